@@ -15,9 +15,10 @@ solo CAPTURA y ANALIZA eventos para trazabilidad.
 
 import logging
 import re
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterable, Iterator, Sequence
 from uuid import uuid4
 
 try:
@@ -47,6 +48,125 @@ from ..models.trace import CognitiveTrace
 
 logger = logging.getLogger(__name__)
 
+# Captura por lotes: un único `git log --patch` para toda la ventana.
+# Cada commit empieza con \x1e y sus campos se separan con \x1f; el mensaje
+# (%B) puede ocupar varias líneas, por eso el encabezado se cierra con \x1f.
+_LOG_FORMAT = "%x1e%H%x1f%P%x1f%an%x1f%ae%x1f%ct%x1f%B%x1f"
+_LOG_HEADER_FIELDS = 6
+_MAX_DIFF_CHARS = 10000  # Limit stored diff to 10KB
+
+
+@dataclass
+class _LogCommit:
+    """
+    Commit parsed from the batch `git log` stream.
+
+    Exposes the attributes of git.Commit used by _detect_event_type and
+    _correlate_with_cognitive_traces (hexsha, parents, message, committed_date).
+    """
+
+    hexsha: str
+    parents: List[str]
+    author_name: str
+    author_email: str
+    committed_date: int
+    message: str
+    files_changed: List[GitFileChange] = field(default_factory=list)
+    _diff_parts: List[str] = field(default_factory=list, repr=False)
+    _diff_len: int = 0
+
+    @property
+    def diff(self) -> str:
+        return "".join(self._diff_parts)[:_MAX_DIFF_CHARS]
+
+    def append_diff(self, text: str) -> None:
+        if self._diff_len < _MAX_DIFF_CHARS:
+            self._diff_parts.append(text)
+            self._diff_len += len(text)
+
+
+def _parse_log_header(header: str) -> _LogCommit:
+    sha, parents, author_name, author_email, committed, message = (
+        header[1:].split("\x1f", _LOG_HEADER_FIELDS)[:_LOG_HEADER_FIELDS]
+    )
+    return _LogCommit(
+        hexsha=sha.strip(),
+        parents=parents.split(),
+        author_name=author_name,
+        author_email=author_email,
+        committed_date=int(committed),
+        message=message,
+    )
+
+
+def _diff_header_path(line: str) -> str:
+    """Path from a `diff --git a/<path> b/<path>` line (both sides are equal unless renamed)"""
+    rest = line[len("diff --git a/"):]
+    return rest[:(len(rest) - 3) // 2]
+
+
+def _iter_log_commits(lines: Iterable[bytes]) -> Iterator[_LogCommit]:
+    """
+    Parse `git log --format=_LOG_FORMAT --patch` output into commits, one pass.
+
+    Per-file line counts come from the hunks, change types from the extended
+    headers (new/deleted file, rename to) and binaries from "Binary files".
+    The stored diff keeps only hunk bodies, like GitPython's Diff.diff.
+    """
+    commit: Optional[_LogCommit] = None
+    header: Optional[str] = None
+    change: Optional[GitFileChange] = None
+    in_hunk = False
+
+    for raw in lines:
+        line = raw.decode("utf-8", errors="ignore").rstrip("\n")
+
+        if header is not None or line.startswith("\x1e"):
+            if header is None:
+                if commit is not None:
+                    yield commit
+                commit, change, in_hunk = None, None, False
+                header = ""
+            header += line + "\n"
+            if header.count("\x1f") >= _LOG_HEADER_FIELDS:
+                commit = _parse_log_header(header)
+                header = None
+            continue
+
+        if commit is None:
+            continue
+
+        if line.startswith("diff --git "):
+            if change is not None:
+                commit.append_diff("\n")
+            change = GitFileChange(file_path=_diff_header_path(line), change_type="modified")
+            commit.files_changed.append(change)
+            in_hunk = False
+        elif change is None:
+            continue
+        elif in_hunk:
+            if line.startswith("+"):
+                change.lines_added += 1
+            elif line.startswith("-"):
+                change.lines_deleted += 1
+            commit.append_diff(line + "\n")
+        elif line.startswith("@@"):
+            in_hunk = True
+            commit.append_diff(line + "\n")
+        elif line.startswith("new file mode"):
+            change.change_type = "added"
+        elif line.startswith("deleted file mode"):
+            change.change_type = "deleted"
+        elif line.startswith("rename to "):
+            change.change_type = "renamed"
+            change.file_path = line[len("rename to "):]
+        elif line.startswith("Binary files "):
+            change.is_binary = True
+            commit.append_diff(line + "\n")
+
+    if commit is not None:
+        yield commit
+
 
 class GitIntegrationAgent:
     """
@@ -98,56 +218,20 @@ class GitIntegrationAgent:
             GitCommandError: If repository or commit not found
         """
         repo = Repo(repo_path)
-        commit = repo.commit(commit_hash)
-
-        # Extract Git metadata
-        event_type = self._detect_event_type(commit)
-        files_changed = self._extract_file_changes(commit)
-        total_lines_added = sum(f.lines_added for f in files_changed)
-        total_lines_deleted = sum(f.lines_deleted for f in files_changed)
-        diff = self._get_commit_diff(commit)
+        commits = list(self._read_log(repo, "-1", commit_hash))
+        if not commits:
+            raise ValueError(f"Commit not found: {commit_hash}")
+        commit = commits[0]
 
-        # Analyze patterns
-        detected_patterns = self._detect_code_patterns(commit, diff)
-
-        # Correlate with cognitive traces (N3/N4)
-        correlation = self._correlate_with_cognitive_traces(
-            commit, cognitive_traces or []
-        )
-
-        # Create GitTrace
-        git_trace = GitTrace(
-            id=str(uuid4()),
+        git_trace = self._build_git_trace(
+            commit,
             session_id=session_id,
             student_id=student_id,
             activity_id=activity_id,
-            event_type=event_type,
-            commit_hash=commit_hash,
-            commit_message=commit.message.strip(),
-            author_name=commit.author.name,
-            author_email=commit.author.email,
-            timestamp=datetime.fromtimestamp(commit.committed_date, tz=timezone.utc),
             branch_name=self._get_branch_name(repo, commit),
-            parent_commits=[p.hexsha for p in commit.parents],
-            files_changed=files_changed,
-            total_lines_added=total_lines_added,
-            total_lines_deleted=total_lines_deleted,
-            diff=diff,
-            is_merge=len(commit.parents) > 1,
-            is_revert="revert" in commit.message.lower(),
-            detected_patterns=detected_patterns,
-            # TODO(TECH-DEBT): Implement cyclomatic complexity analysis
-            # Requires: radon library (pip install radon)
-            # Use: radon.complexity.cc_visit() on Python files
-            # Calculate delta between parent commit and current
-            complexity_delta=None,
-            related_cognitive_traces=correlation["related_trace_ids"],
-            cognitive_state_during_commit=correlation.get("cognitive_state"),
-            time_since_last_interaction_minutes=correlation.get(
-                "time_since_last_interaction_minutes"
-            ),
             repo_path=repo_path,
             remote_url=self._get_remote_url(repo),
+            cognitive_traces=cognitive_traces or [],
         )
 
         # Persist to database if repository is available
@@ -184,7 +268,7 @@ class GitIntegrationAgent:
             extra={
                 "commit_hash": commit_hash,
                 "session_id": session_id,
-                "patterns": [p.value for p in detected_patterns],
+                "patterns": [p.value for p in git_trace.detected_patterns],
             },
         )
         return git_trace
@@ -202,6 +286,11 @@ class GitIntegrationAgent:
         """
         Capture all commits in a time window (typically a learning session)
 
+        Single pass: the repository is opened once, one `git log --patch`
+        streams every commit of the window, branch names are resolved with
+        one rev-list per local branch and new traces are persisted with one
+        bulk insert. Commits already captured for the session are skipped.
+
         Args:
             repo_path: Path to Git repository
             session_id: Session ID
@@ -212,23 +301,26 @@ class GitIntegrationAgent:
             cognitive_traces: N4 traces for correlation
 
         Returns:
-            List of GitTrace instances
+            List of GitTrace instances (newest first)
         """
         repo = Repo(repo_path)
-        commits = list(repo.iter_commits(since=since, until=until))
+        remote_url = self._get_remote_url(repo)
+        commits = list(self._read_log(repo, since=since, until=until))
+        branch_names = self._get_branch_names(repo, [c.hexsha for c in commits])
 
         git_traces = []
         for commit in commits:
             try:
-                git_trace = self.capture_commit(
-                    repo_path=repo_path,
-                    commit_hash=commit.hexsha,
+                git_traces.append(self._build_git_trace(
+                    commit,
                     session_id=session_id,
                     student_id=student_id,
                     activity_id=activity_id,
-                    cognitive_traces=cognitive_traces,
-                )
-                git_traces.append(git_trace)
+                    branch_name=branch_names.get(commit.hexsha, "unknown"),
+                    repo_path=repo_path,
+                    remote_url=remote_url,
+                    cognitive_traces=cognitive_traces or [],
+                ))
             except Exception as e:
                 logger.error(
                     f"Error capturing commit {commit.hexsha}: {e}",
@@ -236,6 +328,14 @@ class GitIntegrationAgent:
                     extra={"commit_hash": commit.hexsha, "session_id": session_id},
                 )
 
+        if self.git_trace_repo and git_traces:
+            existing = self.git_trace_repo.get_existing_commit_hashes(
+                session_id, [t.commit_hash for t in git_traces]
+            )
+            if existing:
+                git_traces = [t for t in git_traces if t.commit_hash not in existing]
+            self.git_trace_repo.bulk_create(git_traces)
+
         logger.info(
             f"Captured {len(git_traces)} commits for session",
             extra={"session_id": session_id, "total_commits": len(git_traces)},
@@ -453,70 +553,76 @@ class GitIntegrationAgent:
             return GitEventType.REVERT
         return GitEventType.COMMIT
 
-    def _extract_file_changes(self, commit: Commit) -> List[GitFileChange]:
-        """Extract file changes from a commit"""
-        changes = []
-
-        # Get parent commit for diff
-        if commit.parents:
-            parent = commit.parents[0]
-            diffs = parent.diff(commit, create_patch=True)
-        else:
-            # First commit: compare to null tree
-            diffs = commit.diff(None, create_patch=True)
-
-        for diff in diffs:
-            # Determine change type
-            if diff.new_file:
-                change_type = "added"
-            elif diff.deleted_file:
-                change_type = "deleted"
-            elif diff.renamed_file:
-                change_type = "renamed"
-            else:
-                change_type = "modified"
-
-            # Extract line counts from diff stats
-            lines_added = 0
-            lines_deleted = 0
-            if hasattr(diff, 'diff') and diff.diff:
-                diff_text = diff.diff.decode('utf-8', errors='ignore')
-                lines_added = diff_text.count('\n+') - diff_text.count('\n+++')
-                lines_deleted = diff_text.count('\n-') - diff_text.count('\n---')
-
-            # Determine if binary
-            is_binary = diff.b_blob and diff.b_blob.data_stream.read(8192).find(b'\x00') != -1 if diff.b_blob else False
-
-            changes.append(
-                GitFileChange(
-                    file_path=diff.b_path or diff.a_path,
-                    change_type=change_type,
-                    lines_added=max(0, lines_added),
-                    lines_deleted=max(0, lines_deleted),
-                    is_binary=is_binary,
-                )
-            )
+    def _read_log(self, repo: Repo, *rev_args: str, **kwargs: Any) -> Iterator[_LogCommit]:
+        """
+        Stream `git log --patch` and yield parsed commits.
 
-        return changes
+        Merges are diffed against their first parent; renames are detected (-M)
+        as GitPython's Diffable.diff does.
+        """
+        proc = repo.git(c="core.quotePath=false").log(
+            f"--format={_LOG_FORMAT}",
+            "--patch",
+            "-M",
+            "--diff-merges=first-parent",
+            "--no-color",
+            "--no-ext-diff",
+            "--no-textconv",
+            *rev_args,
+            as_process=True,
+            **kwargs,
+        )
+        yield from _iter_log_commits(proc.stdout)
+        proc.wait()
 
-    def _get_commit_diff(self, commit: Commit) -> str:
-        """Get full diff text for a commit"""
-        try:
-            if commit.parents:
-                parent = commit.parents[0]
-                diffs = parent.diff(commit, create_patch=True)
-            else:
-                diffs = commit.diff(None, create_patch=True)
-
-            diff_text = ""
-            for diff in diffs:
-                if hasattr(diff, 'diff') and diff.diff:
-                    diff_text += diff.diff.decode('utf-8', errors='ignore') + "\n"
-            return diff_text[:10000]  # Limit to 10KB
-        except Exception as e:
-            # FIX Cortez36: Use lazy logging formatting
-            logger.warning("Error extracting diff: %s", e)
-            return ""
+    def _build_git_trace(
+        self,
+        commit: _LogCommit,
+        session_id: str,
+        student_id: str,
+        activity_id: str,
+        branch_name: str,
+        repo_path: str,
+        remote_url: Optional[str],
+        cognitive_traces: List[CognitiveTrace],
+    ) -> GitTrace:
+        """Build a GitTrace from a parsed commit (no Git access)"""
+        diff = commit.diff
+        correlation = self._correlate_with_cognitive_traces(commit, cognitive_traces)
+
+        return GitTrace(
+            id=str(uuid4()),
+            session_id=session_id,
+            student_id=student_id,
+            activity_id=activity_id,
+            event_type=self._detect_event_type(commit),
+            commit_hash=commit.hexsha,
+            commit_message=commit.message.strip(),
+            author_name=commit.author_name,
+            author_email=commit.author_email,
+            timestamp=datetime.fromtimestamp(commit.committed_date, tz=timezone.utc),
+            branch_name=branch_name,
+            parent_commits=commit.parents,
+            files_changed=commit.files_changed,
+            total_lines_added=sum(f.lines_added for f in commit.files_changed),
+            total_lines_deleted=sum(f.lines_deleted for f in commit.files_changed),
+            diff=diff,
+            is_merge=len(commit.parents) > 1,
+            is_revert="revert" in commit.message.lower(),
+            detected_patterns=self._detect_code_patterns(commit, diff),
+            # TODO(TECH-DEBT): Implement cyclomatic complexity analysis
+            # Requires: radon library (pip install radon)
+            # Use: radon.complexity.cc_visit() on Python files
+            # Calculate delta between parent commit and current
+            complexity_delta=None,
+            related_cognitive_traces=correlation["related_trace_ids"],
+            cognitive_state_during_commit=correlation.get("cognitive_state"),
+            time_since_last_interaction_minutes=correlation.get(
+                "time_since_last_interaction_minutes"
+            ),
+            repo_path=repo_path,
+            remote_url=remote_url,
+        )
 
     def _detect_code_patterns(
         self, commit: Commit, diff: str
@@ -636,6 +742,29 @@ class GitIntegrationAgent:
             logger.debug("Failed to get current branch: %s", e)
             return "unknown"
 
+    def _get_branch_names(self, repo: Repo, commit_hashes: Sequence[str]) -> Dict[str, str]:
+        """
+        Map commits to the first local branch containing them.
+
+        Same answer as `git branch --contains` per commit, but with one
+        rev-list per branch (in refname order) instead of one call per commit.
+        """
+        pending = set(commit_hashes)
+        names: Dict[str, str] = {}
+        try:
+            refs = repo.git.for_each_ref("--format=%(refname)", "refs/heads").splitlines()
+            for ref in refs:
+                if not pending:
+                    break
+                contained = pending.intersection(repo.git.rev_list(ref).splitlines())
+                branch = ref[len("refs/heads/"):]
+                for commit_hash in contained:
+                    names[commit_hash] = branch
+                pending -= contained
+        except (GitCommandError, AttributeError) as e:
+            logger.debug("Failed to resolve branches: %s", e)
+        return names
+
     def _get_remote_url(self, repo: Repo) -> Optional[str]:
         """Get remote URL for repository"""
         try:
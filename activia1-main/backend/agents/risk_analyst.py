@@ -34,15 +34,9 @@ LLM_ANALYSIS_MAX_TOKENS = 600  # Max tokens for LLM risk analysis
 # FIX Cortez91 HIGH-A01: Use centralized LLM_TIMEOUT_SECONDS from constants (avoid duplicate definition)
 from ..core.constants import LLM_TIMEOUT_SECONDS
 
-# BE-OPT-002: Precomputed delegation signals as frozenset for O(1) lookup
-DELEGATION_SIGNALS = frozenset([
-    "dame el código completo",
-    "hacé todo",
-    "resolvelo por mí",
-    "código entero",
-    "implementa todo",
-    "haceme"
-])
+# BE-OPT-002: Señales de delegación e indicadores de código compilados una sola vez
+# (categorías risk_delegation / code_indicator de core/signal_dictionaries.py)
+from ..core.signal_matcher import get_signal_matcher
 from ..models.risk import Risk, RiskType, RiskLevel, RiskDimension, RiskReport
 from ..llm.base import LLMMessage, LLMRole
 
@@ -625,25 +619,15 @@ class AnalistaRiesgoAgent(LLMGenerationMixin):
         """
         Detecta si un prompt es delegación total.
 
-        BE-OPT-002: Uses module-level frozenset DELEGATION_SIGNALS for O(1) lookup.
+        BE-OPT-002: Una pasada del SignalMatcher compartido (categoría risk_delegation).
         """
-        content_lower = content.lower()
-        # O(n) where n = len(content_lower) * len(DELEGATION_SIGNALS)
-        # but DELEGATION_SIGNALS is small and fixed
-        return any(signal in content_lower for signal in DELEGATION_SIGNALS)
+        return "risk_delegation" in get_signal_matcher().match(content)
 
     def _looks_like_code(self, content: str) -> bool:
         """Detecta si el contenido parece ser código de programación"""
-        code_indicators = [
-            "def ", "class ", "function ", "return ", "import ",
-            "if ", "else:", "for ", "while ", "{", "}", 
-            "var ", "const ", "let ", "=>", "public ", "private ",
-            "#include", "void ", "int ", "string "
-        ]
-        content_lower = content.lower()
-        # Considerar código si tiene al menos 2 indicadores
-        matches = sum(1 for indicator in code_indicators if indicator.lower() in content_lower)
-        return matches >= 2
+        # Considerar código si tiene al menos 2 indicadores distintos
+        indicators = get_signal_matcher().match(content).get("code_indicator", ())
+        return len(indicators) >= 2
 
     def _count_delegation_attempts(self, traces: List[CognitiveTrace]) -> int:
         """Cuenta intentos de delegación"""
@@ -402,36 +402,19 @@ class BaseSimulator(ABC):
         """
         Load conversation history from session as LLM messages.
 
-        Retrieves all traces from the session and converts them to the format
-        expected by the LLM provider.
+        Retrieves only the newest traces of the session (HISTORY_TAIL_MESSAGES,
+        newest-first index scan) trimmed to HISTORY_TOKEN_BUDGET, so prompt size
+        and query cost stay bounded in long simulations.
         """
         if self.trace_repo is None:
             logger.warning("No trace repository available for conversation history")
             return []
 
         try:
-            from ...llm.base import LLMMessage, LLMRole
-            from ...models.trace import InteractionType
-
-            # Retrieve all traces for this session
-            db_traces = self.trace_repo.get_by_session(session_id)
+            from ...core.conversation_history import ConversationHistoryLoader
 
-            messages = []
-            for trace in db_traces:
-                # Add user message (STUDENT_PROMPT)
-                if trace.interaction_type == InteractionType.STUDENT_PROMPT.value and trace.content:
-                    messages.append(
-                        LLMMessage(role=LLMRole.USER, content=trace.content)
-                    )
-
-                # Add assistant response (AI_RESPONSE or TUTOR_INTERVENTION)
-                elif trace.interaction_type in [
-                    InteractionType.AI_RESPONSE.value,
-                    InteractionType.TUTOR_INTERVENTION.value
-                ] and trace.content:
-                    messages.append(
-                        LLMMessage(role=LLMRole.ASSISTANT, content=trace.content)
-                    )
+            loader = ConversationHistoryLoader(llm_provider=self.llm_provider)
+            messages = loader.build_messages(loader.fetch_tail(self.trace_repo, session_id))
 
             logger.info(
                 "Loaded conversation history: %d messages",
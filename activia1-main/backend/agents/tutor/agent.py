@@ -27,6 +27,7 @@ from ...models.trace import CognitiveTrace, TraceLevel, InteractionType
 from ...utils.prompt_security import detect_prompt_injection
 # FIX Cortez88 HIGH-TIMEOUT-001: Use centralized timeout configuration (from constants to avoid circular imports)
 from ...core.constants import LLM_TIMEOUT_SECONDS
+from ...core.signal_matcher import get_signal_matcher
 from .rules import (
     TutorRulesEngine,
     TutorRule,
@@ -1390,11 +1391,13 @@ Por favor, reformulá tu consulta incluyendo esta información.
         - Justificación de decisiones
         - Autocorrección
         """
+        # Las cuatro detecciones salen de una sola pasada del matcher
+        signals = get_signal_matcher().match(student_response)
         analysis = {
-            "has_justification": self._detect_justification(student_response),
-            "shows_decomposition": self._detect_decomposition(student_response),
-            "shows_planning": self._detect_planning(student_response),
-            "shows_self_reflection": self._detect_self_reflection(student_response),
+            "has_justification": "justification" in signals,
+            "shows_decomposition": "decomposition" in signals,
+            "shows_planning": "planning" in signals,
+            "shows_self_reflection": "self_reflection" in signals,
             "quality_score": 0.0,  # 0-1
         }
 
@@ -1415,32 +1418,16 @@ Por favor, reformulá tu consulta incluyendo esta información.
 
     def _detect_justification(self, text: str) -> bool:
         """Detecta si hay justificación en la respuesta"""
-        justification_signals = [
-            "porque", "ya que", "debido a", "considerando que",
-            "mi razón es", "pensé que", "decidí", "elegí"
-        ]
-        return any(signal in text.lower() for signal in justification_signals)
+        return "justification" in get_signal_matcher().match(text)
 
     def _detect_decomposition(self, text: str) -> bool:
         """Detecta si hay descomposición del problema"""
-        decomposition_signals = [
-            "primero", "luego", "después", "paso", "parte",
-            "dividir", "separar", "componente", "subproblema"
-        ]
-        return any(signal in text.lower() for signal in decomposition_signals)
+        return "decomposition" in get_signal_matcher().match(text)
 
     def _detect_planning(self, text: str) -> bool:
         """Detecta si hay evidencia de planificación"""
-        planning_signals = [
-            "voy a", "planeo", "mi estrategia", "mi plan",
-            "primero haré", "mi enfoque", "mi idea es"
-        ]
-        return any(signal in text.lower() for signal in planning_signals)
+        return "planning" in get_signal_matcher().match(text)
 
     def _detect_self_reflection(self, text: str) -> bool:
         """Detecta si hay reflexión metacognitiva"""
-        reflection_signals = [
-            "me doy cuenta", "entiendo que", "ahora veo",
-            "me confundí", "cometí el error", "debería"
-        ]
-        return any(signal in text.lower() for signal in reflection_signals)
\ No newline at end of file
+        return "self_reflection" in get_signal_matcher().match(text)
\ No newline at end of file
@@ -7,6 +7,8 @@ Basado en principios de andamiaje cognitivo y pedagogía socrática.
 from typing import Dict, Any, List, Optional
 from enum import Enum
 
+from ...core.signal_matcher import get_signal_matcher
+
 
 class TutorRule(str, Enum):
     """Reglas pedagógicas inquebrantables del tutor"""
@@ -177,8 +179,9 @@ class TutorRulesEngine:
             return {"needs_explicitacion": False}
         
         # Detectar si el estudiante dio una respuesta sin justificación
-        has_justification = self._detect_justification(student_message)
-        has_plan = self._detect_planning(student_message)
+        signals = get_signal_matcher().match(student_message)
+        has_justification = "rules_justification" in signals
+        has_plan = "rules_planning" in signals
         
         # Verificar longitud de la explicación
         is_too_short = len(student_message.strip()) < self.thresholds["min_explanation_length"]
@@ -295,21 +298,11 @@ class TutorRulesEngine:
     
     def _detect_justification(self, text: str) -> bool:
         """Detecta si hay justificación en el texto"""
-        justification_signals = [
-            "porque", "ya que", "debido a", "considerando que",
-            "mi razón es", "pensé que", "decidí", "elegí",
-            "esto se debe", "la razón es"
-        ]
-        return any(signal in text.lower() for signal in justification_signals)
+        return "rules_justification" in get_signal_matcher().match(text)
     
     def _detect_planning(self, text: str) -> bool:
         """Detecta si hay evidencia de planificación"""
-        planning_signals = [
-            "voy a", "planeo", "mi estrategia", "mi plan",
-            "primero", "luego", "después", "paso",
-            "mi enfoque", "mi idea es"
-        ]
-        return any(signal in text.lower() for signal in planning_signals)
+        return "rules_planning" in get_signal_matcher().match(text)
     
     # === Generadores de mensajes ===
     
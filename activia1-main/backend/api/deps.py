@@ -4,27 +4,37 @@ Sistema centralizado para proveer dependencias a los endpoints
 
 Cortez92: Fixed thundering herd, moved imports to top level, lazy logging
 """
-from typing import Generator, Optional, Union
+from typing import AsyncGenerator, Callable, Generator, Optional, Union
 import logging
 import os
 import threading
 
 from dotenv import load_dotenv
 from fastapi import Depends, Header, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from ..database import get_db_session
+from ..database import get_db_session, get_async_db_session, is_async_database_enabled
 from ..database.repositories import (
+    AsyncRiskRepository,
+    AsyncSessionRepository,
+    AsyncTraceRepository,
     EvaluationRepository,
     RiskRepository,
     SessionRepository,
+    SessionRollupRepository,
     TraceRepository,
     TraceSequenceRepository,
     UserRepository,
     InterventionRepository,  # Cortez82
 )
 from ..core import AIGateway
+from ..core.gateway.pipeline import GatewayPipeline
 from ..core.cache import get_llm_cache
+from ..core.semantic_cache import get_semantic_cache
+from ..core.trace_writer import get_trace_writer
+from ..core.risk_queue import get_risk_queue
+from ..core.session_context_cache import get_session_context_cache
 from ..llm import LLMProviderFactory
 
 # Load environment variables once at module level (MED-009 fix)
@@ -55,6 +65,26 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[Optional[AsyncSession], None]:
+    """
+    Dependency para obtener una sesión async de base de datos (asyncpg/aiosqlite).
+
+    Yields None cuando el backend no soporta acceso async (SQLite en memoria,
+    driver no instalado o DB_ASYNC_ENABLED=false): los consumidores deben caer
+    al camino sync con get_db. Tests que sobrescriben get_db deben sobrescribir
+    también esta dependencia (p. ej. devolviendo None).
+
+    Yields:
+        AsyncSession o None
+    """
+    if not is_async_database_enabled():
+        yield None
+        return
+
+    async with get_async_db_session() as session:
+        yield session
+
+
 # =============================================================================
 # Repository Dependencies
 # =============================================================================
@@ -75,6 +105,11 @@ def get_risk_repository(db: Session = Depends(get_db)) -> RiskRepository:
     return RiskRepository(db)
 
 
+def get_session_rollup_repository(db: Session = Depends(get_db)) -> SessionRollupRepository:
+    """Dependency para obtener el repositorio de agregados por sesión"""
+    return SessionRollupRepository(db)
+
+
 def get_evaluation_repository(db: Session = Depends(get_db)) -> EvaluationRepository:
     """Dependency para obtener el repositorio de evaluaciones"""
     return EvaluationRepository(db)
@@ -244,6 +279,7 @@ def get_ai_gateway(
     risk_repo: RiskRepository = Depends(get_risk_repository),
     evaluation_repo: EvaluationRepository = Depends(get_evaluation_repository),
     sequence_repo: TraceSequenceRepository = Depends(get_sequence_repository),
+    async_db: Optional[AsyncSession] = Depends(get_async_db),
 ) -> AIGateway:
     """
     Dependency para obtener el AI Gateway con Dependency Injection completa.
@@ -251,7 +287,8 @@ def get_ai_gateway(
 
     IMPORTANTE: No usar singleton para el gateway ya que los repositorios
     contienen sesiones de BD que deben ser únicas por request.
-    El LLM provider y el cache sí se cachean (stateless).
+    El resto (LLM provider, cache, motor cognitivo, gobernanza, historial)
+    vive en el GatewayPipeline compartido: ver get_gateway_pipeline().
 
     El LLM provider se inicializa desde variables de entorno:
     - LLM_PROVIDER=mock (default): Mock provider sin API calls
@@ -263,6 +300,9 @@ def get_ai_gateway(
     - LLM_CACHE_TTL=3600 (default): TTL en segundos (1 hora)
     - LLM_CACHE_MAX_ENTRIES=1000 (default): Máximo de entradas
 
+    Con sesión async disponible, los repos del hot path (sesión, trazas, riesgos)
+    son async para no bloquear el event loop durante process_interaction.
+
     Returns:
         AIGateway: Nueva instancia del orquestador central con repositorios inyectados
 
@@ -274,48 +314,110 @@ def get_ai_gateway(
         ):
             return gateway.process_interaction(...)
     """
-    global _llm_provider_instance
+    # Motor cognitivo, gobernanza, historial, caches y LLM: construidos una vez
+    pipeline = get_gateway_pipeline()
 
-    # ✅ FIXED (2025-11-22): Usar lock-first pattern (más seguro que double-checked en Python)
-    # El GIL no garantiza atomicidad en evaluación de condiciones, así que
-    # adquirimos el lock ANTES de verificar el estado
-    with _llm_provider_lock:
-        if _llm_provider_instance is None:
-            _llm_provider_instance = _initialize_llm_provider()
+    # Hot path async: sesión, trazas y riesgos sobre AsyncSession
+    if async_db is not None:
+        session_repo = AsyncSessionRepository(async_db)
+        trace_repo = AsyncTraceRepository(async_db)
+        risk_repo = AsyncRiskRepository(async_db)
+
+    # ✅ REFACTORIZADO: Crear NUEVA instancia de gateway por request
+    # con TODOS los repositorios inyectados (Dependency Injection completa)
+    return AIGateway(
+        session_repo=session_repo,
+        trace_repo=trace_repo,
+        risk_repo=risk_repo,
+        evaluation_repo=evaluation_repo,
+        sequence_repo=sequence_repo,
+        trace_writer=get_trace_writer(),  # Write-behind (None si está deshabilitado)
+        risk_queue=get_risk_queue(),  # Cola durable de AR-IA (None si está deshabilitada)
+        pipeline=pipeline,
+    )
 
-    # CRIT-004 FIX: Check if initialization failed
-    if _llm_provider_instance is False:
-        raise LLMProviderInitializationError(
-            "LLM Provider failed to initialize. Check logs for details."
-        )
 
-    # Obtener cache LLM (singleton, compartido entre todos los requests)
-    # Leer configuración desde variables de entorno (os already imported at module level)
+def _get_env_llm_cache():
+    """Obtiene el cache LLM singleton configurado desde variables de entorno."""
     cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
     cache_ttl = int(os.getenv("LLM_CACHE_TTL", "3600"))  # 1 hora por defecto
     cache_max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
 
-    llm_cache = get_llm_cache(
+    return get_llm_cache(
         ttl_seconds=cache_ttl,
         max_entries=cache_max_entries,
         enabled=cache_enabled
     )
 
-    # ✅ REFACTORIZADO: Crear NUEVA instancia de gateway por request
-    # con TODOS los repositorios inyectados (Dependency Injection completa)
+
+# Pipeline del gateway (singleton): componentes sin estado por request
+_gateway_pipeline: Optional[GatewayPipeline] = None
+_gateway_pipeline_lock = threading.Lock()
+
+
+def get_gateway_pipeline() -> GatewayPipeline:
+    """
+    Obtiene el GatewayPipeline compartido (singleton).
+
+    Se construye en el lifespan de la app (o en el primer request) con el LLM
+    provider, el cache LLM, el caché de contexto y el caché semántico. Cada
+    AIGateway por request solo agrega sus repositorios.
+
+    Raises:
+        LLMProviderInitializationError: If provider failed to initialize
+    """
+    global _gateway_pipeline
+
+    llm_provider = get_llm_provider()
+    pipeline = _gateway_pipeline
+    # Se reconstruye si el singleton del provider fue reemplazado
+    if pipeline is None or pipeline.llm is not llm_provider:
+        with _gateway_pipeline_lock:
+            if _gateway_pipeline is None or _gateway_pipeline.llm is not llm_provider:
+                _gateway_pipeline = GatewayPipeline.build(
+                    llm_provider=llm_provider,
+                    cache=_get_env_llm_cache(),
+                    context_cache=get_session_context_cache(),
+                    semantic_cache=get_semantic_cache(),  # None salvo SEMANTIC_CACHE_ENABLED=true
+                )
+                logger.info("Gateway pipeline initialized")
+            pipeline = _gateway_pipeline
+
+    return pipeline
+
+
+def reset_gateway_pipeline() -> None:
+    """Descarta el pipeline compartido (tests o cambio de configuración)."""
+    global _gateway_pipeline
+    with _gateway_pipeline_lock:
+        _gateway_pipeline = None
+
+
+def build_ai_gateway(db: Session) -> AIGateway:
+    """
+    Construye un AIGateway ligado a una sesión de BD propia.
+
+    Para flujos que sobreviven al ciclo de dependencias del request (streaming SSE):
+    FastAPI cierra las dependencias con yield antes de enviar el body, así que el
+    generador del stream abre su propia sesión y arma el gateway con ella.
+    """
     return AIGateway(
-        llm_provider=_llm_provider_instance,
-        cognitive_engine=None,  # Usar default (backward compatibility)
-        session_repo=session_repo,
-        trace_repo=trace_repo,
-        risk_repo=risk_repo,
-        evaluation_repo=evaluation_repo,
-        sequence_repo=sequence_repo,
-        cache=llm_cache,  # ✅ Cache LLM inyectado
-        config=None
+        session_repo=SessionRepository(db),
+        trace_repo=TraceRepository(db),
+        risk_repo=RiskRepository(db),
+        evaluation_repo=EvaluationRepository(db),
+        sequence_repo=TraceSequenceRepository(db),
+        trace_writer=get_trace_writer(),
+        risk_queue=get_risk_queue(),
+        pipeline=get_gateway_pipeline(),
     )
 
 
+def get_ai_gateway_factory() -> Callable[[Session], AIGateway]:
+    """Dependency que provee la factory de gateways para endpoints streaming (override en tests)."""
+    return build_ai_gateway
+
+
 # =============================================================================
 # Authentication Dependencies (JWT)
 # =============================================================================
@@ -353,6 +353,30 @@ class ExportError(AINativeAPIException):
         )
 
 
+class ExportNotReadyError(AINativeAPIException):
+    """El job de exportación todavía no tiene un archivo descargable"""
+
+    def __init__(self, job_id: str, job_status: str):
+        super().__init__(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Export job '{job_id}' is {job_status}, no file available",
+            error_code="EXPORT_NOT_READY",
+            extra={"job_id": job_id, "status": job_status}
+        )
+
+
+class RangeNotSatisfiableError(AINativeAPIException):
+    """Header Range fuera del tamaño del archivo"""
+
+    def __init__(self, range_header: str, file_size: int):
+        super().__init__(
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            detail=f"Range '{range_header}' not satisfiable for {file_size} bytes",
+            headers={"Content-Range": f"bytes */{file_size}"},
+            error_code="RANGE_NOT_SATISFIABLE",
+        )
+
+
 class LLMServiceError(AINativeAPIException):
     """Error del servicio LLM"""
 
@@ -640,13 +664,9 @@ class PrivacyValidationError(AINativeAPIException):
     def __init__(self, errors: list, metrics: dict = None):
         super().__init__(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail={
-                "error": "Privacy validation failed",
-                "errors": errors,
-                "metrics": metrics or {},
-            },
+            detail="Privacy validation failed",
             error_code="PRIVACY_VALIDATION_ERROR",
-            extra={"errors": errors, "metrics": metrics}
+            extra={"errors": errors, "metrics": metrics or {}}
         )
 
 
@@ -161,6 +161,51 @@ async def lifespan(app: FastAPI):
         # FIX Cortez46: Use lazy logging formatting
         logger.warning("Failed to start cache cleanup (non-critical): %s", e)
 
+    # Write-behind de trazas (TRACE_WRITE_BEHIND_ENABLED)
+    try:
+        from ..core.trace_writer import start_trace_writer
+        await start_trace_writer()
+    except Exception as e:
+        logger.warning("Failed to start trace writer, using synchronous trace writes: %s", e)
+
+    # Componentes compartidos del AIGateway (motor cognitivo, gobernanza, caches)
+    try:
+        from .deps import get_gateway_pipeline
+        get_gateway_pipeline()
+    except Exception as e:
+        logger.warning("Failed to build gateway pipeline at startup, will retry on first request: %s", e)
+
+    # Cola durable del análisis de riesgo (RISK_QUEUE_ENABLED)
+    try:
+        from ..core.ai_gateway import AIGateway
+        from ..core.risk_queue import start_risk_queue
+        from .deps import get_gateway_pipeline
+        await start_risk_queue(lambda: AIGateway(pipeline=get_gateway_pipeline()))
+    except Exception as e:
+        logger.warning("Failed to start risk queue, analyzing risks in process: %s", e)
+
+    # Workers de exportaciones de investigación en background (EXPORT_JOBS_ENABLED)
+    try:
+        from ..services.export_jobs import start_export_job_runner
+        await start_export_job_runner()
+    except Exception as e:
+        logger.warning("Failed to start export job workers, export jobs stay pending: %s", e)
+
+    # Fan-out de alertas WebSocket entre workers (ALERT_BROKER)
+    try:
+        from ..core.alert_broker import start_alert_broker
+        from .routers.websocket_alerts import alert_manager
+        await start_alert_broker(alert_manager.deliver_envelope)
+    except Exception as e:
+        logger.warning("Failed to start alert broker, alerts reach this worker's teachers only: %s", e)
+
+    # Workers sandbox pre-arrancados (SANDBOX_POOL_ENABLED)
+    try:
+        from ..utils.sandbox_pool import start_sandbox_pool
+        await start_sandbox_pool()
+    except Exception as e:
+        logger.warning("Failed to start sandbox pool, using per-run interpreters: %s", e)
+
     yield  # Aplicación en ejecución
 
     # Shutdown
@@ -195,14 +240,58 @@ async def lifespan(app: FastAPI):
         # FIX Cortez46: Use lazy logging formatting
         logger.warning("Failed to close LLM provider (non-critical): %s", e)
 
+    try:
+        from ..core.alert_broker import stop_alert_broker
+        await asyncio.wait_for(stop_alert_broker(), timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Alert broker stop timed out after %s seconds", SHUTDOWN_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Failed to stop alert broker (non-critical): %s", e)
+
+    try:
+        from ..utils.sandbox_pool import stop_sandbox_pool
+        await asyncio.wait_for(stop_sandbox_pool(), timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Sandbox pool stop timed out after %s seconds", SHUTDOWN_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Failed to stop sandbox pool (non-critical): %s", e)
+
     # Cortez76: Removed Redis training session storage (Entrenador Digital removed)
 
+    # Workers de exportación: el job en curso vuelve a pending y se retoma luego
+    try:
+        from ..services.export_jobs import stop_export_job_runner
+        await asyncio.wait_for(stop_export_job_runner(), timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Export job workers stop timed out after %s seconds", SHUTDOWN_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Failed to stop export job workers (non-critical): %s", e)
+
+    # Workers de la cola de riesgo: terminan su lote; lo pendiente queda en la cola
+    try:
+        from ..core.risk_queue import stop_risk_queue
+        await asyncio.wait_for(stop_risk_queue(), timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Risk queue stop timed out after %s seconds", SHUTDOWN_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Failed to stop risk queue (non-critical): %s", e)
+
+    # Flush final de trazas pendientes (antes de cerrar el pool de BD)
+    try:
+        from ..core.trace_writer import stop_trace_writer
+        await asyncio.wait_for(stop_trace_writer(), timeout=SHUTDOWN_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        logger.warning("Trace writer flush timed out after %s seconds", SHUTDOWN_TIMEOUT_SECONDS)
+    except Exception as e:
+        logger.warning("Failed to flush trace writer: %s", e)
+
     # FIX Cortez35: Dispose database connection pool
     try:
-        from ..database.config import DatabaseConfig
-        db_config = DatabaseConfig()
-        db_config.close()
-        logger.info("Database connection pool disposed")
+        # Dispose the global config's pools (a fresh DatabaseConfig() has none)
+        from ..database.config import get_db_config
+        db_config = get_db_config()
+        await asyncio.wait_for(db_config.close_async(), timeout=SHUTDOWN_TIMEOUT_SECONDS)
+        logger.info("Database connection pools disposed (sync + async)")
     except Exception as e:
         # FIX Cortez46: Use lazy logging formatting
         logger.warning("Failed to dispose database pool (non-critical): %s", e)
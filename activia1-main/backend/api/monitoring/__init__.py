@@ -6,9 +6,10 @@ Proporciona observabilidad del sistema mediante Prometheus metrics.
 HIGH-01 Implementation (2025-11-25):
 - Métricas de interacciones (interactions_total, governance_blocks)
 - Métricas de LLM (llm_call_duration_seconds)
-- Métricas de cache (cache_hits, cache_misses, cache_hit_rate)
+- Métricas de cache (cache_hits, cache_misses, cache_hit_rate; por lote con record_cache_lookups)
 - Métricas de riesgos (risks_detected_total)
 - Métricas de trazas (traces_created_total)
+- Métricas de la cola de riesgo (risk_queue_depth, risk_queue_jobs_total)
 - Métricas HTTP (http_requests_total, http_request_duration_seconds)
 """
 
@@ -23,6 +24,7 @@ from .metrics import (
     record_interaction,
     record_llm_call,
     record_cache_operation,
+    record_cache_lookups,
     record_database_operation,
     record_governance_block,
     record_risk_detection,
@@ -30,6 +32,8 @@ from .metrics import (
     record_trace_creation,
     update_active_sessions,
     update_database_pool_stats,
+    update_risk_queue_depth,
+    record_risk_queue_jobs,
     # HTTP metrics (HIGH-01)
     record_http_request,
     record_http_request_start,
@@ -49,6 +53,7 @@ __all__ = [
     "record_interaction",
     "record_llm_call",
     "record_cache_operation",
+    "record_cache_lookups",
     "record_database_operation",
     "record_governance_block",
     "record_risk_detection",
@@ -56,6 +61,8 @@ __all__ = [
     "record_trace_creation",
     "update_active_sessions",
     "update_database_pool_stats",
+    "update_risk_queue_depth",
+    "record_risk_queue_jobs",
     # HTTP metrics (HIGH-01)
     "record_http_request",
     "record_http_request_start",
@@ -215,6 +215,21 @@ def _initialize_metrics(registry: CollectorRegistry) -> None:
         registry=registry,
     )
 
+    # 11. RISK QUEUE - Cola durable del análisis AR-IA
+    _metrics["risk_queue_depth"] = Gauge(
+        name="ai_native_risk_queue_depth",
+        documentation="Jobs de análisis de riesgo en la cola por estado (pending, delayed, dead)",
+        labelnames=["state"],
+        registry=registry,
+    )
+
+    _metrics["risk_queue_jobs"] = Counter(
+        name="ai_native_risk_queue_jobs_total",
+        documentation="Jobs de análisis de riesgo por resultado (enqueued, completed, retried, ...)",
+        labelnames=["outcome"],
+        registry=registry,
+    )
+
     logger.info("Initialized %d Prometheus metrics", len(_metrics))
 
 
@@ -400,6 +415,38 @@ def record_cache_operation(cache_type: str, hit: bool) -> None:
         metrics_gauge("cache_hit_rate", hit_rate, "set", {"cache_type": cache_type})
 
 
+def record_cache_lookups(
+    cache_type: str,
+    hits: int,
+    misses: int,
+    total_hits: int,
+    total_lookups: int,
+) -> None:
+    """
+    Registra un lote de consultas de cache (p. ej. MGET de embeddings).
+
+    El hit rate se calcula con los contadores propios del cache (total_hits /
+    total_lookups), no leyendo el valor de los Counter de Prometheus.
+
+    Args:
+        cache_type: Tipo de cache (embedding_memory, embedding_redis, ...)
+        hits: Cantidad de aciertos del lote
+        misses: Cantidad de fallos del lote
+        total_hits: Aciertos acumulados del cache (incluye el lote)
+        total_lookups: Consultas acumuladas del cache (incluye el lote)
+    """
+    if "cache_hits" not in _metrics:
+        return
+
+    if hits:
+        _metrics["cache_hits"].labels(cache_type=cache_type).inc(hits)
+    if misses:
+        _metrics["cache_misses"].labels(cache_type=cache_type).inc(misses)
+
+    if total_lookups > 0:
+        metrics_gauge("cache_hit_rate", (total_hits / total_lookups) * 100, "set", {"cache_type": cache_type})
+
+
 @contextmanager
 def record_database_operation(operation: str, table: str):
     """
@@ -533,6 +580,33 @@ def update_database_pool_stats(pool_size: int, checked_out: int) -> None:
     metrics_gauge("db_pool_checked_out", checked_out, "set")
 
 
+def update_risk_queue_depth(pending: int, delayed: int, dead: int) -> None:
+    """
+    Actualiza la profundidad de la cola de análisis de riesgo.
+
+    Args:
+        pending: Jobs listos o en proceso
+        delayed: Jobs esperando el backoff de un reintento
+        dead: Jobs en dead-letter
+    """
+    metrics_gauge("risk_queue_depth", pending, "set", {"state": "pending"})
+    metrics_gauge("risk_queue_depth", delayed, "set", {"state": "delayed"})
+    metrics_gauge("risk_queue_depth", dead, "set", {"state": "dead"})
+
+
+def record_risk_queue_jobs(outcome: str, count: int = 1) -> None:
+    """
+    Registra jobs de la cola de riesgo por resultado.
+
+    Args:
+        outcome: enqueued, rejected, completed, retried o dead_lettered
+        count: Cantidad de jobs
+    """
+    if "risk_queue_jobs" not in _metrics:
+        return
+    _metrics["risk_queue_jobs"].labels(outcome=outcome).inc(count)
+
+
 # ============================================================================
 # HTTP Request Metrics (HIGH-01)
 # ============================================================================
@@ -9,6 +9,8 @@ from sqlalchemy.orm import Session
 
 from ...database.repositories import ActivityRepository
 from ...database.models import ActivityDB
+from ...core.semantic_cache import invalidate_activity_responses
+from ...core.session_context_cache import invalidate_activity_context
 from ..deps import get_db, require_teacher_role, get_current_user
 from ..schemas.activity import (
     ActivityCreate,
@@ -37,6 +39,12 @@ class ActivityNotFoundError(AINativeAPIException):
         )
 
 
+def _invalidate_activity_caches(activity_id: str) -> None:
+    """Descarta lo cacheado para la actividad: respuestas del tutor y contexto de sus sesiones."""
+    invalidate_activity_responses(activity_id)
+    invalidate_activity_context(activity_id)
+
+
 class ActivityAlreadyExistsError(AINativeAPIException):
     """Excepción para actividad que ya existe"""
 
@@ -305,6 +313,7 @@ async def update_activity(
 
     if not updated_activity:
         raise ActivityNotFoundError(activity_id)
+    _invalidate_activity_caches(activity_id)
 
     # Convertir a schema de respuesta
     response_data = ActivityResponse.model_validate(updated_activity)
@@ -436,6 +445,7 @@ async def delete_activity(
 
     if not success:
         raise ActivityNotFoundError(activity_id)
+    _invalidate_activity_caches(activity_id)
 
     # No retornar contenido (204 No Content)
     return None
\ No newline at end of file
@@ -26,7 +26,11 @@ def _ensure_aware(dt: Optional[datetime]) -> Optional[datetime]:
         return dt.replace(tzinfo=timezone.utc)
     return dt
 
-from ..deps import get_db, get_session_repository, get_trace_repository, get_risk_repository, get_current_user
+
+from ..deps import (
+    get_db, get_session_repository, get_session_rollup_repository,
+    get_trace_repository, get_risk_repository, get_current_user,
+)
 from ..schemas.common import APIResponse, validate_uuid_format
 from ..exceptions import SessionNotFoundError, TraceNotFoundError
 from ..schemas.cognitive_path import (
@@ -36,7 +40,32 @@ from ..schemas.cognitive_path import (
     CognitivePathSummary,
     AIDependencyPoint,
 )
-from ...database.repositories import SessionRepository, TraceRepository, RiskRepository
+from ...database.models import SessionRollupDB
+from ...database.repositories import SessionRepository, SessionRollupRepository, TraceRepository, RiskRepository
+
+
+def _summary_from_rollup(rollup: Optional[SessionRollupDB], total_duration: float) -> CognitivePathSummary:
+    """Resumen cuantitativo a partir del agregado incremental de la sesión."""
+    if rollup is None:
+        return CognitivePathSummary(
+            total_interactions=0,
+            total_duration_minutes=round(total_duration, 2),
+            blocked_interactions=0,
+            ai_dependency_average=0.0,
+            strategy_changes=0,
+            risks_total=0,
+            risks_by_level={}
+        )
+    return CognitivePathSummary(
+        total_interactions=rollup.trace_count or 0,
+        total_duration_minutes=round(total_duration, 2),
+        blocked_interactions=rollup.blocked_count or 0,
+        ai_dependency_average=round(rollup.ai_involvement_avg, 2),
+        strategy_changes=rollup.strategy_change_count or 0,
+        risks_total=rollup.risk_count or 0,
+        risks_by_level=dict(rollup.risk_level_counts or {})
+    )
+
 
 router = APIRouter(prefix="/cognitive-path", tags=["Cognitive Path"])
 
@@ -53,6 +82,7 @@ async def get_cognitive_path(
     session_repo: SessionRepository = Depends(get_session_repository),
     trace_repo: TraceRepository = Depends(get_trace_repository),
     risk_repo: RiskRepository = Depends(get_risk_repository),
+    rollup_repo: SessionRollupRepository = Depends(get_session_rollup_repository),
     _current_user: dict = Depends(get_current_user),  # FIX Cortez20: Add auth
 ) -> APIResponse[CognitivePath]:
     """
@@ -83,8 +113,8 @@ async def get_cognitive_path(
     if not db_session:
         raise SessionNotFoundError(session_id)
 
-    # Obtener todas las trazas de la sesión
-    traces = trace_repo.get_by_session(session_id)
+    # Obtener las trazas de la sesión (sin contenido: solo estados y tiempos)
+    traces = trace_repo.get_timeline_by_session(session_id)
     if not traces:
         raise TraceNotFoundError(session_id=session_id)
 
@@ -95,7 +125,6 @@ async def get_cognitive_path(
     phases_dict = defaultdict(list)
     transitions = []
     prev_state = None
-    blocked_count = 0
 
     for trace in sorted(traces, key=lambda t: t.created_at):
         state = trace.cognitive_state or "unknown"
@@ -116,10 +145,6 @@ async def get_cognitive_path(
             )
         prev_state = state
 
-        # Contar bloqueados
-        if trace.trace_metadata and trace.trace_metadata.get("blocked"):
-            blocked_count += 1
-
     # Construir fases detalladas
     phases = []
     for phase_name, phase_traces in phases_dict.items():
@@ -175,15 +200,6 @@ async def get_cognitive_path(
         else (utc_now() - start_time_aware).total_seconds() / 60.0
     )
 
-    all_ai_involvements = [t.ai_involvement or 0.0 for t in traces]
-    ai_dependency_avg = sum(all_ai_involvements) / len(all_ai_involvements) if all_ai_involvements else 0.0
-
-    # Contar cambios de estrategia (en metadata)
-    strategy_changes_count = sum(
-        1 for t in traces
-        if t.trace_metadata and t.trace_metadata.get("strategy_change")
-    )
-
     # Extraer lista de cambios de estrategia con descripciones
     strategy_changes_list = [
         t.trace_metadata.get("strategy_change_description", f"Cambio de estrategia en {t.cognitive_state}")
@@ -201,20 +217,8 @@ async def get_cognitive_path(
         for t in sorted(traces, key=lambda x: x.created_at)
     ]
 
-    # Agrupar riesgos por nivel
-    risks_by_level = defaultdict(int)
-    for risk in risks:
-        risks_by_level[risk.risk_level] += 1
-
-    summary = CognitivePathSummary(
-        total_interactions=len(traces),
-        total_duration_minutes=round(total_duration, 2),
-        blocked_interactions=blocked_count,
-        ai_dependency_average=round(ai_dependency_avg, 2),
-        strategy_changes=strategy_changes_count,
-        risks_total=len(risks),
-        risks_by_level=dict(risks_by_level)
-    )
+    # Resumen desde el agregado incremental (cubre todas las trazas de la sesión)
+    summary = _summary_from_rollup(rollup_repo.get_by_session(session_id), total_duration)
 
     # Construir respuesta
     # FIX Cortez56: Ensure session timestamps are timezone-aware
@@ -248,8 +252,7 @@ async def get_cognitive_path_summary(
     session_id: str,
     db: Session = Depends(get_db),
     session_repo: SessionRepository = Depends(get_session_repository),
-    trace_repo: TraceRepository = Depends(get_trace_repository),
-    risk_repo: RiskRepository = Depends(get_risk_repository),
+    rollup_repo: SessionRollupRepository = Depends(get_session_rollup_repository),
     _current_user: dict = Depends(get_current_user),  # FIX Cortez22 DEFECTO 2.2: Require auth
 ) -> APIResponse[CognitivePathSummary]:
     """
@@ -269,41 +272,18 @@ async def get_cognitive_path_summary(
     if not db_session:
         raise SessionNotFoundError(session_id)
 
-    # Obtener trazas y riesgos
-    traces = trace_repo.get_by_session(session_id)
-    risks = risk_repo.get_by_session(session_id)
+    # Una fila por sesión en lugar de todas las trazas y riesgos
+    rollup = rollup_repo.get_by_session(session_id)
 
-    if not traces:
+    if not rollup or not rollup.trace_count:
         # Sesión sin trazas
-        summary = CognitivePathSummary(
-            total_interactions=0,
-            total_duration_minutes=0.0,
-            blocked_interactions=0,
-            ai_dependency_average=0.0,
-            strategy_changes=0,
-            risks_total=0,
-            risks_by_level={}
-        )
+        summary = _summary_from_rollup(None, 0.0)
         return APIResponse(
             success=True,
             data=summary,
             message=f"Resumen de sesión {session_id} (sin trazas)"
         )
 
-    # Calcular métricas
-    blocked_count = sum(
-        1 for t in traces
-        if t.trace_metadata and t.trace_metadata.get("blocked")
-    )
-
-    all_ai_involvements = [t.ai_involvement or 0.0 for t in traces]
-    ai_dependency_avg = sum(all_ai_involvements) / len(all_ai_involvements)
-
-    strategy_changes = sum(
-        1 for t in traces
-        if t.trace_metadata and t.trace_metadata.get("strategy_change")
-    )
-
     # FIX Cortez54: Use _ensure_aware to handle naive vs aware datetime comparison
     start_aware = _ensure_aware(db_session.start_time)
     end_aware = _ensure_aware(db_session.end_time)
@@ -313,22 +293,10 @@ async def get_cognitive_path_summary(
         else (utc_now() - start_aware).total_seconds() / 60.0
     )
 
-    risks_by_level = defaultdict(int)
-    for risk in risks:
-        risks_by_level[risk.risk_level] += 1
-
-    summary = CognitivePathSummary(
-        total_interactions=len(traces),
-        total_duration_minutes=round(total_duration, 2),
-        blocked_interactions=blocked_count,
-        ai_dependency_average=round(ai_dependency_avg, 2),
-        strategy_changes=strategy_changes,
-        risks_total=len(risks),
-        risks_by_level=dict(risks_by_level)
-    )
+    summary = _summary_from_rollup(rollup, total_duration)
 
     return APIResponse(
         success=True,
         data=summary,
         message=f"Resumen de camino cognitivo de sesión {session_id}"
-    )
\ No newline at end of file
+    )
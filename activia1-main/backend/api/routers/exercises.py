@@ -10,7 +10,7 @@ import json
 import logging
 from pathlib import Path
 # FIX Cortez36: Import from shared utility module (consolidated from duplicate code)
-from backend.utils.sandbox import execute_python_code
+from backend.utils.sandbox import SandboxTest, run_python_tests
 
 from backend.database.config import get_db
 from backend.models.exercise import Exercise, UserExerciseSubmission
@@ -22,12 +22,13 @@ from backend.llm.ollama_provider import OllamaProvider
 # FIX 1.3 Cortez3: Import rate limiter for code execution endpoint
 from backend.api.middleware.rate_limiter import limiter
 # NUEVO: Importar loader de ejercicios JSON y evaluador Alex
-from backend.data.exercises.loader import ExerciseLoader
+from backend.data.exercises.loader import exercise_loader
 from backend.services.code_evaluator import CodeEvaluator
 # Importar LLM provider para evaluación con IA
 from backend.api.deps import get_llm_provider
 from backend.llm.base import LLMMessage, LLMRole
 from backend.core.security import decode_access_token
+from backend.core.submission_cache import get_submission_cache
 # FIX Cortez73 (MED-001): Add pagination constants
 from backend.api.config import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MIN_PAGE_SIZE
 from backend.api.schemas.exercises import (
@@ -49,8 +50,7 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/exercises", tags=["Code Exercises"])
 
-# Inicializar loader y evaluador
-exercise_loader = ExerciseLoader()
+# exercise_loader es la instancia compartida de backend.data.exercises.loader
 # Code evaluator se inicializará con LLM provider en cada request
 
 # FIX Cortez51: Optional OAuth2 scheme for optional authentication
@@ -339,6 +339,14 @@ async def submit_json_exercise(
     if not exercise:
         # FIX Cortez36: Use custom exception for consistent error handling
         raise ExerciseNotFoundError(exercise_id)
+
+    # Reenvío de código idéntico (misma versión del ejercicio): resultado memoizado
+    submission_cache = get_submission_cache()
+    if submission_cache is not None:
+        cached = submission_cache.get(exercise, submission.student_code)
+        if cached is not None:
+            logger.info("Submission cache HIT for exercise %s: skipping sandbox and AI evaluation", exercise_id)
+            return EvaluationResultSchema(**cached["evaluation"])
     
     # 2. Ejecutar tests ocultos en sandbox SOLO si es Python
     # Para Java/Spring Boot, solo evaluación con IA
@@ -367,6 +375,7 @@ async def submit_json_exercise(
         logger.info("Ejecutando código para ejercicio %s (usuario anónimo)", exercise_id)
     
     # Ejecutar tests ocultos (solo para Python)
+    any_timeout = False
     tests_passed = 0
     tests_total = len(exercise['hidden_tests'])
     stdout_output = ""
@@ -374,40 +383,49 @@ async def submit_json_exercise(
     total_execution_time = 0
     
     if not is_java:  # Solo ejecutar si es Python
-        for i, test in enumerate(exercise['hidden_tests'], 1):
+        # Validación única y todos los tests en una sola ejecución sandbox
+        harness_tests = []
+        expectations = []
+        for test in exercise['hidden_tests']:
             # Adaptarse a la estructura real de los JSON (input/expected)
             test_input = test.get('input', test.get('input_data', ''))
             if isinstance(test_input, dict) or isinstance(test_input, list):
                 test_input = json.dumps(test_input)
-            
+
             # Soportar tanto 'expected_output' (legacy) como 'expected' (nuevo)
             expected = test.get('expected_output') or test.get('expected', '')
-            
-            # FIX Cortez36: Use lazy logging formatting
-            logger.info("Ejecutando test %d/%d: input='%s', expected='%s'", i, tests_total, test_input, expected)
-            
+
             # Si expected es una expresión Python (ej: "total == 42600"), evaluarla
-            if expected and ('==' in expected or 'and' in expected or 'or' in expected or '>' in expected or '<' in expected):
+            is_expression = bool(expected) and (
+                '==' in expected or 'and' in expected or 'or' in expected or '>' in expected or '<' in expected
+            )
+            suffix = ""
+            if is_expression:
                 # FIX Cortez70 CRIT-API-002: Use sandbox instead of exec/eval in server process
-                # Create wrapper code that runs student code then evaluates the expression
-                # and prints the result for the sandbox to capture
-                wrapper_code = f'''{submission.student_code}
+                # The expression runs after the student code and prints the result
+                # for the sandbox to capture
+                suffix = f'''
 
 # FIX Cortez70: Evaluate test expression in sandbox
 _test_result = {expected}
 print("__TEST_RESULT__:" + str(_test_result))
 '''
-                stdout, stderr, exec_time = execute_python_code(
-                    wrapper_code,
-                    str(test_input),
-                    timeout_seconds=30
-                )
-                total_execution_time += exec_time
+            harness_tests.append(SandboxTest(input=str(test_input), suffix=suffix))
+            expectations.append((test_input, expected, is_expression))
+
+        results = await run_python_tests(submission.student_code, harness_tests, timeout_seconds=30)
+        any_timeout = any(result.timed_out for result in results)
 
+        for i, (result, (test_input, expected, is_expression)) in enumerate(zip(results, expectations), 1):
+            stdout, stderr, exec_time = result.stdout, result.stderr, result.execution_time_ms
+            total_execution_time += exec_time
+
+            # FIX Cortez36: Use lazy logging formatting
+            logger.info("Test %d/%d: input='%s', expected='%s'", i, tests_total, test_input, expected)
+
+            if is_expression:
                 # Parse the result from sandbox output
-                test_passed = False
                 if not stderr and "__TEST_RESULT__:True" in stdout:
-                    test_passed = True
                     tests_passed += 1
                     logger.info("Test %d PASSED: %s", i, expected)
                 elif "__TEST_RESULT__:False" in stdout:
@@ -416,17 +434,10 @@ print("__TEST_RESULT__:" + str(_test_result))
                     # Error or unexpected output
                     logger.warning("Test %d ERROR: %s", i, stderr if stderr else "unexpected output")
             else:
-                # Es un test de output, ejecutar código con input
-                stdout, stderr, exec_time = execute_python_code(
-                    submission.student_code,
-                    str(test_input),
-                    timeout_seconds=30
-                )
-                
-                total_execution_time += exec_time
+                # Es un test de output
                 stdout_output += stdout + "\n"
                 stderr_output += stderr + "\n"
-                
+
                 # Verificar si pasó el test
                 if not stderr:
                     if expected:
@@ -448,7 +459,7 @@ print("__TEST_RESULT__:" + str(_test_result))
                 else:
                     # FIX Cortez36: Use lazy logging formatting
                     logger.warning("✗ Test %d FALLÓ: %s", i, stderr)
-        
+
         # Crear sandbox_result solo si es Python (si es Java ya se creó arriba)
         sandbox_result = {
             "exit_code": 0 if not stderr_output.strip() else 1,
@@ -474,6 +485,11 @@ print("__TEST_RESULT__:" + str(_test_result))
         sandbox_result=sandbox_result
     )
     
+    # Solo se memoizan resultados completos: sin timeouts (pueden deberse a carga)
+    # ni evaluaciones de fallback por error del LLM
+    if submission_cache is not None and not any_timeout and "error_reference" not in evaluation:
+        submission_cache.set(exercise, submission.student_code, sandbox_result, evaluation)
+
     # 4. Guardar en BD (opcional, para historial)
     # TODO: Crear modelo UserExerciseEvaluation para guardar evaluaciones Alex
 
@@ -593,15 +609,16 @@ async def submit_code(
     total_tests = len(exercise.test_cases)
     total_execution_time = 0
     
-    for i, test_case in enumerate(exercise.test_cases):
+    results = await run_python_tests(
+        submission.code,
+        [SandboxTest(input=test_case.get("input", "")) for test_case in exercise.test_cases],
+        exercise.time_limit_seconds
+    )
+
+    for i, (test_case, result) in enumerate(zip(exercise.test_cases, results)):
         test_input = test_case.get("input", "")
         expected_output = test_case.get("expected_output", "")
-        
-        output, error, exec_time = execute_python_code(
-            submission.code,
-            test_input,
-            exercise.time_limit_seconds
-        )
+        output, error, exec_time = result.stdout, result.stderr, result.execution_time_ms
         
         total_execution_time += exec_time
         
@@ -3,6 +3,10 @@ Export Router - REST API endpoints for research data export
 
 Endpoints:
 - POST /api/v1/export/research-data - Export anonymized data for research
+- POST /api/v1/export/research-data/download - Streaming export as a file (NDJSON/CSV/Excel)
+- POST /api/v1/export/jobs - Run a research export as a background job (optionally incremental)
+- GET /api/v1/export/jobs/{job_id} - Export job status and progress
+- GET /api/v1/export/jobs/{job_id}/download - Download a finished export (HTTP Range supported)
 - GET /api/v1/export/history - View previous exports (admin only)
 - GET /api/v1/export/{export_id} - Download specific export
 - GET /api/v1/export/session/{session_id} - Export session data (Frontend compatibility)
@@ -11,7 +15,9 @@ Endpoints:
 FIX Cortez52: Added authentication to research-data endpoint
 """
 
+import asyncio
 import logging
+import tempfile
 import uuid
 import json
 import csv
@@ -19,12 +25,12 @@ import io
 from datetime import datetime
 from typing import Dict, List, Optional, Literal
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 
 # FIX Cortez91 LOW-03: Type-safe export format validation
 ExportFormat = Literal["json", "csv"]
 
-from backend.core.constants import utc_now
+from backend.core.constants import utc_now, EXPORT_SPOOL_MAX_MEMORY_BYTES
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
@@ -43,8 +49,19 @@ from ...export import (
     ExportConfig,
     PrivacyValidator,
     GDPRCompliance,
+    ValidationResult,
+)
+from ...database.repositories import ResearchExportJobRepository
+from ...services.export_jobs import export_scope_key
+from ...services.file_storage import get_file_storage
+from ...services.research_export import (
+    RESEARCH_QUASI_IDENTIFIERS,
+    build_anonymization_config,
+    run_research_export,
 )
 from ..schemas.export import (
+    ExportJobCreateRequest,
+    ExportJobResponse,
     ExportRequest,
     ExportResponse,
     ExportMetadata,
@@ -56,7 +73,10 @@ from ..schemas.common import validate_uuid_format
 from ..exceptions import (
     AINativeAPIException,
     AuthorizationError,
+    ExportNotReadyError,
     NoDataFoundError,
+    NotFoundError,
+    RangeNotSatisfiableError,
     PrivacyValidationError,
     ExportError,
     SessionNotFoundError,
@@ -188,6 +208,50 @@ def fetch_data_from_db(
     return data
 
 
+def _enforce_privacy(
+    validation_result: ValidationResult, anon_config: AnonymizationConfig
+) -> None:
+    """
+    Add the GDPR Article 89 check to a privacy validation and reject the export if it fails
+
+    Raises:
+        PrivacyValidationError: If privacy or GDPR validation failed
+    """
+    gdpr_result = GDPRCompliance.check_article_89_compliance(
+        anonymization_config=anon_config.model_dump(),
+        validation_result=validation_result,
+    )
+
+    # Combine validation results
+    validation_result.metrics.update(gdpr_result.metrics)
+    validation_result.is_valid &= gdpr_result.is_valid
+    validation_result.errors.extend(gdpr_result.errors)
+
+    if not validation_result.is_valid:
+        logger.error(
+            "Privacy validation failed",
+            extra={
+                "errors": validation_result.errors,
+                "metrics": validation_result.metrics,
+            },
+        )
+        # FIX Cortez53: Use custom exception
+        raise PrivacyValidationError(validation_result.errors, validation_result.metrics)
+
+
+def _validation_report(validation_result: ValidationResult) -> ValidationReport:
+    """Build the API validation report from a (GDPR-checked) validation result"""
+    return ValidationReport(
+        is_valid=validation_result.is_valid,
+        errors=validation_result.errors,
+        warnings=validation_result.warnings,
+        metrics=PrivacyMetrics(**validation_result.metrics),
+        gdpr_article_89_compliant=validation_result.metrics.get(
+            "gdpr_article_89_compliance", False
+        ),
+    )
+
+
 @router.post("/research-data", response_model=ExportResponse)
 async def export_research_data(
     request: ExportRequest,
@@ -261,13 +325,7 @@ async def export_research_data(
         )
 
         # Step 2: Anonymize data
-        anon_config = AnonymizationConfig(
-            k_anonymity=request.k_anonymity,
-            suppress_pii=True,
-            generalize_timestamps=True,
-            add_noise_to_scores=request.add_noise,
-            noise_epsilon=request.noise_epsilon,
-        )
+        anon_config = build_anonymization_config(request)
         anonymizer = DataAnonymizer(anon_config)
 
         anonymized_data = {}
@@ -299,32 +357,8 @@ async def export_research_data(
         for records in anonymized_data.values():
             all_records.extend(records)
 
-        # Quasi-identifiers: fields that combined could identify someone
-        quasi_identifiers = ["activity_id", "week"]
-
-        validation_result = validator.validate(all_records, quasi_identifiers)
-
-        # Check GDPR compliance
-        gdpr_result = GDPRCompliance.check_article_89_compliance(
-            anonymization_config=anon_config.model_dump(),
-            validation_result=validation_result,
-        )
-
-        # Combine validation results
-        validation_result.metrics.update(gdpr_result.metrics)
-        validation_result.is_valid &= gdpr_result.is_valid
-        validation_result.errors.extend(gdpr_result.errors)
-
-        if not validation_result.is_valid:
-            logger.error(
-                "Privacy validation failed",
-                extra={
-                    "errors": validation_result.errors,
-                    "metrics": validation_result.metrics,
-                },
-            )
-            # FIX Cortez53: Use custom exception
-            raise PrivacyValidationError(validation_result.errors, validation_result.metrics)
+        validation_result = validator.validate(all_records, RESEARCH_QUASI_IDENTIFIERS)
+        _enforce_privacy(validation_result, anon_config)
 
         logger.info("Privacy validation passed", extra=validation_result.metrics)
 
@@ -371,17 +405,7 @@ async def export_research_data(
             else None,
         )
 
-        privacy_metrics = PrivacyMetrics(**validation_result.metrics)
-
-        validation_report = ValidationReport(
-            is_valid=validation_result.is_valid,
-            errors=validation_result.errors,
-            warnings=validation_result.warnings,
-            metrics=privacy_metrics,
-            gdpr_article_89_compliant=validation_result.metrics.get(
-                "gdpr_article_89_compliance", False
-            ),
-        )
+        validation_report = _validation_report(validation_result)
 
         # For now, return data inline (future: upload to S3 and provide download URL)
         # TODO: For production, save to file storage and provide download URL
@@ -409,6 +433,275 @@ async def export_research_data(
         raise ExportError(str(e), request.format)
 
 
+def _iter_file_chunks(file_obj, chunk_size: int = 64 * 1024):
+    """Yield a file in chunks and close it when the response is done"""
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+
+@router.post(
+    "/research-data/download",
+    summary="Download anonymized research data (streaming)",
+    response_class=StreamingResponse,
+)
+async def download_research_data(
+    request: ExportRequest,
+    _current_user: dict = Depends(require_admin_role),
+    db: Session = Depends(get_db_session),
+) -> StreamingResponse:
+    """
+    Export anonymized research data as a downloadable file
+
+    Same filters and privacy safeguards as POST /export/research-data, but
+    rows are read with a server-side cursor, anonymized one by one and written
+    to a spooled temp file (memory up to EXPORT_SPOOL_MAX_MEMORY_BYTES, then
+    disk). Privacy is validated incrementally while writing; the file is only
+    released if validation and GDPR checks pass.
+
+    **Formats**: json (NDJSON), csv (one section per data type), excel (xlsx).
+    With compress=true, json/csv are gzip-compressed.
+
+    **Permissions**: Requires admin role
+    """
+    export_id = str(uuid.uuid4())[:8]
+    anon_config = build_anonymization_config(request)
+    spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_MEMORY_BYTES)
+
+    logger.info(
+        "Starting streaming research data export",
+        extra={"export_id": export_id, "format": request.format, "k_anonymity": request.k_anonymity},
+    )
+
+    try:
+        # DB cursor + anonymization + file IO: keep it off the event loop
+        result = await asyncio.to_thread(run_research_export, db, request, spool, anon_config)
+
+        if result.total_records == 0:
+            raise NoDataFoundError("the specified filters")
+
+        _enforce_privacy(result.validation, anon_config)
+
+        file_size = spool.tell()
+        spool.seek(0)
+    except AINativeAPIException:
+        spool.close()
+        raise
+    except Exception as e:
+        spool.close()
+        logger.error(
+            "Streaming export failed with exception",
+            exc_info=True,
+            extra={"export_id": export_id},
+        )
+        raise ExportError(str(e), request.format)
+
+    logger.info(
+        "Streaming export completed successfully",
+        extra={
+            "export_id": export_id,
+            "format": request.format,
+            "file_size_bytes": file_size,
+            "record_counts": result.record_counts,
+        },
+    )
+
+    filename = f"research_export_{export_id}.{result.file_extension}"
+    return StreamingResponse(
+        _iter_file_chunks(spool),
+        media_type=result.media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}",
+            "Content-Length": str(file_size),
+            "X-Export-Id": export_id,
+            "X-Total-Records": str(result.total_records),
+        },
+    )
+
+
+# =============================================================================
+# BACKGROUND EXPORT JOBS
+# =============================================================================
+
+
+def _job_response(job) -> ExportJobResponse:
+    return ExportJobResponse(
+        job_id=job.id,
+        status=job.status,
+        incremental=bool(job.incremental),
+        progress=job.progress or {},
+        records_processed=job.records_processed or 0,
+        since=job.since,
+        watermark=job.watermark,
+        attempts=job.attempts or 0,
+        file_size_bytes=job.file_size,
+        media_type=job.media_type,
+        download_url=(
+            f"/api/v1/export/jobs/{job.id}/download"
+            if job.status == "completed" and job.artifact_chunks else None
+        ),
+        validation=job.validation,
+        error=job.last_error,
+        created_at=job.created_at,
+        completed_at=job.completed_at,
+    )
+
+
+def _get_job(db: Session, job_id: str):
+    job = ResearchExportJobRepository(db).get_by_id(job_id)
+    if job is None:
+        raise NotFoundError("Export job", job_id)
+    return job
+
+
+def _parse_range(range_header: str, file_size: int) -> tuple:
+    """
+    Parse a single-range "bytes=" header into inclusive (start, end) offsets
+
+    Supports "bytes=a-b", "bytes=a-" and "bytes=-n" (last n bytes).
+    """
+    unit, _, spec = range_header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        raise RangeNotSatisfiableError(range_header, file_size)
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else file_size - 1
+        else:
+            start = max(0, file_size - int(last))
+            end = file_size - 1
+    except ValueError:
+        raise RangeNotSatisfiableError(range_header, file_size)
+
+    end = min(end, file_size - 1)
+    if start < 0 or start > end:
+        raise RangeNotSatisfiableError(range_header, file_size)
+    return start, end
+
+
+async def _iter_artifact_range(storage, chunks: List[Dict], start: int, end: int, read_size: int = 1024 * 1024):
+    """Yield bytes [start, end] of an artifact stored as consecutive parts"""
+    offset = 0
+    for chunk in chunks:
+        chunk_start, chunk_end = offset, offset + chunk["size"] - 1
+        offset += chunk["size"]
+        if chunk_end < start:
+            continue
+        if chunk_start > end:
+            break
+        position = max(start, chunk_start) - chunk_start
+        stop = min(end, chunk_end) - chunk_start + 1
+        while position < stop:
+            length = min(read_size, stop - position)
+            yield await storage.read_file_range(chunk["path"], position, length)
+            position += length
+
+
+@router.post(
+    "/jobs",
+    response_model=ExportJobResponse,
+    status_code=202,
+    summary="Run a research export as a background job",
+)
+async def create_export_job(
+    request: ExportJobCreateRequest,
+    current_user: dict = Depends(require_admin_role),
+    db: Session = Depends(get_db_session),
+) -> ExportJobResponse:
+    """
+    Queue an anonymized research export
+
+    The export runs in the export job workers, outside the request, and is
+    stored in file storage as parts. Poll GET /export/jobs/{job_id} for
+    progress and download the file from GET /export/jobs/{job_id}/download
+    once completed. Jobs interrupted by a restart are picked up again.
+
+    With incremental=true, only rows created after the last completed job
+    with the same filters and format are exported.
+
+    **Permissions**: Requires admin role
+    """
+    export_request = ExportRequest.model_validate(request.model_dump(exclude={"incremental"}))
+    serialized = export_request.model_dump(mode="json")
+    job = ResearchExportJobRepository(db).create(
+        request=serialized,
+        scope_key=export_scope_key(serialized),
+        incremental=request.incremental,
+        requested_by=current_user.get("user_id"),
+    )
+    return _job_response(job)
+
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=ExportJobResponse,
+    summary="Get export job status",
+)
+async def get_export_job(
+    job_id: str,
+    _current_user: dict = Depends(require_admin_role),
+    db: Session = Depends(get_db_session),
+) -> ExportJobResponse:
+    """
+    Status, progress (rows processed per data type) and validation of an export job
+
+    **Permissions**: Requires admin role
+    """
+    return _job_response(_get_job(db, job_id))
+
+
+@router.get(
+    "/jobs/{job_id}/download",
+    summary="Download a completed export job",
+    response_class=StreamingResponse,
+)
+async def download_export_job(
+    job_id: str,
+    range_header: Optional[str] = Header(default=None, alias="Range"),
+    _current_user: dict = Depends(require_admin_role),
+    db: Session = Depends(get_db_session),
+) -> StreamingResponse:
+    """
+    Download the file of a completed export job
+
+    Supports a single HTTP Range ("bytes=start-end") to resume interrupted
+    downloads; the response is then 206 Partial Content.
+
+    **Permissions**: Requires admin role
+    """
+    job = _get_job(db, job_id)
+    if job.status != "completed" or not job.artifact_chunks:
+        raise ExportNotReadyError(job_id, job.status)
+
+    file_size = job.file_size or 0
+    start, end = 0, file_size - 1
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Disposition": f"attachment; filename=research_export_{job.id[:8]}.{job.file_extension}",
+        "X-Total-Records": str(job.records_processed or 0),
+    }
+    status_code = 200
+    if range_header:
+        start, end = _parse_range(range_header, file_size)
+        headers["Content-Range"] = f"bytes {start}-{end}/{file_size}"
+        status_code = 206
+    headers["Content-Length"] = str(end - start + 1)
+
+    return StreamingResponse(
+        _iter_artifact_range(get_file_storage(), job.artifact_chunks, start, end),
+        status_code=status_code,
+        media_type=job.media_type,
+        headers=headers,
+    )
+
+
 # =============================================================================
 # FRONTEND COMPATIBILITY ENDPOINTS
 # These endpoints were missing and are required by the frontend
@@ -4,13 +4,15 @@ Router para Git Analytics
 FIX Cortez21 DEFECTO 2.1, 2.5: Added authentication and typed response_model
 FIX Cortez22 DEFECTO 1.2: Added path validation to prevent command injection
 FIX Cortez51: Added logging for ValueError exceptions
+
+Las estadísticas de commits se sirven desde services/git_analytics.py (cache
+por repositorio; git asíncrono y solo para los commits nuevos).
 """
 from fastapi import APIRouter, Depends, Query
 # FIX Cortez53: Removed HTTPException, status - using custom exceptions
 from ..exceptions import InvalidRepoPathError
 from typing import List, Optional
 from datetime import datetime, timedelta
-import subprocess
 import os
 import re
 import logging
@@ -18,6 +20,7 @@ from pydantic import BaseModel
 
 from ..schemas.common import APIResponse
 from ..deps import get_current_user
+from ...services.git_analytics import get_git_analytics_engine
 
 logger = logging.getLogger(__name__)
 
@@ -153,169 +156,15 @@ async def get_git_analytics(
             # FIX Cortez53: Use custom exception
             raise InvalidRepoPathError(repo_path, "not a valid git repository")
 
-        # Obtener commits del período
-        git_log_cmd = [
-            "git", "log",
-            f"--since={start_date.strftime('%Y-%m-%d')}",
-            "--pretty=format:%H|%an|%ae|%s|%ad",
-            "--date=iso",
-            "--numstat"
-        ]
-        
-        result = subprocess.run(
-            git_log_cmd,
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0:
-            raise Exception(f"Git command failed: {result.stderr}")
-        
-        # Parse commits
-        commits_data = []
-        contributors = {}
-        total_insertions = 0
-        total_deletions = 0
-        
-        lines = result.stdout.split('\n')
-        current_commit = None
-        
-        for line in lines:
-            if '|' in line and not line.startswith('+') and not line.startswith('-'):
-                parts = line.split('|')
-                if len(parts) == 5:
-                    commit_hash, author, email, message, date_str = parts
-                    current_commit = {
-                        "hash": commit_hash,
-                        "author": author,
-                        "email": email,
-                        "message": message,
-                        "date": date_str,
-                        "insertions": 0,
-                        "deletions": 0
-                    }
-                    commits_data.append(current_commit)
-                    
-                    if author not in contributors:
-                        contributors[author] = {
-                            "name": author,
-                            "email": email,
-                            "commits": 0,
-                            "insertions": 0,
-                            "deletions": 0
-                        }
-                    contributors[author]["commits"] += 1
-            elif line.strip() and current_commit:
-                parts = line.split('\t')
-                if len(parts) == 3:
-                    try:
-                        insertions = int(parts[0]) if parts[0] != '-' else 0
-                        deletions = int(parts[1]) if parts[1] != '-' else 0
-                        current_commit["insertions"] += insertions
-                        current_commit["deletions"] += deletions
-                        contributors[current_commit["author"]]["insertions"] += insertions
-                        contributors[current_commit["author"]]["deletions"] += deletions
-                        total_insertions += insertions
-                        total_deletions += deletions
-                    except ValueError:
-                        # FIX Cortez51: Log instead of silently ignoring parse errors
-                        logger.debug("Could not parse git stat line: %s", line)
-        
-        # Calcular métricas
-        total_commits = len(commits_data)
-        avg_commits_per_day = total_commits / days if days > 0 else 0
-        code_churn = total_insertions + total_deletions
-        avg_commit_size = code_churn / total_commits if total_commits > 0 else 0
-        
-        # Refactoring ratio (estimación: deletions/insertions ratio cerca de 1 indica refactoring)
-        refactoring_ratio = min(total_deletions / total_insertions, 1.0) if total_insertions > 0 else 0
-        
-        # Calcular porcentajes de contribuidores
-        total_contributor_commits = sum(c["commits"] for c in contributors.values())
-        contributors_list = []
-        for contrib in contributors.values():
-            contributors_list.append({
-                **contrib,
-                "percentage": (contrib["commits"] / total_contributor_commits * 100) if total_contributor_commits > 0 else 0
-            })
-        
-        # Ordenar por commits desc
-        contributors_list.sort(key=lambda x: x["commits"], reverse=True)
-        
-        # Calcular tendencias (agrupadas por día)
-        trends = {}
-        for commit in commits_data:
-            date_str = commit["date"][:10]  # YYYY-MM-DD
-            if date_str not in trends:
-                trends[date_str] = {
-                    "date": date_str,
-                    "commits": 0,
-                    "insertions": 0,
-                    "deletions": 0
-                }
-            trends[date_str]["commits"] += 1
-            trends[date_str]["insertions"] += commit["insertions"]
-            trends[date_str]["deletions"] += commit["deletions"]
-        
-        trends_list = sorted(trends.values(), key=lambda x: x["date"])
-        
-        # Quality indicators
-        conventional_commits = sum(
-            1 for c in commits_data
-            if any(c["message"].startswith(prefix) for prefix in ["feat:", "fix:", "docs:", "style:", "refactor:", "test:", "chore:"])
-        )
-        conventional_commits_ratio = conventional_commits / total_commits if total_commits > 0 else 0
-        
-        avg_message_length = sum(len(c["message"]) for c in commits_data) / total_commits if total_commits > 0 else 0
-        
-        # Message quality score (0-100)
-        message_quality_score = min(
-            (conventional_commits_ratio * 50) +  # 50 points for conventional commits
-            (min(avg_message_length / 50, 1.0) * 50),  # 50 points for descriptive messages
-            100
-        )
-        
-        # Get current branch
-        branch_result = subprocess.run(
-            ["git", "rev-parse", "--abbrev-ref", "HEAD"],
-            cwd=repo_path,
-            capture_output=True,
-            text=True
-        )
-        current_branch = branch_result.stdout.strip() if branch_result.returncode == 0 else "main"
-        
-        analytics = {
-            "repository": os.path.basename(repo_path),
-            "branch": current_branch,
-            "period": {
-                "start": start_date.isoformat(),
-                "end": now.isoformat()
-            },
-            "metrics": {
-                "total_commits": total_commits,
-                "avg_commits_per_day": round(avg_commits_per_day, 2),
-                "total_insertions": total_insertions,
-                "total_deletions": total_deletions,
-                "code_churn": code_churn,
-                "avg_commit_size": round(avg_commit_size, 2),
-                "refactoring_ratio": round(refactoring_ratio, 2)
-            },
-            "contributors": contributors_list[:10],  # Top 10
-            "trends": trends_list[-30:],  # Last 30 days
-            "quality_indicators": {
-                "message_quality_score": round(message_quality_score, 2),
-                "avg_message_length": round(avg_message_length, 2),
-                "conventional_commits_ratio": round(conventional_commits_ratio, 2)
-            }
-        }
-        
+        # Estadísticas de commits cacheadas por repo: git solo lee los commits nuevos
+        analytics = await get_git_analytics_engine().get_analytics(repo_path, days, now=now)
+
         return APIResponse(
             success=True,
             message="Git analytics retrieved successfully",
             data=analytics
         )
-        
+
     except Exception as e:
         # Fallback: datos de demo
         analytics = {
@@ -2,11 +2,15 @@
 Router para procesar interacciones estudiante-IA
 Este es el endpoint principal del sistema AI-Native
 """
+import json
 import logging
-from typing import List, Optional
+from contextlib import AsyncExitStack
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
 import time
 from uuid import uuid4
 from fastapi import APIRouter, Depends, Header, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.core.constants import utc_now
@@ -14,9 +18,25 @@ from sqlalchemy.exc import OperationalError, IntegrityError
 from pydantic import ValidationError
 
 from ...core import AIGateway
-from ...database.repositories import SessionRepository, TraceRepository
-from ...database.transaction import transaction
-from ..deps import get_ai_gateway, get_session_repository, get_trace_repository, get_db, get_current_user
+from ...core.gateway.protocols import resolve_repo_result
+from ...core.trace_writer import get_trace_writer
+from ...database import get_db_session
+from ...database.repositories import (
+    AsyncSessionRepository,
+    AsyncTraceRepository,
+    SessionRepository,
+    TraceRepository,
+)
+from ...database.transaction import async_transaction, transaction
+from ..deps import (
+    get_ai_gateway,
+    get_ai_gateway_factory,
+    get_session_repository,
+    get_trace_repository,
+    get_db,
+    get_async_db,
+    get_current_user,
+)
 from ..schemas.interaction import (
     InteractionRequest,
     InteractionResponse,
@@ -54,6 +74,7 @@ router = APIRouter(prefix="/interactions", tags=["Interactions"])
 async def process_interaction(
     request: InteractionRequest,
     db: Session = Depends(get_db),
+    async_db: Optional[AsyncSession] = Depends(get_async_db),
     gateway: AIGateway = Depends(get_ai_gateway),
     current_user: dict = Depends(get_current_user),
     x_flow_id: Optional[str] = Header(None, alias="X-Flow-Id"),
@@ -104,13 +125,23 @@ async def process_interaction(
 
     # ✅ TRANSACTION MANAGEMENT: Wrap entire interaction processing in explicit transaction
     # Ensures atomicity: all DB operations (traces, risks, etc.) commit together or rollback together
-    with transaction(db, "Process student interaction"):
-        # Create repositories with the shared DB session
-        session_repo = SessionRepository(db)
-        trace_repo = TraceRepository(db)
+    async with AsyncExitStack() as unit_of_work:
+        # Con sesión async, todo el hot path (router y gateway) corre sobre la
+        # misma AsyncSession: los repos async solo hacen flush y la transacción
+        # se confirma una vez al salir. Sin ella, repos sync en la transacción sync.
+        if async_db is not None:
+            await unit_of_work.enter_async_context(
+                async_transaction(async_db, "Process student interaction")
+            )
+            session_repo = AsyncSessionRepository(async_db)
+            trace_repo = AsyncTraceRepository(async_db)
+        else:
+            unit_of_work.enter_context(transaction(db, "Process student interaction"))
+            session_repo = SessionRepository(db)
+            trace_repo = TraceRepository(db)
 
         # 1. Validar que la sesión existe y está activa
-        db_session = session_repo.get_by_id(request.session_id)
+        db_session = await resolve_repo_result(session_repo.get_by_id(request.session_id))
         if not db_session:
             raise SessionNotFoundError(request.session_id)
 
@@ -204,7 +235,10 @@ async def process_interaction(
 
         # 3. Obtener la traza más reciente (corresponde a esta interacción)
         # FIX N+1 #1: Usar get_latest_by_session() en lugar de cargar TODAS las trazas
-        latest_trace = trace_repo.get_latest_by_session(request.session_id)
+        # Con write-behind la traza puede estar aún en el buffer del TraceWriter
+        latest_trace = _latest_pending_trace(request.session_id)
+        if latest_trace is None:
+            latest_trace = await resolve_repo_result(trace_repo.get_latest_by_session(request.session_id))
 
         # 4. Determinar si la interacción fue bloqueada
         blocked = result.get("blocked", False)
@@ -251,6 +285,161 @@ async def process_interaction(
     )
 
 
+def _latest_pending_trace(session_id: str) -> Optional[Any]:
+    """Última traza de la sesión aún no escrita por el TraceWriter (None si no hay)."""
+    writer = get_trace_writer()
+    return writer.latest_pending(session_id) if writer else None
+
+
+def _format_sse(event: str, data: Any) -> str:
+    """Serializa un evento en formato Server-Sent Events."""
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+def _stream_error_payload(exc: Exception) -> Dict[str, Any]:
+    """Traduce excepciones del gateway al mismo contrato de error que POST /interactions."""
+    if isinstance(exc, ValueError) and not isinstance(exc, ValidationError):
+        error_msg = str(exc)
+        if "bloqueada" in error_msg.lower() or "blocked" in error_msg.lower():
+            return {"error_code": "GOVERNANCE_BLOCKED", "message": error_msg}
+        return {"error_code": "INVALID_INTERACTION", "message": f"Invalid value in interaction: {error_msg}"}
+    if isinstance(exc, (ValidationError, KeyError)):
+        return {"error_code": "INVALID_INTERACTION", "message": f"Invalid data in interaction: {exc}"}
+    if isinstance(exc, OperationalError):
+        return {"error_code": "INVALID_INTERACTION", "message": "Database error occurred while processing interaction"}
+    return {
+        "error_code": "INVALID_INTERACTION",
+        "message": f"Unexpected error processing interaction: {type(exc).__name__}",
+    }
+
+
+@router.post(
+    "/stream",
+    summary="Process Interaction (streaming)",
+    description="""
+    Igual que `POST /interactions`, pero devuelve la respuesta como
+    Server-Sent Events (`text/event-stream`) a medida que el LLM genera tokens.
+
+    Eventos:
+    - `classification`: estado cognitivo y decisión de gobernanza (antes de llamar al LLM)
+    - `token`: fragmento de la respuesta (`{"delta": "..."}`)
+    - `done`: `InteractionResponse` completo (texto autoritativo, trace_id, riesgos)
+    - `error`: `{"error_code", "message"}` si el flujo falla después de iniciado el stream
+
+    La traza AI_RESPONSE se persiste y el análisis de riesgo se agenda al cerrar el stream.
+    """,
+    response_class=StreamingResponse,
+)
+async def process_interaction_stream(
+    request: InteractionRequest,
+    db: Session = Depends(get_db),
+    gateway_factory: Callable[[Session], AIGateway] = Depends(get_ai_gateway_factory),
+    current_user: dict = Depends(get_current_user),
+    x_flow_id: Optional[str] = Header(None, alias="X-Flow-Id"),
+) -> StreamingResponse:
+    """
+    Procesa una interacción emitiendo la respuesta del LLM token a token.
+
+    La validación de la sesión ocurre antes de abrir el stream para que los
+    errores 404/400 mantengan el mismo contrato HTTP que el endpoint normal.
+    El flujo del gateway corre con una sesión de BD propia: las dependencias
+    con yield de FastAPI se cierran antes de enviar el body.
+
+    Raises:
+        SessionNotFoundError: Si la sesión no existe
+        InvalidInteractionError: Si la sesión no está activa
+    """
+    flow_id = x_flow_id or f"flow_{uuid4()}"
+    started_at = time.perf_counter()
+
+    db_session = SessionRepository(db).get_by_id(request.session_id)
+    if not db_session:
+        raise SessionNotFoundError(request.session_id)
+
+    if db_session.status != "active":
+        raise InvalidInteractionError(
+            f"Session is not active: {db_session.status}",
+            {"session_id": request.session_id, "status": db_session.status}
+        )
+
+    default_agent = db_session.mode
+    logger.info(
+        "HTTP streaming interaction request received",
+        extra={
+            "flow_id": flow_id,
+            "session_id": request.session_id,
+            "user_id": current_user.get("user_id"),
+        },
+    )
+
+    async def event_stream() -> AsyncIterator[str]:
+        first_token_ms: Optional[float] = None
+        with get_db_session() as stream_db:
+            gateway = gateway_factory(stream_db)
+            try:
+                async for item in gateway.process_interaction_stream(
+                    session_id=request.session_id,
+                    prompt=request.prompt,
+                    context=request.context or {},
+                    flow_id=flow_id,
+                ):
+                    event, data = item["event"], item["data"]
+                    if event == "token":
+                        if first_token_ms is None:
+                            first_token_ms = round((time.perf_counter() - started_at) * 1000, 2)
+                        yield _format_sse("token", {"delta": data})
+                    elif event == "done":
+                        latest_trace = (
+                            _latest_pending_trace(request.session_id)
+                            or TraceRepository(stream_db).get_latest_by_session(request.session_id)
+                        )
+                        response_data = InteractionResponse(
+                            interaction_id=str(uuid4()),
+                            session_id=request.session_id,
+                            response=data.get("response", ""),
+                            agent_used=data.get("agent_used", default_agent),
+                            cognitive_state_detected=data.get("cognitive_state", "UNKNOWN"),
+                            ai_involvement=latest_trace.ai_involvement if latest_trace else 0.5,
+                            blocked=data.get("blocked", False),
+                            block_reason=data.get("block_reason"),
+                            trace_id=latest_trace.id if latest_trace else "",
+                            risks_detected=data.get("risks_detected", []),
+                            timestamp=utc_now(),
+                            tokens_used=data.get("tokens_used"),
+                        )
+                        yield _format_sse("done", response_data.model_dump(mode="json"))
+                    else:
+                        yield _format_sse(event, data)
+            except Exception as e:
+                logger.error(
+                    "Error in streaming interaction processing",
+                    exc_info=True,
+                    extra={"flow_id": flow_id, "session_id": request.session_id, "error_type": type(e).__name__}
+                )
+                yield _format_sse("error", _stream_error_payload(e))
+
+        logger.info(
+            "HTTP streaming interaction request completed",
+            extra={
+                "flow_id": flow_id,
+                "session_id": request.session_id,
+                "first_token_ms": first_token_ms,
+                "duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
+            },
+        )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",  # Evita buffering de nginx
+            "X-Flow-Id": flow_id,
+        },
+    )
+
+
 @router.get(
     "/{session_id}/history",
     response_model=APIResponse[InteractionHistory],
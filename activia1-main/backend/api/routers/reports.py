@@ -24,11 +24,15 @@ from backend.core.constants import utc_now
 from fastapi.responses import FileResponse
 from ..deps import require_teacher_role
 from pydantic import BaseModel, Field
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 
 from ..deps import get_db
-from ...database.repositories import CourseReportRepository, SessionRepository, TraceRepository, RiskRepository, EvaluationRepository
-from ...database.models import SessionDB, CognitiveTraceDB, RiskDB, EvaluationDB, ActivityDB
+from ...database.repositories import (
+    CourseReportRepository, SessionRepository, SessionRollupRepository,
+    TraceRepository, RiskRepository, EvaluationRepository,
+)
+from ...database.models import SessionDB, RiskDB, EvaluationDB, ActivityDB
 from ...services.course_report_generator import CourseReportGenerator
 from ..schemas.common import APIResponse
 # FIX Cortez53: Import custom exceptions
@@ -47,6 +51,13 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/reports", tags=["Institutional Reports"])
 
 
+def _rollup_ai_average(rollups) -> float:
+    """Average ai_involvement over every trace of the given session rollups."""
+    total = sum(rollup.ai_involvement_sum or 0.0 for rollup in rollups)
+    count = sum(rollup.ai_involvement_count or 0 for rollup in rollups)
+    return total / count if count else 0.0
+
+
 # =============================================================================
 # REQUEST/RESPONSE SCHEMAS
 # =============================================================================
@@ -499,15 +510,9 @@ async def get_activity_report(
         completed_sessions = len([s for s in sessions if s.status == "completed"])
         completion_rate = (completed_sessions / total_sessions) * 100 if total_sessions > 0 else 0.0
 
-        # Calculate average AI dependency from traces
-        traces = db.query(CognitiveTraceDB).filter(
-            CognitiveTraceDB.session_id.in_(session_ids)
-        ).all()
-
-        avg_ai_dependency = 0.0
-        if traces:
-            ai_involvements = [t.ai_involvement for t in traces if t.ai_involvement is not None]
-            avg_ai_dependency = sum(ai_involvements) / len(ai_involvements) if ai_involvements else 0.0
+        # AI dependency and risk counts from the incremental session rollups
+        rollups = SessionRollupRepository(db).get_by_session_ids(session_ids)
+        avg_ai_dependency = _rollup_ai_average(rollups.values())
 
         # Get evaluations for average score
         evaluations = db.query(EvaluationDB).filter(
@@ -525,17 +530,18 @@ async def get_activity_report(
                 level = e.overall_competency_level or "UNKNOWN"
                 competency_distribution[level] = competency_distribution.get(level, 0) + 1
 
-        # Get risks summary
-        risks = db.query(RiskDB).filter(
-            RiskDB.session_id.in_(session_ids)
-        ).all()
+        # Risks summary
+        risk_levels = {}
+        for rollup in rollups.values():
+            for level, count in (rollup.risk_level_counts or {}).items():
+                risk_levels[level] = risk_levels.get(level, 0) + count
 
         risk_summary = RiskSummary(
-            total_risks=len(risks),
-            critical_count=len([r for r in risks if r.risk_level == "critical"]),
-            high_count=len([r for r in risks if r.risk_level == "high"]),
-            medium_count=len([r for r in risks if r.risk_level == "medium"]),
-            low_count=len([r for r in risks if r.risk_level == "low"]),
+            total_risks=sum(rollup.risk_count or 0 for rollup in rollups.values()),
+            critical_count=risk_levels.get("critical", 0),
+            high_count=risk_levels.get("high", 0),
+            medium_count=risk_levels.get("medium", 0),
+            low_count=risk_levels.get("low", 0),
         )
 
         # Build per-student performance
@@ -547,8 +553,7 @@ async def get_activity_report(
             student_session_ids = [s.id for s in student_sessions]
 
             student_evals = [e for e in evaluations if e.session_id in student_session_ids]
-            student_risks = [r for r in risks if r.session_id in student_session_ids]
-            student_traces = [t for t in traces if t.session_id in student_session_ids]
+            student_rollups = [rollups[sid] for sid in student_session_ids if sid in rollups]
 
             student_avg_score = 0.0
             competency_level = "INICIAL"
@@ -557,10 +562,7 @@ async def get_activity_report(
                 student_avg_score = sum(scores) / len(scores) if scores else 0.0
                 competency_level = student_evals[-1].overall_competency_level or "INICIAL"
 
-            student_ai_dep = 0.0
-            if student_traces:
-                ai_invs = [t.ai_involvement for t in student_traces if t.ai_involvement is not None]
-                student_ai_dep = sum(ai_invs) / len(ai_invs) if ai_invs else 0.0
+            student_ai_dep = _rollup_ai_average(student_rollups)
 
             student_performance.append(StudentPerformance(
                 student_id=student_id,
@@ -568,7 +570,7 @@ async def get_activity_report(
                 avg_score=student_avg_score,
                 competency_level=competency_level,
                 ai_dependency=student_ai_dep,
-                risks_detected=len(student_risks),
+                risks_detected=sum(rollup.risk_count or 0 for rollup in student_rollups),
             ))
 
         logger.info(
@@ -651,10 +653,13 @@ async def get_learning_analytics(
         else:  # year
             start_date = now - timedelta(days=365)
 
-        # Get sessions in period
-        sessions = db.query(SessionDB).filter(
+        # Get sessions in period (only the columns the analytics use)
+        sessions = db.query(
+            SessionDB.student_id, SessionDB.start_time, SessionDB.end_time, SessionDB.mode
+        ).filter(
             SessionDB.start_time >= start_date
         ).all()
+        period_session_ids = select(SessionDB.id).where(SessionDB.start_time >= start_date)
 
         if not sessions:
             return APIResponse(
@@ -671,7 +676,6 @@ async def get_learning_analytics(
                 message=f"No data found for period: {period}",
             )
 
-        session_ids = [s.id for s in sessions]
         total_sessions = len(sessions)
         total_students = len(set(s.student_id for s in sessions))
 
@@ -683,11 +687,6 @@ async def get_learning_analytics(
                 durations.append(duration)
         avg_session_duration = sum(durations) / len(durations) if durations else 0.0
 
-        # Get agent usage from traces
-        traces = db.query(CognitiveTraceDB).filter(
-            CognitiveTraceDB.session_id.in_(session_ids)
-        ).all()
-
         # Count agent usage (using session mode as proxy)
         agent_counts = {}
         for s in sessions:
@@ -704,8 +703,8 @@ async def get_learning_analytics(
         ]
 
         # Build competency trends (simplified - group by date)
-        evaluations = db.query(EvaluationDB).filter(
-            EvaluationDB.session_id.in_(session_ids)
+        evaluations = db.query(EvaluationDB.created_at, EvaluationDB.overall_score).filter(
+            EvaluationDB.session_id.in_(period_session_ids)
         ).all()
 
         competency_by_date = {}
@@ -725,17 +724,18 @@ async def get_learning_analytics(
             for date, data in sorted(competency_by_date.items())
         ]
 
-        # Build risk trends
-        risks = db.query(RiskDB).filter(
-            RiskDB.session_id.in_(session_ids)
-        ).all()
+        # Build risk trends (counted per day and level in the database)
+        risk_day = func.date(RiskDB.created_at)
+        risk_rows = db.query(risk_day, RiskDB.risk_level, func.count(RiskDB.id)).filter(
+            RiskDB.session_id.in_(period_session_ids)
+        ).group_by(risk_day, RiskDB.risk_level).all()
 
         risk_by_date_level = {}
-        for r in risks:
-            date_str = r.created_at.strftime("%Y-%m-%d") if r.created_at else "unknown"
-            level = r.risk_level or "unknown"
-            key = (date_str, level)
-            risk_by_date_level[key] = risk_by_date_level.get(key, 0) + 1
+        for day, level, count in risk_rows:
+            # SQLite returns 'YYYY-MM-DD', PostgreSQL a date
+            date_str = str(day) if day else "unknown"
+            key = (date_str, level or "unknown")
+            risk_by_date_level[key] = risk_by_date_level.get(key, 0) + count
 
         risk_trends = [
             RiskTrendData(
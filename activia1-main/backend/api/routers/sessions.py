@@ -13,6 +13,7 @@ import logging
 from ...database.repositories import SessionRepository, TraceRepository, RiskRepository, EvaluationRepository
 from ...database.models import SessionDB, CognitiveTraceDB, RiskDB, EvaluationDB
 from ...database.transaction import transaction
+from ...core.session_context_cache import invalidate_session_context
 from ..deps import get_db, get_session_repository, get_trace_repository, get_risk_repository, get_current_user
 from ..schemas.session import (
     SessionCreate,
@@ -363,6 +364,7 @@ async def update_session(
         if status_value in TERMINAL_STATUSES:
             success = session_repo.end_session(session_id)
             if success:
+                invalidate_session_context(session_id)
                 db_session = session_repo.get_by_id(session_id)
         else:
             # Actualizar estado usando el repositorio (no acceso directo)
@@ -457,6 +459,7 @@ async def end_session(
             f"Could not end session '{session_id}'. It may already be completed.",
             field="session_id"
         )
+    invalidate_session_context(session_id)
 
     # Recargar sesión actualizada
     db_session = session_repo.get_by_id(session_id)
@@ -538,6 +541,7 @@ async def delete_session(
             operation=f"delete session '{session_id}'",
             details=str(e)
         )
+    invalidate_session_context(session_id)
 
     # No retornar contenido (204 No Content)
     return None
@@ -26,9 +26,9 @@ def _ensure_aware(dt: Optional[datetime]) -> Optional[datetime]:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=timezone.utc)
     return dt
-from ..deps import get_db, get_session_repository, get_trace_repository, get_risk_repository, require_teacher_role, get_intervention_repository
+from ..deps import get_db, get_session_repository, get_session_rollup_repository, get_trace_repository, get_risk_repository, require_teacher_role, get_intervention_repository
 from ..schemas.common import APIResponse
-from ...database.repositories import SessionRepository, TraceRepository, RiskRepository, InterventionRepository
+from ...database.repositories import SessionRepository, SessionRollupRepository, TraceRepository, RiskRepository, InterventionRepository
 
 router = APIRouter(prefix="/teacher", tags=["Teacher Tools"])
 
@@ -47,8 +47,7 @@ async def compare_students(
     student_ids: List[str] = Query(None, description=f"IDs específicos de estudiantes (opcional, máximo {MAX_STUDENTS_COMPARE})"),
     db: Session = Depends(get_db),
     session_repo: SessionRepository = Depends(get_session_repository),
-    trace_repo: TraceRepository = Depends(get_trace_repository),
-    risk_repo: RiskRepository = Depends(get_risk_repository),
+    rollup_repo: SessionRollupRepository = Depends(get_session_rollup_repository),
     current_user: dict = Depends(require_teacher_role),
 ) -> APIResponse[Dict[str, Any]]:
     """
@@ -92,54 +91,33 @@ async def compare_students(
         # FIX Cortez53: Use custom exception
         raise NoSessionsFoundError(activity_id=activity_id, student_ids=student_ids)
 
-    # FIX Cortez52: Batch load all traces and risks to avoid N+1 queries
+    # Agregados incrementales por sesión: una fila por sesión, sin cargar trazas
     session_ids = [s.id for s in sessions]
-    all_traces_by_session = trace_repo.get_by_session_ids(session_ids)
-    all_risks_by_session = risk_repo.get_by_session_ids(session_ids)
+    rollups = rollup_repo.get_by_session_ids(session_ids)
 
     # Construir comparativa
     students_data = []
 
     for session in sessions:
-        # FIX Cortez52: Use pre-loaded data instead of per-session queries
-        traces = all_traces_by_session.get(session.id, [])
-        risks = all_risks_by_session.get(session.id, [])
+        rollup = rollups.get(session.id)
 
         # Calcular duración
         duration_minutes = 0.0
         if session.end_time:
             duration_minutes = (session.end_time - session.start_time).total_seconds() / 60.0
 
-        # Estados cognitivos visitados
-        cognitive_states = list(set(t.cognitive_state for t in traces if t.cognitive_state))
-
-        # Promedio de AI involvement
-        ai_involvements = [t.ai_involvement or 0.0 for t in traces]
-        ai_dependency_avg = sum(ai_involvements) / len(ai_involvements) if ai_involvements else 0.0
-
-        # Riesgos por tipo
-        risks_by_type = defaultdict(int)
-        for risk in risks:
-            risks_by_type[risk.risk_type] += 1
-
-        # Interacciones bloqueadas
-        blocked_count = sum(
-            1 for t in traces
-            if t.trace_metadata and t.trace_metadata.get("blocked")
-        )
-
         students_data.append({
             "student_id": session.student_id,
             "session_id": session.id,
             "start_time": session.start_time.isoformat(),
             "end_time": session.end_time.isoformat() if session.end_time else None,
             "duration_minutes": round(duration_minutes, 2),
-            "total_interactions": len(traces),
-            "blocked_interactions": blocked_count,
-            "cognitive_states_visited": cognitive_states,
-            "ai_dependency_average": round(ai_dependency_avg, 2),
-            "risks_total": len(risks),
-            "risks_by_type": dict(risks_by_type),
+            "total_interactions": rollup.trace_count if rollup else 0,
+            "blocked_interactions": rollup.blocked_count if rollup else 0,
+            "cognitive_states_visited": list(rollup.cognitive_state_counts or {}) if rollup else [],
+            "ai_dependency_average": round(rollup.ai_involvement_avg, 2) if rollup else 0.0,
+            "risks_total": rollup.risk_count if rollup else 0,
+            "risks_by_type": dict(rollup.risk_type_counts or {}) if rollup else {},
             "status": session.status
         })
 
@@ -201,8 +179,7 @@ async def get_teacher_alerts(
     severity: str = Query("all", description="Filtro por severidad: all, critical, high, medium"),
     db: Session = Depends(get_db),
     session_repo: SessionRepository = Depends(get_session_repository),
-    trace_repo: TraceRepository = Depends(get_trace_repository),
-    risk_repo: RiskRepository = Depends(get_risk_repository),
+    rollup_repo: SessionRollupRepository = Depends(get_session_rollup_repository),
     current_user: dict = Depends(require_teacher_role),
 ) -> APIResponse[Dict[str, Any]]:
     """
@@ -226,27 +203,23 @@ async def get_teacher_alerts(
     # Obtener todas las sesiones activas
     active_sessions = [s for s in session_repo.get_all() if s.status == "active"]
 
-    # FIX Cortez52: Batch load all risks and traces to avoid N+1 queries
+    # Agregados incrementales por sesión en lugar de todas las trazas y riesgos
     active_session_ids = [s.id for s in active_sessions]
-    all_risks_by_session = risk_repo.get_by_session_ids(active_session_ids) if active_session_ids else {}
-    all_traces_by_session = trace_repo.get_by_session_ids(active_session_ids) if active_session_ids else {}
+    rollups = rollup_repo.get_by_session_ids(active_session_ids)
 
     alerts = []
 
     for session in active_sessions:
-        # FIX Cortez52: Use pre-loaded data instead of per-session queries
-        risks = all_risks_by_session.get(session.id, [])
+        rollup = rollups.get(session.id)
 
         # Clasificar riesgos (DB almacena en lowercase)
-        critical_risks = [r for r in risks if r.risk_level == "critical"]
-        high_risks = [r for r in risks if r.risk_level == "high"]
-        medium_risks = [r for r in risks if r.risk_level == "medium"]
-
-        # FIX Cortez52: Use pre-loaded traces
-        traces = all_traces_by_session.get(session.id, [])
+        risk_levels = (rollup.risk_level_counts or {}) if rollup else {}
+        critical_risks = risk_levels.get("critical", 0)
+        high_risks = risk_levels.get("high", 0)
+        medium_risks = risk_levels.get("medium", 0)
 
-        ai_involvements = [t.ai_involvement or 0.0 for t in traces]
-        ai_dependency_avg = sum(ai_involvements) / len(ai_involvements) if ai_involvements else 0.0
+        total_interactions = rollup.trace_count if rollup else 0
+        ai_dependency_avg = rollup.ai_involvement_avg if rollup else 0.0
 
         # Calcular duración de la sesión
         # FIX Cortez79: Ensure start_time is timezone-aware for subtraction
@@ -257,17 +230,17 @@ async def get_teacher_alerts(
         alert_reasons = []
         alert_severity = "low"
 
-        if len(critical_risks) >= 1:
-            alert_reasons.append(f"{len(critical_risks)} riesgo(s) crítico(s)")
+        if critical_risks >= 1:
+            alert_reasons.append(f"{critical_risks} riesgo(s) crítico(s)")
             alert_severity = "critical"
 
-        if len(high_risks) >= 2:
-            alert_reasons.append(f"{len(high_risks)} riesgos altos")
+        if high_risks >= 2:
+            alert_reasons.append(f"{high_risks} riesgos altos")
             if alert_severity == "low":
                 alert_severity = "high"
 
-        if len(medium_risks) >= 3:
-            alert_reasons.append(f"{len(medium_risks)} riesgos medios")
+        if medium_risks >= 3:
+            alert_reasons.append(f"{medium_risks} riesgos medios")
             if alert_severity == "low":
                 alert_severity = "medium"
 
@@ -289,7 +262,7 @@ async def get_teacher_alerts(
 
             # Sugerencias de intervención
             suggestions = []
-            if len(critical_risks) >= 1:
+            if critical_risks >= 1:
                 suggestions.append("Intervención inmediata: revisar riesgos críticos con el estudiante")
             if ai_dependency_avg > 0.85:
                 suggestions.append("Fomentar autonomía: reducir dependencia de IA")
@@ -305,12 +278,12 @@ async def get_teacher_alerts(
                 "reasons": alert_reasons,
                 "suggestions": suggestions,
                 "metrics": {
-                    "critical_risks": len(critical_risks),
-                    "high_risks": len(high_risks),
-                    "medium_risks": len(medium_risks),
+                    "critical_risks": critical_risks,
+                    "high_risks": high_risks,
+                    "medium_risks": medium_risks,
                     "ai_dependency": round(ai_dependency_avg, 2),
                     "duration_hours": round(duration_hours, 2),
-                    "total_interactions": len(traces)
+                    "total_interactions": total_interactions
                 },
                 "timestamp": utc_now().isoformat()
             })
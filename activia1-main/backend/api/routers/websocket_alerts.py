@@ -7,6 +7,8 @@ Provides:
 - WebSocket endpoint for real-time teacher alerts
 - Connection management for multiple teachers
 - Broadcast mechanism for critical alerts
+- Cross-worker fan-out through the AlertBroker (Redis pub/sub) with
+  per-connection bounded send queues
 """
 import asyncio
 import logging
@@ -20,9 +22,13 @@ from fastapi.websockets import WebSocketState
 
 from ..deps import get_user_repository, require_admin_role
 from ...database.repositories import UserRepository
+from ...core.alert_broker import get_alert_broker
 from ...core.constants import (
     WEBSOCKET_KEEPALIVE_TIMEOUT_SECONDS,
     WEBSOCKET_AUTH_CODE_MISSING_TOKEN,
+    WEBSOCKET_CLOSE_CODE_SLOW_CONSUMER,
+    WEBSOCKET_SEND_QUEUE_SIZE,
+    WEBSOCKET_SEND_TIMEOUT_SECONDS,
 )
 
 logger = logging.getLogger(__name__)
@@ -30,29 +36,107 @@ logger = logging.getLogger(__name__)
 router = APIRouter(tags=["WebSocket Alerts"])
 
 
+class AlertConnection:
+    """
+    Una conexión de docente con su cola de salida acotada.
+
+    Un task propio envía los mensajes en orden; quien publica solo encola
+    (put_nowait) y nunca espera al socket. Todos los envíos a este WebSocket
+    pasan por la cola (un solo escritor).
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        teacher_id: str,
+        queue_size: int = WEBSOCKET_SEND_QUEUE_SIZE,
+        send_timeout: float = WEBSOCKET_SEND_TIMEOUT_SECONDS,
+    ):
+        self.websocket = websocket
+        self.teacher_id = teacher_id
+        self.send_timeout = send_timeout
+        self.queue: "asyncio.Queue[dict]" = asyncio.Queue(maxsize=max(1, queue_size))
+        self.closed = False
+        self._sender: Optional[asyncio.Task] = None
+
+    def start(self, on_failure) -> None:
+        """Arranca el task de envío; on_failure(conn, reason) si el socket falla o se atrasa."""
+        self._sender = asyncio.create_task(self._send_loop(on_failure), name=f"ws_alerts_{self.teacher_id}")
+
+    def offer(self, message: dict) -> bool:
+        """Encola un mensaje; False si la conexión está cerrada o su cola llena."""
+        if self.closed:
+            return False
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _send_loop(self, on_failure) -> None:
+        while True:
+            message = await self.queue.get()
+            try:
+                if self.websocket.client_state != WebSocketState.CONNECTED:
+                    raise WebSocketDisconnect()
+                await asyncio.wait_for(self.websocket.send_json(message), timeout=self.send_timeout)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                await on_failure(self, "send timeout")
+                return
+            except Exception as e:
+                await on_failure(self, f"send failed: {e}")
+                return
+
+    async def close(self, code: Optional[int] = None, reason: str = "") -> None:
+        """Detiene el envío y, si se indica `code`, cierra el socket."""
+        self.closed = True
+        if self._sender is not None and self._sender is not asyncio.current_task():
+            self._sender.cancel()
+        if code is not None:
+            try:
+                await self.websocket.close(code=code, reason=reason)
+            except Exception:
+                pass  # Ya cerrado por el cliente
+
+
 class AlertConnectionManager:
     """
     Manages WebSocket connections for teacher alerts.
 
-    Thread-safe connection management with broadcast capabilities.
+    Solo conoce las conexiones de este worker. send_to_teacher y
+    broadcast_to_all_teachers publican en el AlertBroker (Redis pub/sub) y
+    cada worker entrega lo recibido a sus conexiones con deliver_local().
+    La entrega es concurrente (un task de envío por conexión) y un cliente
+    lento cuya cola se llena se desconecta en lugar de frenar al resto.
     """
 
-    def __init__(self):
-        # teacher_id -> set of websocket connections
-        self.active_connections: Dict[str, Set[WebSocket]] = {}
+    def __init__(
+        self,
+        queue_size: int = WEBSOCKET_SEND_QUEUE_SIZE,
+        send_timeout: float = WEBSOCKET_SEND_TIMEOUT_SECONDS,
+    ):
+        # teacher_id -> set of connections
+        self.active_connections: Dict[str, Set[AlertConnection]] = {}
         # All teacher connections for broadcasts
-        self.all_teachers: Set[WebSocket] = set()
+        self.all_teachers: Set[AlertConnection] = set()
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
         self._lock = asyncio.Lock()
+        self._stats: Dict[str, int] = {"delivered": 0, "dropped_slow": 0, "dropped_failed": 0}
+        # Referencias a los cierres en curso (evita que el GC cancele el task)
+        self._drop_tasks: Set[asyncio.Task] = set()
 
-    async def connect(self, websocket: WebSocket, teacher_id: str):
+    async def connect(self, websocket: WebSocket, teacher_id: str) -> AlertConnection:
         """Accept and register a new WebSocket connection."""
         await websocket.accept()
 
+        connection = AlertConnection(websocket, teacher_id, self.queue_size, self.send_timeout)
         async with self._lock:
-            if teacher_id not in self.active_connections:
-                self.active_connections[teacher_id] = set()
-            self.active_connections[teacher_id].add(websocket)
-            self.all_teachers.add(websocket)
+            self.active_connections.setdefault(teacher_id, set()).add(connection)
+            self.all_teachers.add(connection)
+        connection.start(self._on_send_failure)
 
         logger.info(
             "WebSocket connected",
@@ -61,21 +145,25 @@ class AlertConnectionManager:
                 "total_connections": len(self.all_teachers)
             }
         )
+        return connection
 
-    async def disconnect(self, websocket: WebSocket, teacher_id: str):
+    async def disconnect(self, connection: AlertConnection, code: Optional[int] = None, reason: str = ""):
         """Remove a WebSocket connection.
 
         MED-006 FIX: Fixed potential race condition by using .get() with default
         and checking key existence before deletion inside the same lock context.
         """
+        teacher_id = connection.teacher_id
         async with self._lock:
             # MED-006 FIX: Use .get() to avoid KeyError race condition
             connections = self.active_connections.get(teacher_id, set())
-            connections.discard(websocket)
+            connections.discard(connection)
             # Only delete key if it exists AND is empty (atomic check inside lock)
             if teacher_id in self.active_connections and not self.active_connections[teacher_id]:
                 del self.active_connections[teacher_id]
-            self.all_teachers.discard(websocket)
+            self.all_teachers.discard(connection)
+
+        await connection.close(code, reason)
 
         logger.info(
             "WebSocket disconnected",
@@ -85,57 +173,84 @@ class AlertConnectionManager:
             }
         )
 
-    async def send_to_teacher(self, teacher_id: str, message: dict):
-        """Send a message to a specific teacher."""
-        async with self._lock:
-            connections = self.active_connections.get(teacher_id, set()).copy()
+    async def _on_send_failure(self, connection: AlertConnection, reason: str) -> None:
+        self._stats["dropped_failed"] += 1
+        # CRIT-002 FIX: Use lazy logging instead of f-strings
+        logger.warning("Dropping WebSocket of teacher %s: %s", connection.teacher_id, reason)
+        await self.disconnect(connection, WEBSOCKET_CLOSE_CODE_SLOW_CONSUMER, "Slow consumer")
 
-        disconnected = []
-        for websocket in connections:
-            try:
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_json(message)
-            except Exception as e:
-                # CRIT-002 FIX: Use lazy logging instead of f-strings
-                logger.warning("Failed to send to teacher %s: %s", teacher_id, e)
-                disconnected.append(websocket)
+    def deliver_local(self, message: dict, teacher_id: Optional[str] = None) -> int:
+        """
+        Encola un mensaje en las conexiones de este worker (sin esperar envíos).
 
-        # Clean up disconnected
-        if disconnected:
-            async with self._lock:
-                for ws in disconnected:
-                    self.active_connections.get(teacher_id, set()).discard(ws)
-                    self.all_teachers.discard(ws)
+        Args:
+            message: Mensaje a enviar
+            teacher_id: Solo a ese docente; None = a todos los conectados
 
-    async def broadcast_to_all_teachers(self, message: dict):
-        """Broadcast a message to all connected teachers."""
-        async with self._lock:
-            connections = self.all_teachers.copy()
+        Returns:
+            Número de conexiones que lo encolaron
+        """
+        if teacher_id:
+            targets = list(self.active_connections.get(teacher_id, ()))
+        else:
+            targets = list(self.all_teachers)
+
+        delivered = 0
+        for connection in targets:
+            if connection.offer(message):
+                delivered += 1
+            elif not connection.closed:
+                # Cola llena: el cliente no consume; se desconecta sin frenar al resto
+                connection.closed = True
+                self._stats["dropped_slow"] += 1
+                logger.warning(
+                    "Dropping slow WebSocket consumer for teacher %s (%d queued)",
+                    connection.teacher_id, connection.queue.qsize()
+                )
+                task = asyncio.create_task(
+                    self.disconnect(connection, WEBSOCKET_CLOSE_CODE_SLOW_CONSUMER, "Slow consumer")
+                )
+                self._drop_tasks.add(task)
+                task.add_done_callback(self._drop_tasks.discard)
+        self._stats["delivered"] += delivered
+        return delivered
+
+    def deliver_envelope(self, envelope: dict) -> None:
+        """Callback del AlertBroker: entrega un sobre recibido de cualquier worker."""
+        message = envelope.get("message")
+        if isinstance(message, dict):
+            self.deliver_local(message, envelope.get("target"))
+
+    async def _publish(self, message: dict, teacher_id: Optional[str]) -> None:
+        broker = get_alert_broker()
+        if broker is None:
+            # Sin broker (lifespan no iniciado): solo este worker
+            self.deliver_local(message, teacher_id)
+            return
+        await broker.publish({"target": teacher_id, "message": message})
 
-        disconnected = []
-        for websocket in connections:
-            try:
-                if websocket.client_state == WebSocketState.CONNECTED:
-                    await websocket.send_json(message)
-            except Exception as e:
-                # CRIT-002 FIX: Use lazy logging instead of f-strings
-                logger.warning("Failed to broadcast: %s", e)
-                disconnected.append(websocket)
+    async def send_to_teacher(self, teacher_id: str, message: dict):
+        """Send a message to a specific teacher (on whichever worker holds the connection)."""
+        await self._publish(message, teacher_id)
 
-        # Clean up disconnected
-        if disconnected:
-            async with self._lock:
-                for ws in disconnected:
-                    self.all_teachers.discard(ws)
+    async def broadcast_to_all_teachers(self, message: dict):
+        """Broadcast a message to all connected teachers across workers."""
+        await self._publish(message, None)
 
     def get_connected_count(self) -> int:
-        """Get number of connected teachers."""
+        """Get number of connected teachers (this worker)."""
         return len(self.all_teachers)
 
     def is_teacher_connected(self, teacher_id: str) -> bool:
-        """Check if a specific teacher is connected."""
+        """Check if a specific teacher is connected to this worker."""
         return teacher_id in self.active_connections and len(self.active_connections[teacher_id]) > 0
 
+    def stats(self) -> Dict[str, int]:
+        """Contadores de entrega de este worker."""
+        stats = dict(self._stats)
+        stats["connections"] = len(self.all_teachers)
+        return stats
+
 
 # Global connection manager
 alert_manager = AlertConnectionManager()
@@ -196,11 +311,12 @@ async def websocket_teacher_alerts(
         await websocket.close(code=WEBSOCKET_AUTH_CODE_MISSING_TOKEN, reason="Authentication required")
         return
 
+    connection = None
     try:
-        await alert_manager.connect(websocket, teacher_id)
+        connection = await alert_manager.connect(websocket, teacher_id)
 
         # Send connection confirmation
-        await websocket.send_json({
+        connection.offer({
             "type": "connected",
             "data": {
                 "teacher_id": teacher_id,
@@ -210,7 +326,8 @@ async def websocket_teacher_alerts(
         })
 
         # Keep connection alive and handle messages
-        while True:
+        # (todos los envíos van por la cola de la conexión: un solo escritor)
+        while not connection.closed:
             try:
                 # Wait for messages with timeout for keepalive
                 # MED-004 FIX: Use centralized constant
@@ -223,26 +340,24 @@ async def websocket_teacher_alerts(
                 msg_type = data.get("type", "")
 
                 if msg_type == "ping":
-                    await websocket.send_json({
+                    connection.offer({
                         "type": "pong",
                         "timestamp": datetime.now(timezone.utc).isoformat()
                     })
 
                 elif msg_type == "subscribe":
                     # Handle subscription to specific alert types (future feature)
-                    await websocket.send_json({
+                    connection.offer({
                         "type": "subscribed",
                         "data": data.get("filters", {})
                     })
 
             except asyncio.TimeoutError:
-                # Send keepalive ping
-                try:
-                    await websocket.send_json({
-                        "type": "ping",
-                        "timestamp": datetime.now(timezone.utc).isoformat()
-                    })
-                except Exception:
+                # Send keepalive ping (False: conexión descartada por lenta)
+                if not connection.offer({
+                    "type": "ping",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }):
                     break
 
     except WebSocketDisconnect:
@@ -252,7 +367,8 @@ async def websocket_teacher_alerts(
         # CRIT-002 FIX: Use lazy logging instead of f-strings
         logger.error("WebSocket error: %s", e, exc_info=True)
     finally:
-        await alert_manager.disconnect(websocket, teacher_id)
+        if connection is not None:
+            await alert_manager.disconnect(connection)
 
 
 # =====================================================================
@@ -383,11 +499,14 @@ async def trigger_alert_notification(
 async def get_websocket_status(
     _current_user: dict = Depends(require_admin_role),  # FIX Cortez91 CRIT-R02: Add admin auth
 ):
-    """Get WebSocket connection status."""
+    """Get WebSocket connection status (this worker) and fan-out broker state."""
+    broker = get_alert_broker()
     return {
         "success": True,
         "data": {
             "connected_teachers": alert_manager.get_connected_count(),
+            "delivery": alert_manager.stats(),
+            "broker": broker.stats() if broker is not None else None,
             "timestamp": datetime.now(timezone.utc).isoformat()
         }
     }
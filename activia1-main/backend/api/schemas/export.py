@@ -9,7 +9,7 @@ Defines Pydantic models for:
 """
 
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -165,4 +165,46 @@ class ExportHistoryResponse(BaseModel):
 
     success: bool = Field(description="Whether request succeeded")
     total_exports: int = Field(description="Total number of exports")
-    exports: List[ExportSummary] = Field(description="List of exports")
\ No newline at end of file
+    exports: List[ExportSummary] = Field(description="List of exports")
+
+class ExportJobCreateRequest(ExportRequest):
+    """Request to run a research export as a background job"""
+
+    incremental: bool = Field(
+        default=False,
+        description="Only export rows created after the last completed job with the same filters",
+    )
+
+
+class ExportJobResponse(BaseModel):
+    """Status of a background research export job"""
+
+    job_id: str = Field(description="Export job ID")
+    status: Literal["pending", "running", "completed", "failed", "rejected"] = Field(
+        description="Job status"
+    )
+    incremental: bool = Field(description="Whether the job is incremental")
+    progress: Dict[str, int] = Field(
+        default_factory=dict, description="Rows processed per data type"
+    )
+    records_processed: int = Field(default=0, description="Total rows processed")
+    since: Optional[datetime] = Field(
+        default=None, description="Rows created after this instant (incremental jobs)"
+    )
+    watermark: Optional[datetime] = Field(
+        default=None, description="Rows created up to this instant"
+    )
+    attempts: int = Field(default=0, description="Processing attempts")
+    file_size_bytes: Optional[int] = Field(
+        default=None, description="Size of the export file in bytes"
+    )
+    media_type: Optional[str] = Field(default=None, description="Content type of the file")
+    download_url: Optional[str] = Field(
+        default=None, description="URL to download the file (completed jobs)"
+    )
+    validation: Optional[Dict[str, Any]] = Field(
+        default=None, description="Privacy validation of the export"
+    )
+    error: Optional[str] = Field(default=None, description="Last processing error")
+    created_at: Optional[datetime] = Field(default=None, description="When the job was created")
+    completed_at: Optional[datetime] = Field(default=None, description="When the job finished")
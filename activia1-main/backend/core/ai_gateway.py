@@ -19,7 +19,8 @@ Background Tasks for Risk Analysis:
 - This would allow immediate response to user while analysis runs in background
 - See: https://fastapi.tiangolo.com/tutorial/background-tasks/
 """
-from typing import Optional, Dict, Any, List, TYPE_CHECKING
+from typing import Optional, Dict, Any, List, AsyncIterator, TYPE_CHECKING
+from contextvars import ContextVar
 from datetime import datetime
 import uuid
 import logging
@@ -30,13 +31,17 @@ from .cognitive_engine import CognitiveReasoningEngine, AgentMode
 from ..models.trace import CognitiveTrace, TraceLevel, InteractionType, TraceSequence
 from ..models.risk import Risk, RiskType, RiskLevel, RiskDimension, RiskReport
 from ..models.evaluation import EvaluationReport
-from ..llm import LLMProviderFactory, LLMProvider, LLMMessage, LLMRole
+from ..llm import LLMProvider, LLMMessage, LLMResponse, LLMRole
 from .cache import LLMResponseCache
-from ..agents.governance import GobernanzaAgent
+from .semantic_cache import SemanticResponseCache, make_bucket_key
+from .signal_matcher import get_signal_matcher
 
 # Cortez87: Import RAG types for type checking only (avoid circular import)
 if TYPE_CHECKING:
     from ..agents.knowledge_rag import KnowledgeRAGAgent, RAGResult
+    from .trace_writer import TraceWriter
+    from .risk_queue import RiskAnalysisQueue
+    from .session_context_cache import SessionContextCache
 # FIX Cortez68 (HIGH-005): Import protocols from gateway module instead of duplicating
 from .gateway.protocols import (
     SessionRepositoryProtocol,
@@ -44,10 +49,12 @@ from .gateway.protocols import (
     RiskRepositoryProtocol,
     EvaluationRepositoryProtocol,
     SequenceRepositoryProtocol,
+    resolve_repo_result,
 )
 # FIX Cortez91 CRIT-G01: Use centralized LLM_TIMEOUT_SECONDS from constants
 # This avoids duplicate definitions (was also defined here via os.getenv)
 from .constants import LLM_TIMEOUT_SECONDS
+from .gateway.pipeline import GatewayPipeline
 
 # Prometheus metrics instrumentation (HIGH-01)
 # Lazy import to avoid circular dependency with api.monitoring
@@ -83,6 +90,16 @@ def _get_metrics():
 
 logger = logging.getLogger(__name__)
 
+# Streaming de interacciones: cola del consumidor SSE para el flujo actual.
+# Se propaga por contextvars a la tarea que ejecuta process_interaction(), de modo
+# que solo las llamadas LLM de ESE flujo se emiten token a token.
+_stream_sink: ContextVar[Optional[asyncio.Queue]] = ContextVar("ai_gateway_stream_sink", default=None)
+_STREAM_END = object()
+
+# Marca que la respuesta del flujo actual es un fallback (LLM caído o circuit
+# breaker abierto): esas respuestas no se guardan en los cachés de respuestas.
+_llm_fallback_used: ContextVar[bool] = ContextVar("ai_gateway_llm_fallback_used", default=False)
+
 
 # FIX Cortez68 (HIGH-005): Protocol definitions removed - now imported from gateway.protocols
 # See: backend/core/gateway/protocols.py for canonical definitions
@@ -127,6 +144,16 @@ class AIGateway:
         config: Optional[Dict[str, Any]] = None,
         # Cortez87: RAG agent for context enrichment
         knowledge_rag: Optional["KnowledgeRAGAgent"] = None,
+        # Write-behind de trazas (batch INSERT), opcional
+        trace_writer: Optional["TraceWriter"] = None,
+        # Caché de la cola conversacional por sesión (Redis), opcional
+        context_cache: Optional["SessionContextCache"] = None,
+        # Caché semántico de respuestas del tutor (opt-in), opcional
+        semantic_cache: Optional[SemanticResponseCache] = None,
+        # Componentes compartidos por todo el proceso, opcional
+        pipeline: Optional[GatewayPipeline] = None,
+        # Cola durable del análisis de riesgo (workers propios), opcional
+        risk_queue: Optional["RiskAnalysisQueue"] = None,
     ):
         """
         Inicializa el AI Gateway con Dependency Injection completa
@@ -142,53 +169,63 @@ class AIGateway:
             cache: Cache de respuestas LLM (inyectado, opcional)
             config: Configuración adicional
             knowledge_rag: Agente RAG para enriquecimiento de contexto (Cortez87, opcional)
+            trace_writer: Writer write-behind de trazas; si está corriendo, las trazas
+                se encolan y se persisten en lote (opcional)
+            context_cache: Caché de la cola del historial por sesión; evita leer
+                cognitive_traces en cada turno (opcional)
+            semantic_cache: Caché de respuestas por similitud de prompts dentro de
+                la misma actividad / estrategia; solo para los tipos de respuesta
+                habilitados (opcional)
+            pipeline: Motor cognitivo, gobernanza, historial, caches, RAG y
+                registro de tareas ya construidos y compartidos entre requests.
+                Si se pasa, se ignoran llm_provider, cognitive_engine, cache,
+                config, knowledge_rag, context_cache y semantic_cache.
+            risk_queue: Cola durable del análisis AR-IA; si está corriendo, el
+                request solo encola el job y el análisis corre en sus workers
+                (opcional)
 
         Note:
             Si no se inyectan dependencias, se crean con valores por defecto
-            (útil para backward compatibility con código existente)
+            (útil para backward compatibility con código existente). Con
+            `pipeline` el costo de construcción es solo el de los repositorios.
         """
-        self.config = config or {}
-
-        # C1: Motor LLM - Usar proveedor inyectado o crear uno por defecto
-        if llm_provider is not None:
-            self.llm = llm_provider
-        else:
-            # Backward compatibility: crear proveedor mock por defecto
-            self.llm = LLMProviderFactory.create("mock", self.config.get("llm", {}))
-
-        # C3: Motor de Razonamiento Cognitivo-Pedagógico - Inyectado
-        if cognitive_engine is not None:
-            self.cognitive_engine = cognitive_engine
-        else:
-            # Backward compatibility
-            self.cognitive_engine = CognitiveReasoningEngine(self.config)
-        
-        # C4: Agente de Gobernanza - Instanciar para filtrado PII
-        self.governance_agent = GobernanzaAgent(llm_provider=None, config=self.config)
+        if pipeline is None:
+            pipeline = GatewayPipeline.build(
+                llm_provider=llm_provider,
+                cognitive_engine=cognitive_engine,
+                cache=cache,
+                config=config,
+                knowledge_rag=knowledge_rag,
+                context_cache=context_cache,
+                semantic_cache=semantic_cache,
+            )
+        self.pipeline = pipeline
+
+        # Componentes compartidos (solo lectura): C1 LLM, C3 CRPE, C4 gobernanza PII
+        self.config = pipeline.config
+        self.llm = pipeline.llm
+        self.cognitive_engine = pipeline.cognitive_engine
+        self.governance_agent = pipeline.governance_agent
+        self.history = pipeline.history
+        self.cache = pipeline.cache
+        self.semantic_cache = pipeline.semantic_cache
+        self.context_cache = pipeline.context_cache
+        # Cortez87: RAG agent for context enrichment (optional)
+        self.knowledge_rag = pipeline.knowledge_rag
+        # FIX Cortez35: Task registry to prevent garbage collection of background tasks
+        # (compartido: las tareas sobreviven al gateway del request que las creó)
+        self._background_tasks = pipeline.background_tasks
 
-        # Repositorios inyectados (opcional para backward compatibility)
+        # Estado por request: repositorios (sesión de BD del request) y writer
         self.session_repo = session_repo
         self.trace_repo = trace_repo
         self.risk_repo = risk_repo
         self.evaluation_repo = evaluation_repo
         self.sequence_repo = sequence_repo
-
-        # Cache LLM (opcional, para reducir costos)
-        self.cache = cache
-
-        # Cortez87: RAG agent for context enrichment (optional)
-        # If not injected, create via factory (respects RAG_ENABLED env var)
-        self.knowledge_rag = knowledge_rag
-
-        # FIX Cortez35: Task registry to prevent garbage collection of background tasks
-        # This keeps a strong reference to running tasks so they don't get GC'd
-        self._background_tasks: set = set()
-        # FIX Cortez73 (HIGH-002): Add asyncio.Lock to protect concurrent access to task registry
-        self._background_tasks_lock = asyncio.Lock()
-        # FIX Cortez74: Add threading.Lock for sync context add operations
-        self._background_tasks_sync_lock = threading.Lock()
-        # FIX Cortez74 (HIGH-MEM-001): Maximum background tasks to prevent unbounded growth
-        self._max_background_tasks = 1000
+        self.trace_writer = trace_writer
+        self.risk_queue = risk_queue
+        # sessions.conversation_summary de las sesiones procesadas por esta instancia
+        self._conversation_summaries: Dict[str, Optional[Dict[str, Any]]] = {}
 
         # ✅ ELIMINADO: No más estado en memoria
         # ❌ self.trace_sequences: Dict[str, TraceSequence] = {}
@@ -324,13 +361,16 @@ class AIGateway:
         # to prevent race conditions on concurrent session modifications. This requires
         # adding a `version` column to SessionDB and incrementing it on each update.
         if self.session_repo is not None:
-            db_session = self.session_repo.get_by_id(session_id)
+            # Repos sync o async (AsyncSessionRepository): await solo si corresponde
+            db_session = await resolve_repo_result(self.session_repo.get_by_id(session_id))
             if not db_session:
                 raise ValueError(f"Sesión {session_id} no encontrada en BD")
 
             student_id = db_session.student_id
             activity_id = db_session.activity_id
             current_mode = AgentMode(db_session.mode.upper())
+            summary = getattr(db_session, "conversation_summary", None)
+            self._conversation_summaries[session_id] = summary if isinstance(summary, dict) else None
             logger.info(
                 "Session context loaded",
                 extra={
@@ -370,6 +410,14 @@ class AIGateway:
                 "block_reason": block_reason
             }
         )
+        cognitive_state = classification.get("cognitive_state")
+        self._emit_stream_event("classification", {
+            "flow_id": flow_id,
+            "agent_mode": current_mode.value,
+            "cognitive_state": cognitive_state.value if hasattr(cognitive_state, "value") else cognitive_state,
+            "blocked": should_block,
+            "block_reason": block_reason,
+        })
 
         # C6: Registrar traza de entrada (N3/N4)
         input_trace = self._create_trace(
@@ -382,7 +430,7 @@ class AIGateway:
             cognitive_intent=classification.get("cognitive_state", "").value if classification.get("cognitive_state") else None,
             context={"classification": classification}
         )
-        self._persist_trace(input_trace)
+        await self._persist_trace(input_trace)
 
         # Si debe bloquearse, retornar mensaje pedagógico
         if should_block:
@@ -398,10 +446,10 @@ class AIGateway:
                 level=TraceLevel.N4_COGNITIVO,
                 agent_id="GOV-IA"
             )
-            self._persist_trace(intervention_trace)
+            await self._persist_trace(intervention_trace)
 
             # Registrar riesgo detectado
-            self._persist_risk(
+            await self._persist_risk(
                 session_id=session_id,
                 student_id=student_id,
                 activity_id=activity_id,
@@ -441,7 +489,7 @@ class AIGateway:
             return response
 
         # C3: Generar estrategia pedagógica
-        student_history = self._get_student_history(student_id, activity_id)
+        student_history = await self._get_student_history(student_id, activity_id)
         strategy = self.cognitive_engine.generate_pedagogical_response_strategy(
             prompt,
             classification,
@@ -527,7 +575,8 @@ class AIGateway:
         if current_mode == AgentMode.TUTOR:
             # Cortez87: Use enriched_prompt (with RAG context if available)
             response = await self._process_tutor_mode(
-                session_id, enriched_prompt, strategy, classification, flow_id=flow_id
+                session_id, enriched_prompt, strategy, classification, flow_id=flow_id,
+                activity_id=activity_id, student_prompt=prompt
             )
         elif current_mode == AgentMode.SIMULATOR:
             # FIX Cortez22 DEFECTO 1.1: Add await for async method
@@ -566,7 +615,7 @@ class AIGateway:
             agent_id=current_mode.value,
             context={"strategy": strategy}
         )
-        self._persist_trace(response_trace)
+        await self._persist_trace(response_trace)
 
         # Análisis de riesgo en paralelo (AR-IA)
         self._run_risk_analysis_background(
@@ -603,6 +652,83 @@ class AIGateway:
         )
         return response
 
+    async def process_interaction_stream(
+        self,
+        session_id: str,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        flow_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Variante streaming de process_interaction() (time-to-first-token).
+
+        Ejecuta exactamente el mismo flujo (validación, PII, clasificación,
+        gobernanza, trazas N4, análisis de riesgo), pero las llamadas al LLM
+        usan generate_stream() y cada fragmento se entrega al consumidor a
+        medida que llega. La traza AI_RESPONSE se persiste y el análisis de
+        riesgo se agenda cuando termina el stream, igual que en modo normal.
+
+        Eventos emitidos (dicts con "event" y "data"):
+        - classification: estado cognitivo y decisión de gobernanza (antes del LLM)
+        - token: fragmento de texto generado
+        - done: resultado completo (mismo dict que process_interaction)
+
+        Si no se generó ningún token (bloqueo, cache hit, fallback) se emite la
+        respuesta completa como un único token antes de "done". El texto de
+        "done" es siempre el autoritativo.
+
+        Raises:
+            Las mismas excepciones que process_interaction(), al consumir el stream.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def _run() -> Dict[str, Any]:
+            try:
+                return await self.process_interaction(
+                    session_id=session_id,
+                    prompt=prompt,
+                    context=context,
+                    flow_id=flow_id,
+                )
+            finally:
+                queue.put_nowait((_STREAM_END, None))
+
+        # create_task() copia el contexto actual: el sink solo es visible en esta tarea
+        sink_token = _stream_sink.set(queue)
+        try:
+            task = asyncio.create_task(_run(), name=f"interaction_stream_{session_id}")
+        finally:
+            _stream_sink.reset(sink_token)
+
+        streamed_tokens = 0
+        try:
+            while True:
+                event, data = await queue.get()
+                if event is _STREAM_END:
+                    break
+                if event == "token":
+                    streamed_tokens += 1
+                yield {"event": event, "data": data}
+
+            result = await task
+            if streamed_tokens == 0 and result.get("response"):
+                yield {"event": "token", "data": result["response"]}
+            yield {"event": "done", "data": result}
+        finally:
+            if not task.done():
+                # Cliente desconectado: no seguir consumiendo el LLM
+                task.cancel()
+                logger.info(
+                    "Interaction stream cancelled by consumer",
+                    extra={"flow_id": flow_id, "session_id": session_id, "tokens_streamed": streamed_tokens}
+                )
+
+    def _emit_stream_event(self, event: str, data: Any) -> None:
+        """Publica un evento al consumidor streaming del flujo actual (no-op si no hay stream)."""
+        sink = _stream_sink.get()
+        if sink is not None:
+            sink.put_nowait((event, data))
+
     def _run_risk_analysis_background(
         self,
         session_id: str,
@@ -617,6 +743,12 @@ class AIGateway:
             self._analyze_risks_async(session_id, input_trace, response_trace, classification, flow_id)
             return
 
+        # Cola durable: el request solo encola; si el backend falla, análisis en proceso
+        if self.risk_queue is not None and self.risk_queue.enqueue(
+            session_id, input_trace, response_trace, classification, flow_id
+        ):
+            return
+
         logger.info(
             "Scheduling risk analysis task",
             extra={
@@ -710,20 +842,11 @@ class AIGateway:
 
         # FIX Cortez34: Add done callback to track task completion and log errors
         # FIX Cortez35: Also remove task from registry when done
-        # FIX Cortez73 (HIGH-002): Use lock to protect concurrent access
-        async def _remove_task_from_registry(task: asyncio.Task) -> None:
-            """Remove task from registry with lock protection."""
-            async with self._background_tasks_lock:
-                self._background_tasks.discard(task)
+        registry = self._background_tasks
 
         def _task_done_callback(task: asyncio.Task) -> None:
             """Callback to log unhandled exceptions and cleanup task registry."""
-            # FIX Cortez73: Schedule async removal to use lock
-            try:
-                asyncio.create_task(_remove_task_from_registry(task))
-            except RuntimeError:
-                # No running event loop, just discard directly (shutdown scenario)
-                self._background_tasks.discard(task)
+            registry.discard(task)
 
             try:
                 exc = task.exception()
@@ -748,21 +871,21 @@ class AIGateway:
         task = loop.create_task(_async_task(), name=f"risk_analysis_{session_id}")
         # FIX Cortez74: Use threading.Lock for sync context protection
         # Also enforce maximum task limit to prevent unbounded memory growth
-        with self._background_tasks_sync_lock:
+        with registry.lock:
             # FIX Cortez74 (HIGH-MEM-001): Enforce max task limit
-            if len(self._background_tasks) >= self._max_background_tasks:
+            if len(registry.tasks) >= registry.max_tasks:
                 # Remove oldest completed tasks
-                completed = [t for t in self._background_tasks if t.done()]
+                completed = [t for t in registry.tasks if t.done()]
                 for t in completed:
-                    self._background_tasks.discard(t)
-                if len(self._background_tasks) >= self._max_background_tasks:
+                    registry.tasks.discard(t)
+                if len(registry.tasks) >= registry.max_tasks:
                     logger.warning(
                         "Background task registry full (%d tasks), "
                         "new task may not be tracked",
-                        self._max_background_tasks,
+                        registry.max_tasks,
                         extra={"session_id": session_id, "flow_id": flow_id}
                     )
-            self._background_tasks.add(task)
+            registry.tasks.add(task)
         task.add_done_callback(_task_done_callback)
 
     def _generate_blocked_response(
@@ -807,7 +930,9 @@ Esto no es una limitación arbitraria: el objetivo es que desarrolles tu capacid
         prompt: str,
         strategy: Dict[str, Any],
         classification: Dict[str, Any],
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        activity_id: Optional[str] = None,
+        student_prompt: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Procesa la interacción en modo T-IA-Cog (Tutor)
@@ -819,6 +944,10 @@ Esto no es una limitación arbitraria: el objetivo es que desarrolles tu capacid
         - Verifica cache antes de generar respuesta
         - Guarda respuesta en cache después de generarla
         - Ahorra costos de LLM (30-50% en prompts repetidos)
+        - Caché semántico opcional: prompts equivalentes (student_prompt, sin el
+          contexto RAG) de la misma actividad / estrategia comparten respuesta,
+          solo para los tipos de respuesta habilitados. Esas respuestas se
+          generan sin historial de sesión, así nunca dependen de otro estudiante
         """
         response_type = strategy.get("response_type", "unknown")
         
@@ -847,6 +976,25 @@ Esto no es una limitación arbitraria: el objetivo es que desarrolles tu capacid
                 mode="TUTOR"
             )
 
+        # Caché semántico: solo tras un miss exacto y para respuestas compartibles
+        semantic_bucket = None
+        semantic_hit = None
+        if (
+            self.semantic_cache is not None
+            and activity_id
+            and self.semantic_cache.is_eligible(response_type)
+        ):
+            semantic_bucket = make_bucket_key(
+                activity_id,
+                response_type,
+                strategy.get("max_help_level"),
+                cache_context["cognitive_state"],
+            )
+            if cached_response is None:
+                semantic_hit = await self.semantic_cache.get(student_prompt or prompt, semantic_bucket)
+                if semantic_hit is not None:
+                    cached_response = semantic_hit.response
+
         if cached_response is not None:
             # Cache HIT - usar respuesta cacheada
             logger.info(
@@ -861,23 +1009,28 @@ Esto no es una limitación arbitraria: el objetivo es que desarrolles tu capacid
             message = cached_response
         else:
             # Cache MISS - generar respuesta nueva
+            # Las respuestas compartibles por el caché semántico se generan sin
+            # el historial de la sesión: de lo contrario una respuesta adaptada a
+            # la conversación de un estudiante se serviría a otro
+            use_history = semantic_bucket is None
+            fallback_token = _llm_fallback_used.set(False)
             if response_type == "socratic_questioning":
-                message = await self._generate_socratic_response(prompt, strategy, session_id, flow_id=flow_id)
+                message = await self._generate_socratic_response(prompt, strategy, session_id, flow_id=flow_id, use_history=use_history)
             elif response_type == "conceptual_explanation":
-                message = await self._generate_conceptual_explanation(prompt, strategy, session_id, flow_id=flow_id)
+                message = await self._generate_conceptual_explanation(prompt, strategy, session_id, flow_id=flow_id, use_history=use_history)
             elif response_type == "guided_hints":
-                message = await self._generate_guided_hints(prompt, strategy, session_id, flow_id=flow_id)
+                message = await self._generate_guided_hints(prompt, strategy, session_id, flow_id=flow_id, use_history=use_history)
             # ============================================================
             # NUEVOS TIPOS DE RESPUESTA (FIX Cortez64)
             # ============================================================
             elif response_type == "empathetic_support":
-                message = await self._generate_empathetic_support(prompt, strategy, session_id, flow_id=flow_id)
+                message = await self._generate_empathetic_support(prompt, strategy, session_id, flow_id=flow_id, use_history=use_history)
             elif response_type == "metacognitive_guidance":
-                message = await self._generate_metacognitive_guidance(prompt, strategy, session_id, flow_id=flow_id)
+                message = await self._generate_metacognitive_guidance(prompt, strategy, session_id, flow_id=flow_id, use_history=use_history)
             elif response_type == "example_based":
-                message = await self._generate_example_based(prompt, strategy, session_id, flow_id=flow_id)
+                message = await self._generate_example_based(prompt, strategy, session_id, flow_id=flow_id, use_history=use_history)
             elif response_type == "clarification_request":
-                message = await self._generate_clarification_request(prompt, strategy, session_id, flow_id=flow_id)
+                message = await self._generate_clarification_request(prompt, strategy, session_id, flow_id=flow_id, use_history=use_history)
             else:
                 # Fallback: usar explicación conceptual para casos no clasificados
                 logger.warning(
@@ -888,26 +1041,42 @@ Esto no es una limitación arbitraria: el objetivo es que desarrolles tu capacid
                         "response_type": response_type
                     }
                 )
-                message = await self._generate_conceptual_explanation(prompt, strategy, session_id, flow_id=flow_id)
+                message = await self._generate_conceptual_explanation(prompt, strategy, session_id, flow_id=flow_id, use_history=use_history)
 
-            # Guardar en cache para futuras solicitudes idénticas
-            if self.cache is not None:
-                self.cache.set(
-                    prompt=prompt,
-                    response=message,
-                    context=cache_context,
-                    mode="TUTOR"
+            is_fallback = _llm_fallback_used.get()
+            _llm_fallback_used.reset(fallback_token)
+
+            # Guardar en cache para futuras solicitudes idénticas. Los fallbacks
+            # no se cachean: se servirían durante todo el TTL aunque el LLM se recupere
+            if is_fallback:
+                logger.info(
+                    "Skipping response caches for fallback reply",
+                    extra={"session_id": session_id, "response_type": response_type, "flow_id": flow_id}
                 )
+            else:
+                if self.cache is not None:
+                    self.cache.set(
+                        prompt=prompt,
+                        response=message,
+                        context=cache_context,
+                        mode="TUTOR"
+                    )
+                if semantic_bucket is not None:
+                    await self.semantic_cache.set(student_prompt or prompt, semantic_bucket, message)
+
+        metadata = {
+            "response_type": response_type,
+            "cognitive_state": classification.get("cognitive_state", "").value if classification.get("cognitive_state") else None,
+            "from_cache": cached_response is not None
+        }
+        if semantic_hit is not None:
+            metadata["semantic_similarity"] = round(semantic_hit.similarity, 4)
 
         return {
             "response": message,  # Changed from "message" to "response"
             "strategy": strategy,
             "mode": "tutor",
-            "metadata": {
-                "response_type": response_type,
-                "cognitive_state": classification.get("cognitive_state", "").value if classification.get("cognitive_state") else None,
-                "from_cache": cached_response is not None
-            }
+            "metadata": metadata
         }
 
     async def _generate_socratic_response(
@@ -915,13 +1084,14 @@ Esto no es una limitación arbitraria: el objetivo es que desarrolles tu capacid
         prompt: str,
         strategy: Dict[str, Any],
         session_id: str = None,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        use_history: bool = True
     ) -> str:
         """✅ Genera respuesta socrática con memoria de conversación"""
         # Recuperar historial de conversación si hay session_id
         conversation_history = []
-        if session_id and self.trace_repo:
-            conversation_history = self._load_conversation_history(session_id)
+        if use_history and session_id and self.trace_repo:
+            conversation_history = await self._load_conversation_history_async(session_id)
         
         # Construir mensajes con historial + system prompt + prompt actual
         messages = [
@@ -982,7 +1152,7 @@ Sé breve y preciso. Máximo 4-5 preguntas por respuesta."""
             # FIX Cortez68 (HIGH-004): Add timeout to prevent indefinite hangs
             # FIX Cortez84 CRIT-GW-001: Use centralized LLM_TIMEOUT_SECONDS from config
             response = await asyncio.wait_for(
-                self.llm.generate(
+                self._llm_generate(
                     messages,
                     max_tokens=300,
                     temperature=0.7,
@@ -1017,8 +1187,38 @@ Sé breve y preciso. Máximo 4-5 preguntas por respuesta."""
             # FIX Cortez36: Use lazy logging formatting
             logger.error("LLM generation failed: %s", e, exc_info=True)
             # Circuit Breaker: Fallback cuando Ollama está inaccesible
+            _llm_fallback_used.set(True)
             return self._get_fallback_socratic_response(prompt, flow_id=flow_id)
 
+    async def _llm_generate(self, messages: List[LLMMessage], **kwargs) -> LLMResponse:
+        """
+        Llama al LLM respetando el modo del flujo actual.
+
+        En modo normal delega en generate(). Si el flujo fue iniciado por
+        process_interaction_stream(), usa generate_stream(), reenvía cada
+        fragmento al consumidor y devuelve el contenido completo como
+        LLMResponse para que cache, trazas y riesgo no cambien.
+        """
+        sink = _stream_sink.get()
+        if sink is None:
+            return await self.llm.generate(messages, **kwargs)
+
+        chunks: List[str] = []
+        async for chunk in self.llm.generate_stream(messages, **kwargs):
+            if not chunk:
+                continue
+            chunks.append(chunk)
+            sink.put_nowait(("token", chunk))
+
+        content = "".join(chunks)
+        completion_tokens = self.llm.count_tokens(content)
+        return LLMResponse(
+            content=content,
+            model=self.llm.get_model_info().get("model", "unknown"),
+            usage={"completion_tokens": completion_tokens, "total_tokens": completion_tokens},
+            metadata={"streamed": True, "chunks": len(chunks)},
+        )
+
     async def _decide_model_for_prompt(self, prompt: str) -> str:
         """
         Decide inteligentemente qué modelo usar (Flash o Pro)
@@ -1035,33 +1235,18 @@ Sé breve y preciso. Máximo 4-5 preguntas por respuesta."""
         Returns:
             "pro" o "flash" (nombre del modelo a usar)
         """
-        # Keywords obvios que requieren Pro (análisis profundo)
-        PRO_KEYWORDS = [
-            'complejidad', 'complexity', 'big o', 'algoritmo complejo',
-            'optimizar algoritmo', 'optimize algorithm', 'refactor',
-            'arquitectura', 'architecture', 'diseño de sistema',
-            'patrones de diseño', 'design patterns', 'solid principles',
-            'analizar código', 'analyze code', 'revisar implementación',
-            'debugging avanzado', 'advanced debug'
-        ]
-        
-        # Keywords obvios que NO requieren Pro (conversación simple)
-        FLASH_KEYWORDS = [
-            '¿qué es', 'what is', 'explícame', 'explain',
-            'hola', 'hello', 'ayuda', 'help',
-            'gracias', 'thanks', 'entiendo', 'understand'
-        ]
-        
-        prompt_lower = prompt.lower()
-        
+        # Keywords obvios de Pro (análisis profundo) y de Flash (conversación
+        # simple): categorías model_pro / model_flash de signal_dictionaries
+        signals = get_signal_matcher().match(prompt)
+
         # 1. Check rápido: ¿Obviamente necesita Pro?
-        if any(keyword in prompt_lower for keyword in PRO_KEYWORDS):
+        if "model_pro" in signals:
             # FIX Cortez36: Use lazy logging formatting
             logger.info("Quick decision: Using Pro (matched keyword)")
             return "pro"
 
         # 2. Check rápido: ¿Obviamente NO necesita Pro?
-        if any(keyword in prompt_lower for keyword in FLASH_KEYWORDS):
+        if "model_flash" in signals:
             # FIX Cortez36: Use lazy logging formatting
             logger.info("Quick decision: Using Flash (matched simple keyword)")
             return "flash"
@@ -1096,13 +1281,14 @@ Sé breve y preciso. Máximo 4-5 preguntas por respuesta."""
         prompt: str,
         strategy: Dict[str, Any],
         session_id: str = None,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        use_history: bool = True
     ) -> str:
         """✅ Genera explicación conceptual con memoria de conversación"""
         # Recuperar historial de conversación si hay session_id
         conversation_history = []
-        if session_id and self.trace_repo:
-            conversation_history = self._load_conversation_history(session_id)
+        if use_history and session_id and self.trace_repo:
+            conversation_history = await self._load_conversation_history_async(session_id)
         
         messages = [
             LLMMessage(
@@ -1158,7 +1344,7 @@ Usa markdown para formato. Sé claro y conciso (máximo 200 palabras)."""
             # FIX Cortez68 (HIGH-004): Add timeout to prevent indefinite hangs
             # FIX Cortez84 CRIT-GW-001: Use centralized LLM_TIMEOUT_SECONDS from config
             response = await asyncio.wait_for(
-                self.llm.generate(
+                self._llm_generate(
                     messages,
                     max_tokens=400,
                     temperature=0.7,
@@ -1192,6 +1378,7 @@ Usa markdown para formato. Sé claro y conciso (máximo 200 palabras)."""
             # FIX Cortez36: Use lazy logging formatting
             logger.error("LLM generation failed: %s", e, exc_info=True)
             # Circuit Breaker: Fallback cuando Ollama está inaccesible
+            _llm_fallback_used.set(True)
             return self._get_fallback_conceptual_explanation(prompt, flow_id=flow_id)
 
     async def _generate_guided_hints(
@@ -1199,13 +1386,14 @@ Usa markdown para formato. Sé claro y conciso (máximo 200 palabras)."""
         prompt: str,
         strategy: Dict[str, Any],
         session_id: str = None,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        use_history: bool = True
     ) -> str:
         """✅ Genera pistas guiadas con memoria de conversación"""
         # Recuperar historial de conversación si hay session_id
         conversation_history = []
-        if session_id and self.trace_repo:
-            conversation_history = self._load_conversation_history(session_id)
+        if use_history and session_id and self.trace_repo:
+            conversation_history = await self._load_conversation_history_async(session_id)
         
         messages = [
             LLMMessage(
@@ -1263,7 +1451,7 @@ Cada pista debe acercar al estudiante a la solución conceptual sin dársela dir
             # FIX Cortez68 (HIGH-004): Add timeout to prevent indefinite hangs
             # FIX Cortez84 CRIT-GW-001: Use centralized LLM_TIMEOUT_SECONDS from config
             response = await asyncio.wait_for(
-                self.llm.generate(
+                self._llm_generate(
                     messages,
                     max_tokens=350,
                     temperature=0.7,
@@ -1297,6 +1485,7 @@ Cada pista debe acercar al estudiante a la solución conceptual sin dársela dir
             # FIX Cortez36: Use lazy logging formatting
             logger.error("LLM generation failed: %s", e, exc_info=True)
             # Circuit Breaker: Fallback cuando Ollama está inaccesible
+            _llm_fallback_used.set(True)
             return self._get_fallback_guided_hints(prompt, flow_id=flow_id)
 
     # ============================================================
@@ -1308,7 +1497,8 @@ Cada pista debe acercar al estudiante a la solución conceptual sin dársela dir
         prompt: str,
         strategy: Dict[str, Any],
         session_id: str = None,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        use_history: bool = True
     ) -> str:
         """
         FIX Cortez64: Genera respuesta empática para estudiantes frustrados.
@@ -1317,8 +1507,8 @@ Cada pista debe acercar al estudiante a la solución conceptual sin dársela dir
         fresco con pistas más directas para desbloquear.
         """
         conversation_history = []
-        if session_id and self.trace_repo:
-            conversation_history = self._load_conversation_history(session_id)
+        if use_history and session_id and self.trace_repo:
+            conversation_history = await self._load_conversation_history_async(session_id)
 
         messages = [
             LLMMessage(
@@ -1369,7 +1559,7 @@ Sé cálido, paciente y constructivo. Máximo 200 palabras."""
             # FIX Cortez68 (HIGH-004): Add timeout to prevent indefinite hangs
             # FIX Cortez84 CRIT-GW-001: Use centralized LLM_TIMEOUT_SECONDS from config
             response = await asyncio.wait_for(
-                self.llm.generate(
+                self._llm_generate(
                     messages,
                     max_tokens=400,
                     temperature=0.8  # Un poco más de variedad para empatía
@@ -1393,6 +1583,7 @@ Sé cálido, paciente y constructivo. Máximo 200 palabras."""
             return content.strip()
         except Exception as e:
             logger.error("LLM generation failed (empathetic_support): %s", e, exc_info=True)
+            _llm_fallback_used.set(True)
             return self._get_fallback_empathetic_support(prompt, flow_id=flow_id)
 
     async def _generate_metacognitive_guidance(
@@ -1400,15 +1591,16 @@ Sé cálido, paciente y constructivo. Máximo 200 palabras."""
         prompt: str,
         strategy: Dict[str, Any],
         session_id: str = None,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        use_history: bool = True
     ) -> str:
         """
         FIX Cortez64: Genera guía metacognitiva para estudiantes que preguntan
         sobre cómo pensar o encarar un problema.
         """
         conversation_history = []
-        if session_id and self.trace_repo:
-            conversation_history = self._load_conversation_history(session_id)
+        if use_history and session_id and self.trace_repo:
+            conversation_history = await self._load_conversation_history_async(session_id)
 
         messages = [
             LLMMessage(
@@ -1458,7 +1650,7 @@ Máximo 250 palabras."""
             # FIX Cortez68 (HIGH-004): Add timeout to prevent indefinite hangs
             # FIX Cortez84 CRIT-GW-001: Use centralized LLM_TIMEOUT_SECONDS from config
             response = await asyncio.wait_for(
-                self.llm.generate(
+                self._llm_generate(
                     messages,
                     max_tokens=450,
                     temperature=0.6  # Más estructurado
@@ -1482,6 +1674,7 @@ Máximo 250 palabras."""
             return content.strip()
         except Exception as e:
             logger.error("LLM generation failed (metacognitive_guidance): %s", e, exc_info=True)
+            _llm_fallback_used.set(True)
             return self._get_fallback_metacognitive_guidance(prompt, flow_id=flow_id)
 
     async def _generate_example_based(
@@ -1489,7 +1682,8 @@ Máximo 250 palabras."""
         prompt: str,
         strategy: Dict[str, Any],
         session_id: str = None,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        use_history: bool = True
     ) -> str:
         """
         FIX Cortez64: Genera respuesta basada en ejemplos análogos.
@@ -1498,8 +1692,8 @@ Máximo 250 palabras."""
         guiando la transferencia del conocimiento.
         """
         conversation_history = []
-        if session_id and self.trace_repo:
-            conversation_history = self._load_conversation_history(session_id)
+        if use_history and session_id and self.trace_repo:
+            conversation_history = await self._load_conversation_history_async(session_id)
 
         messages = [
             LLMMessage(
@@ -1555,7 +1749,7 @@ Máximo 300 palabras."""
             # FIX Cortez68 (HIGH-004): Add timeout to prevent indefinite hangs
             # FIX Cortez84 CRIT-GW-001: Use centralized LLM_TIMEOUT_SECONDS from config
             response = await asyncio.wait_for(
-                self.llm.generate(
+                self._llm_generate(
                     messages,
                     max_tokens=500,
                     temperature=0.7
@@ -1579,6 +1773,7 @@ Máximo 300 palabras."""
             return content.strip()
         except Exception as e:
             logger.error("LLM generation failed (example_based): %s", e, exc_info=True)
+            _llm_fallback_used.set(True)
             return self._get_fallback_example_based(prompt, flow_id=flow_id)
 
     async def _generate_clarification_request(
@@ -1586,15 +1781,16 @@ Máximo 300 palabras."""
         prompt: str,
         strategy: Dict[str, Any],
         session_id: str = None,
-        flow_id: Optional[str] = None
+        flow_id: Optional[str] = None,
+        use_history: bool = True
     ) -> str:
         """
         FIX Cortez64: Solicita clarificación cuando el prompt es ambiguo.
         Actualizado a async con LLM para respuestas más naturales.
         """
         conversation_history = []
-        if session_id and self.trace_repo:
-            conversation_history = self._load_conversation_history(session_id)
+        if use_history and session_id and self.trace_repo:
+            conversation_history = await self._load_conversation_history_async(session_id)
 
         messages = [
             LLMMessage(
@@ -1638,7 +1834,7 @@ Sé amable y específico. Máximo 100 palabras."""
             # FIX Cortez68 (HIGH-004): Add timeout to prevent indefinite hangs
             # FIX Cortez84 CRIT-GW-001: Use centralized LLM_TIMEOUT_SECONDS from config
             response = await asyncio.wait_for(
-                self.llm.generate(
+                self._llm_generate(
                     messages,
                     max_tokens=200,
                     temperature=0.5
@@ -1651,6 +1847,7 @@ Sé amable y específico. Máximo 100 palabras."""
             return content.strip()
         except Exception as e:
             logger.error("LLM generation failed (clarification_request): %s", e, exc_info=True)
+            _llm_fallback_used.set(True)
             return self._get_fallback_clarification_request(prompt, flow_id=flow_id)
 
     # ============================================================
@@ -1800,11 +1997,23 @@ Por favor, reformulá tu pregunta con más detalles."""
             **kwargs
         )
 
-    def _persist_trace(self, trace: CognitiveTrace) -> None:
-        """Persiste una traza en BD (STATELESS)"""
+    async def _persist_trace(self, trace: CognitiveTrace) -> None:
+        """Persiste una traza en BD (STATELESS, repo sync o async, o write-behind)"""
+        # Write-behind: encolar para INSERT en lote; si el buffer está lleno, escritura síncrona
+        if self.trace_writer is not None and self.trace_writer.enqueue(trace):
+            self._append_to_context_cache(trace)
+            metrics = _get_metrics()
+            if metrics:
+                metrics.record_trace_creation(
+                    trace_level=trace.trace_level.value if hasattr(trace.trace_level, 'value') else str(trace.trace_level),
+                    interaction_type=trace.interaction_type.value if hasattr(trace.interaction_type, 'value') else str(trace.interaction_type)
+                )
+            return
+
         if self.trace_repo is not None:
             try:
-                db_trace = self.trace_repo.create(trace)
+                db_trace = await resolve_repo_result(self.trace_repo.create(trace))
+                self._append_to_context_cache(db_trace)
                 logger.debug(
                     "Trace persisted successfully",
                     extra={
@@ -1841,6 +2050,58 @@ Por favor, reformulá tu pregunta con más detalles."""
             )
         # Si no hay repo, no hacer nada (backward compatibility)
 
+    def _append_to_context_cache(self, trace: Any) -> None:
+        """Agrega una traza persistida a la cola cacheada de su sesión (si existe)."""
+        if self.context_cache is None:
+            return
+        try:
+            self.context_cache.append(trace.session_id, trace)
+        except Exception as e:
+            # El caché es una optimización: ante un error se invalida y se relee de BD
+            logger.warning(
+                "Failed to append trace to session context cache: %s",
+                e,
+                extra={"session_id": trace.session_id}
+            )
+            self._invalidate_context_cache(trace.session_id)
+
+    def _invalidate_context_cache(self, session_id: str) -> None:
+        try:
+            self.context_cache.invalidate(session_id)
+        except Exception as e:
+            logger.warning(
+                "Failed to invalidate session context cache: %s",
+                e,
+                extra={"session_id": session_id}
+            )
+
+    def _cached_history_traces(self, session_id: str) -> Optional[List[Any]]:
+        """Cola cacheada de la sesión, o None si no hay caché o es un miss."""
+        if self.context_cache is None:
+            return None
+        try:
+            return self.context_cache.get_tail(session_id)
+        except Exception as e:
+            logger.warning(
+                "Session context cache read failed: %s",
+                e,
+                extra={"session_id": session_id}
+            )
+            return None
+
+    def _store_history_traces(self, session_id: str, traces: List[Any]) -> None:
+        """Read-through: guarda la cola leída de BD (con pendientes del writer)."""
+        if self.context_cache is None:
+            return
+        try:
+            self.context_cache.store_tail(session_id, traces)
+        except Exception as e:
+            logger.warning(
+                "Session context cache write failed: %s",
+                e,
+                extra={"session_id": session_id}
+            )
+
     def _load_conversation_history(
         self,
         session_id: str,
@@ -1849,8 +2110,10 @@ Por favor, reformulá tu pregunta con más detalles."""
         """
         ✅ NUEVO: Carga el historial de conversación de esta sesión como mensajes LLM.
 
-        Recupera las trazas más recientes de la sesión y las convierte al formato de mensajes
-        que espera el LLM provider, manteniendo el contexto de la conversación.
+        Lee solo la cola de la sesión (HISTORY_TAIL_MESSAGES trazas más recientes,
+        desde SessionContextCache o con ORDER BY created_at DESC LIMIT n en miss)
+        y la recorta a HISTORY_TOKEN_BUDGET; los turnos anteriores llegan como
+        resumen (sessions.conversation_summary).
 
         FIX Cortez22 DEFECTO 1.7: Added limit to prevent OOM in long sessions
 
@@ -1859,54 +2122,58 @@ Por favor, reformulá tu pregunta con más detalles."""
             max_messages: Límite máximo de mensajes a retornar (default: 50)
 
         Returns:
-            Lista de LLMMessage con el historial formateado (últimos max_messages)
+            Lista de LLMMessage: [resumen] + últimos mensajes en orden cronológico
         """
         if self.trace_repo is None:
             logger.warning("No trace repository available for conversation history")
             return []
 
         try:
-            # FIX Cortez22 DEFECTO 1.7: Add limit=100 to prevent loading ALL traces
-            # This prevents OOM in sessions with thousands of interactions
-            db_traces = self.trace_repo.get_by_session(session_id, limit=100)
-
-            messages = []
-            for trace in db_traces:
-                # Agregar mensaje del usuario (STUDENT_PROMPT)
-                if trace.interaction_type == InteractionType.STUDENT_PROMPT.value and trace.content:
-                    messages.append(
-                        LLMMessage(
-                            role=LLMRole.USER,
-                            content=trace.content
-                        )
-                    )
+            db_traces = self._cached_history_traces(session_id)
+            if db_traces is None:
+                db_traces = self.history.fetch_tail(self.trace_repo, session_id)
+                db_traces = self._merge_pending_traces(db_traces, session_id)
+                self._store_history_traces(session_id, db_traces)
+            return self._build_history_messages(db_traces, session_id, max_messages)
 
-                # Agregar respuesta del asistente (AI_RESPONSE o TUTOR_INTERVENTION)
-                elif trace.interaction_type in [
-                    InteractionType.AI_RESPONSE.value,
-                    InteractionType.TUTOR_INTERVENTION.value
-                ] and trace.content:
-                    messages.append(
-                        LLMMessage(
-                            role=LLMRole.ASSISTANT,
-                            content=trace.content
-                        )
-                    )
+        except Exception as e:
+            logger.error(
+                f"Error loading conversation history: {e}",
+                exc_info=True,
+                extra={"session_id": session_id}
+            )
+            return []
 
-            # FIX Cortez22 DEFECTO 1.7: Limit to last N messages to prevent LLM token explosion
-            if len(messages) > max_messages:
-                messages = messages[-max_messages:]
-                logger.info(
-                    f"Truncated conversation history to last {max_messages} messages",
-                    extra={"session_id": session_id, "original_count": len(messages) + (len(messages) - max_messages)}
-                )
+    async def _load_conversation_history_async(
+        self,
+        session_id: str,
+        max_messages: int = 50
+    ) -> List[LLMMessage]:
+        """
+        Versión awaitable de _load_conversation_history para el hot path.
 
-            logger.info(
-                f"Loaded conversation history: {len(messages)} messages",
-                extra={"session_id": session_id}
+        Con AsyncTraceRepository la consulta no bloquea el event loop. Además
+        agenda en background la actualización del resumen si hay turnos fuera
+        de la ventana sin resumir.
+        """
+        if self.trace_repo is None:
+            logger.warning("No trace repository available for conversation history")
+            return []
+
+        try:
+            db_traces = self._cached_history_traces(session_id)
+            if db_traces is None:
+                db_traces = await self.history.fetch_tail_async(self.trace_repo, session_id)
+                db_traces = self._merge_pending_traces(db_traces, session_id)
+                self._store_history_traces(session_id, db_traces)
+            messages = self._build_history_messages(db_traces, session_id, max_messages)
+            self.history.schedule_summary_refresh(
+                session_id,
+                db_traces[-self.history.tail_messages:],
+                self._conversation_summaries.get(session_id),
             )
             return messages
-            
+
         except Exception as e:
             logger.error(
                 f"Error loading conversation history: {e}",
@@ -1914,8 +2181,39 @@ Por favor, reformulá tu pregunta con más detalles."""
                 extra={"session_id": session_id}
             )
             return []
-    
-    def _get_student_history(
+
+    def _merge_pending_traces(self, db_traces: List[Any], session_id: str) -> List[Any]:
+        """
+        Read-your-writes con write-behind: agrega al final las trazas de la sesión
+        que el TraceWriter todavía no confirmó en BD.
+        """
+        if self.trace_writer is None:
+            return db_traces
+        pending = self.trace_writer.pending_for_session(session_id)
+        if not pending:
+            return db_traces
+        persisted_ids = {t.id for t in db_traces}
+        return list(db_traces) + [t for t in pending if t.id not in persisted_ids]
+
+    def _build_history_messages(
+        self,
+        db_traces: List[Any],
+        session_id: str,
+        max_messages: int
+    ) -> List[LLMMessage]:
+        """Trazas de la cola (orden cronológico) -> [resumen] + mensajes dentro del presupuesto."""
+        messages = self.history.build_messages(
+            db_traces[-self.history.tail_messages:],
+            summary=self._conversation_summaries.get(session_id),
+            max_messages=max_messages,
+        )
+        logger.info(
+            f"Loaded conversation history: {len(messages)} messages",
+            extra={"session_id": session_id}
+        )
+        return messages
+
+    async def _get_student_history(
         self,
         student_id: str,
         activity_id: Optional[str] = None
@@ -1924,8 +2222,8 @@ Por favor, reformulá tu pregunta con más detalles."""
         if self.trace_repo is None:
             return []  # Backward compatibility
 
-        # ✅ STATELESS: Leer desde BD
-        db_traces = self.trace_repo.get_by_student(student_id, limit=100)
+        # ✅ STATELESS: Leer desde BD (repo sync o async)
+        db_traces = await resolve_repo_result(self.trace_repo.get_by_student(student_id, limit=100))
 
         # Convertir de ORM a Pydantic
         traces = []
@@ -1992,7 +2290,7 @@ Por favor, reformulá tu pregunta con más detalles."""
             **kwargs
         )
 
-    def _persist_risk(
+    async def _persist_risk(
         self,
         session_id: str,
         student_id: str,
@@ -2024,10 +2322,10 @@ Por favor, reformulá tu pregunta con más detalles."""
 
         repo = risk_repo_override or self.risk_repo
 
-        # ✅ STATELESS: Persistir en BD
+        # ✅ STATELESS: Persistir en BD (repo sync o async)
         if repo is not None:
             try:
-                repo.create(risk)
+                await resolve_repo_result(repo.create(risk))
                 # ✅ Structured logging: Risk persisted successfully
                 logger.info(
                     "Risk persisted to database",
@@ -2311,7 +2609,11 @@ Por favor, reformulá tu pregunta con más detalles."""
                     ]
                 )
                 detected_risks.append(risk)
-                self._persist_risk_object(risk, flow_id=flow_id)  # FIX: Persistir riesgo inmediatamente
+                self._persist_risk_object(
+                    risk,
+                    flow_id=flow_id,
+                    risk_repo_override=risk_repo_override,
+                )
 
         # Log summary
         if detected_risks:
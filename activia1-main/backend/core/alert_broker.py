@@ -0,0 +1,266 @@
+"""
+Alert Broker - Fan-out de alertas en tiempo real entre workers
+
+Cada worker uvicorn/gunicorn guarda en memoria solo los WebSockets de los
+docentes conectados a él. Sin un broker, una alerta generada en un worker
+solo llegaba a esos docentes (con 8 workers, ~1 de cada 8).
+
+El broker desacopla publicar de entregar: cualquier worker publica un sobre
+{"target": teacher_id | None, "message": {...}} y todos los workers (también
+el que publica) lo reciben y lo entregan a sus conexiones locales.
+
+- RedisAlertBroker: Redis pub/sub (redis.asyncio). Un task por worker escucha
+  el canal y se resuscribe con backoff si Redis se cae. Si publish() falla,
+  la alerta se entrega al menos a los docentes del worker local.
+- InMemoryAlertBroker: entrega directa en el mismo proceso (un solo worker,
+  desarrollo y tests).
+
+Pub/sub no persiste mensajes: un docente desconectado en ese momento no
+recibe la alerta en vivo (sigue disponible en los endpoints REST de alertas).
+
+ALERT_BROKER=auto usa Redis si hay REDIS_URL y el paquete redis.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional
+
+from .constants import ALERT_BROKER, ALERT_BROKER_CHANNEL
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis.asyncio as redis_asyncio
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+# (envelope) -> None; entrega a las conexiones locales sin bloquear
+DeliverCallback = Callable[[Dict[str, Any]], None]
+
+_RESUBSCRIBE_MAX_DELAY = 30.0
+
+
+async def _aclose(resource: Any) -> None:
+    """aclose() en redis>=5.0.1, close() en versiones anteriores."""
+    try:
+        closer = getattr(resource, "aclose", None) or resource.close
+        await closer()
+    except Exception:
+        pass
+
+
+class AlertBroker:
+    """Publica sobres de alerta y los entrega en cada worker suscripto."""
+
+    name = "base"
+
+    def __init__(self):
+        self._deliver: Optional[DeliverCallback] = None
+        self._running = False
+        self._stats: Dict[str, int] = {"published": 0, "received": 0, "publish_errors": 0}
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        self._deliver = deliver
+        self._running = True
+
+    async def stop(self) -> None:
+        self._running = False
+
+    async def publish(self, envelope: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def _dispatch(self, envelope: Dict[str, Any]) -> None:
+        self._stats["received"] += 1
+        if self._deliver is None:
+            return
+        try:
+            self._deliver(envelope)
+        except Exception as e:
+            logger.error("Alert delivery failed: %s", e, exc_info=True)
+
+    def stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["broker"] = self.name
+        stats["running"] = self._running
+        return stats
+
+
+class InMemoryAlertBroker(AlertBroker):
+    """Un solo proceso: publicar es entregar localmente."""
+
+    name = "memory"
+
+    async def publish(self, envelope: Dict[str, Any]) -> None:
+        self._stats["published"] += 1
+        self._dispatch(envelope)
+
+
+class RedisAlertBroker(AlertBroker):
+    """Redis pub/sub: cada worker entrega a sus conexiones lo publicado por cualquiera."""
+
+    name = "redis"
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        channel: str = ALERT_BROKER_CHANNEL,
+        redis_client: Optional[Any] = None,
+    ):
+        """
+        Args:
+            redis_url: URL de Redis (default: REDIS_URL)
+            channel: Canal pub/sub compartido por los workers
+            redis_client: Cliente redis.asyncio ya creado (decode_responses=True)
+        """
+        super().__init__()
+        self.channel = channel
+        self._redis = redis_client
+        self._redis_url = redis_url or os.getenv("REDIS_URL")
+        self._task: Optional[asyncio.Task] = None
+        self._subscribed = asyncio.Event()
+        # Identifica a este worker en los logs del sobre
+        self.origin = uuid.uuid4().hex[:12]
+
+    async def start(self, deliver: DeliverCallback) -> None:
+        if self._redis is None:
+            if not REDIS_AVAILABLE or not self._redis_url:
+                raise RuntimeError("RedisAlertBroker requires the redis package and REDIS_URL")
+            self._redis = redis_asyncio.from_url(
+                self._redis_url,
+                decode_responses=True,
+                socket_connect_timeout=5,
+            )
+        await super().start(deliver)
+        self._task = asyncio.create_task(self._listen(), name="alert_broker_listener")
+        logger.info("Alert broker started (redis channel=%s, origin=%s)", self.channel, self.origin)
+
+    async def stop(self) -> None:
+        await super().stop()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._task = None
+        await _aclose(self._redis)
+
+    async def wait_subscribed(self, timeout: float = 5.0) -> bool:
+        """True cuando el listener ya está suscripto (útil en el arranque y en tests)."""
+        try:
+            await asyncio.wait_for(self._subscribed.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def publish(self, envelope: Dict[str, Any]) -> None:
+        payload = json.dumps({**envelope, "origin": self.origin}, ensure_ascii=False, default=str)
+        try:
+            await self._redis.publish(self.channel, payload)
+            self._stats["published"] += 1
+        except Exception as e:
+            # Sin Redis: al menos los docentes de este worker reciben la alerta
+            self._stats["publish_errors"] += 1
+            logger.warning("Alert publish failed, delivering locally only: %s", e)
+            self._dispatch(envelope)
+
+    async def _listen(self) -> None:
+        delay = 0.5
+        while self._running:
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                self._subscribed.set()
+                delay = 0.5
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        envelope = json.loads(message["data"])
+                    except (TypeError, ValueError):
+                        logger.warning("Discarding malformed alert envelope")
+                        continue
+                    self._dispatch(envelope)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._subscribed.clear()
+                logger.warning("Alert broker subscription lost, retrying in %.1fs: %s", delay, e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, _RESUBSCRIBE_MAX_DELAY)
+            finally:
+                await _aclose(pubsub)
+
+
+# Instancia global (una por worker), creada en el lifespan
+_alert_broker: Optional[AlertBroker] = None
+_alert_broker_lock = threading.Lock()
+
+
+def create_alert_broker(kind: Optional[str] = None) -> AlertBroker:
+    """Broker según ALERT_BROKER: redis, memory o auto."""
+    kind = (kind or ALERT_BROKER).lower()
+    if kind == "auto":
+        kind = "redis" if (REDIS_AVAILABLE and os.getenv("REDIS_URL")) else "memory"
+    if kind == "redis":
+        return RedisAlertBroker()
+    if kind == "memory":
+        return InMemoryAlertBroker()
+    raise ValueError(f"Unknown ALERT_BROKER: {kind}")
+
+
+def get_alert_broker() -> Optional[AlertBroker]:
+    """
+    Broker global si está corriendo, None en caso contrario.
+
+    Sin broker, las alertas se entregan solo a las conexiones del worker local.
+    """
+    broker = _alert_broker
+    if broker is not None and broker.is_running:
+        return broker
+    return None
+
+
+async def start_alert_broker(deliver: DeliverCallback) -> AlertBroker:
+    """Crea y arranca el broker global (lifespan startup)."""
+    global _alert_broker
+
+    with _alert_broker_lock:
+        if _alert_broker is None:
+            _alert_broker = create_alert_broker()
+        broker = _alert_broker
+
+    if not broker.is_running:
+        await broker.start(deliver)
+    return broker
+
+
+async def stop_alert_broker() -> None:
+    """Detiene el broker global (lifespan shutdown)."""
+    global _alert_broker
+
+    with _alert_broker_lock:
+        broker = _alert_broker
+        _alert_broker = None
+
+    if broker is not None:
+        await broker.stop()
+
+
+__all__ = [
+    "AlertBroker",
+    "InMemoryAlertBroker",
+    "RedisAlertBroker",
+    "create_alert_broker",
+    "get_alert_broker",
+    "start_alert_broker",
+    "stop_alert_broker",
+]
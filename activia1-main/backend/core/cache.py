@@ -152,6 +152,21 @@ class LRUCache:
 
             self.cache[key] = value
 
+    def delete(self, key: str) -> bool:
+        """Elimina una entrada. Thread-safe. Retorna True si existía."""
+        with self._lock:
+            return self.cache.pop(key, None) is not None
+
+    def __contains__(self, key: str) -> bool:
+        """Pertenencia sin afectar el orden LRU ni las estadísticas."""
+        with self._lock:
+            return key in self.cache
+
+    def keys(self) -> list:
+        """Snapshot de las claves actuales. Thread-safe."""
+        with self._lock:
+            return list(self.cache.keys())
+
     def clear(self) -> None:
         """Limpia todo el cache. Thread-safe."""
         with self._lock:
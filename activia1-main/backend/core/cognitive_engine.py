@@ -6,6 +6,7 @@ from typing import Optional, Dict, Any, List, Tuple
 from enum import Enum
 
 from ..models.trace import CognitiveTrace, InteractionType, CognitiveState
+from .signal_matcher import get_signal_matcher
 
 
 class AgentMode(str, Enum):
@@ -64,247 +65,34 @@ class CognitiveReasoningEngine:
         Returns:
             Diccionario con clasificación y metadata
         """
-        prompt_lower = prompt.lower()
-
-        # ============================================================
-        # 1. DETECCIÓN DE DELEGACIÓN TOTAL (prioridad máxima)
-        # ============================================================
-        delegation_signals = [
-            # Señales originales
-            "dame el código completo",
-            "hacé todo",
-            "resolvelo por mí",
-            "código entero",
-            "implementa todo",
-            # Nuevas señales - solicitud directa de código
-            "hazme el programa",
-            "escribí el código",
-            "escribime el código",
-            "pasame la solución",
-            "pasame el código",
-            "dame la solución",
-            "necesito el código funcionando",
-            "código que funcione",
-            "dame algo que funcione",
-            # Nuevas señales - delegación explícita
-            "terminá esto por mí",
-            "hacelo vos",
-            "hacelo por mí",
-            "no quiero pensar",
-            "solo dame la respuesta",
-            "dame la respuesta",
-            "copiá y pegá",
-            "resolvé esto",
-            "completá el ejercicio",
-            "completá el código",
-            # Nuevas señales - urgencia/presión
-            "necesito que me lo hagas",
-            "solo necesito el código",
-            "dame todo el código",
-            "quiero el código completo",
-        ]
-        is_total_delegation = any(signal in prompt_lower for signal in delegation_signals)
-
-        # ============================================================
-        # 2. DETECCIÓN DE FRUSTRACIÓN / ESTANCAMIENTO
-        # ============================================================
-        frustration_signals = [
-            "no me sale",
-            "me rindo",
-            "esto es imposible",
-            "llevo horas",
-            "ya intenté todo",
-            "estoy perdido",
-            "no avanzo",
-            "me trabé",
-            "estoy atascado",
-            "no puedo más",
-            "es muy difícil",
-            "no sirvo para esto",
-            "esto no funciona",
-            "no funciona nada",
-            "me frustro",
-            "estoy frustrado",
-            "no sé qué más hacer",
-            "ya probé de todo",
-            "sigo sin entender",
-            "cada vez peor",
-        ]
-        is_frustrated = any(signal in prompt_lower for signal in frustration_signals)
-
-        # ============================================================
-        # 3. DETECCIÓN DE SOLICITUD DE VALIDACIÓN / VERIFICACIÓN
-        # ============================================================
-        validation_signals = [
-            # Señales originales
-            "funciona",
-            "correcto",
-            # Nuevas señales - verificación de código
-            "está bien esto",
-            "es correcto",
-            "así está bien",
-            "está bien así",
-            "revisá mi código",
-            "chequeá esto",
-            "mirá si funciona",
-            "validá mi solución",
-            "tiene errores",
-            "qué le falta",
-            "qué está mal",
-            "por qué no funciona",
-            "por qué falla",
-            "dónde está el error",
-            "encontrá el error",
-            "revisame esto",
-            "está correcto esto",
-            "lo hice bien",
-            "me quedó bien",
-        ]
-        requests_validation = any(signal in prompt_lower for signal in validation_signals)
-
-        # ============================================================
-        # 4. DETECCIÓN DE CONFUSIÓN CONCEPTUAL
-        # ============================================================
-        confusion_signals = [
-            # Señales originales
-            "no entiendo",
-            "no sé",
-            # Nuevas señales - confusión
-            "no me queda claro",
-            "me confunde",
-            "cuál es la diferencia",
-            "es lo mismo que",
-            "para qué sirve",
-            "cuándo uso",
-            "en qué casos",
-            "me perdí",
-            "no sigo",
-            "no capto",
-            "no comprendo",
-            "qué significa",
-            "qué quiere decir",
-            "a qué se refiere",
-            "cómo es eso",
-            "no veo la relación",
-            "qué tiene que ver",
-        ]
-        is_confused = any(signal in prompt_lower for signal in confusion_signals)
-
-        # ============================================================
-        # 5. DETECCIÓN DE SOLICITUD DE EJEMPLOS
-        # ============================================================
-        example_signals = [
-            "dame un ejemplo",
-            "mostrame un ejemplo",
-            "mostrame cómo",
-            "un caso práctico",
-            "cómo sería",
-            "podés ejemplificar",
-            "algo similar",
-            "ejemplo de",
-            "un ejemplo",
-            "ejemplos de",
-            "por ejemplo",
-            "cómo se vería",
-            "cómo quedaría",
-            "a ver un ejemplo",
-            "necesito un ejemplo",
-        ]
-        requests_example = any(signal in prompt_lower for signal in example_signals)
-
-        # ============================================================
-        # 6. DETECCIÓN DE METACOGNICIÓN / REFLEXIÓN
-        # ============================================================
-        metacognition_signals = [
-            "qué debería pensar",
-            "por dónde empiezo",
-            "qué pasos sigo",
-            "cómo organizo",
-            "qué me falta entender",
-            "qué estoy haciendo mal",
-            "cómo debería encarar",
-            "cuál es el enfoque",
-            "cómo pienso esto",
-            "qué estrategia uso",
-            "cómo lo encaro",
-            "por dónde arranco",
-            "cuál es el primer paso",
-            "cómo me organizo",
-            "qué orden sigo",
-        ]
-        is_metacognitive = any(signal in prompt_lower for signal in metacognition_signals)
-
-        # ============================================================
-        # 7. DETECCIÓN DE TIPO DE SOLICITUD GENERAL
-        # ============================================================
-        question_signals = [
-            "cómo", "por qué", "qué", "cuál", "explica", "ayuda",
-            "dónde", "cuándo", "quién", "podrías", "podés", "puedo"
-        ]
-        is_question = any(signal in prompt_lower for signal in question_signals)
-
-        # ============================================================
-        # 8. DETECCIÓN DE SOLICITUD DE EXPLICACIÓN
-        # ============================================================
-        explanation_signals = [
-            "explica", "no entiendo", "ayuda a entender",
-            "por qué", "qué es", "qué son",
-            "explicame", "explicá", "contame",
-            "decime qué es", "qué significa",
-            "cómo funciona", "para qué es",
-        ]
-        requests_explanation = any(signal in prompt_lower for signal in explanation_signals)
-
-        # ============================================================
-        # 9. DETECCIÓN DE OPTIMIZACIÓN / MEJORA
-        # ============================================================
-        optimization_signals = [
-            "cómo mejoro",
-            "es eficiente",
-            "hay forma más rápida",
-            "se puede optimizar",
-            "cómo lo hago más rápido",
-            "es óptimo",
-            "mejor manera",
-            "hay otra forma",
-            "alternativa más",
-            "se puede mejorar",
-        ]
-        requests_optimization = any(signal in prompt_lower for signal in optimization_signals)
-
-        # ============================================================
-        # 10. DETECCIÓN DE COMPARACIÓN
-        # ============================================================
-        comparison_signals = [
-            "qué es mejor",
-            "cuál conviene",
-            "diferencia entre",
-            "comparar",
-            "versus",
-            "o es mejor",
-            "qué elegir",
-            "cuál usar",
-            "cuál es más",
-        ]
-        requests_comparison = any(signal in prompt_lower for signal in comparison_signals)
+        # Todas las categorías de señales en una sola pasada sobre el prompt
+        # (diccionarios en core/signal_dictionaries.py)
+        signals = get_signal_matcher().match(prompt)
+
+        is_total_delegation = "delegation" in signals
+        is_frustrated = "frustration" in signals
+        requests_validation = "validation" in signals
+        is_confused = "confusion" in signals
+        requests_example = "example" in signals
+        is_metacognitive = "metacognition" in signals
+        is_question = "question" in signals
+        requests_explanation = "explanation" in signals
+        requests_optimization = "optimization" in signals
+        requests_comparison = "comparison" in signals
 
         # ============================================================
         # DETERMINAR ESTADO COGNITIVO (orden de prioridad)
         # ============================================================
         if is_frustrated:
             cognitive_state = CognitiveState.ATASCADO
-        elif is_confused or "no entiendo" in prompt_lower or "no sé" in prompt_lower:
+        elif is_confused:
             cognitive_state = CognitiveState.EXPLORACION
-        elif is_metacognitive or "por dónde empiezo" in prompt_lower:
+        elif is_metacognitive or "implementation_planning" in signals:
             cognitive_state = CognitiveState.PLANIFICACION
-        elif "cómo implemento" in prompt_lower or "cómo hago" in prompt_lower:
-            cognitive_state = CognitiveState.PLANIFICACION
-        elif requests_validation or "error" in prompt_lower or "bug" in prompt_lower or "falla" in prompt_lower:
+        elif requests_validation or "debugging" in signals:
             cognitive_state = CognitiveState.DEPURACION
         elif requests_optimization:
             cognitive_state = CognitiveState.VALIDACION
-        elif "funciona" in prompt_lower or "correcto" in prompt_lower:
-            cognitive_state = CognitiveState.VALIDACION
         else:
             cognitive_state = CognitiveState.IMPLEMENTACION
 
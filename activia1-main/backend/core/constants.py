@@ -169,6 +169,101 @@ RAG_DEFAULT_MIN_CONFIDENCE = float(os.getenv("RAG_MIN_CONFIDENCE", "0.5"))
 RAG_CONTENT_TRUNCATE_LENGTH = 1000
 """Longitud máxima de contenido por documento en contexto RAG (caracteres)"""
 
+RAG_INDEX_SYNC_INTERVAL_SECONDS = float(os.getenv("RAG_INDEX_SYNC_SECONDS", "30"))
+"""Cada cuánto el índice vectorial en memoria incorpora cambios de otros workers"""
+
+RAG_ANN_INDEX_TYPE = os.getenv("RAG_ANN_INDEX", "hnsw").lower()
+"""Índice ANN de pgvector creado por la migración: 'hnsw' o 'ivfflat'"""
+
+RAG_HNSW_M = int(os.getenv("RAG_HNSW_M", "16"))
+"""Vecinos por nodo del grafo HNSW (pgvector y grafo en memoria)"""
+
+RAG_HNSW_EF_CONSTRUCTION = int(os.getenv("RAG_HNSW_EF_CONSTRUCTION", "64"))
+"""Candidatos evaluados al insertar en HNSW (mayor = mejor recall, build más lento)"""
+
+RAG_HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "64"))
+"""Candidatos evaluados por consulta HNSW (hnsw.ef_search; nunca menor que el límite)"""
+
+RAG_IVFFLAT_PROBES = int(os.getenv("RAG_IVFFLAT_PROBES", "10"))
+"""Listas IVFFlat inspeccionadas por consulta (ivfflat.probes)"""
+
+RAG_ANN_MIN_DOCUMENTS = int(os.getenv("RAG_ANN_MIN_DOCUMENTS", "50000"))
+"""Documentos a partir de los cuales el índice en memoria usa HNSW en vez de búsqueda exacta"""
+
+EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "64"))
+"""Textos máximos por request a /api/embed de Ollama"""
+
+EMBEDDING_BATCH_MAX_CHARS = int(os.getenv("EMBEDDING_BATCH_MAX_CHARS", "32000"))
+"""Caracteres máximos por request de embeddings (textos largos -> lotes más chicos)"""
+
+EMBEDDING_BATCH_CONCURRENCY = int(os.getenv("EMBEDDING_BATCH_CONCURRENCY", "2"))
+"""Requests de embeddings en vuelo simultáneamente contra Ollama"""
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+"""Caché de embeddings en dos niveles (LRU en proceso + Redis)"""
+
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000"))
+"""Embeddings en el LRU en proceso (384 float32 = 1.5 KB cada uno)"""
+
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+"""Expiración de los embeddings en Redis (el embedding de un texto no cambia)"""
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+"""Caché semántico de respuestas del tutor (opt-in; comparte respuestas entre sesiones)"""
+
+SEMANTIC_CACHE_SIMILARITY = float(os.getenv("SEMANTIC_CACHE_SIMILARITY", "0.92"))
+"""Similitud coseno mínima entre prompts normalizados para servir una respuesta cacheada"""
+
+SEMANTIC_CACHE_RESPONSE_TYPES = frozenset(
+    t.strip() for t in os.getenv(
+        "SEMANTIC_CACHE_RESPONSE_TYPES", "conceptual_explanation,example_based"
+    ).split(",") if t.strip()
+)
+"""Tipos de respuesta que pueden compartirse (el resto mantiene el caché exacto por sesión)"""
+
+SEMANTIC_CACHE_TTL_SECONDS = int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "86400"))
+"""Vida de una respuesta en el caché semántico"""
+
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "500"))
+"""Respuestas por bucket (actividad / tipo de respuesta / nivel de ayuda)"""
+
+SUBMISSION_CACHE_ENABLED = os.getenv("SUBMISSION_CACHE_ENABLED", "true").lower() == "true"
+"""Memoización de sandbox_result + evaluación para código idéntico del mismo ejercicio"""
+
+SUBMISSION_CACHE_MAX_ENTRIES = int(os.getenv("SUBMISSION_CACHE_MAX_ENTRIES", "2000"))
+"""Entregas en el LRU en proceso"""
+
+SUBMISSION_CACHE_TTL_SECONDS = int(os.getenv("SUBMISSION_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+"""Expiración de los resultados de entregas en Redis"""
+
+SIGNAL_DICTIONARIES_PATH = os.getenv("SIGNAL_DICTIONARIES_PATH", "")
+"""JSON opcional con categorías de señales que reemplazan/agregan a las de signal_dictionaries.py"""
+
+SIGNAL_DICTIONARIES_RELOAD_SECONDS = float(os.getenv("SIGNAL_DICTIONARIES_RELOAD_SECONDS", "30"))
+"""Cada cuánto se revisa el mtime de SIGNAL_DICTIONARIES_PATH (<= 0 desactiva la recarga)"""
+
+# =============================================================================
+# Conversation History Configuration
+# =============================================================================
+
+HISTORY_TAIL_MESSAGES = int(os.getenv("HISTORY_TAIL_MESSAGES", "20"))
+"""Mensajes más recientes cargados de BD por turno (ventana de cola)"""
+
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+"""Presupuesto de tokens para historial + resumen en el prompt"""
+
+HISTORY_SUMMARY_ENABLED = os.getenv("HISTORY_SUMMARY_ENABLED", "true").lower() == "true"
+"""Resumen incremental (LLM) de los turnos fuera de la ventana"""
+
+HISTORY_SUMMARY_MIN_NEW_MESSAGES = int(os.getenv("HISTORY_SUMMARY_MIN_NEW_MESSAGES", "10"))
+"""Mensajes nuevos fuera de la ventana necesarios para regenerar el resumen"""
+
+HISTORY_SUMMARY_MAX_SOURCE_MESSAGES = 200
+"""Máximo de mensajes viejos resumidos por actualización (el resto en la siguiente)"""
+
+HISTORY_SUMMARY_MAX_TOKENS = 400
+"""Longitud máxima del resumen generado"""
+
 # =============================================================================
 # WebSocket Configuration (Cortez92)
 # =============================================================================
@@ -182,6 +277,21 @@ WEBSOCKET_AUTH_CODE_MISSING_TOKEN = 4001
 WEBSOCKET_AUTH_CODE_INVALID_TOKEN = 4002
 """Código de cierre WebSocket para token inválido"""
 
+WEBSOCKET_CLOSE_CODE_SLOW_CONSUMER = 1013
+"""Código de cierre (Try Again Later) para clientes que no consumen sus mensajes"""
+
+WEBSOCKET_SEND_QUEUE_SIZE = int(os.getenv("WEBSOCKET_SEND_QUEUE_SIZE", "100"))
+"""Mensajes pendientes por conexión; con la cola llena el cliente se desconecta"""
+
+WEBSOCKET_SEND_TIMEOUT_SECONDS = float(os.getenv("WEBSOCKET_SEND_TIMEOUT_SECONDS", "5"))
+"""Tiempo máximo de un send; si se excede el cliente se considera lento y se desconecta"""
+
+ALERT_BROKER = os.getenv("ALERT_BROKER", "auto").lower()
+"""Fan-out de alertas entre workers: redis (pub/sub), memory (un solo proceso) o auto"""
+
+ALERT_BROKER_CHANNEL = os.getenv("ALERT_BROKER_CHANNEL", "alerts:fanout")
+"""Canal pub/sub de Redis por el que los workers comparten las alertas"""
+
 # =============================================================================
 # Session Configuration
 # =============================================================================
@@ -193,6 +303,69 @@ SESSION_INACTIVE_TIMEOUT_SECONDS = 3600
 SESSION_MAX_DURATION_SECONDS = 10800
 """Duración máxima de una sesión (3 horas)"""
 
+# Context cache (cola conversacional por sesión en Redis)
+SESSION_CONTEXT_CACHE_ENABLED = os.getenv("SESSION_CONTEXT_CACHE_ENABLED", "auto").lower()
+"""Caché de la cola del historial por sesión: auto (solo con Redis conectado), true (también en memoria) o false"""
+
+SESSION_CONTEXT_CACHE_TTL_SECONDS = int(
+    os.getenv("SESSION_CONTEXT_CACHE_TTL_SECONDS", str(SESSION_INACTIVE_TIMEOUT_SECONDS))
+)
+"""TTL del contexto cacheado; se renueva en cada turno (expira por inactividad)"""
+
+# =============================================================================
+# Research Export Configuration
+# =============================================================================
+
+EXPORT_STREAM_BATCH_SIZE = int(os.getenv("EXPORT_STREAM_BATCH_SIZE", "1000"))
+"""Filas por lote del cursor del lado del servidor (yield_per) en la exportación streaming"""
+
+EXPORT_SPOOL_MAX_MEMORY_BYTES = int(os.getenv("EXPORT_SPOOL_MAX_MEMORY_BYTES", str(8 * 1024 * 1024)))
+"""Bytes que el archivo exportado mantiene en memoria antes de pasar a disco"""
+
+EXPORT_ANONYMIZE_BATCH_SIZE = int(os.getenv("EXPORT_ANONYMIZE_BATCH_SIZE", "500"))
+"""Registros por lote de anonimización (hash de IDs únicos y ruido por columna)"""
+
+EXPORT_ANONYMIZE_WORKERS = int(os.getenv("EXPORT_ANONYMIZE_WORKERS", "1"))
+"""Procesos que anonimizan lotes en exportaciones grandes (1 = en el proceso del request)"""
+
+# Jobs de exportación en background (POST /export/jobs)
+EXPORT_JOBS_ENABLED = os.getenv("EXPORT_JOBS_ENABLED", "true").lower() == "true"
+"""Arranca los workers que procesan los jobs de exportación"""
+
+EXPORT_JOB_WORKERS = int(os.getenv("EXPORT_JOB_WORKERS", "1"))
+"""Threads por proceso que procesan jobs de exportación"""
+
+EXPORT_JOB_POLL_INTERVAL_SECONDS = float(os.getenv("EXPORT_JOB_POLL_INTERVAL_SECONDS", "5"))
+"""Espera entre consultas cuando no hay jobs pendientes"""
+
+EXPORT_JOB_LEASE_SECONDS = int(os.getenv("EXPORT_JOB_LEASE_SECONDS", "300"))
+"""Alquiler de un job; si el worker no lo renueva (caída, deploy) otro lo retoma"""
+
+EXPORT_JOB_MAX_ATTEMPTS = int(os.getenv("EXPORT_JOB_MAX_ATTEMPTS", "3"))
+"""Intentos antes de marcar el job como failed"""
+
+EXPORT_JOB_CHUNK_BYTES = int(os.getenv("EXPORT_JOB_CHUNK_BYTES", str(8 * 1024 * 1024)))
+"""Tamaño de cada parte del artefacto en el almacenamiento de archivos"""
+
+EXPORT_JOB_WATERMARK_LAG_SECONDS = int(os.getenv("EXPORT_JOB_WATERMARK_LAG_SECONDS", "60"))
+"""El watermark se fija en ahora - lag: filas de transacciones aún abiertas quedan para el job siguiente"""
+
+# =============================================================================
+# Git Analytics Configuration
+# =============================================================================
+
+GIT_ANALYTICS_MAX_CONCURRENCY = int(os.getenv("GIT_ANALYTICS_MAX_CONCURRENCY", "4"))
+"""Procesos git simultáneos del dashboard de git analytics (entre todos los repos)"""
+
+GIT_ANALYTICS_TIMEOUT_SECONDS = float(os.getenv("GIT_ANALYTICS_TIMEOUT_SECONDS", "30"))
+"""Timeout de cada comando git del dashboard"""
+
+GIT_ANALYTICS_HEAD_CHECK_SECONDS = float(os.getenv("GIT_ANALYTICS_HEAD_CHECK_SECONDS", "10"))
+"""Intervalo mínimo entre consultas de HEAD de un repo (los refrescos más seguidos se sirven del cache)"""
+
+GIT_ANALYTICS_CACHE_MAX_REPOS = int(os.getenv("GIT_ANALYTICS_CACHE_MAX_REPOS", "100"))
+"""Repositorios con estadísticas de commits cacheadas (se descarta el menos usado)"""
+
 # =============================================================================
 # Governance Configuration
 # =============================================================================
@@ -0,0 +1,396 @@
+"""
+Conversation History - Ventana de cola + resumen incremental del historial
+
+El historial que se envía al LLM se arma con:
+1. Cola: los HISTORY_TAIL_MESSAGES mensajes conversacionales más recientes,
+   leídos con ORDER BY created_at DESC LIMIT n (idx_session_created_desc), así
+   el costo por turno no crece con la longitud de la sesión.
+2. Resumen: los turnos que quedaron fuera de la cola se condensan con el LLM en
+   un resumen que se guarda en sessions.conversation_summary y se antepone como
+   mensaje SYSTEM. Se regenera en background (no bloquea el turno) cuando hay al
+   menos HISTORY_SUMMARY_MIN_NEW_MESSAGES mensajes nuevos fuera de la ventana.
+3. Presupuesto: resumen + cola se recortan a HISTORY_TOKEN_BUDGET tokens
+   (LLMProvider.count_tokens), descartando primero los mensajes más viejos.
+
+Los pocos turnos que salen de la cola antes de alcanzar el mínimo para un nuevo
+resumen quedan temporalmente fuera del contexto; se incorporan en la siguiente
+actualización del resumen.
+"""
+import asyncio
+import logging
+from contextlib import AbstractContextManager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from ..llm.base import LLMMessage, LLMRole
+from ..models.trace import InteractionType
+from .constants import (
+    HISTORY_SUMMARY_ENABLED,
+    HISTORY_SUMMARY_MAX_SOURCE_MESSAGES,
+    HISTORY_SUMMARY_MAX_TOKENS,
+    HISTORY_SUMMARY_MIN_NEW_MESSAGES,
+    HISTORY_TAIL_MESSAGES,
+    HISTORY_TOKEN_BUDGET,
+    LLM_TIMEOUT_SECONDS,
+    utc_now,
+)
+from .gateway.protocols import resolve_repo_result
+
+logger = logging.getLogger(__name__)
+
+# Tipos de traza que forman parte del diálogo estudiante <-> IA
+CONVERSATIONAL_INTERACTION_TYPES = (
+    InteractionType.STUDENT_PROMPT.value,
+    InteractionType.AI_RESPONSE.value,
+    InteractionType.TUTOR_INTERVENTION.value,
+)
+
+SUMMARY_PREFIX = "Resumen de la conversación previa con el estudiante:"
+
+_SUMMARY_INSTRUCTIONS = (
+    "Sos un asistente que resume conversaciones pedagógicas de programación. "
+    "Actualizá el resumen existente incorporando los nuevos turnos. Conservá: "
+    "el problema que trabaja el estudiante, decisiones y enfoques que propuso, "
+    "conceptos explicados, errores o dudas recurrentes y el estado actual del "
+    "trabajo. No incluyas código completo. Respondé solo con el resumen, en "
+    "español y en no más de 10 oraciones."
+)
+
+# Registro de tareas de resumen en curso (evita GC y resúmenes duplicados)
+_summary_tasks: set = set()
+_sessions_in_flight: set = set()
+
+
+def _as_naive_utc(value: Any) -> Optional[datetime]:
+    """Normaliza datetimes/ISO strings a datetime naive UTC (como los guarda la BD)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _interaction_type_value(trace: Any) -> Any:
+    interaction_type = getattr(trace, "interaction_type", None)
+    return getattr(interaction_type, "value", interaction_type)
+
+
+class ConversationHistoryLoader:
+    """
+    Arma el historial LLM de una sesión: cola reciente + resumen + presupuesto de tokens.
+
+    Sin estado por sesión: el resumen vive en BD (sessions.conversation_summary),
+    por lo que funciona igual con múltiples workers.
+    """
+
+    def __init__(
+        self,
+        llm_provider: Optional[Any] = None,
+        tail_messages: int = HISTORY_TAIL_MESSAGES,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        summary_enabled: bool = HISTORY_SUMMARY_ENABLED,
+        summary_min_new_messages: int = HISTORY_SUMMARY_MIN_NEW_MESSAGES,
+        session_factory: Optional[Callable[[], AbstractContextManager]] = None,
+    ):
+        """
+        Args:
+            llm_provider: Proveedor para count_tokens y para generar el resumen
+            tail_messages: Mensajes más recientes leídos de BD por turno
+            token_budget: Tokens máximos para resumen + historial
+            summary_enabled: Habilita el resumen incremental
+            summary_min_new_messages: Mensajes fuera de la ventana para regenerar el resumen
+            session_factory: Context manager de sesión sync para la tarea de resumen
+                (default: get_db_session)
+        """
+        self.llm = llm_provider
+        self.tail_messages = max(1, tail_messages)
+        self.token_budget = max(1, token_budget)
+        self.summary_enabled = summary_enabled
+        self.summary_min_new_messages = max(1, summary_min_new_messages)
+        self._session_factory = session_factory
+
+    # ------------------------------------------------------------------
+    # Lectura de la cola
+    # ------------------------------------------------------------------
+
+    def fetch_tail(self, trace_repo: Any, session_id: str) -> List[Any]:
+        """Trazas conversacionales más recientes de la sesión, en orden cronológico."""
+        return trace_repo.get_recent_by_session(
+            session_id,
+            limit=self.tail_messages,
+            interaction_types=CONVERSATIONAL_INTERACTION_TYPES,
+        )
+
+    async def fetch_tail_async(self, trace_repo: Any, session_id: str) -> List[Any]:
+        """fetch_tail para repos sync o async (AsyncTraceRepository)."""
+        return await resolve_repo_result(self.fetch_tail(trace_repo, session_id))
+
+    # ------------------------------------------------------------------
+    # Conversión y presupuesto
+    # ------------------------------------------------------------------
+
+    def count_tokens(self, text: str) -> int:
+        """count_tokens del proveedor, con estimación len/4 si no está disponible."""
+        if self.llm is not None:
+            try:
+                tokens = self.llm.count_tokens(text)
+                if isinstance(tokens, int) and not isinstance(tokens, bool):
+                    return tokens
+            except Exception:
+                pass
+        return max(1, len(text) // 4)
+
+    def traces_to_messages(self, traces: Sequence[Any]) -> List[LLMMessage]:
+        """Convierte trazas (orden cronológico) a mensajes LLM user/assistant."""
+        messages = []
+        for trace in traces:
+            content = getattr(trace, "content", None)
+            if not content:
+                continue
+            interaction_type = _interaction_type_value(trace)
+            if interaction_type == InteractionType.STUDENT_PROMPT.value:
+                messages.append(LLMMessage(role=LLMRole.USER, content=content))
+            elif interaction_type in (
+                InteractionType.AI_RESPONSE.value,
+                InteractionType.TUTOR_INTERVENTION.value,
+            ):
+                messages.append(LLMMessage(role=LLMRole.ASSISTANT, content=content))
+        return messages
+
+    def summary_message(self, summary: Optional[Dict[str, Any]]) -> Optional[LLMMessage]:
+        """Mensaje SYSTEM con el resumen de los turnos fuera de la ventana."""
+        if not self.summary_enabled or not isinstance(summary, dict):
+            return None
+        text = summary.get("text")
+        if not text:
+            return None
+        return LLMMessage(role=LLMRole.SYSTEM, content=f"{SUMMARY_PREFIX}\n{text}")
+
+    def build_messages(
+        self,
+        traces: Sequence[Any],
+        summary: Optional[Dict[str, Any]] = None,
+        max_messages: Optional[int] = None,
+    ) -> List[LLMMessage]:
+        """
+        Historial final: [resumen] + mensajes más recientes dentro del presupuesto.
+
+        Args:
+            traces: Trazas de la cola en orden cronológico
+            summary: sessions.conversation_summary (opcional)
+            max_messages: Tope adicional de mensajes (además del presupuesto)
+
+        Returns:
+            Lista de LLMMessage en orden cronológico
+        """
+        messages = self.traces_to_messages(traces)
+        if max_messages is not None and len(messages) > max_messages:
+            messages = messages[-max_messages:]
+
+        remaining = self.token_budget
+        summary_msg = self.summary_message(summary)
+        if summary_msg is not None:
+            summary_tokens = self.count_tokens(summary_msg.content)
+            if summary_tokens < remaining:
+                remaining -= summary_tokens
+            else:
+                summary_msg = None
+
+        kept: List[LLMMessage] = []
+        for message in reversed(messages):
+            tokens = self.count_tokens(message.content)
+            if tokens <= remaining:
+                kept.append(message)
+                remaining -= tokens
+                continue
+            if not kept:
+                # El turno más reciente nunca se descarta: se trunca al presupuesto
+                max_chars = max(1, remaining * 4)
+                kept.append(LLMMessage(role=message.role, content=message.content[-max_chars:]))
+            break
+        kept.reverse()
+
+        if len(kept) < len(messages):
+            logger.info(
+                "Conversation history trimmed to token budget",
+                extra={
+                    "kept_messages": len(kept),
+                    "tail_messages": len(messages),
+                    "token_budget": self.token_budget,
+                },
+            )
+
+        return ([summary_msg] if summary_msg is not None else []) + kept
+
+    # ------------------------------------------------------------------
+    # Resumen incremental
+    # ------------------------------------------------------------------
+
+    def needs_summary(self, tail: Sequence[Any], summary: Optional[Dict[str, Any]]) -> bool:
+        """
+        True si pueden existir turnos fuera de la ventana aún no resumidos.
+
+        Solo cuando la cola está completa (puede haber mensajes más viejos) y el
+        resumen no cubre hasta el inicio de la ventana.
+        """
+        if not self.summary_enabled or self.llm is None:
+            return False
+        if len(tail) < self.tail_messages:
+            return False
+        boundary = _as_naive_utc(getattr(tail[0], "created_at", None))
+        if boundary is None:
+            return False
+        # window_start: inicio de la cola cuando se generó el resumen
+        summary = summary or {}
+        covered = _as_naive_utc(summary.get("window_start") or summary.get("covered_until"))
+        return covered is None or covered < boundary
+
+    def schedule_summary_refresh(
+        self,
+        session_id: str,
+        tail: Sequence[Any],
+        summary: Optional[Dict[str, Any]],
+    ) -> Optional[asyncio.Task]:
+        """
+        Lanza en background la actualización del resumen si corresponde.
+
+        Una sola tarea por sesión a la vez; la tarea no bloquea el turno actual.
+        """
+        if not self.needs_summary(tail, summary) or session_id in _sessions_in_flight:
+            return None
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+
+        boundary = _as_naive_utc(tail[0].created_at)
+        _sessions_in_flight.add(session_id)
+        task = loop.create_task(self.refresh_summary(session_id, boundary, summary))
+        _summary_tasks.add(task)
+
+        def _done(t: asyncio.Task) -> None:
+            _summary_tasks.discard(t)
+            _sessions_in_flight.discard(session_id)
+
+        task.add_done_callback(_done)
+        return task
+
+    async def refresh_summary(
+        self,
+        session_id: str,
+        before: datetime,
+        summary: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Resume los turnos en (covered_until, before) sobre el resumen previo y lo guarda.
+
+        Returns:
+            Nuevo resumen persistido, o None si no hubo suficientes turnos nuevos o falló
+        """
+        after = _as_naive_utc((summary or {}).get("covered_until"))
+        try:
+            traces = await asyncio.to_thread(self._load_summary_source, session_id, after, before)
+            messages = self.traces_to_messages(traces)
+            if len(messages) < self.summary_min_new_messages:
+                return None
+
+            text = await self._generate_summary((summary or {}).get("text"), messages)
+            if not text:
+                return None
+
+            last = traces[-1]
+            new_summary = {
+                "text": text,
+                "covered_until": _as_naive_utc(last.created_at).isoformat(),
+                "covered_trace_id": last.id,
+                "window_start": before.isoformat(),
+                "message_count": int((summary or {}).get("message_count", 0)) + len(messages),
+                "updated_at": utc_now().isoformat(),
+            }
+            await asyncio.to_thread(self._store_summary, session_id, new_summary)
+            logger.info(
+                "Conversation summary updated",
+                extra={
+                    "session_id": session_id,
+                    "summarized_messages": len(messages),
+                    "message_count": new_summary["message_count"],
+                },
+            )
+            return new_summary
+        except Exception as e:
+            logger.warning(
+                "Conversation summary refresh failed: %s",
+                str(e),
+                extra={"session_id": session_id},
+                exc_info=True,
+            )
+            return None
+
+    async def _generate_summary(self, previous: Optional[str], messages: List[LLMMessage]) -> str:
+        transcript = "\n".join(
+            f"{'Estudiante' if m.role == LLMRole.USER else 'Tutor'}: {m.content}"
+            for m in messages
+        )
+        user_content = (
+            f"Resumen existente:\n{previous or '(sin resumen previo)'}\n\n"
+            f"Nuevos turnos:\n{transcript}"
+        )
+        response = await asyncio.wait_for(
+            self.llm.generate(
+                [
+                    LLMMessage(role=LLMRole.SYSTEM, content=_SUMMARY_INSTRUCTIONS),
+                    LLMMessage(role=LLMRole.USER, content=user_content),
+                ],
+                temperature=0.2,
+                max_tokens=HISTORY_SUMMARY_MAX_TOKENS,
+            ),
+            timeout=LLM_TIMEOUT_SECONDS,
+        )
+        content = getattr(response, "content", None)
+        return content.strip() if isinstance(content, str) else ""
+
+    def _get_session_factory(self) -> Callable[[], AbstractContextManager]:
+        if self._session_factory is not None:
+            return self._session_factory
+        from ..database.config import get_db_session
+        return get_db_session
+
+    def _load_summary_source(
+        self,
+        session_id: str,
+        after: Optional[datetime],
+        before: datetime,
+    ) -> List[Any]:
+        from ..database.repositories import TraceRepository
+
+        with self._get_session_factory()() as db:
+            traces = TraceRepository(db).get_by_session_window(
+                session_id,
+                after=after,
+                before=before,
+                interaction_types=CONVERSATIONAL_INTERACTION_TYPES,
+                limit=HISTORY_SUMMARY_MAX_SOURCE_MESSAGES,
+            )
+            # Desacoplar de la sesión antes de cerrarla
+            db.expunge_all()
+            return traces
+
+    def _store_summary(self, session_id: str, summary: Dict[str, Any]) -> None:
+        from ..database.repositories import SessionRepository
+
+        with self._get_session_factory()() as db:
+            SessionRepository(db).update_conversation_summary(session_id, summary)
+
+
+async def wait_for_summary_tasks(timeout: float = 5.0) -> None:
+    """Espera las tareas de resumen en curso (shutdown y tests)."""
+    pending = list(_summary_tasks)
+    if pending:
+        await asyncio.wait(pending, timeout=timeout)
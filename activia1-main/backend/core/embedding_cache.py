@@ -0,0 +1,280 @@
+"""
+Embedding Cache - Caché de embeddings en dos niveles con codificación binaria
+
+OllamaEmbeddingProvider guardaba cada vector como lista Python de 384 floats:
+~10 KB de JSON por entrada y un decode lento en cada hit. Las consultas RAG se
+repiten mucho dentro de una misma clase, así que conviene que el embedding de
+una consulta repetida sea prácticamente gratis:
+
+- Nivel 1: LRU en proceso de arrays float32 (EMBEDDING_CACHE_MAX_ENTRIES).
+- Nivel 2: Redis con los bytes float32 little-endian crudos (1.5 KB por
+  vector de 384), compartido entre workers, con TTL EMBEDDING_CACHE_TTL_SECONDS.
+- get_many/set_many: un MGET y un pipeline de SET EX por lote (un round-trip
+  cada uno); los hits de Redis se promueven al LRU.
+- Hit rate por nivel exportado a Prometheus (cache_type embedding_memory /
+  embedding_redis) vía api/monitoring/metrics.py.
+
+Interfaz compatible con el `cache` de OllamaEmbeddingProvider (get/set y
+get_many/set_many). Sin REDIS_URL (o sin el paquete redis) funciona solo con
+el nivel en memoria; los errores de Redis degradan a miss, nunca a excepción.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from .constants import (
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_MAX_ENTRIES,
+    EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    from redis.exceptions import RedisError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    RedisError = OSError
+
+# float32 little-endian, independiente de la arquitectura del worker
+_WIRE_DTYPE = np.dtype("<f4")
+
+# Lazy import to avoid circular dependency with api.monitoring
+_metrics_module = None
+_metrics_lock = threading.Lock()
+
+
+def _get_metrics():
+    """Lazy load metrics module to avoid circular imports."""
+    global _metrics_module
+    if _metrics_module is None:
+        with _metrics_lock:
+            if _metrics_module is None:
+                try:
+                    from ..api.monitoring import metrics as m
+                    _metrics_module = m
+                except ImportError:
+                    _metrics_module = False
+    return _metrics_module if _metrics_module else None
+
+
+def encode_embedding(embedding: Sequence[float]) -> bytes:
+    """Vector -> bytes float32 little-endian."""
+    return np.asarray(embedding, dtype=_WIRE_DTYPE).tobytes()
+
+
+def decode_embedding(raw: bytes) -> Optional[np.ndarray]:
+    """bytes float32 little-endian -> array (None si el payload es inválido)."""
+    if not raw or len(raw) % _WIRE_DTYPE.itemsize:
+        return None
+    return np.frombuffer(raw, dtype=_WIRE_DTYPE).astype(np.float32)
+
+
+class EmbeddingCache:
+    """Caché de embeddings: LRU de float32 en proceso delante de Redis binario."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = EMBEDDING_CACHE_TTL_SECONDS,
+        prefix: str = "emb_cache:",
+        redis_client: Optional[Any] = None,
+    ):
+        """
+        Args:
+            redis_url: URL de Redis (default: REDIS_URL; sin URL solo nivel en memoria)
+            max_entries: Capacidad del LRU en proceso
+            ttl_seconds: Expiración de las entradas en Redis
+            prefix: Prefijo de las claves en Redis
+            redis_client: Cliente Redis ya creado (decode_responses=False)
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._local: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "memory_misses": 0, "redis_hits": 0, "redis_misses": 0}
+        self._redis_error_logged = False
+
+        self._redis = redis_client
+        if self._redis is None and REDIS_AVAILABLE:
+            redis_url = redis_url or os.getenv("REDIS_URL")
+            if redis_url:
+                try:
+                    # Sin decode_responses: los valores son bytes crudos
+                    self._redis = redis.from_url(
+                        redis_url,
+                        decode_responses=False,
+                        socket_connect_timeout=5,
+                        socket_timeout=5,
+                    )
+                except Exception as e:
+                    logger.warning("Embedding cache: Redis unavailable, memory only: %s", e)
+                    self._redis = None
+
+        logger.info(
+            "EmbeddingCache initialized (memory entries: %d, redis: %s)",
+            self.max_entries, "yes" if self._redis is not None else "no"
+        )
+
+    # ------------------------------------------------------------------
+    # Nivel en memoria
+    # ------------------------------------------------------------------
+
+    def _local_get(self, key: str) -> Optional[np.ndarray]:
+        vector = self._local.get(key)
+        if vector is not None:
+            self._local.move_to_end(key)
+        return vector
+
+    def _local_put(self, key: str, vector: np.ndarray) -> None:
+        self._local[key] = vector
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def _record(self, tier: str, hits: int, misses: int) -> None:
+        if not hits and not misses:
+            return
+        with self._lock:
+            self._stats[f"{tier}_hits"] += hits
+            self._stats[f"{tier}_misses"] += misses
+            total_hits = self._stats[f"{tier}_hits"]
+            total_lookups = total_hits + self._stats[f"{tier}_misses"]
+        metrics = _get_metrics()
+        if metrics:
+            metrics.record_cache_lookups(
+                f"embedding_{tier}", hits=hits, misses=misses,
+                total_hits=total_hits, total_lookups=total_lookups,
+            )
+
+    def _log_redis_error(self, operation: str, error: Exception) -> None:
+        if not self._redis_error_logged:
+            logger.error("Embedding cache Redis error during %s: %s (treating as miss)", operation, error)
+            self._redis_error_logged = True
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def get_many(self, keys: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Busca un lote de claves: LRU primero, un MGET para el resto.
+
+        Returns:
+            Un embedding (o None) por clave, en el mismo orden
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(keys)
+        missing: List[int] = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                vector = self._local_get(key)
+                if vector is None:
+                    missing.append(i)
+                else:
+                    results[i] = vector
+        self._record("memory", len(keys) - len(missing), len(missing))
+
+        if missing and self._redis is not None:
+            try:
+                raw_values = self._redis.mget([self.prefix + keys[i] for i in missing])
+            except (RedisError, OSError) as e:
+                self._log_redis_error("MGET", e)
+                raw_values = [None] * len(missing)
+
+            found = 0
+            with self._lock:
+                for i, raw in zip(missing, raw_values):
+                    vector = decode_embedding(raw) if raw is not None else None
+                    if vector is not None:
+                        results[i] = vector
+                        self._local_put(keys[i], vector)
+                        found += 1
+            self._record("redis", found, len(missing) - found)
+
+        return [vector.tolist() if vector is not None else None for vector in results]
+
+    def set_many(self, embeddings: Mapping[str, Sequence[float]]) -> None:
+        """Guarda un lote en el LRU y en Redis (pipeline de SET EX, un round-trip)."""
+        if not embeddings:
+            return
+        vectors = {key: np.asarray(value, dtype=np.float32) for key, value in embeddings.items()}
+        with self._lock:
+            for key, vector in vectors.items():
+                self._local_put(key, vector)
+
+        if self._redis is not None:
+            try:
+                # MSET no admite TTL: SET EX por clave en un pipeline sin transacción
+                pipe = self._redis.pipeline(transaction=False)
+                for key, vector in vectors.items():
+                    pipe.set(self.prefix + key, encode_embedding(vector), ex=self.ttl_seconds)
+                pipe.execute()
+            except (RedisError, OSError) as e:
+                self._log_redis_error("SET", e)
+
+    def get(self, key: str) -> Optional[List[float]]:
+        return self.get_many([key])[0]
+
+    def set(self, key: str, embedding: Sequence[float]) -> None:
+        self.set_many({key: embedding})
+
+    def clear(self) -> None:
+        """Vacía el nivel en memoria (Redis expira por TTL)."""
+        with self._lock:
+            self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._local)
+        memory_total = stats["memory_hits"] + stats["memory_misses"]
+        redis_total = stats["redis_hits"] + stats["redis_misses"]
+        stats["memory_hit_rate"] = stats["memory_hits"] / memory_total if memory_total else 0.0
+        stats["redis_hit_rate"] = stats["redis_hits"] / redis_total if redis_total else 0.0
+        stats["redis_enabled"] = self._redis is not None
+        return stats
+
+
+# Instancia global (singleton) con thread-safety
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Obtiene el caché de embeddings (singleton).
+
+    Returns:
+        EmbeddingCache, o None si EMBEDDING_CACHE_ENABLED=false
+    """
+    global _embedding_cache
+
+    if not EMBEDDING_CACHE_ENABLED:
+        return None
+
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+
+    return _embedding_cache
+
+
+__all__ = [
+    "EmbeddingCache",
+    "get_embedding_cache",
+    "encode_embedding",
+    "decode_embedding",
+]
@@ -11,24 +11,67 @@ Caracteristicas:
 - Costo: $0 (self-hosted via Ollama)
 - Dimensiones: 384 (nomic-embed-text)
 - Latencia: 10-50ms por documento
-- Cache integrado via Redis para consultas repetidas
+- Cache integrado para consultas repetidas (EmbeddingCache: LRU float32 en
+  proceso + Redis con bytes float32)
+- Batch real via /api/embed (multiples textos por request), con lotes
+  adaptados al largo de los textos, deduplicacion y consulta de cache del
+  lote completo en un solo round-trip
 - Fallback a embeddings mock para tests
 """
 import hashlib
 import logging
 import os
 import asyncio
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Iterator, Sequence
 from abc import ABC, abstractmethod
 
 import httpx
 
+from .constants import (
+    EMBEDDING_BATCH_CONCURRENCY,
+    EMBEDDING_BATCH_MAX_CHARS,
+    EMBEDDING_BATCH_MAX_SIZE,
+)
+from .embedding_cache import get_embedding_cache
+
 logger = logging.getLogger(__name__)
 
 # Dimension de embeddings (nomic-embed-text = 384)
 EMBEDDING_DIMENSIONS = 384
 
 
+@dataclass
+class EmbeddingBatchResult:
+    """
+    Resultado de vectorizar un lote de textos.
+
+    Attributes:
+        embeddings: Un embedding por texto de entrada, en el mismo orden
+            (None para los textos que fallaron)
+        failures: Indice del texto -> descripcion del error
+    """
+    embeddings: List[Optional[List[float]]]
+    failures: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failures
+
+
+class EmbeddingBatchError(Exception):
+    """Uno o mas textos de un lote no pudieron vectorizarse."""
+
+    def __init__(self, result: EmbeddingBatchResult):
+        self.result = result
+        self.failures = result.failures
+        first_index = min(result.failures)
+        super().__init__(
+            f"{len(result.failures)} of {len(result.embeddings)} texts failed to embed "
+            f"(first: #{first_index}: {result.failures[first_index]})"
+        )
+
+
 class EmbeddingProvider(ABC):
     """Interfaz abstracta para proveedores de embeddings."""
 
@@ -38,10 +81,37 @@ class EmbeddingProvider(ABC):
         pass
 
     @abstractmethod
-    async def embed_batch(self, texts: List[str], batch_size: int = 10) -> List[List[float]]:
-        """Genera embeddings para multiples textos."""
+    async def embed_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Genera embeddings para multiples textos.
+
+        Raises:
+            EmbeddingBatchError: Si algun texto no pudo vectorizarse
+        """
         pass
 
+    async def embed_many(
+        self,
+        texts: Sequence[str],
+        batch_size: Optional[int] = None
+    ) -> EmbeddingBatchResult:
+        """
+        Vectoriza un lote reportando las fallas por texto, sin abortar el lote.
+
+        Implementacion por defecto: embed() concurrente por texto.
+        """
+        results = await asyncio.gather(
+            *[self.embed(text) for text in texts],
+            return_exceptions=True
+        )
+        batch = EmbeddingBatchResult(embeddings=[None] * len(results))
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                batch.failures[i] = str(result) or type(result).__name__
+            else:
+                batch.embeddings[i] = result
+        return batch
+
     @abstractmethod
     async def close(self) -> None:
         """Cierra conexiones y libera recursos."""
@@ -71,7 +141,10 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         base_url: Optional[str] = None,
         model: str = "nomic-embed-text",
         timeout: float = 30.0,
-        cache: Optional[Any] = None  # LLMResponseCache or similar
+        cache: Optional[Any] = None,  # LLMResponseCache or similar
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_batch_chars: int = EMBEDDING_BATCH_MAX_CHARS,
+        max_concurrency: int = EMBEDDING_BATCH_CONCURRENCY
     ):
         """
         Inicializa el proveedor de embeddings.
@@ -80,7 +153,11 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
             base_url: URL de Ollama (default: env OLLAMA_EMBEDDINGS_URL o localhost)
             model: Modelo de embeddings
             timeout: Timeout en segundos
-            cache: Cache opcional para embeddings
+            cache: Cache opcional para embeddings (get/set; get_many/set_many
+                si soporta operaciones por lote)
+            max_batch_size: Maximo de textos por request a /api/embed
+            max_batch_chars: Maximo de caracteres por request
+            max_concurrency: Requests de lote simultaneos
         """
         self.base_url = base_url or os.getenv(
             "OLLAMA_EMBEDDINGS_URL",
@@ -89,6 +166,10 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         self.model = model
         self.timeout = timeout
         self.cache = cache
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_chars = max(1, max_batch_chars)
+        self.max_concurrency = max(1, max_concurrency)
+        self._batch_endpoint_available = True
         self._client: Optional[httpx.AsyncClient] = None
 
         logger.info(
@@ -145,6 +226,99 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
         except Exception as e:
             logger.debug(f"Cache set failed: {e}")
 
+    async def _get_many_from_cache(self, texts: Sequence[str]) -> Dict[str, List[float]]:
+        """
+        Busca en cache todos los textos del lote.
+
+        Si el cache expone get_many(keys) (MGET) se resuelve en un solo
+        round-trip; si no, se consultan las claves concurrentemente.
+        """
+        if not self.cache or not texts:
+            return {}
+
+        if hasattr(self.cache, "get_many"):
+            try:
+                values = self.cache.get_many([self._cache_key(text) for text in texts])
+                if asyncio.iscoroutine(values):
+                    values = await values
+            except Exception as e:
+                logger.debug(f"Cache get_many failed: {e}")
+                return {}
+        else:
+            values = await asyncio.gather(*[self._get_from_cache(text) for text in texts])
+
+        return {text: value for text, value in zip(texts, values) if value is not None}
+
+    async def _set_many_to_cache(self, embeddings: Dict[str, List[float]]) -> None:
+        """Guarda en cache los embeddings recien calculados (set_many si existe)."""
+        if not self.cache or not embeddings:
+            return
+
+        if hasattr(self.cache, "set_many"):
+            try:
+                result = self.cache.set_many(
+                    {self._cache_key(text): embedding for text, embedding in embeddings.items()}
+                )
+                if asyncio.iscoroutine(result):
+                    await result
+            except Exception as e:
+                logger.debug(f"Cache set_many failed: {e}")
+        else:
+            await asyncio.gather(*[
+                self._set_to_cache(text, embedding) for text, embedding in embeddings.items()
+            ])
+
+    async def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Vectoriza textos en un unico request a Ollama.
+
+        Usa /api/embed (input multiple, Ollama >= 0.3.4). Si el servidor no
+        lo tiene (404) se recuerda y se usa /api/embeddings por texto.
+
+        Raises:
+            httpx.HTTPError: Si falla la conexion o Ollama responde con error
+            ValueError: Si la respuesta es invalida
+        """
+        client = await self._get_client()
+
+        if self._batch_endpoint_available:
+            response = await client.post(
+                "/api/embed",
+                json={"model": self.model, "input": texts}
+            )
+            if response.status_code == 404 and "model" not in response.text.lower():
+                logger.warning(
+                    "Ollama /api/embed not available, falling back to /api/embeddings "
+                    "(one request per text). Upgrade Ollama for batch embeddings."
+                )
+                self._batch_endpoint_available = False
+            else:
+                response.raise_for_status()
+                data = response.json()
+                embeddings = data.get("embeddings")
+                if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+                    raise ValueError(
+                        f"Expected {len(texts)} embeddings, got "
+                        f"{len(embeddings) if isinstance(embeddings, list) else 'none'}"
+                    )
+                if not all(embeddings):
+                    raise ValueError("Empty embedding in /api/embed response")
+                return embeddings
+
+        embeddings = []
+        for text in texts:
+            response = await client.post(
+                "/api/embeddings",
+                json={"model": self.model, "prompt": text}
+            )
+            response.raise_for_status()
+            data = response.json()
+            embedding = data.get("embedding")
+            if not embedding:
+                raise ValueError(f"No embedding in response: {data}")
+            embeddings.append(embedding)
+        return embeddings
+
     async def embed(self, text: str) -> List[float]:
         """
         Genera el embedding vectorial para un texto.
@@ -171,20 +345,8 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
             logger.debug(f"Embedding cache HIT for text length {len(text)}")
             return cached
 
-        # Generar embedding via Ollama
-        client = await self._get_client()
-
         try:
-            response = await client.post(
-                "/api/embeddings",
-                json={"model": self.model, "prompt": text}
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            embedding = data.get("embedding")
-            if not embedding:
-                raise ValueError(f"No embedding in response: {data}")
+            embedding = (await self._request_embeddings([text]))[0]
 
             # Validar dimensiones
             if len(embedding) != EMBEDDING_DIMENSIONS:
@@ -209,49 +371,145 @@ class OllamaEmbeddingProvider(EmbeddingProvider):
             logger.error(f"Ollama connection error: {e}")
             raise
 
-    async def embed_batch(
+    def _plan_batches(self, texts: Sequence[str], batch_size: int) -> Iterator[List[str]]:
+        """
+        Agrupa textos en lotes acotados por cantidad y por caracteres.
+
+        Los textos se ordenan por largo para que cada lote tenga textos de
+        tamano parecido (menos padding en el modelo); los textos largos
+        quedan en lotes mas chicos por el limite de caracteres.
+        """
+        batch: List[str] = []
+        chars = 0
+        for text in sorted(texts, key=len):
+            if batch and (len(batch) >= batch_size or chars + len(text) > self.max_batch_chars):
+                yield batch
+                batch, chars = [], 0
+            batch.append(text)
+            chars += len(text)
+        if batch:
+            yield batch
+
+    async def _embed_chunk(
         self,
         texts: List[str],
-        batch_size: int = 10
-    ) -> List[List[float]]:
+        computed: Dict[str, List[float]],
+        errors: Dict[str, str],
+    ) -> None:
+        """
+        Vectoriza un lote; si Ollama lo rechaza, lo divide a la mitad para
+        aislar los textos problematicos en lugar de perder el lote completo.
+        """
+        try:
+            embeddings = await self._request_embeddings(texts)
+        except (httpx.HTTPStatusError, httpx.TimeoutException, ValueError) as e:
+            if len(texts) > 1:
+                middle = len(texts) // 2
+                await self._embed_chunk(texts[:middle], computed, errors)
+                await self._embed_chunk(texts[middle:], computed, errors)
+                return
+            errors[texts[0]] = self._describe_error(e)
+            return
+        except httpx.RequestError as e:
+            # Ollama inaccesible: reintentar por partes solo multiplicaria fallas
+            for text in texts:
+                errors[text] = self._describe_error(e)
+            return
+
+        for text, embedding in zip(texts, embeddings):
+            computed[text] = embedding
+
+    @staticmethod
+    def _describe_error(error: Exception) -> str:
+        if isinstance(error, httpx.HTTPStatusError):
+            return f"HTTP {error.response.status_code}: {error.response.text[:200]}"
+        return f"{type(error).__name__}: {error}"
+
+    async def embed_many(
+        self,
+        texts: Sequence[str],
+        batch_size: Optional[int] = None
+    ) -> EmbeddingBatchResult:
         """
-        Genera embeddings para multiples textos en lotes.
+        Vectoriza un lote de textos usando requests multi-input.
+
+        1. Deduplica textos identicos (se vectorizan una sola vez)
+        2. Consulta el cache del lote completo en un round-trip
+        3. Agrupa los faltantes en lotes por cantidad y largo
+           (EMBEDDING_BATCH_MAX_SIZE, EMBEDDING_BATCH_MAX_CHARS) y los envia
+           a /api/embed con concurrencia acotada
+        4. Guarda los nuevos embeddings en cache
 
-        Para evitar sobrecargar Ollama, procesa los textos en
-        lotes de tamano configurable con concurrencia limitada.
+        Los textos que fallan se reportan en `failures` (nunca como vectores
+        en cero, que contaminarian la busqueda por similitud).
 
         Args:
-            texts: Lista de textos a vectorizar
-            batch_size: Cantidad de textos a procesar simultaneamente
+            texts: Textos a vectorizar
+            batch_size: Maximo de textos por request (default EMBEDDING_BATCH_MAX_SIZE)
 
         Returns:
-            Lista de embeddings en el mismo orden que los textos de entrada
+            EmbeddingBatchResult con un embedding (o None) por texto
         """
-        embeddings = []
+        batch_size = max(1, batch_size or self.max_batch_size)
+        positions: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            positions.setdefault(text, []).append(i)
+
+        unique = list(positions)
+        cached = await self._get_many_from_cache(unique)
+        pending = [text for text in unique if text not in cached]
+
+        computed: Dict[str, List[float]] = {}
+        errors: Dict[str, str] = {}
+        if pending:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def run(batch: List[str]) -> None:
+                async with semaphore:
+                    await self._embed_chunk(batch, computed, errors)
+
+            await asyncio.gather(*[run(batch) for batch in self._plan_batches(pending, batch_size)])
+            await self._set_many_to_cache(computed)
+
+        result = EmbeddingBatchResult(embeddings=[None] * len(texts))
+        for text, indices in positions.items():
+            embedding = cached.get(text) or computed.get(text)
+            for i in indices:
+                if embedding is not None:
+                    result.embeddings[i] = embedding
+                else:
+                    result.failures[i] = errors.get(text, "No embedding returned")
 
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
+        logger.info(
+            "Embedded batch: %d texts (%d unique, %d cached, %d computed, %d failed)",
+            len(texts), len(unique), len(cached), len(computed), len(errors),
+            extra={"model": self.model}
+        )
+        return result
 
-            # Procesar batch concurrentemente
-            batch_embeddings = await asyncio.gather(
-                *[self.embed(text) for text in batch],
-                return_exceptions=True
-            )
+    async def embed_batch(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Genera embeddings para multiples textos en lotes (ver embed_many).
 
-            # Manejar errores individuales
-            for j, result in enumerate(batch_embeddings):
-                if isinstance(result, Exception):
-                    logger.error(f"Failed to embed text {i + j}: {result}")
-                    # Usar embedding vacio como fallback
-                    embeddings.append([0.0] * EMBEDDING_DIMENSIONS)
-                else:
-                    embeddings.append(result)
+        Args:
+            texts: Lista de textos a vectorizar
+            batch_size: Maximo de textos por request a Ollama
 
-            # Breve pausa entre batches para no saturar
-            if i + batch_size < len(texts):
-                await asyncio.sleep(0.1)
+        Returns:
+            Lista de embeddings en el mismo orden que los textos de entrada
 
-        return embeddings
+        Raises:
+            EmbeddingBatchError: Si algun texto no pudo vectorizarse; el
+                resultado parcial queda en error.result
+        """
+        result = await self.embed_many(texts, batch_size)
+        if not result.ok:
+            raise EmbeddingBatchError(result)
+        return result.embeddings
 
     async def close(self) -> None:
         """Cierra el cliente HTTP liberando recursos."""
@@ -300,7 +558,7 @@ class MockEmbeddingProvider(EmbeddingProvider):
     async def embed_batch(
         self,
         texts: List[str],
-        batch_size: int = 10
+        batch_size: Optional[int] = None
     ) -> List[List[float]]:
         """Genera embeddings para multiples textos."""
         return [await self.embed(text) for text in texts]
@@ -340,6 +598,9 @@ def get_embedding_provider(
             provider_type = "mock"
 
     if provider_type == "ollama":
+        # Cache de embeddings en dos niveles (None si EMBEDDING_CACHE_ENABLED=false)
+        if "cache" not in kwargs:
+            kwargs["cache"] = get_embedding_cache()
         return OllamaEmbeddingProvider(**kwargs)
     elif provider_type == "mock":
         return MockEmbeddingProvider(**kwargs)
@@ -349,6 +610,8 @@ def get_embedding_provider(
 
 __all__ = [
     "EmbeddingProvider",
+    "EmbeddingBatchResult",
+    "EmbeddingBatchError",
     "OllamaEmbeddingProvider",
     "MockEmbeddingProvider",
     "get_embedding_provider",
@@ -11,6 +11,8 @@ This module provides modular components for the AI Gateway:
 - response_generators.py: LLM response generation (7 types + fallbacks)
 - trace_coordinator.py: N4 traceability management
 - risk_coordinator.py: Risk analysis and persistence
+- pipeline.py: Process-wide components shared by per-request gateways
+  (imported directly from .pipeline: depends on ai_gateway's own imports)
 
 The main AIGateway class remains in ai_gateway.py but imports
 these extracted components for cleaner separation of concerns.
@@ -23,6 +25,7 @@ from .protocols import (
     RiskRepositoryProtocol,
     EvaluationRepositoryProtocol,
     SequenceRepositoryProtocol,
+    resolve_repo_result,
 )
 
 # Fallback responses
@@ -62,6 +65,7 @@ __all__ = [
     "RiskRepositoryProtocol",
     "EvaluationRepositoryProtocol",
     "SequenceRepositoryProtocol",
+    "resolve_repo_result",
     # Fallback responses (original)
     "get_fallback_socratic_response",
     "get_fallback_conceptual_explanation",
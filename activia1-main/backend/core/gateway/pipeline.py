@@ -0,0 +1,115 @@
+"""
+Gateway Pipeline - componentes del AIGateway compartidos por todo el proceso
+
+get_ai_gateway arma un AIGateway por request porque los repositorios llevan la
+sesión de BD del request. Hasta ahora cada construcción creaba también un
+CognitiveReasoningEngine, un GobernanzaAgent (recompilando sus regex de PII),
+un ConversationHistoryLoader y el registro de tareas en background, aunque
+ninguno guarda estado del request.
+
+GatewayPipeline agrupa esas piezas. Se construye una vez (lifespan o primer
+uso) y el AIGateway de cada request solo agrega repositorios, trace_writer y
+el estado propio del turno. Todos sus componentes son de solo lectura
+después de construidos; el único estado mutable es el registro de tareas,
+protegido con su propio lock.
+"""
+import threading
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Set
+
+from ...agents.governance import GobernanzaAgent
+from ...llm import LLMProvider, LLMProviderFactory
+from ..cache import LLMResponseCache
+from ..cognitive_engine import CognitiveReasoningEngine
+from ..conversation_history import ConversationHistoryLoader
+from ..semantic_cache import SemanticResponseCache
+
+if TYPE_CHECKING:
+    from ...agents.knowledge_rag import KnowledgeRAGAgent
+    from ..session_context_cache import SessionContextCache
+
+# FIX Cortez74 (HIGH-MEM-001): Maximum background tasks to prevent unbounded growth
+MAX_BACKGROUND_TASKS = 1000
+
+
+class BackgroundTaskRegistry:
+    """
+    Referencias fuertes a las tareas en background (evita que el GC las
+    cancele), compartidas entre los gateways de todos los requests.
+    """
+
+    def __init__(self, max_tasks: int = MAX_BACKGROUND_TASKS):
+        self.max_tasks = max_tasks
+        self.tasks: Set[Any] = set()
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def discard(self, task: Any) -> None:
+        with self.lock:
+            self.tasks.discard(task)
+
+
+@dataclass(frozen=True)
+class GatewayPipeline:
+    """Componentes sin estado por request, construidos una sola vez."""
+
+    llm: LLMProvider
+    cognitive_engine: CognitiveReasoningEngine
+    governance_agent: GobernanzaAgent
+    history: ConversationHistoryLoader
+    config: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    cache: Optional[LLMResponseCache] = None
+    semantic_cache: Optional[SemanticResponseCache] = None
+    context_cache: Optional["SessionContextCache"] = None
+    knowledge_rag: Optional["KnowledgeRAGAgent"] = None
+    background_tasks: BackgroundTaskRegistry = field(default_factory=BackgroundTaskRegistry)
+
+    @classmethod
+    def build(
+        cls,
+        llm_provider: Optional[LLMProvider] = None,
+        cognitive_engine: Optional[CognitiveReasoningEngine] = None,
+        cache: Optional[LLMResponseCache] = None,
+        config: Optional[Mapping[str, Any]] = None,
+        knowledge_rag: Optional["KnowledgeRAGAgent"] = None,
+        context_cache: Optional["SessionContextCache"] = None,
+        semantic_cache: Optional[SemanticResponseCache] = None,
+    ) -> "GatewayPipeline":
+        """
+        Arma el pipeline con los mismos defaults que AIGateway.
+
+        Args:
+            llm_provider: Proveedor de LLM (default: mock)
+            cognitive_engine: Motor de razonamiento (default: uno nuevo con `config`)
+            cache: Cache de respuestas LLM
+            config: Configuración del gateway (se congela)
+            knowledge_rag: Agente RAG para enriquecimiento de contexto
+            context_cache: Caché de la cola del historial por sesión
+            semantic_cache: Caché semántico de respuestas del tutor
+        """
+        config = dict(config or {})
+        if llm_provider is None:
+            # Backward compatibility: crear proveedor mock por defecto
+            llm_provider = LLMProviderFactory.create("mock", config.get("llm", {}))
+        if cognitive_engine is None:
+            cognitive_engine = CognitiveReasoningEngine(config=config)
+
+        return cls(
+            llm=llm_provider,
+            cognitive_engine=cognitive_engine,
+            # C4: Gobernanza solo para filtrado PII (sin LLM)
+            governance_agent=GobernanzaAgent(llm_provider=None, config=config),
+            # Historial: cola reciente + resumen incremental + presupuesto de tokens
+            history=ConversationHistoryLoader(llm_provider=llm_provider),
+            config=MappingProxyType(config),
+            cache=cache,
+            semantic_cache=semantic_cache,
+            context_cache=context_cache,
+            knowledge_rag=knowledge_rag,
+        )
+
+
+__all__ = ["GatewayPipeline", "BackgroundTaskRegistry", "MAX_BACKGROUND_TASKS"]
@@ -6,8 +6,13 @@ Cortez42: Extracted from ai_gateway.py (1,996 lines)
 These protocols define expected interfaces for repositories without
 creating circular imports. They enable proper type checking while
 maintaining loose coupling.
+
+Repositories may be sync (SessionRepository, ...) or async
+(AsyncSessionRepository, ...); callers use resolve_repo_result() so both
+implementations satisfy the same protocol.
 """
-from typing import Any, List, Optional, Protocol, runtime_checkable
+import inspect
+from typing import Any, List, Optional, Protocol, Sequence, runtime_checkable
 
 from ...models.trace import CognitiveTrace, TraceSequence
 from ...models.risk import Risk
@@ -43,6 +48,15 @@ class TraceRepositoryProtocol(Protocol):
         """Get all traces for a session."""
         ...
 
+    def get_recent_by_session(
+        self,
+        session_id: str,
+        limit: int = 20,
+        interaction_types: Optional[Sequence[str]] = None
+    ) -> List[CognitiveTrace]:
+        """Get the newest traces of a session, oldest first."""
+        ...
+
 
 @runtime_checkable
 class RiskRepositoryProtocol(Protocol):
@@ -89,3 +103,15 @@ class SequenceRepositoryProtocol(Protocol):
     def update(self, sequence: TraceSequence) -> Any:
         """Update a trace sequence."""
         ...
+
+
+async def resolve_repo_result(result: Any) -> Any:
+    """
+    Await a repository call result if it came from an async repository.
+
+    Lets the gateway accept sync and async repositories interchangeably:
+        session = await resolve_repo_result(self.session_repo.get_by_id(sid))
+    """
+    if inspect.isawaitable(result):
+        return await result
+    return result
@@ -10,13 +10,17 @@ Características:
 - Soporte para TTL nativo de Redis
 - Fallback automático a caché en memoria
 - Thread-safe
+- Operaciones por clave y listas acotadas (contexto conversacional por sesión)
+- Invalidación por tags (sesión / estudiante / actividad) sin SCAN del keyspace
 """
 import os
 import json
 import logging
 import hashlib
 import threading
-from typing import Optional, Dict, Any
+import time
+from fnmatch import fnmatchcase
+from typing import Optional, Dict, Any, Iterable, List, Sequence, Set
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -129,12 +133,21 @@ class RedisCache:
             )
             self._initialize_fallback()
 
+    @property
+    def using_redis(self) -> bool:
+        """True si el caché opera sobre Redis y no sobre el fallback en memoria."""
+        return self._using_redis
+
     def _initialize_fallback(self):
         """Inicializa caché en memoria como fallback."""
         from .cache import LRUCache
 
         self._fallback_cache = LRUCache(max_size=1000)
         self._using_redis = False
+        # Serializa read-modify-write de listas en el fallback (RPUSHX/LTRIM)
+        self._fallback_lock = threading.Lock()
+        # Índice inverso tag -> claves (equivalente en memoria de los SETs de Redis)
+        self._fallback_tags: Dict[str, Set[str]] = {}
 
         # FIX Cortez69 CRIT-CORE-002: No emojis in logs
         logger.info(
@@ -171,6 +184,50 @@ class RedisCache:
 
         return f"{self.prefix}{key_hash}"
 
+    @staticmethod
+    def _entry_tags(
+        session_id: Optional[str] = None,
+        student_id: Optional[str] = None,
+        activity_id: Optional[str] = None
+    ) -> List[str]:
+        """Tags de una entrada: una por cada entidad conocida."""
+        tags = []
+        if session_id:
+            tags.append(f"session:{session_id}")
+        if student_id:
+            tags.append(f"student:{student_id}")
+        if activity_id:
+            tags.append(f"activity:{activity_id}")
+        return tags
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _pipeline_add_tags(self, pipe: Any, cache_key: str, tags: Sequence[str], ttl: int) -> None:
+        """SADD de la clave a cada tag; el SET del tag vive al menos tanto como sus entradas."""
+        tag_ttl = max(ttl, self.ttl_seconds)
+        for tag in tags:
+            pipe.sadd(self._tag_key(tag), cache_key)
+            pipe.expire(self._tag_key(tag), tag_ttl)
+
+    def _fallback_tag_entry(self, cache_key: str, tags: Sequence[str]) -> None:
+        """Registra la clave en el índice inverso del fallback."""
+        if not tags:
+            return
+        with self._fallback_lock:
+            for tag in tags:
+                self._fallback_tags.setdefault(tag, set()).add(cache_key)
+            # Las claves desalojadas por el LRU quedan en el índice: se podan
+            # cuando el índice supera el doble de la capacidad del caché
+            indexed = sum(len(keys) for keys in self._fallback_tags.values())
+            if indexed > 2 * self._fallback_cache.max_size:
+                for tag in list(self._fallback_tags):
+                    live = {k for k in self._fallback_tags[tag] if k in self._fallback_cache}
+                    if live:
+                        self._fallback_tags[tag] = live
+                    else:
+                        del self._fallback_tags[tag]
+
     def get(
         self,
         prompt: str,
@@ -247,17 +304,27 @@ class RedisCache:
         response: str,
         context: Optional[Dict[str, Any]] = None,
         mode: Optional[str] = None,
-        ttl: Optional[int] = None
+        ttl: Optional[int] = None,
+        session_id: Optional[str] = None,
+        student_id: Optional[str] = None,
+        activity_id: Optional[str] = None
     ) -> bool:
         """
         Guarda una respuesta en el caché.
 
+        Si se indican session_id / student_id / activity_id, la entrada se
+        registra en los tags correspondientes para poder invalidarla con
+        invalidate_session / invalidate_student / invalidate_activity.
+
         Args:
             prompt: Prompt del usuario
             response: Respuesta del LLM
             context: Contexto adicional
             mode: Modo del agente
             ttl: TTL personalizado (usa self.ttl_seconds si no se especifica)
+            session_id: Tag de sesión (opcional)
+            student_id: Tag de estudiante (opcional)
+            activity_id: Tag de actividad (opcional)
 
         Returns:
             True si se guardó exitosamente, False en caso contrario
@@ -267,16 +334,24 @@ class RedisCache:
 
         cache_key = self._generate_cache_key(prompt, context, mode)
         ttl_to_use = ttl or self.ttl_seconds
+        tags = self._entry_tags(session_id, student_id, activity_id)
 
         try:
             if self._using_redis and self._redis_client:
                 # Guardar en Redis con TTL
                 try:
-                    self._redis_client.setex(
-                        cache_key,
-                        ttl_to_use,
-                        response
-                    )
+                    if tags:
+                        # Entrada + SADD a cada tag en un solo round-trip
+                        pipe = self._redis_client.pipeline(transaction=True)
+                        pipe.setex(cache_key, ttl_to_use, response)
+                        self._pipeline_add_tags(pipe, cache_key, tags, ttl_to_use)
+                        pipe.execute()
+                    else:
+                        self._redis_client.setex(
+                            cache_key,
+                            ttl_to_use,
+                            response
+                        )
                     logger.debug(
                         f"Redis cache SET for key: {cache_key[:16]}... "
                         f"(TTL: {ttl_to_use}s, response length: {len(response)} chars)"
@@ -293,10 +368,12 @@ class RedisCache:
 
                     # Fallback a caché en memoria
                     self._fallback_cache.set(cache_key, response)
+                    self._fallback_tag_entry(cache_key, tags)
                     return True
             else:
                 # Usar fallback directamente
                 self._fallback_cache.set(cache_key, response)
+                self._fallback_tag_entry(cache_key, tags)
                 return True
 
         except Exception as e:
@@ -336,6 +413,8 @@ class RedisCache:
             else:
                 # Limpiar fallback
                 self._fallback_cache.clear()
+                with self._fallback_lock:
+                    self._fallback_tags.clear()
                 with self._stats_lock:
                     self._hits = 0
                     self._misses = 0
@@ -347,6 +426,209 @@ class RedisCache:
             logger.error("Unexpected error in cache CLEAR: %s", e, exc_info=True)
             return False
 
+    # =========================================================================
+    # Operaciones por clave (sin hash de prompt)
+    # =========================================================================
+
+    def _full_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    def _fallback_get_entry(self, full_key: str) -> Optional[Any]:
+        """Valor del fallback respetando TTL; entradas guardadas como (expires_at, value)."""
+        entry = self._fallback_cache.get(full_key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._fallback_cache.delete(full_key)
+            return None
+        return value
+
+    def _fallback_set_entry(self, full_key: str, value: Any, ttl: Optional[int]) -> None:
+        ttl_to_use = ttl or self.ttl_seconds
+        expires_at = time.monotonic() + ttl_to_use if ttl_to_use else None
+        self._fallback_cache.set(full_key, (expires_at, value))
+
+    def _record_lookup(self, hit: bool) -> None:
+        with self._stats_lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def _log_redis_error(self, operation: str, error: Exception) -> None:
+        if not self._connection_error_logged:
+            logger.error(
+                "Redis connection error during %s: %s. Falling back to memory cache.",
+                operation, error
+            )
+            self._connection_error_logged = True
+
+    def list_get(self, key: str) -> Optional[List[str]]:
+        """
+        Obtiene una lista completa por clave.
+
+        Returns:
+            Lista de valores, o None si la clave no existe (miss)
+        """
+        if not self.enabled:
+            return None
+
+        full_key = self._full_key(key)
+        try:
+            if self._using_redis and self._redis_client:
+                try:
+                    values = self._redis_client.lrange(full_key, 0, -1)
+                    self._record_lookup(bool(values))
+                    return values or None
+                except (RedisConnectionError, RedisError) as e:
+                    # Sin fallback a memoria: evitaría servir contexto desactualizado
+                    # cuando Redis vuelva a estar disponible
+                    self._log_redis_error("LRANGE", e)
+                    self._record_lookup(False)
+                    return None
+
+            with self._fallback_lock:
+                values = self._fallback_get_entry(full_key)
+            self._record_lookup(values is not None)
+            return list(values) if values is not None else None
+
+        except Exception as e:
+            logger.error("Unexpected error in cache LIST GET: %s", e, exc_info=True)
+            self._record_lookup(False)
+            return None
+
+    def list_replace(
+        self,
+        key: str,
+        values: Sequence[str],
+        ttl: Optional[int] = None,
+        session_id: Optional[str] = None,
+        student_id: Optional[str] = None,
+        activity_id: Optional[str] = None
+    ) -> bool:
+        """
+        Reemplaza atómicamente la lista de una clave (DEL + RPUSH + EXPIRE).
+
+        Una lista vacía elimina la clave. Los ids opcionales registran la lista
+        en sus tags, igual que en set().
+        """
+        if not self.enabled:
+            return False
+
+        full_key = self._full_key(key)
+        ttl_to_use = ttl or self.ttl_seconds
+        tags = self._entry_tags(session_id, student_id, activity_id)
+        try:
+            if self._using_redis and self._redis_client:
+                try:
+                    pipe = self._redis_client.pipeline(transaction=True)
+                    pipe.delete(full_key)
+                    if values:
+                        pipe.rpush(full_key, *values)
+                        pipe.expire(full_key, ttl_to_use)
+                        self._pipeline_add_tags(pipe, full_key, tags, ttl_to_use)
+                    pipe.execute()
+                    return True
+                except (RedisConnectionError, RedisError) as e:
+                    self._log_redis_error("LIST REPLACE", e)
+                    return False
+
+            with self._fallback_lock:
+                if values:
+                    self._fallback_set_entry(full_key, list(values), ttl_to_use)
+                else:
+                    self._fallback_cache.delete(full_key)
+            if values:
+                self._fallback_tag_entry(full_key, tags)
+            return True
+
+        except Exception as e:
+            logger.error("Unexpected error in cache LIST REPLACE: %s", e, exc_info=True)
+            return False
+
+    def list_append_existing(
+        self,
+        key: str,
+        values: Sequence[str],
+        max_length: Optional[int] = None,
+        ttl: Optional[int] = None,
+        session_id: Optional[str] = None,
+        student_id: Optional[str] = None,
+        activity_id: Optional[str] = None
+    ) -> bool:
+        """
+        Agrega valores al final de una lista SOLO si ya existe (RPUSHX + LTRIM + EXPIRE).
+
+        Sobre una clave inexistente no hace nada: así una lista nunca queda
+        con solo los elementos nuevos (historial parcial) tras expirar.
+
+        Args:
+            key: Clave de la lista
+            values: Valores a agregar
+            max_length: Conserva solo los últimos max_length elementos
+            ttl: Renueva el TTL (expiración por inactividad)
+            session_id / student_id / activity_id: Tags a renovar junto con el TTL
+
+        Returns:
+            True si la lista existía y se actualizó
+        """
+        if not self.enabled or not values:
+            return False
+
+        full_key = self._full_key(key)
+        ttl_to_use = ttl or self.ttl_seconds
+        tags = self._entry_tags(session_id, student_id, activity_id)
+        try:
+            if self._using_redis and self._redis_client:
+                try:
+                    pipe = self._redis_client.pipeline(transaction=True)
+                    pipe.rpushx(full_key, *values)
+                    if max_length:
+                        pipe.ltrim(full_key, -max_length, -1)
+                    pipe.expire(full_key, ttl_to_use)
+                    # El TTL de la lista se renueva: también el de sus tags
+                    self._pipeline_add_tags(pipe, full_key, tags, ttl_to_use)
+                    length = pipe.execute()[0]
+                    return bool(length)
+                except (RedisConnectionError, RedisError) as e:
+                    self._log_redis_error("LIST APPEND", e)
+                    return False
+
+            with self._fallback_lock:
+                current = self._fallback_get_entry(full_key)
+                if current is None:
+                    return False
+                updated = list(current) + list(values)
+                if max_length:
+                    updated = updated[-max_length:]
+                self._fallback_set_entry(full_key, updated, ttl_to_use)
+            return True
+
+        except Exception as e:
+            logger.error("Unexpected error in cache LIST APPEND: %s", e, exc_info=True)
+            return False
+
+    def delete_key(self, key: str) -> bool:
+        """Elimina una clave. Retorna False si Redis no respondió."""
+        full_key = self._full_key(key)
+        try:
+            if self._using_redis and self._redis_client:
+                try:
+                    self._redis_client.delete(full_key)
+                    return True
+                except (RedisConnectionError, RedisError) as e:
+                    self._log_redis_error("DELETE", e)
+                    return False
+
+            with self._fallback_lock:
+                self._fallback_cache.delete(full_key)
+            return True
+
+        except Exception as e:
+            logger.error("Unexpected error in cache DELETE: %s", e, exc_info=True)
+            return False
+
     def invalidate_by_pattern(self, pattern: str) -> int:
         """
         Invalida entradas del caché que coincidan con un patrón.
@@ -398,13 +680,19 @@ class RedisCache:
                     self._fallback_cache.clear()
                     deleted_count = -1  # Indica que se limpió todo
             else:
-                # En memoria: buscar claves que coincidan manualmente
-                # Nota: LRUCache no soporta patrones, así que limpiamos todo como fallback seguro
-                self._fallback_cache.clear()
+                # En memoria: eliminar solo las claves que coinciden con el patrón
+                matching = [
+                    key for key in self._fallback_cache.keys()
+                    if fnmatchcase(key, full_pattern)
+                ]
+                with self._fallback_lock:
+                    for key in matching:
+                        self._fallback_cache.delete(key)
+                deleted_count = len(matching)
                 logger.info(
-                    f"In-memory cache cleared (pattern invalidation not supported)"
+                    "In-memory cache invalidated by pattern '%s': %d keys deleted",
+                    pattern, deleted_count
                 )
-                deleted_count = -1
 
         except Exception as e:
             # FIX Cortez34: Add exc_info for better debugging
@@ -413,6 +701,66 @@ class RedisCache:
 
         return deleted_count
 
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """
+        Invalida exactamente las entradas registradas bajo los tags indicados.
+
+        En Redis: SMEMBERS de cada tag y un único DEL (entradas + SETs de tag),
+        ambos en pipeline; no recorre el keyspace. En memoria: usa el índice
+        inverso y no toca el resto de las entradas.
+
+        Args:
+            tags: Tags a invalidar (ej: "session:abc123")
+
+        Returns:
+            Número de entradas eliminadas (-1 si se limpió todo el fallback por error)
+        """
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return 0
+
+        deleted_count = 0
+        try:
+            if self._using_redis and self._redis_client:
+                try:
+                    tag_keys = [self._tag_key(tag) for tag in tags]
+                    pipe = self._redis_client.pipeline(transaction=False)
+                    for tag_key in tag_keys:
+                        pipe.smembers(tag_key)
+                    cache_keys = set().union(*pipe.execute())
+
+                    pipe = self._redis_client.pipeline(transaction=True)
+                    if cache_keys:
+                        pipe.delete(*cache_keys)
+                    pipe.delete(*tag_keys)
+                    results = pipe.execute()
+                    deleted_count = results[0] if cache_keys else 0
+
+                except (RedisConnectionError, RedisError) as e:
+                    logger.error("Redis error during tag invalidation: %s", e, exc_info=True)
+                    self._fallback_cache.clear()
+                    with self._fallback_lock:
+                        self._fallback_tags.clear()
+                    deleted_count = -1  # Indica que se limpió todo
+            else:
+                with self._fallback_lock:
+                    cache_keys = set()
+                    for tag in tags:
+                        cache_keys |= self._fallback_tags.pop(tag, set())
+                    for key in cache_keys:
+                        if self._fallback_cache.delete(key):
+                            deleted_count += 1
+
+            if deleted_count:
+                logger.info(
+                    "Cache invalidated by tags %s: %d keys deleted", tags, deleted_count
+                )
+
+        except Exception as e:
+            logger.error("Unexpected error in cache tag invalidation: %s", e, exc_info=True)
+
+        return deleted_count
+
     def invalidate_session(self, session_id: str) -> int:
         """
         Invalida todo el cache relacionado con una sesión.
@@ -423,7 +771,7 @@ class RedisCache:
         Returns:
             Número de claves eliminadas
         """
-        return self.invalidate_by_pattern(f"*session*{session_id}*")
+        return self.invalidate_tags(self._entry_tags(session_id=session_id))
 
     def invalidate_student(self, student_id: str) -> int:
         """
@@ -435,7 +783,19 @@ class RedisCache:
         Returns:
             Número de claves eliminadas
         """
-        return self.invalidate_by_pattern(f"*student*{student_id}*")
+        return self.invalidate_tags(self._entry_tags(student_id=student_id))
+
+    def invalidate_activity(self, activity_id: str) -> int:
+        """
+        Invalida todo el cache relacionado con una actividad.
+
+        Args:
+            activity_id: ID de la actividad
+
+        Returns:
+            Número de claves eliminadas
+        """
+        return self.invalidate_tags(self._entry_tags(activity_id=activity_id))
 
     def get_stats(self) -> Dict[str, Any]:
         """
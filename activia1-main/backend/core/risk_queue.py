@@ -0,0 +1,926 @@
+"""
+Risk Queue - Cola durable para el análisis de riesgos AR-IA en background
+
+El AIGateway lanzaba una tarea asyncio por interacción que corría el análisis
+con asyncio.to_thread (el pool por defecto, compartido con los handlers),
+reintentaba en proceso y registraba la tarea en un set en memoria. Un deploy o
+un reinicio del worker perdía los análisis pendientes, y un pico de carga
+saturaba el thread pool por defecto.
+
+Con la cola habilitada el request solo encola un RiskAnalysisJob (las dos
+trazas y la clasificación serializadas) y un pool propio de threads los procesa:
+
+- Backends intercambiables: Redis Streams (consumer group, XAUTOCLAIM de
+  mensajes de consumidores caídos, ZSET para los reintentos diferidos y un
+  stream de dead-letter) o una tabla risk_analysis_jobs reclamada con
+  SELECT ... FOR UPDATE SKIP LOCKED (sin Redis, o en desarrollo local).
+- Lotes: cada worker reclama hasta RISK_QUEUE_BATCH_SIZE jobs, los analiza y
+  persiste los riesgos de todo el lote con un solo commit; si el lote falla se
+  reintenta job por job para aislar el que falla.
+- Idempotencia: el id de cada riesgo se deriva del id del job, así que un job
+  reentregado (crash entre el commit y el ack) no duplica riesgos.
+- Reintentos con backoff exponencial y jitter; después de
+  RISK_QUEUE_MAX_ATTEMPTS el job pasa a dead-letter con el último error.
+- Métricas: profundidad de la cola (pending / delayed / dead) y jobs por
+  resultado (enqueued, completed, retried, dead_lettered, rejected).
+
+Si el backend no acepta el job (Redis caído, BD inaccesible) enqueue()
+devuelve False y el gateway usa el análisis en proceso de siempre.
+
+Habilitar con RISK_QUEUE_ENABLED=true (default: false).
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import time
+import uuid
+from contextlib import AbstractContextManager
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..models.risk import Risk
+from ..models.trace import CognitiveTrace
+from .constants import utc_now
+
+if TYPE_CHECKING:
+    from .ai_gateway import AIGateway
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    from redis.exceptions import ResponseError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    ResponseError = OSError
+
+DEFAULT_RISK_QUEUE_WORKERS = 2
+DEFAULT_RISK_QUEUE_BATCH_SIZE = 20
+DEFAULT_RISK_QUEUE_MAX_ATTEMPTS = 5
+DEFAULT_RISK_QUEUE_BACKOFF_BASE_SECONDS = 2.0
+DEFAULT_RISK_QUEUE_BACKOFF_MAX_SECONDS = 300.0
+DEFAULT_RISK_QUEUE_VISIBILITY_TIMEOUT_SECONDS = 300
+DEFAULT_RISK_QUEUE_POLL_INTERVAL_MS = 1000
+
+# Cada cuánto un worker publica la profundidad de la cola en Prometheus
+_DEPTH_REPORT_INTERVAL = 5.0
+
+# Namespace de los ids de riesgo derivados del id del job
+_RISK_ID_NAMESPACE = uuid.UUID("6f1c2a8e-3d4b-4f0a-9c1e-7b5d2e8a4c10")
+
+# Lazy import to avoid circular dependency with api.monitoring
+_metrics_module = None
+_metrics_lock = threading.Lock()
+
+
+def _get_metrics():
+    """Lazy load metrics module to avoid circular imports."""
+    global _metrics_module
+    if _metrics_module is None:
+        with _metrics_lock:
+            if _metrics_module is None:
+                try:
+                    from ..api.monitoring import metrics as m
+                    _metrics_module = m
+                except ImportError:
+                    _metrics_module = False
+    return _metrics_module if _metrics_module else None
+
+
+def _default_session_factory() -> AbstractContextManager:
+    """Sesión de BD propia de la cola (commit/rollback/close gestionados)."""
+    from ..database import get_db_session
+    return get_db_session()
+
+
+@dataclass
+class RiskAnalysisJob:
+    """Un análisis AR-IA pendiente: lo que necesita _analyze_risks_async."""
+
+    session_id: str
+    input_trace: Dict[str, Any]
+    response_trace: Dict[str, Any]
+    classification: Dict[str, Any]
+    flow_id: Optional[str] = None
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+    # Referencia del backend (id del mensaje en el stream / fila); no se serializa
+    receipt: Optional[str] = field(default=None, compare=False)
+
+    @classmethod
+    def from_interaction(
+        cls,
+        session_id: str,
+        input_trace: CognitiveTrace,
+        response_trace: CognitiveTrace,
+        classification: Dict[str, Any],
+        flow_id: Optional[str] = None,
+    ) -> "RiskAnalysisJob":
+        # default=str: la clasificación puede traer enums o datetimes
+        return cls(
+            session_id=session_id,
+            input_trace=input_trace.model_dump(mode="json", by_alias=True),
+            response_trace=response_trace.model_dump(mode="json", by_alias=True),
+            classification=json.loads(json.dumps(classification, default=str)),
+            flow_id=flow_id,
+        )
+
+    def to_json(self) -> str:
+        data = asdict(self)
+        data.pop("receipt")
+        return json.dumps(data, ensure_ascii=False)
+
+    @classmethod
+    def from_json(cls, raw: str, receipt: Optional[str] = None) -> "RiskAnalysisJob":
+        job = cls(**json.loads(raw))
+        job.receipt = receipt
+        return job
+
+    def traces(self) -> Tuple[CognitiveTrace, CognitiveTrace]:
+        return (
+            CognitiveTrace.model_validate(self.input_trace),
+            CognitiveTrace.model_validate(self.response_trace),
+        )
+
+
+class RiskQueueBackend:
+    """
+    Almacenamiento durable de los jobs.
+
+    Un job reclamado y no confirmado (ack/retry/dead_letter) vuelve a estar
+    disponible después de visibility_timeout: así sobreviven a un worker que
+    muere a mitad del lote.
+    """
+
+    name = "base"
+    # True si claim() espera hasta block_ms por jobs nuevos (el worker no duerme)
+    blocking_claim = False
+
+    def enqueue(self, job: RiskAnalysisJob) -> None:
+        raise NotImplementedError
+
+    def claim(self, consumer: str, count: int, block_ms: int) -> List[RiskAnalysisJob]:
+        raise NotImplementedError
+
+    def ack(self, jobs: Sequence[RiskAnalysisJob]) -> None:
+        raise NotImplementedError
+
+    def retry(self, job: RiskAnalysisJob, delay_seconds: float, error: str) -> None:
+        raise NotImplementedError
+
+    def dead_letter(self, job: RiskAnalysisJob, error: str) -> None:
+        raise NotImplementedError
+
+    def depth(self) -> Dict[str, int]:
+        """{"pending": listos o en proceso, "delayed": esperando backoff, "dead": ...}"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class RedisStreamRiskQueueBackend(RiskQueueBackend):
+    """
+    Redis Streams con consumer group.
+
+    - stream: jobs listos (XADD al encolar; XACK + XDEL al terminar)
+    - delayed (ZSET, score = epoch de disponibilidad): reintentos con backoff,
+      que vuelven al stream cuando vencen
+    - dead (stream acotado): jobs que agotaron sus intentos
+    """
+
+    name = "redis"
+    blocking_claim = True
+
+    def __init__(
+        self,
+        redis_client: Any,
+        prefix: str = "risk_queue:",
+        group: str = "risk-workers",
+        visibility_timeout_seconds: int = DEFAULT_RISK_QUEUE_VISIBILITY_TIMEOUT_SECONDS,
+        dead_letter_maxlen: int = 10000,
+    ):
+        """
+        Args:
+            redis_client: Cliente Redis (decode_responses=True)
+            prefix: Prefijo de las claves
+            group: Consumer group compartido por todos los workers
+            visibility_timeout_seconds: Inactividad tras la cual un mensaje
+                reclamado por otro consumidor se vuelve a reclamar (XAUTOCLAIM)
+            dead_letter_maxlen: Longitud máxima aproximada del stream de dead-letter
+        """
+        self._redis = redis_client
+        self.stream = f"{prefix}jobs"
+        self.delayed = f"{prefix}delayed"
+        self.dead = f"{prefix}dead"
+        self.group = group
+        self.visibility_timeout_ms = max(1, visibility_timeout_seconds) * 1000
+        self.dead_letter_maxlen = dead_letter_maxlen
+        self._ensure_group()
+
+    def _ensure_group(self) -> None:
+        try:
+            self._redis.xgroup_create(self.stream, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def enqueue(self, job: RiskAnalysisJob) -> None:
+        self._redis.xadd(self.stream, {"job": job.to_json()})
+
+    def _promote_delayed(self, count: int) -> None:
+        """Mueve al stream los reintentos cuyo backoff venció."""
+        due = self._redis.zrangebyscore(self.delayed, "-inf", time.time(), start=0, num=count)
+        for raw in due:
+            # ZREM decide qué worker lo promueve (evita duplicados)
+            if self._redis.zrem(self.delayed, raw):
+                self._redis.xadd(self.stream, {"job": raw})
+
+    def _parse(self, messages: Sequence[Any]) -> List[RiskAnalysisJob]:
+        jobs = []
+        for message_id, fields in messages:
+            if not fields:
+                continue  # Borrado con XDEL mientras estaba pendiente
+            try:
+                jobs.append(RiskAnalysisJob.from_json(fields["job"], receipt=message_id))
+            except (KeyError, TypeError, ValueError) as e:
+                logger.error("Discarding malformed risk job %s: %s", message_id, e)
+                self._redis.xack(self.stream, self.group, message_id)
+                self._redis.xdel(self.stream, message_id)
+        return jobs
+
+    def claim(self, consumer: str, count: int, block_ms: int) -> List[RiskAnalysisJob]:
+        self._promote_delayed(count)
+
+        # Mensajes de consumidores caídos (deploy, crash) inactivos por más del timeout
+        reclaimed = self._redis.xautoclaim(
+            self.stream, self.group, consumer,
+            min_idle_time=self.visibility_timeout_ms, start_id="0-0", count=count,
+        )
+        jobs = self._parse(reclaimed[1] if reclaimed else [])
+        if len(jobs) >= count:
+            return jobs
+
+        response = self._redis.xreadgroup(
+            self.group, consumer, {self.stream: ">"},
+            count=count - len(jobs),
+            # block=0 esperaría para siempre; con jobs ya reclamados no se espera
+            block=block_ms if block_ms and not jobs else None,
+        )
+        for _stream, messages in response or []:
+            jobs.extend(self._parse(messages))
+        return jobs
+
+    def ack(self, jobs: Sequence[RiskAnalysisJob]) -> None:
+        ids = [job.receipt for job in jobs if job.receipt]
+        if not ids:
+            return
+        pipe = self._redis.pipeline()
+        pipe.xack(self.stream, self.group, *ids)
+        pipe.xdel(self.stream, *ids)
+        pipe.execute()
+
+    def retry(self, job: RiskAnalysisJob, delay_seconds: float, error: str) -> None:
+        pipe = self._redis.pipeline()
+        pipe.zadd(self.delayed, {job.to_json(): time.time() + delay_seconds})
+        if job.receipt:
+            pipe.xack(self.stream, self.group, job.receipt)
+            pipe.xdel(self.stream, job.receipt)
+        pipe.execute()
+
+    def dead_letter(self, job: RiskAnalysisJob, error: str) -> None:
+        pipe = self._redis.pipeline()
+        pipe.xadd(
+            self.dead, {"job": job.to_json(), "error": error[:2000]},
+            maxlen=self.dead_letter_maxlen, approximate=True,
+        )
+        if job.receipt:
+            pipe.xack(self.stream, self.group, job.receipt)
+            pipe.xdel(self.stream, job.receipt)
+        pipe.execute()
+
+    def depth(self) -> Dict[str, int]:
+        pipe = self._redis.pipeline()
+        pipe.xlen(self.stream)
+        pipe.zcard(self.delayed)
+        pipe.xlen(self.dead)
+        pending, delayed, dead = pipe.execute()
+        return {"pending": pending, "delayed": delayed, "dead": dead}
+
+    def close(self) -> None:
+        try:
+            self._redis.close()
+        except Exception:
+            pass
+
+
+class DatabaseRiskQueueBackend(RiskQueueBackend):
+    """
+    Tabla risk_analysis_jobs como cola (sin Redis).
+
+    claim() toma las filas disponibles con FOR UPDATE SKIP LOCKED (workers de
+    distintos procesos no se pisan) y las "alquila" corriendo available_at
+    visibility_timeout hacia adelante. En SQLite la cláusula se omite; alcanza
+    para un solo proceso.
+    """
+
+    name = "database"
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], AbstractContextManager]] = None,
+        visibility_timeout_seconds: int = DEFAULT_RISK_QUEUE_VISIBILITY_TIMEOUT_SECONDS,
+    ):
+        """
+        Args:
+            session_factory: Callable que devuelve un context manager de Session
+                (default: get_db_session)
+            visibility_timeout_seconds: Duración del alquiler de un job reclamado
+        """
+        self._session_factory = session_factory or _default_session_factory
+        self.visibility_timeout = timedelta(seconds=max(1, visibility_timeout_seconds))
+
+    def enqueue(self, job: RiskAnalysisJob) -> None:
+        from ..database.models import RiskAnalysisJobDB
+
+        with self._session_factory() as db:
+            db.add(RiskAnalysisJobDB(
+                id=job.id,
+                payload=json.loads(job.to_json()),
+                status="pending",
+                attempts=job.attempts,
+                available_at=utc_now(),
+            ))
+            db.commit()
+
+    def claim(self, consumer: str, count: int, block_ms: int) -> List[RiskAnalysisJob]:
+        from ..database.models import RiskAnalysisJobDB
+
+        now = utc_now()
+        with self._session_factory() as db:
+            rows = (
+                db.query(RiskAnalysisJobDB)
+                .filter(
+                    RiskAnalysisJobDB.status != "dead",
+                    RiskAnalysisJobDB.available_at <= now,
+                )
+                .order_by(RiskAnalysisJobDB.available_at)
+                .limit(count)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            jobs = []
+            for row in rows:
+                row.status = "running"
+                row.available_at = now + self.visibility_timeout
+                try:
+                    job = RiskAnalysisJob(**row.payload)
+                except TypeError as e:
+                    row.status = "dead"
+                    row.last_error = f"malformed payload: {e}"
+                    continue
+                job.receipt = row.id
+                jobs.append(job)
+            db.commit()
+        return jobs
+
+    def ack(self, jobs: Sequence[RiskAnalysisJob]) -> None:
+        from ..database.models import RiskAnalysisJobDB
+
+        ids = [job.receipt for job in jobs if job.receipt]
+        if not ids:
+            return
+        with self._session_factory() as db:
+            db.query(RiskAnalysisJobDB).filter(
+                RiskAnalysisJobDB.id.in_(ids)
+            ).delete(synchronize_session=False)
+            db.commit()
+
+    def _update(self, job: RiskAnalysisJob, **values: Any) -> None:
+        from ..database.models import RiskAnalysisJobDB
+
+        with self._session_factory() as db:
+            db.query(RiskAnalysisJobDB).filter(
+                RiskAnalysisJobDB.id == (job.receipt or job.id)
+            ).update(
+                {
+                    RiskAnalysisJobDB.payload: json.loads(job.to_json()),
+                    RiskAnalysisJobDB.attempts: job.attempts,
+                    **{getattr(RiskAnalysisJobDB, name): value for name, value in values.items()},
+                },
+                synchronize_session=False,
+            )
+            db.commit()
+
+    def retry(self, job: RiskAnalysisJob, delay_seconds: float, error: str) -> None:
+        self._update(
+            job,
+            status="retry",
+            available_at=utc_now() + timedelta(seconds=delay_seconds),
+            last_error=error[:2000],
+        )
+
+    def dead_letter(self, job: RiskAnalysisJob, error: str) -> None:
+        self._update(job, status="dead", last_error=error[:2000])
+
+    def depth(self) -> Dict[str, int]:
+        from sqlalchemy import func
+        from ..database.models import RiskAnalysisJobDB
+
+        with self._session_factory() as db:
+            counts = dict(
+                db.query(RiskAnalysisJobDB.status, func.count(RiskAnalysisJobDB.id))
+                .group_by(RiskAnalysisJobDB.status)
+                .all()
+            )
+        return {
+            "pending": counts.get("pending", 0) + counts.get("running", 0),
+            "delayed": counts.get("retry", 0),
+            "dead": counts.get("dead", 0),
+        }
+
+
+class _RiskCollector:
+    """
+    Repositorio de riesgos en memoria para _analyze_risks_async.
+
+    Junta los riesgos de un job para escribirlos con el lote y les asigna un
+    id determinista (uuid5 del id del job y su posición).
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.risks: List[Risk] = []
+
+    def create(self, risk: Risk) -> Risk:
+        risk.id = str(uuid.uuid5(_RISK_ID_NAMESPACE, f"{self.job_id}:{len(self.risks)}"))
+        self.risks.append(risk)
+        return risk
+
+
+class RiskAnalysisQueue:
+    """
+    Cola de análisis de riesgo con su pool de workers.
+
+    enqueue() lo llama el request; los workers son threads propios (no el
+    thread pool por defecto de asyncio) con su propia sesión de BD.
+    """
+
+    def __init__(
+        self,
+        backend: RiskQueueBackend,
+        gateway_factory: Callable[[], "AIGateway"],
+        workers: int = DEFAULT_RISK_QUEUE_WORKERS,
+        batch_size: int = DEFAULT_RISK_QUEUE_BATCH_SIZE,
+        max_attempts: int = DEFAULT_RISK_QUEUE_MAX_ATTEMPTS,
+        backoff_base_seconds: float = DEFAULT_RISK_QUEUE_BACKOFF_BASE_SECONDS,
+        backoff_max_seconds: float = DEFAULT_RISK_QUEUE_BACKOFF_MAX_SECONDS,
+        poll_interval_ms: int = DEFAULT_RISK_QUEUE_POLL_INTERVAL_MS,
+        session_factory: Optional[Callable[[], AbstractContextManager]] = None,
+    ):
+        """
+        Args:
+            backend: Almacenamiento de los jobs (Redis Streams o tabla de BD)
+            gateway_factory: Devuelve un AIGateway para correr el análisis
+                (con el pipeline compartido es barato construirlo por lote)
+            workers: Threads que procesan jobs
+            batch_size: Jobs reclamados por ciclo (riesgos del lote en un commit)
+            max_attempts: Intentos antes de mandar el job a dead-letter
+            backoff_base_seconds: Espera del primer reintento (se duplica en cada uno)
+            backoff_max_seconds: Tope de la espera entre reintentos
+            poll_interval_ms: Espera entre consultas cuando la cola está vacía
+            session_factory: Callable que devuelve un context manager de Session
+                para escribir los riesgos (default: get_db_session)
+        """
+        self.backend = backend
+        self._gateway_factory = gateway_factory
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = max(0.0, backoff_base_seconds)
+        self.backoff_max = max(self.backoff_base, backoff_max_seconds)
+        self.poll_interval = max(1, poll_interval_ms) / 1000.0
+        self._session_factory = session_factory or _default_session_factory
+
+        self._consumer_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._running = False
+        self._lock = threading.Lock()  # Protege _stats
+        self._last_depth_report = 0.0
+        self._backend_error_logged = False
+
+        self._stats: Dict[str, int] = {
+            "enqueued": 0,
+            "rejected": 0,
+            "completed": 0,
+            "retried": 0,
+            "dead_lettered": 0,
+            "risks_persisted": 0,
+            "batches": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # API para el AIGateway
+    # ------------------------------------------------------------------
+
+    @property
+    def is_running(self) -> bool:
+        """True mientras los workers están activos."""
+        return self._running
+
+    def enqueue(
+        self,
+        session_id: str,
+        input_trace: CognitiveTrace,
+        response_trace: CognitiveTrace,
+        classification: Dict[str, Any],
+        flow_id: Optional[str] = None,
+    ) -> bool:
+        """
+        Encola el análisis de riesgo de una interacción.
+
+        Returns:
+            True si quedó en la cola; False si la cola no está corriendo o el
+            backend falló (el llamador debe analizar en proceso)
+        """
+        if not self._running:
+            return False
+
+        try:
+            job = RiskAnalysisJob.from_interaction(
+                session_id, input_trace, response_trace, classification, flow_id
+            )
+            self.backend.enqueue(job)
+        except Exception as e:
+            self._count("rejected")
+            logger.warning(
+                "Risk queue rejected job, analyzing in process: %s", e,
+                extra={"session_id": session_id, "flow_id": flow_id}
+            )
+            return False
+
+        self._count("enqueued")
+        logger.debug(
+            "Risk analysis job enqueued",
+            extra={"job_id": job.id, "session_id": session_id, "flow_id": flow_id}
+        )
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de la cola (para métricas/health)."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["running"] = self._running
+        stats["backend"] = self.backend.name
+        stats["workers"] = self.workers
+        return stats
+
+    def depth(self) -> Dict[str, int]:
+        """Profundidad actual de la cola (consulta al backend)."""
+        return self.backend.depth()
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida (lifespan)
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Arranca los threads del pool."""
+        if self._running:
+            logger.warning("Risk queue already running")
+            return
+
+        self._stop.clear()
+        self._running = True
+        self._threads = [
+            threading.Thread(
+                target=self._worker_loop,
+                args=(f"{self._consumer_prefix}-{index}",),
+                name=f"risk-queue-worker-{index}",
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(
+            "Risk queue started (backend=%s, workers=%d, batch_size=%d)",
+            self.backend.name, self.workers, self.batch_size
+        )
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Detiene los workers; cada uno termina el lote en curso.
+
+        Lo que quede sin confirmar sigue en el backend y lo retoma el próximo
+        proceso (vence el visibility timeout).
+        """
+        if not self._running:
+            return
+
+        self._running = False
+        self._stop.set()
+        threads, self._threads = self._threads, []
+
+        def _join() -> None:
+            deadline = time.monotonic() + timeout
+            for thread in threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+
+        await asyncio.to_thread(_join)
+        self.backend.close()
+        logger.info("Risk queue stopped", extra={"stats": self.stats()})
+
+    # ------------------------------------------------------------------
+    # Workers (corren en threads)
+    # ------------------------------------------------------------------
+
+    def _worker_loop(self, consumer: str) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.process_batch(consumer, block_ms=int(self.poll_interval * 1000))
+                self._backend_error_logged = False
+            except Exception as e:
+                # Nunca debe morir el worker: los jobs siguen en el backend
+                if not self._backend_error_logged:
+                    logger.error("Risk queue worker error: %s", e, exc_info=True)
+                    self._backend_error_logged = True
+                self._stop.wait(self.poll_interval)
+                continue
+
+            self._report_depth()
+            if not processed and not self.backend.blocking_claim:
+                self._stop.wait(self.poll_interval)
+
+    def process_batch(self, consumer: str = "worker", block_ms: int = 0) -> int:
+        """
+        Reclama un lote, lo analiza y persiste sus riesgos con un commit.
+
+        Returns:
+            Número de jobs reclamados
+        """
+        jobs = self.backend.claim(consumer, self.batch_size, block_ms)
+        if not jobs:
+            return 0
+
+        started_at = time.perf_counter()
+        gateway = self._gateway_factory()
+        analyzed: List[Tuple[RiskAnalysisJob, List[Risk]]] = []
+        failed: List[Tuple[RiskAnalysisJob, Exception]] = []
+
+        for job in jobs:
+            collector = _RiskCollector(job.id)
+            try:
+                input_trace, response_trace = job.traces()
+                gateway._analyze_risks_async(
+                    job.session_id,
+                    input_trace,
+                    response_trace,
+                    job.classification,
+                    job.flow_id,
+                    risk_repo_override=collector,
+                )
+                analyzed.append((job, collector.risks))
+            except Exception as e:
+                failed.append((job, e))
+
+        persisted, insert_failed = self._persist(analyzed)
+        if persisted:
+            self.backend.ack(persisted)
+        for job, error in failed + insert_failed:
+            self._fail(job, error)
+
+        self._count("completed", len(persisted))
+        self._count("batches")
+        logger.info(
+            "Risk analysis batch processed",
+            extra={
+                "jobs": len(jobs),
+                "completed": len(persisted),
+                "failed": len(failed) + len(insert_failed),
+                "duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
+            }
+        )
+        return len(jobs)
+
+    def _persist(
+        self, analyzed: List[Tuple[RiskAnalysisJob, List[Risk]]]
+    ) -> Tuple[List[RiskAnalysisJob], List[Tuple[RiskAnalysisJob, Exception]]]:
+        """Un commit para todo el lote; si falla, job por job."""
+        if not analyzed:
+            return [], []
+
+        try:
+            self._write_risks([risk for _, risks in analyzed for risk in risks])
+            return [job for job, _ in analyzed], []
+        except Exception as e:
+            logger.warning(
+                "Risk batch insert failed, retrying job by job: %s", e,
+                extra={"jobs": len(analyzed)}
+            )
+
+        persisted, failed = [], []
+        for job, risks in analyzed:
+            try:
+                self._write_risks(risks)
+                persisted.append(job)
+            except Exception as e:
+                failed.append((job, e))
+        return persisted, failed
+
+    def _write_risks(self, risks: List[Risk]) -> None:
+        if not risks:
+            return
+        from ..database.repositories import RiskRepository
+
+        with self._session_factory() as db:
+            repo = RiskRepository(db)
+            # Reentregas: riesgos ya escritos antes del ack perdido
+            existing = repo.get_existing_ids([risk.id for risk in risks])
+            fresh = [risk for risk in risks if risk.id not in existing]
+            repo.bulk_create(fresh)
+        self._count("risks_persisted", len(fresh))
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(0, attempts - 1)))
+        # Jitter: evita que los reintentos de un mismo corte lleguen juntos
+        return delay * random.uniform(0.5, 1.0)
+
+    def _fail(self, job: RiskAnalysisJob, error: Exception) -> None:
+        job.attempts += 1
+        message = f"{type(error).__name__}: {error}"
+        extra = {
+            "job_id": job.id,
+            "session_id": job.session_id,
+            "flow_id": job.flow_id,
+            "attempt": job.attempts,
+            "max_attempts": self.max_attempts,
+        }
+
+        if job.attempts >= self.max_attempts:
+            self.backend.dead_letter(job, message)
+            self._count("dead_lettered")
+            logger.error("Risk analysis job dead-lettered: %s", message, extra=extra)
+            return
+
+        delay = self._backoff(job.attempts)
+        self.backend.retry(job, delay, message)
+        self._count("retried")
+        logger.warning(
+            "Risk analysis job failed, retrying in %.1fs: %s", delay, message, extra=extra
+        )
+
+    # ------------------------------------------------------------------
+    # Métricas
+    # ------------------------------------------------------------------
+
+    def _count(self, outcome: str, amount: int = 1) -> None:
+        if not amount:
+            return
+        with self._lock:
+            self._stats[outcome] += amount
+        metrics = _get_metrics()
+        if metrics and outcome not in ("batches", "risks_persisted"):
+            metrics.record_risk_queue_jobs(outcome, amount)
+
+    def _report_depth(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_depth_report < _DEPTH_REPORT_INTERVAL:
+                return
+            self._last_depth_report = now
+
+        metrics = _get_metrics()
+        if not metrics:
+            return
+        try:
+            depth = self.backend.depth()
+        except Exception as e:
+            logger.debug("Could not read risk queue depth: %s", e)
+            return
+        metrics.update_risk_queue_depth(**depth)
+
+
+# Instancia global (una por worker uvicorn), creada en el lifespan
+_global_risk_queue: Optional[RiskAnalysisQueue] = None
+_risk_queue_lock = threading.Lock()
+
+
+def is_risk_queue_enabled() -> bool:
+    """RISK_QUEUE_ENABLED=true habilita la cola durable."""
+    return os.getenv("RISK_QUEUE_ENABLED", "false").lower() == "true"
+
+
+def create_risk_queue_backend(
+    kind: Optional[str] = None,
+    redis_url: Optional[str] = None,
+) -> RiskQueueBackend:
+    """
+    Backend según RISK_QUEUE_BACKEND: redis, database o auto (default).
+
+    auto usa Redis Streams si hay REDIS_URL y el paquete redis; si no, la tabla.
+    """
+    kind = (kind or os.getenv("RISK_QUEUE_BACKEND", "auto")).lower()
+    redis_url = redis_url or os.getenv("REDIS_URL")
+    visibility_timeout = int(os.getenv(
+        "RISK_QUEUE_VISIBILITY_TIMEOUT_SECONDS", str(DEFAULT_RISK_QUEUE_VISIBILITY_TIMEOUT_SECONDS)
+    ))
+
+    if kind == "auto":
+        kind = "redis" if (REDIS_AVAILABLE and redis_url) else "database"
+
+    if kind == "redis":
+        if not REDIS_AVAILABLE or not redis_url:
+            raise ValueError("RISK_QUEUE_BACKEND=redis requires the redis package and REDIS_URL")
+        client = redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_connect_timeout=5,
+            # Mayor que el BLOCK de XREADGROUP (RISK_QUEUE_POLL_INTERVAL_MS)
+            socket_timeout=30,
+        )
+        return RedisStreamRiskQueueBackend(client, visibility_timeout_seconds=visibility_timeout)
+
+    if kind == "database":
+        return DatabaseRiskQueueBackend(visibility_timeout_seconds=visibility_timeout)
+
+    raise ValueError(f"Unknown RISK_QUEUE_BACKEND: {kind}")
+
+
+def get_risk_queue() -> Optional[RiskAnalysisQueue]:
+    """
+    Cola global si está corriendo, None en caso contrario.
+
+    El AIGateway analiza en proceso cuando devuelve None.
+    """
+    queue = _global_risk_queue
+    if queue is not None and queue.is_running:
+        return queue
+    return None
+
+
+async def start_risk_queue(
+    gateway_factory: Callable[[], "AIGateway"],
+) -> Optional[RiskAnalysisQueue]:
+    """Crea y arranca la cola global desde variables de entorno (lifespan startup)."""
+    global _global_risk_queue
+
+    if not is_risk_queue_enabled():
+        logger.info("Risk queue disabled (RISK_QUEUE_ENABLED=false), analyzing in process")
+        return None
+
+    with _risk_queue_lock:
+        if _global_risk_queue is None:
+            _global_risk_queue = RiskAnalysisQueue(
+                backend=create_risk_queue_backend(),
+                gateway_factory=gateway_factory,
+                workers=int(os.getenv("RISK_QUEUE_WORKERS", str(DEFAULT_RISK_QUEUE_WORKERS))),
+                batch_size=int(os.getenv("RISK_QUEUE_BATCH_SIZE", str(DEFAULT_RISK_QUEUE_BATCH_SIZE))),
+                max_attempts=int(os.getenv("RISK_QUEUE_MAX_ATTEMPTS", str(DEFAULT_RISK_QUEUE_MAX_ATTEMPTS))),
+                backoff_base_seconds=float(os.getenv(
+                    "RISK_QUEUE_BACKOFF_BASE_SECONDS", str(DEFAULT_RISK_QUEUE_BACKOFF_BASE_SECONDS)
+                )),
+                backoff_max_seconds=float(os.getenv(
+                    "RISK_QUEUE_BACKOFF_MAX_SECONDS", str(DEFAULT_RISK_QUEUE_BACKOFF_MAX_SECONDS)
+                )),
+                poll_interval_ms=int(os.getenv(
+                    "RISK_QUEUE_POLL_INTERVAL_MS", str(DEFAULT_RISK_QUEUE_POLL_INTERVAL_MS)
+                )),
+            )
+        queue = _global_risk_queue
+
+    await queue.start()
+    return queue
+
+
+async def stop_risk_queue() -> None:
+    """Detiene la cola global (lifespan shutdown); los jobs pendientes quedan en el backend."""
+    global _global_risk_queue
+
+    with _risk_queue_lock:
+        queue = _global_risk_queue
+        _global_risk_queue = None
+
+    if queue is not None:
+        await queue.stop()
+
+
+__all__ = [
+    "RiskAnalysisJob",
+    "RiskQueueBackend",
+    "RedisStreamRiskQueueBackend",
+    "DatabaseRiskQueueBackend",
+    "RiskAnalysisQueue",
+    "create_risk_queue_backend",
+    "get_risk_queue",
+    "start_risk_queue",
+    "stop_risk_queue",
+    "is_risk_queue_enabled",
+]
@@ -0,0 +1,353 @@
+"""
+Semantic Response Cache - Caché semántico (opt-in) de respuestas del tutor
+
+LLMResponseCache solo acierta con el prompt exacto: "¿qué es una pila?" y
+"Que es una pila" son dos llamadas al LLM aunque pidan la misma explicación.
+En una comisión, decenas de estudiantes hacen la misma pregunta conceptual
+sobre la misma actividad. Este nivel:
+
+- Normaliza el prompt (minúsculas, sin tildes ni puntuación, espacios
+  colapsados) y lo embebe con el EmbeddingProvider existente.
+- Agrupa las respuestas por bucket (actividad, tipo de respuesta, nivel de
+  ayuda, estado cognitivo): nunca se sirve una respuesta generada para otra
+  actividad u otra estrategia pedagógica.
+- Dentro del bucket busca el vecino más cercano con un único producto
+  matriz-vector sobre embeddings normalizados (float32) y sirve la respuesta
+  si la similitud coseno supera SEMANTIC_CACHE_SIMILARITY.
+
+Es opt-in (SEMANTIC_CACHE_ENABLED=false por defecto) y solo aplica a los
+tipos de respuesta de SEMANTIC_CACHE_RESPONSE_TYPES (explicaciones
+conceptuales, ejemplos). Con el caché habilitado, AIGateway genera esas
+respuestas sin el historial de la sesión: lo que se comparte entre sesiones
+nunca se adaptó a la conversación de un estudiante. El bucket no incluye la
+sesión a propósito. El resto de los modos (socrático, pistas guiadas, apoyo
+emocional...) conserva el historial y sigue usando solo el caché exacto.
+
+Los errores del proveedor de embeddings degradan a miss, nunca a excepción.
+"""
+import logging
+import re
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .constants import (
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_RESPONSE_TYPES,
+    SEMANTIC_CACHE_SIMILARITY,
+    SEMANTIC_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+BucketKey = Tuple[str, str, str, str]
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+# Lazy import to avoid circular dependency with api.monitoring
+_metrics_module = None
+_metrics_lock = threading.Lock()
+
+
+def _get_metrics():
+    """Lazy load metrics module to avoid circular imports."""
+    global _metrics_module
+    if _metrics_module is None:
+        with _metrics_lock:
+            if _metrics_module is None:
+                try:
+                    from ..api.monitoring import metrics as m
+                    _metrics_module = m
+                except ImportError:
+                    _metrics_module = False
+    return _metrics_module if _metrics_module else None
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Minúsculas, sin tildes ni puntuación, espacios colapsados."""
+    decomposed = unicodedata.normalize("NFKD", prompt.lower())
+    without_accents = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    without_punctuation = _PUNCTUATION_RE.sub(" ", without_accents)
+    return _WHITESPACE_RE.sub(" ", without_punctuation).strip()
+
+
+def make_bucket_key(
+    activity_id: str,
+    response_type: str,
+    help_level: Any = None,
+    cognitive_state: Optional[str] = None,
+) -> BucketKey:
+    """
+    Clave del bucket: solo se comparten respuestas de la misma actividad,
+    tipo de respuesta, nivel de ayuda y estado cognitivo.
+    """
+    if isinstance(help_level, float):
+        help_level = f"{help_level:.2f}"
+    return (
+        str(activity_id),
+        str(response_type),
+        "" if help_level is None else str(help_level),
+        cognitive_state or "",
+    )
+
+
+@dataclass
+class SemanticCacheHit:
+    """Respuesta servida desde el caché semántico."""
+    response: str
+    similarity: float
+    age_seconds: float
+
+
+@dataclass
+class _Bucket:
+    """Embeddings normalizados (una fila por respuesta) y sus respuestas."""
+    vectors: Optional[np.ndarray] = None
+    prompts: List[str] = field(default_factory=list)
+    responses: List[str] = field(default_factory=list)
+    created_at: List[float] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    def keep(self, mask: np.ndarray) -> None:
+        indexes = np.flatnonzero(mask)
+        self.vectors = self.vectors[indexes] if len(indexes) else None
+        self.prompts = [self.prompts[i] for i in indexes]
+        self.responses = [self.responses[i] for i in indexes]
+        self.created_at = [self.created_at[i] for i in indexes]
+
+
+class SemanticResponseCache:
+    """
+    Caché de respuestas por similitud de prompts, particionado por bucket.
+
+    Thread-safe: los buckets se modifican bajo un lock; el embedding del
+    prompt se calcula fuera del lock.
+    """
+
+    def __init__(
+        self,
+        embedding_provider: Optional[Any] = None,
+        similarity_threshold: float = SEMANTIC_CACHE_SIMILARITY,
+        ttl_seconds: int = SEMANTIC_CACHE_TTL_SECONDS,
+        max_entries_per_bucket: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        response_types: Iterable[str] = SEMANTIC_CACHE_RESPONSE_TYPES,
+    ):
+        """
+        Args:
+            embedding_provider: EmbeddingProvider (default: get_embedding_provider())
+            similarity_threshold: Similitud coseno mínima para servir una respuesta
+            ttl_seconds: Vida de cada respuesta cacheada
+            max_entries_per_bucket: Respuestas por bucket (se descartan las más viejas)
+            response_types: Tipos de respuesta que pueden compartirse entre sesiones
+        """
+        self._embedding_provider = embedding_provider
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_bucket = max(1, max_entries_per_bucket)
+        self.response_types = frozenset(response_types)
+        self._buckets: Dict[BucketKey, _Bucket] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "errors": 0}
+
+        logger.info(
+            "SemanticResponseCache initialized (threshold: %.2f, response types: %s)",
+            similarity_threshold, ",".join(sorted(self.response_types)) or "-"
+        )
+
+    @property
+    def embedding_provider(self):
+        if self._embedding_provider is None:
+            from .embeddings import get_embedding_provider
+            self._embedding_provider = get_embedding_provider()
+        return self._embedding_provider
+
+    def is_eligible(self, response_type: Optional[str]) -> bool:
+        """True si las respuestas de este tipo pueden compartirse entre sesiones."""
+        return bool(response_type) and response_type in self.response_types
+
+    async def _embed(self, normalized_prompt: str) -> Optional[np.ndarray]:
+        try:
+            vector = np.asarray(
+                await self.embedding_provider.embed(normalized_prompt), dtype=np.float32
+            )
+        except Exception as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            logger.warning("Semantic cache: embedding failed, treating as miss: %s", e)
+            return None
+        norm = float(np.linalg.norm(vector))
+        if vector.ndim != 1 or norm == 0.0:
+            return None
+        return vector / norm
+
+    def _record(self, hit: bool) -> None:
+        with self._lock:
+            self._stats["hits" if hit else "misses"] += 1
+            total_hits = self._stats["hits"]
+            total_lookups = total_hits + self._stats["misses"]
+        metrics = _get_metrics()
+        if metrics:
+            metrics.record_cache_lookups(
+                "llm_semantic", hits=int(hit), misses=int(not hit),
+                total_hits=total_hits, total_lookups=total_lookups,
+            )
+
+    def _expire_locked(self, bucket: _Bucket, now: float) -> None:
+        if not len(bucket):
+            return
+        fresh = (now - np.asarray(bucket.created_at)) <= self.ttl_seconds
+        if not fresh.all():
+            bucket.keep(fresh)
+
+    async def get(self, prompt: str, bucket_key: BucketKey) -> Optional[SemanticCacheHit]:
+        """
+        Busca una respuesta para un prompt equivalente dentro del bucket.
+
+        Returns:
+            SemanticCacheHit, o None si no hay vecino sobre el umbral
+        """
+        normalized = normalize_prompt(prompt)
+        if not normalized:
+            return None
+
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            empty = bucket is None or not len(bucket)
+        if empty:
+            self._record(hit=False)
+            return None
+
+        query = await self._embed(normalized)
+        if query is None:
+            self._record(hit=False)
+            return None
+
+        now = time.time()
+        hit = None
+        with self._lock:
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                self._expire_locked(bucket, now)
+            if bucket is not None and len(bucket) and bucket.vectors.shape[1] == query.shape[0]:
+                similarities = bucket.vectors @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    hit = SemanticCacheHit(
+                        response=bucket.responses[best],
+                        similarity=float(similarities[best]),
+                        age_seconds=now - bucket.created_at[best],
+                    )
+
+        self._record(hit=hit is not None)
+        if hit is not None:
+            logger.info(
+                "Semantic cache HIT (similarity %.3f, age %ds, saved LLM call)",
+                hit.similarity, int(hit.age_seconds),
+                extra={"activity_id": bucket_key[0], "response_type": bucket_key[1]}
+            )
+        return hit
+
+    async def set(self, prompt: str, bucket_key: BucketKey, response: str) -> None:
+        """Guarda la respuesta generada para el prompt en su bucket."""
+        normalized = normalize_prompt(prompt)
+        if not normalized or not response:
+            return
+
+        vector = await self._embed(normalized)
+        if vector is None:
+            return
+
+        with self._lock:
+            bucket = self._buckets.setdefault(bucket_key, _Bucket())
+            self._expire_locked(bucket, time.time())
+            if bucket.vectors is not None and bucket.vectors.shape[1] != vector.shape[0]:
+                # Cambió el modelo de embeddings: el bucket viejo no es comparable
+                bucket = self._buckets[bucket_key] = _Bucket()
+
+            if normalized in bucket.prompts:
+                # Mismo prompt normalizado: se reemplaza la respuesta
+                bucket.keep(np.array([p != normalized for p in bucket.prompts]))
+            if len(bucket) >= self.max_entries_per_bucket:
+                bucket.keep(np.arange(len(bucket)) >= len(bucket) - self.max_entries_per_bucket + 1)
+
+            row = vector[np.newaxis, :]
+            bucket.vectors = row if bucket.vectors is None else np.vstack([bucket.vectors, row])
+            bucket.prompts.append(normalized)
+            bucket.responses.append(response)
+            bucket.created_at.append(time.time())
+
+    def invalidate_activity(self, activity_id: str) -> int:
+        """Elimina los buckets de una actividad (p. ej. al modificarla). Retorna las entradas borradas."""
+        with self._lock:
+            keys = [key for key in self._buckets if key[0] == str(activity_id)]
+            removed = sum(len(self._buckets.pop(key)) for key in keys)
+        if removed:
+            logger.info("Semantic cache invalidated for activity", extra={"activity_id": activity_id, "entries": removed})
+        return removed
+
+    def clear(self) -> None:
+        """Limpia todos los buckets. Thread-safe."""
+        with self._lock:
+            self._buckets.clear()
+        logger.info("Semantic Response Cache cleared")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["buckets"] = len(self._buckets)
+            stats["entries"] = sum(len(bucket) for bucket in self._buckets.values())
+        total = stats["hits"] + stats["misses"]
+        stats["hit_rate_percent"] = round(stats["hits"] / total * 100, 2) if total else 0
+        stats["similarity_threshold"] = self.similarity_threshold
+        stats["response_types"] = sorted(self.response_types)
+        return stats
+
+
+# Instancia global (singleton) con thread-safety
+_semantic_cache: Optional[SemanticResponseCache] = None
+_semantic_cache_lock = threading.Lock()
+
+
+def get_semantic_cache() -> Optional[SemanticResponseCache]:
+    """
+    Obtiene el caché semántico de respuestas (singleton).
+
+    Returns:
+        SemanticResponseCache, o None si SEMANTIC_CACHE_ENABLED=false
+    """
+    global _semantic_cache
+
+    if not SEMANTIC_CACHE_ENABLED:
+        return None
+
+    if _semantic_cache is None:
+        with _semantic_cache_lock:
+            if _semantic_cache is None:
+                _semantic_cache = SemanticResponseCache()
+
+    return _semantic_cache
+
+
+def invalidate_activity_responses(activity_id: str) -> None:
+    """Invalida las respuestas cacheadas de una actividad, si el caché está habilitado."""
+    cache = get_semantic_cache()
+    if cache is not None:
+        cache.invalidate_activity(activity_id)
+
+
+__all__ = [
+    "SemanticResponseCache",
+    "SemanticCacheHit",
+    "get_semantic_cache",
+    "invalidate_activity_responses",
+    "make_bucket_key",
+    "normalize_prompt",
+]
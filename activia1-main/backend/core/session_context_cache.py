@@ -0,0 +1,227 @@
+"""
+Session Context Cache - Cola conversacional por sesión en Redis
+
+Cada turno reconstruía la lista de mensajes desde cognitive_traces, aunque el
+turno anterior ya tenía la misma lista salvo los dos últimos mensajes. Este
+caché guarda la cola del historial (HISTORY_TAIL_MESSAGES trazas
+conversacionales) como una lista Redis por sesión:
+
+- Read-through: en miss el AIGateway lee la cola de BD y la guarda.
+- Append: cada traza conversacional persistida por el gateway se agrega con
+  RPUSHX + LTRIM (solo si la lista existe, nunca queda un historial parcial).
+- TTL por inactividad (SESSION_CONTEXT_CACHE_TTL_SECONDS), renovado en cada append.
+- Tags de sesión, estudiante y actividad (RedisCache): la invalidación al
+  finalizar o eliminar la sesión (routers/sessions.py) y al modificar una
+  actividad (routers/activities.py) borra exactamente las listas etiquetadas.
+
+Usa RedisCache. Con SESSION_CONTEXT_CACHE_ENABLED=auto (default) el caché solo
+se activa si Redis está conectado: el fallback en memoria es por proceso y, con
+varios workers uvicorn, cada uno serviría su propia cola desactualizada (la
+invalidación solo llega al worker que atendió la escritura). "true" permite el
+fallback en memoria (un solo worker, desarrollo) y "false" lo deshabilita.
+
+Las trazas escritas fuera del AIGateway (p. ej. routers de simuladores) no se
+agregan al caché; esas sesiones no pasan por el historial del gateway.
+"""
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from .constants import (
+    HISTORY_TAIL_MESSAGES,
+    SESSION_CONTEXT_CACHE_ENABLED,
+    SESSION_CONTEXT_CACHE_TTL_SECONDS,
+)
+from .conversation_history import CONVERSATIONAL_INTERACTION_TYPES
+from .redis_cache import RedisCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class CachedTurn:
+    """Traza conversacional cacheada (mismos atributos que usa el historial)."""
+    id: str
+    interaction_type: str
+    content: str
+    created_at: Optional[datetime]
+
+
+def _interaction_type_value(trace: Any) -> Any:
+    interaction_type = getattr(trace, "interaction_type", None)
+    return getattr(interaction_type, "value", interaction_type)
+
+
+def _serialize(trace: Any) -> Optional[str]:
+    """JSON de una traza conversacional; None si no forma parte del diálogo."""
+    interaction_type = _interaction_type_value(trace)
+    content = getattr(trace, "content", None)
+    if interaction_type not in CONVERSATIONAL_INTERACTION_TYPES or not content:
+        return None
+    created_at = getattr(trace, "created_at", None)
+    return json.dumps(
+        {
+            "id": getattr(trace, "id", None),
+            "interaction_type": interaction_type,
+            "content": content,
+            "created_at": created_at.isoformat() if isinstance(created_at, datetime) else None,
+        },
+        ensure_ascii=False,
+    )
+
+
+def _tags(session_id: str, trace: Any) -> dict:
+    """Tags de la lista de la sesión a partir de una de sus trazas."""
+    return {
+        "session_id": session_id,
+        "student_id": getattr(trace, "student_id", None),
+        "activity_id": getattr(trace, "activity_id", None),
+    }
+
+
+def _deserialize(raw: str) -> CachedTurn:
+    data = json.loads(raw)
+    created_at = data.get("created_at")
+    return CachedTurn(
+        id=data.get("id"),
+        interaction_type=data["interaction_type"],
+        content=data["content"],
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+    )
+
+
+class SessionContextCache:
+    """Cola conversacional por sesión sobre RedisCache."""
+
+    def __init__(
+        self,
+        cache: Optional[RedisCache] = None,
+        max_messages: int = HISTORY_TAIL_MESSAGES,
+        ttl_seconds: int = SESSION_CONTEXT_CACHE_TTL_SECONDS,
+    ):
+        """
+        Args:
+            cache: RedisCache a usar (default: instancia propia con prefijo session_ctx:)
+            max_messages: Largo máximo de la cola cacheada
+            ttl_seconds: Expiración por inactividad de la sesión
+        """
+        self.cache = cache or RedisCache(ttl_seconds=ttl_seconds, prefix="session_ctx:")
+        self.max_messages = max(1, max_messages)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(session_id: str) -> str:
+        return f"session:{session_id}"
+
+    def get_tail(self, session_id: str) -> Optional[List[CachedTurn]]:
+        """Cola cacheada en orden cronológico, o None en miss."""
+        raw_items = self.cache.list_get(self._key(session_id))
+        if raw_items is None:
+            return None
+        try:
+            return [_deserialize(raw) for raw in raw_items]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(
+                "Corrupted session context cache entry, invalidating: %s",
+                e,
+                extra={"session_id": session_id}
+            )
+            self.invalidate(session_id)
+            return None
+
+    def store_tail(self, session_id: str, traces: Sequence[Any]) -> bool:
+        """Guarda la cola leída de BD (solo trazas conversacionales)."""
+        values = [v for v in (_serialize(t) for t in traces) if v is not None]
+        return self.cache.list_replace(
+            self._key(session_id),
+            values[-self.max_messages:],
+            ttl=self.ttl_seconds,
+            **_tags(session_id, traces[-1] if traces else None),
+        )
+
+    def append(self, session_id: str, trace: Any) -> bool:
+        """
+        Agrega una traza recién persistida si la cola de la sesión está cacheada.
+
+        Returns:
+            True si se agregó; False si no es conversacional o no había caché
+        """
+        value = _serialize(trace)
+        if value is None:
+            return False
+        return self.cache.list_append_existing(
+            self._key(session_id),
+            [value],
+            max_length=self.max_messages,
+            ttl=self.ttl_seconds,
+            **_tags(session_id, trace),
+        )
+
+    def invalidate(self, session_id: str) -> bool:
+        """Elimina el contexto cacheado de la sesión (cierre o borrado)."""
+        # La lista se borra también por clave: cubre entradas escritas sin tags
+        deleted = self.cache.invalidate_session(session_id) > 0
+        deleted = self.cache.delete_key(self._key(session_id)) or deleted
+        logger.debug("Session context cache invalidated", extra={"session_id": session_id})
+        return deleted
+
+    def invalidate_activity(self, activity_id: str) -> int:
+        """Elimina el contexto cacheado de todas las sesiones de una actividad."""
+        deleted = self.cache.invalidate_activity(activity_id)
+        logger.debug("Session context cache invalidated for activity", extra={"activity_id": activity_id})
+        return deleted
+
+    def get_stats(self):
+        return self.cache.get_stats()
+
+
+# Instancia global (singleton) con thread-safety
+_session_context_cache: Optional[SessionContextCache] = None
+_session_context_cache_resolved = False
+_session_context_cache_lock = threading.Lock()
+
+
+def get_session_context_cache() -> Optional[SessionContextCache]:
+    """
+    Obtiene el caché de contexto por sesión (singleton).
+
+    Returns:
+        SessionContextCache, o None si está deshabilitado o si en modo auto
+        Redis no está disponible
+    """
+    global _session_context_cache, _session_context_cache_resolved
+
+    if SESSION_CONTEXT_CACHE_ENABLED == "false":
+        return None
+
+    if not _session_context_cache_resolved:
+        with _session_context_cache_lock:
+            if not _session_context_cache_resolved:
+                cache = SessionContextCache()
+                if cache.cache.using_redis or SESSION_CONTEXT_CACHE_ENABLED == "true":
+                    _session_context_cache = cache
+                else:
+                    logger.info(
+                        "Session context cache disabled: Redis not available "
+                        "(set SESSION_CONTEXT_CACHE_ENABLED=true to use the in-memory fallback)"
+                    )
+                _session_context_cache_resolved = True
+
+    return _session_context_cache
+
+
+def invalidate_session_context(session_id: str) -> None:
+    """Invalida el contexto cacheado de una sesión, si el caché está habilitado."""
+    cache = get_session_context_cache()
+    if cache is not None:
+        cache.invalidate(session_id)
+
+
+def invalidate_activity_context(activity_id: str) -> None:
+    """Invalida el contexto cacheado de las sesiones de una actividad, si el caché está habilitado."""
+    cache = get_session_context_cache()
+    if cache is not None:
+        cache.invalidate_activity(activity_id)
@@ -0,0 +1,301 @@
+"""
+Diccionarios de señales lingüísticas para la clasificación de prompts.
+
+Cada categoría es una lista de frases o un dict con:
+- "signals": frases que se comparan sin tildes (y con variantes voseo/tuteo)
+- "exact": frases que se comparan tal cual (minúsculas), para las que quitar
+  la tilde cambia el sentido ("qué" vs "que", "no sé" vs "no se")
+
+Los consume SignalMatcher (core/signal_matcher.py); SIGNAL_DICTIONARIES_PATH
+puede apuntar a un JSON con el mismo formato que reemplaza o agrega
+categorías sin reiniciar el proceso.
+"""
+from typing import Any, Dict
+
+DEFAULT_SIGNAL_DICTIONARIES: Dict[str, Any] = {
+    # ------------------------------------------------------------------
+    # CognitiveReasoningEngine.classify_prompt (FIX Cortez64)
+    # ------------------------------------------------------------------
+    "delegation": [
+        # Señales originales
+        "dame el código completo",
+        "hacé todo",
+        "resolvelo por mí",
+        "código entero",
+        "implementa todo",
+        # Solicitud directa de código
+        "hazme el programa",
+        "escribí el código",
+        "escribime el código",
+        "pasame la solución",
+        "pasame el código",
+        "dame la solución",
+        "necesito el código funcionando",
+        "código que funcione",
+        "dame algo que funcione",
+        # Delegación explícita
+        "terminá esto por mí",
+        "hacelo vos",
+        "hacelo por mí",
+        "no quiero pensar",
+        "solo dame la respuesta",
+        "dame la respuesta",
+        "copiá y pegá",
+        "resolvé esto",
+        "completá el ejercicio",
+        "completá el código",
+        # Urgencia/presión
+        "necesito que me lo hagas",
+        "solo necesito el código",
+        "dame todo el código",
+        "quiero el código completo",
+    ],
+    "frustration": [
+        "no me sale",
+        "me rindo",
+        "esto es imposible",
+        "llevo horas",
+        "ya intenté todo",
+        "estoy perdido",
+        "no avanzo",
+        "me trabé",
+        "estoy atascado",
+        "no puedo más",
+        "es muy difícil",
+        "no sirvo para esto",
+        "esto no funciona",
+        "no funciona nada",
+        "me frustro",
+        "estoy frustrado",
+        "no sé qué más hacer",
+        "ya probé de todo",
+        "sigo sin entender",
+        "cada vez peor",
+    ],
+    "validation": [
+        "funciona",
+        "correcto",
+        "está bien esto",
+        "es correcto",
+        "así está bien",
+        "está bien así",
+        "revisá mi código",
+        "chequeá esto",
+        "mirá si funciona",
+        "validá mi solución",
+        "tiene errores",
+        "qué le falta",
+        "qué está mal",
+        "por qué no funciona",
+        "por qué falla",
+        "dónde está el error",
+        "encontrá el error",
+        "revisame esto",
+        "está correcto esto",
+        "lo hice bien",
+        "me quedó bien",
+    ],
+    "confusion": {
+        "signals": [
+            "no entiendo",
+            "no me queda claro",
+            "me confunde",
+            "cuál es la diferencia",
+            "es lo mismo que",
+            "para qué sirve",
+            "cuándo uso",
+            "en qué casos",
+            "me perdí",
+            "no sigo",
+            "no capto",
+            "no comprendo",
+            "qué significa",
+            "qué quiere decir",
+            "a qué se refiere",
+            "cómo es eso",
+            "no veo la relación",
+            "qué tiene que ver",
+        ],
+        # "no se" sin tilde es impersonal ("no se puede")
+        "exact": ["no sé"],
+    },
+    "example": [
+        "dame un ejemplo",
+        "mostrame un ejemplo",
+        "mostrame cómo",
+        "un caso práctico",
+        "cómo sería",
+        "podés ejemplificar",
+        "algo similar",
+        "ejemplo de",
+        "un ejemplo",
+        "ejemplos de",
+        "por ejemplo",
+        "cómo se vería",
+        "cómo quedaría",
+        "a ver un ejemplo",
+        "necesito un ejemplo",
+    ],
+    "metacognition": [
+        "qué debería pensar",
+        "por dónde empiezo",
+        "qué pasos sigo",
+        "cómo organizo",
+        "qué me falta entender",
+        "qué estoy haciendo mal",
+        "cómo debería encarar",
+        "cuál es el enfoque",
+        "cómo pienso esto",
+        "qué estrategia uso",
+        "cómo lo encaro",
+        "por dónde arranco",
+        "cuál es el primer paso",
+        "cómo me organizo",
+        "qué orden sigo",
+    ],
+    # Interrogativos sueltos: sin tilde son conjunciones ("que", "como")
+    "question": {
+        "exact": [
+            "cómo", "por qué", "qué", "cuál", "explica", "ayuda",
+            "dónde", "cuándo", "quién", "podrías", "podés", "puedo",
+        ],
+    },
+    "explanation": {
+        "signals": [
+            "explica", "no entiendo", "ayuda a entender",
+            "explicame", "explicá", "contame",
+            "decime qué es", "qué significa",
+            "cómo funciona", "para qué es",
+        ],
+        "exact": ["por qué", "qué es", "qué son"],
+    },
+    "optimization": [
+        "cómo mejoro",
+        "es eficiente",
+        "hay forma más rápida",
+        "se puede optimizar",
+        "cómo lo hago más rápido",
+        "es óptimo",
+        "mejor manera",
+        "hay otra forma",
+        "alternativa más",
+        "se puede mejorar",
+    ],
+    "comparison": [
+        "qué es mejor",
+        "cuál conviene",
+        "diferencia entre",
+        "comparar",
+        "versus",
+        "o es mejor",
+        "qué elegir",
+        "cuál usar",
+        "cuál es más",
+    ],
+    "implementation_planning": ["cómo implemento", "cómo hago"],
+    "debugging": ["error", "bug", "falla"],
+
+    # ------------------------------------------------------------------
+    # AIGateway._decide_model_for_prompt
+    # ------------------------------------------------------------------
+    "model_pro": [
+        "complejidad", "complexity", "big o", "algoritmo complejo",
+        "optimizar algoritmo", "optimize algorithm", "refactor",
+        "arquitectura", "architecture", "diseño de sistema",
+        "patrones de diseño", "design patterns", "solid principles",
+        "analizar código", "analyze code", "revisar implementación",
+        "debugging avanzado", "advanced debug",
+    ],
+    "model_flash": {
+        "signals": [
+            "what is", "explícame", "explain",
+            "hola", "hello", "ayuda", "help",
+            "gracias", "thanks", "entiendo", "understand",
+        ],
+        "exact": ["¿qué es"],
+    },
+
+    # ------------------------------------------------------------------
+    # AnalistaRiesgoAgent (BE-OPT-002)
+    # ------------------------------------------------------------------
+    "risk_delegation": [
+        "dame el código completo",
+        "hacé todo",
+        "resolvelo por mí",
+        "código entero",
+        "implementa todo",
+        "haceme",
+    ],
+    # _looks_like_code: se cuentan indicadores distintos (>= 2 => código)
+    "code_indicator": [
+        "def ", "class ", "function ", "return ", "import ",
+        "if ", "else:", "for ", "while ", "{", "}",
+        "var ", "const ", "let ", "=>", "public ", "private ",
+        "#include", "void ", "int ", "string ",
+    ],
+
+    # ------------------------------------------------------------------
+    # TutorCognitivoAgent.evaluate_student_response
+    # ------------------------------------------------------------------
+    # "decidí"/"elegí" sin tilde son prefijo de "decidir"/"elegir"
+    "justification": {
+        "signals": [
+            "porque", "ya que", "debido a", "considerando que",
+            "mi razón es", "pensé que",
+        ],
+        "exact": ["decidí", "elegí"],
+    },
+    "decomposition": [
+        "primero", "luego", "después", "paso", "parte",
+        "dividir", "separar", "componente", "subproblema",
+    ],
+    "planning": [
+        "voy a", "planeo", "mi estrategia", "mi plan",
+        "primero haré", "mi enfoque", "mi idea es",
+    ],
+    "self_reflection": [
+        "me doy cuenta", "entiendo que", "ahora veo",
+        "me confundí", "cometí el error", "debería",
+    ],
+
+    # ------------------------------------------------------------------
+    # TutorRulesEngine (exigir explicitación)
+    # ------------------------------------------------------------------
+    "rules_justification": {
+        "signals": [
+            "porque", "ya que", "debido a", "considerando que",
+            "mi razón es", "pensé que",
+            "esto se debe", "la razón es",
+        ],
+        "exact": ["decidí", "elegí"],
+    },
+    "rules_planning": [
+        "voy a", "planeo", "mi estrategia", "mi plan",
+        "primero", "luego", "después", "paso",
+        "mi enfoque", "mi idea es",
+    ],
+}
+
+# Formas de voseo rioplatense y su equivalente de tuteo (ya sin tildes).
+# Cada señal que contiene una de estas palabras se compila también con la
+# otra forma: "decime qué es" detecta "dime qué es" y viceversa.
+VOSEO_EQUIVALENTS = (
+    ("podes", "puedes"),
+    ("tenes", "tienes"),
+    ("queres", "quieres"),
+    ("sos", "eres"),
+    ("hace", "haz"),
+    ("hacelo", "hazlo"),
+    ("haceme", "hazme"),
+    ("decime", "dime"),
+    ("mostrame", "muestrame"),
+    ("contame", "cuentame"),
+    ("escribi", "escribe"),
+    ("escribime", "escribeme"),
+    ("resolve", "resuelve"),
+    ("resolvelo", "resuelvelo"),
+    ("encontra", "encuentra"),
+    ("proba", "prueba"),
+)
+
+__all__ = ["DEFAULT_SIGNAL_DICTIONARIES", "VOSEO_EQUIVALENTS"]
@@ -0,0 +1,272 @@
+"""
+Signal Matcher - detección de señales lingüísticas en una sola pasada
+
+classify_prompt, la elección de modelo del gateway, el analista de riesgo y el
+tutor buscaban sus listas de frases con `any(signal in text.lower() ...)`, una
+vez por categoría y reconstruyendo las listas en cada llamada. SignalMatcher
+compila todos los diccionarios una sola vez en una expresión regular con forma
+de trie (las alternativas comparten prefijos) y devuelve todas las categorías
+detectadas recorriendo el texto una vez:
+
+- Normalización: NFC + minúsculas; las señales "signals" se comparan además sin
+  tildes ("explicame" == "explícame") y con variantes voseo/tuteo
+  (VOSEO_EQUIVALENTS). Las señales "exact" exigen las tildes del original.
+- Semántica de substring, igual que `signal in text`.
+- En cada posición el trie encuentra la señal más larga; las señales que son
+  prefijo de ella (también presentes en esa posición) se precalculan.
+
+get_signal_matcher() devuelve el matcher compartido. Si SIGNAL_DICTIONARIES_PATH
+apunta a un JSON, sus categorías reemplazan/agregan a las de
+signal_dictionaries.py y el archivo se revisa por mtime cada
+SIGNAL_DICTIONARIES_RELOAD_SECONDS: el matcher nuevo se compila aparte y
+reemplaza al anterior de una vez (los lectores nunca esperan).
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from .constants import SIGNAL_DICTIONARIES_PATH, SIGNAL_DICTIONARIES_RELOAD_SECONDS
+from .signal_dictionaries import DEFAULT_SIGNAL_DICTIONARIES, VOSEO_EQUIVALENTS
+
+logger = logging.getLogger(__name__)
+
+# Vocales acentuadas -> base, carácter a carácter (conserva las posiciones).
+# La ñ se mantiene: es otra letra, no una tilde.
+_ACCENT_TABLE = str.maketrans(
+    "áéíóúüàèìòùâêîôûäëïö",
+    "aeiouuaeiouaeiouaeio",
+)
+
+_VOSEO = {}
+for _vos, _tu in VOSEO_EQUIVALENTS:
+    _VOSEO.setdefault(_vos, _tu)
+    _VOSEO.setdefault(_tu, _vos)
+_WORD_RE = re.compile(r"\w+")
+
+_NO_MATCHES: Mapping[str, FrozenSet[str]] = MappingProxyType({})
+
+
+def normalize_text(text: str) -> str:
+    """NFC y minúsculas (el texto sobre el que se verifican las señales exactas)."""
+    return unicodedata.normalize("NFC", text).lower()
+
+
+def fold_accents(text: str) -> str:
+    """Quita tildes de un texto ya normalizado sin cambiar su longitud."""
+    return text.translate(_ACCENT_TABLE)
+
+
+def _voseo_variant(folded: str) -> Optional[str]:
+    """La señal con cada forma voseo/tuteo reemplazada por la otra (o None)."""
+    variant = _WORD_RE.sub(lambda m: _VOSEO.get(m.group(0), m.group(0)), folded)
+    return variant if variant != folded else None
+
+
+def _trie_pattern(keys: List[str]) -> str:
+    """Regex equivalente a la alternación de `keys`, agrupando prefijos comunes."""
+    root: Dict[str, Any] = {}
+    for key in keys:
+        node = root
+        for char in key:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict[str, Any]) -> str:
+        is_end = "" in node
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        # Greedy: prueba primero la señal más larga del camino
+        return body + "?" if is_end else body
+
+    return build(root)
+
+
+def _parse_category(spec: Any) -> Tuple[List[str], List[str]]:
+    """Lista de frases o {"signals": [...], "exact": [...]}."""
+    if isinstance(spec, Mapping):
+        return list(spec.get("signals", ())), list(spec.get("exact", ()))
+    return list(spec), []
+
+
+class SignalMatcher:
+    """Diccionarios de señales compilados en una sola regex de trie."""
+
+    def __init__(self, dictionaries: Mapping[str, Any]):
+        """
+        Args:
+            dictionaries: {categoría: [frases] | {"signals": [...], "exact": [...]}}
+        """
+        # clave plegada -> [(categoría, señal original, texto exacto o None)]
+        entries: Dict[str, List[Tuple[str, str, Optional[str]]]] = {}
+        categories = set()
+
+        for category, spec in dictionaries.items():
+            signals, exact = _parse_category(spec)
+            categories.add(category)
+            for signal in signals:
+                folded = fold_accents(normalize_text(signal))
+                if not folded:
+                    continue
+                entries.setdefault(folded, []).append((category, signal, None))
+                variant = _voseo_variant(folded)
+                if variant:
+                    entries.setdefault(variant, []).append((category, signal, None))
+            for signal in exact:
+                lowered = normalize_text(signal)
+                if not lowered:
+                    continue
+                entries.setdefault(fold_accents(lowered), []).append((category, signal, lowered))
+
+        self.categories: FrozenSet[str] = frozenset(categories)
+        self._regex = None
+        self._implied: Dict[str, Tuple[Tuple[str, str, Optional[str]], ...]] = {}
+        if entries:
+            keys = sorted(entries)
+            self._regex = re.compile("(?=(" + _trie_pattern(keys) + "))")
+            # Para cada clave: sus entradas y las de toda clave que sea prefijo suyo
+            for key in keys:
+                implied = []
+                for end in range(1, len(key) + 1):
+                    implied.extend(entries.get(key[:end], ()))
+                self._implied[key] = tuple(implied)
+
+    def match(self, text: str) -> Mapping[str, FrozenSet[str]]:
+        """
+        Todas las señales presentes en el texto, en una pasada.
+
+        Returns:
+            {categoría: señales detectadas (como figuran en el diccionario)};
+            las categorías sin señales no aparecen
+        """
+        if not text or self._regex is None:
+            return _NO_MATCHES
+        lowered = normalize_text(text)
+        folded = fold_accents(lowered)
+
+        hits: Dict[str, set] = {}
+        for found in self._regex.finditer(folded):
+            start = found.start()
+            for category, signal, exact in self._implied[found.group(1)]:
+                if exact is not None and not lowered.startswith(exact, start):
+                    continue
+                hits.setdefault(category, set()).add(signal)
+        return {category: frozenset(signals) for category, signals in hits.items()}
+
+    def categories_in(self, text: str) -> FrozenSet[str]:
+        """Solo los nombres de las categorías detectadas."""
+        return frozenset(self.match(text))
+
+
+def load_signal_dictionaries(path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Diccionarios por defecto con las categorías del JSON de `path` encima.
+
+    Raises:
+        OSError, ValueError: si el archivo no se puede leer o no es un objeto JSON
+    """
+    dictionaries = dict(DEFAULT_SIGNAL_DICTIONARIES)
+    if path:
+        with open(path, "r", encoding="utf-8") as f:
+            overrides = json.load(f)
+        if not isinstance(overrides, dict):
+            raise ValueError("signal dictionaries file must contain a JSON object")
+        dictionaries.update(overrides)
+    return dictionaries
+
+
+# Instancia global con recarga por mtime del archivo de configuración
+_matcher: Optional[SignalMatcher] = None
+_matcher_signature: Optional[Tuple[int, int]] = None
+_matcher_lock = threading.Lock()
+_last_check = 0.0
+
+
+def _config_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _compile(path: str) -> SignalMatcher:
+    """Compila y publica el matcher (con _matcher_lock tomado)."""
+    global _matcher, _matcher_signature, _last_check
+    _last_check = time.monotonic()
+    signature = _config_signature(path) if path else None
+    try:
+        matcher = SignalMatcher(load_signal_dictionaries(path))
+    except (OSError, ValueError, TypeError) as e:
+        logger.error("Could not load signal dictionaries from %s: %s", path, e)
+        if _matcher is not None:
+            # Se conserva el anterior; no se reintenta hasta que el archivo cambie
+            _matcher_signature = signature
+            return _matcher
+        matcher = SignalMatcher(DEFAULT_SIGNAL_DICTIONARIES)
+    _matcher = matcher
+    _matcher_signature = signature
+    logger.info("Signal matcher compiled (%d categories)", len(matcher.categories))
+    return matcher
+
+
+def reload_signal_matcher(path: Optional[str] = None) -> SignalMatcher:
+    """
+    Recompila el matcher compartido desde los diccionarios actuales.
+
+    Si el archivo de configuración no se puede leer, se conserva el matcher
+    anterior (o se usan los diccionarios por defecto si no había ninguno).
+    """
+    with _matcher_lock:
+        return _compile(SIGNAL_DICTIONARIES_PATH if path is None else path)
+
+
+def get_signal_matcher() -> SignalMatcher:
+    """
+    Obtiene el matcher compartido (singleton).
+
+    Con SIGNAL_DICTIONARIES_PATH, revisa el mtime del archivo cada
+    SIGNAL_DICTIONARIES_RELOAD_SECONDS; solo un hilo recompila y el resto
+    sigue usando el matcher anterior mientras tanto.
+    """
+    global _last_check
+
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                _compile(SIGNAL_DICTIONARIES_PATH)
+        return _matcher
+
+    if (
+        SIGNAL_DICTIONARIES_PATH
+        and SIGNAL_DICTIONARIES_RELOAD_SECONDS > 0
+        and time.monotonic() - _last_check >= SIGNAL_DICTIONARIES_RELOAD_SECONDS
+        and _matcher_lock.acquire(blocking=False)
+    ):
+        try:
+            _last_check = time.monotonic()
+            if _config_signature(SIGNAL_DICTIONARIES_PATH) != _matcher_signature:
+                _compile(SIGNAL_DICTIONARIES_PATH)
+        finally:
+            _matcher_lock.release()
+
+    return _matcher
+
+
+__all__ = [
+    "SignalMatcher",
+    "get_signal_matcher",
+    "reload_signal_matcher",
+    "load_signal_dictionaries",
+    "normalize_text",
+    "fold_accents",
+]
@@ -0,0 +1,280 @@
+"""
+Submission Cache - Memoización por contenido de resultados de entregas
+
+Los estudiantes reenvían código idéntico con frecuencia (reintento de red,
+"enviar de nuevo para ver el feedback"). Cada reenvío volvía a ejecutar todos
+los tests ocultos y una evaluación completa con el LLM. Este caché guarda el
+sandbox_result y la evaluación de /exercises/json/{id}/submit:
+
+- Clave: (exercise_id, hash de versión del ejercicio, hash del código
+  normalizado). Si el JSON del ejercicio cambia, cambia el hash de versión y
+  las entradas anteriores dejan de ser alcanzables (expiran por TTL en Redis).
+- Normalización conservadora: fines de línea, espacios al final de cada línea
+  y líneas vacías finales. No se quitan comentarios ni líneas iniciales para
+  que los números de línea del code_review sigan siendo válidos.
+- Nivel 1: LRU en proceso (SUBMISSION_CACHE_MAX_ENTRIES).
+- Nivel 2: Redis (JSON, TTL SUBMISSION_CACHE_TTL_SECONDS) compartido entre
+  workers; los hits de Redis se promueven al LRU.
+
+Sin REDIS_URL (o sin el paquete redis) funciona solo en memoria; los errores
+de Redis degradan a miss, nunca a excepción.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from .constants import (
+    SUBMISSION_CACHE_ENABLED,
+    SUBMISSION_CACHE_MAX_ENTRIES,
+    SUBMISSION_CACHE_TTL_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+try:
+    import redis
+    from redis.exceptions import RedisError
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+    RedisError = OSError
+
+# Cambiar al modificar el formato de lo guardado o el prompt de evaluación
+_CACHE_VERSION = "v1"
+
+# Lazy import to avoid circular dependency with api.monitoring
+_metrics_module = None
+_metrics_lock = threading.Lock()
+
+
+def _get_metrics():
+    """Lazy load metrics module to avoid circular imports."""
+    global _metrics_module
+    if _metrics_module is None:
+        with _metrics_lock:
+            if _metrics_module is None:
+                try:
+                    from ..api.monitoring import metrics as m
+                    _metrics_module = m
+                except ImportError:
+                    _metrics_module = False
+    return _metrics_module if _metrics_module else None
+
+
+def normalize_code(code: str) -> str:
+    """Fines de línea, espacios al final de línea y líneas vacías finales."""
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).rstrip("\n")
+
+
+def exercise_version_hash(exercise: Dict[str, Any]) -> str:
+    """Hash del JSON completo del ejercicio (cambia con cualquier edición)."""
+    canonical = json.dumps(exercise, sort_keys=True, ensure_ascii=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def submission_key(exercise: Dict[str, Any], code: str) -> Tuple[str, str, str]:
+    """(exercise_id, hash de versión del ejercicio, hash del código normalizado)."""
+    code_hash = hashlib.sha256(normalize_code(code).encode("utf-8")).hexdigest()
+    return str(exercise["id"]), exercise_version_hash(exercise), code_hash
+
+
+class SubmissionCache:
+    """Resultados de entregas: LRU en proceso delante de Redis."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        max_entries: int = SUBMISSION_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = SUBMISSION_CACHE_TTL_SECONDS,
+        prefix: str = "submission_cache:",
+        redis_client: Optional[Any] = None,
+    ):
+        """
+        Args:
+            redis_url: URL de Redis (default: REDIS_URL; sin URL solo nivel en memoria)
+            max_entries: Capacidad del LRU en proceso
+            ttl_seconds: Expiración de las entradas en Redis
+            prefix: Prefijo de las claves en Redis
+            redis_client: Cliente Redis ya creado (decode_responses=True)
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._local: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0, "stores": 0}
+        self._redis_error_logged = False
+
+        self._redis = redis_client
+        if self._redis is None and REDIS_AVAILABLE:
+            redis_url = redis_url or os.getenv("REDIS_URL")
+            if redis_url:
+                try:
+                    self._redis = redis.from_url(
+                        redis_url,
+                        decode_responses=True,
+                        socket_connect_timeout=5,
+                        socket_timeout=5,
+                    )
+                except Exception as e:
+                    logger.warning("Submission cache: Redis unavailable, memory only: %s", e)
+                    self._redis = None
+
+        logger.info(
+            "SubmissionCache initialized (memory entries: %d, redis: %s)",
+            self.max_entries, "yes" if self._redis is not None else "no"
+        )
+
+    def _redis_key(self, key: Tuple[str, str, str]) -> str:
+        exercise_id, version, code_hash = key
+        return f"{self.prefix}{_CACHE_VERSION}:{exercise_id}:{version}:{code_hash}"
+
+    def _local_put(self, key: Tuple[str, str, str], entry: Dict[str, Any]) -> None:
+        self._local[key] = entry
+        self._local.move_to_end(key)
+        while len(self._local) > self.max_entries:
+            self._local.popitem(last=False)
+
+    def _log_redis_error(self, operation: str, error: Exception) -> None:
+        if not self._redis_error_logged:
+            logger.error("Submission cache Redis error during %s: %s (treating as miss)", operation, error)
+            self._redis_error_logged = True
+
+    def _record(self, outcome: str) -> None:
+        with self._lock:
+            self._stats[outcome] += 1
+            total_hits = self._stats["memory_hits"] + self._stats["redis_hits"]
+            total_lookups = total_hits + self._stats["misses"]
+        metrics = _get_metrics()
+        if metrics:
+            hit = outcome != "misses"
+            metrics.record_cache_lookups(
+                "submission", hits=int(hit), misses=int(not hit),
+                total_hits=total_hits, total_lookups=total_lookups,
+            )
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def get(self, exercise: Dict[str, Any], code: str) -> Optional[Dict[str, Any]]:
+        """
+        Resultado cacheado para este código y esta versión del ejercicio.
+
+        Returns:
+            {"sandbox_result": ..., "evaluation": ...} o None
+        """
+        key = submission_key(exercise, code)
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is not None:
+                self._local.move_to_end(key)
+        if entry is not None:
+            self._record("memory_hits")
+            return entry
+
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(self._redis_key(key))
+            except (RedisError, OSError) as e:
+                self._log_redis_error("GET", e)
+                raw = None
+            if raw is not None:
+                try:
+                    entry = json.loads(raw)
+                except ValueError:
+                    entry = None
+            if entry is not None:
+                with self._lock:
+                    self._local_put(key, entry)
+                self._record("redis_hits")
+                return entry
+
+        self._record("misses")
+        return None
+
+    def set(
+        self,
+        exercise: Dict[str, Any],
+        code: str,
+        sandbox_result: Dict[str, Any],
+        evaluation: Dict[str, Any],
+    ) -> None:
+        """Guarda el resultado de una entrega en ambos niveles."""
+        key = submission_key(exercise, code)
+        entry = {"sandbox_result": sandbox_result, "evaluation": evaluation}
+        with self._lock:
+            self._local_put(key, entry)
+            self._stats["stores"] += 1
+
+        if self._redis is not None:
+            try:
+                self._redis.set(self._redis_key(key), json.dumps(entry, default=str), ex=self.ttl_seconds)
+            except (RedisError, OSError, TypeError) as e:
+                self._log_redis_error("SET", e)
+
+    def invalidate_exercise(self, exercise_id: str) -> int:
+        """
+        Descarta del nivel en memoria las entradas de un ejercicio.
+
+        En Redis no hace falta: la versión nueva del ejercicio usa otra clave
+        y las entradas viejas expiran por TTL.
+        """
+        with self._lock:
+            stale = [key for key in self._local if key[0] == str(exercise_id)]
+            for key in stale:
+                del self._local[key]
+        return len(stale)
+
+    def clear(self) -> None:
+        """Vacía el nivel en memoria (Redis expira por TTL)."""
+        with self._lock:
+            self._local.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._local)
+        lookups = stats["memory_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+        stats["redis_enabled"] = self._redis is not None
+        return stats
+
+
+# Instancia global (singleton) con thread-safety
+_submission_cache: Optional[SubmissionCache] = None
+_submission_cache_lock = threading.Lock()
+
+
+def get_submission_cache() -> Optional[SubmissionCache]:
+    """
+    Obtiene el caché de resultados de entregas (singleton).
+
+    Returns:
+        SubmissionCache, o None si SUBMISSION_CACHE_ENABLED=false
+    """
+    global _submission_cache
+
+    if not SUBMISSION_CACHE_ENABLED:
+        return None
+
+    if _submission_cache is None:
+        with _submission_cache_lock:
+            if _submission_cache is None:
+                _submission_cache = SubmissionCache()
+
+    return _submission_cache
+
+
+__all__ = [
+    "SubmissionCache",
+    "get_submission_cache",
+    "normalize_code",
+    "exercise_version_hash",
+    "submission_key",
+]
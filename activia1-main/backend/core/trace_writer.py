@@ -0,0 +1,477 @@
+"""
+Trace Writer - Persistencia write-behind de trazas cognitivas N4
+
+Cada interacción escribe al menos dos trazas (STUDENT_PROMPT + AI_RESPONSE) y
+TraceRepository.create hace add/commit/refresh por traza: dos commits
+síncronos por request. El TraceWriter encola las trazas en memoria y las
+persiste en lotes (un INSERT multi-fila + un commit por lote) cuando se alcanza
+TRACE_WRITER_BATCH_SIZE o pasa TRACE_WRITER_FLUSH_INTERVAL_MS.
+
+Garantías:
+- Read-your-writes dentro del worker: las trazas pendientes se exponen con
+  pending_for_session() y el AIGateway las combina con el historial de BD, así
+  el siguiente turno las ve aunque el lote aún no se haya escrito.
+- Fallback durable: si el lote falla se reintenta fila a fila (aislando filas
+  inválidas) y lo que sigue fallando se agrega a un spool JSONL
+  (TRACE_WRITER_SPOOL_PATH) que se reprocesa al iniciar y al detener el writer.
+- Backpressure: con más de TRACE_WRITER_MAX_PENDING trazas pendientes enqueue()
+  devuelve False y el llamador persiste de forma síncrona.
+- Flush final en el shutdown del lifespan de FastAPI (stop_trace_writer).
+
+Con varios workers uvicorn, read-your-writes aplica solo al worker que generó
+la traza; el intervalo de flush (default 500ms) es muy inferior a la latencia
+entre turnos de un estudiante.
+
+Habilitar con TRACE_WRITE_BEHIND_ENABLED=true (default: false, escritura síncrona).
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import AbstractContextManager
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..models.trace import CognitiveTrace
+from .constants import utc_now
+
+logger = logging.getLogger(__name__)
+
+# (trace, created_at asignado al encolar)
+_PendingEntry = Tuple[CognitiveTrace, datetime]
+
+DEFAULT_TRACE_WRITER_BATCH_SIZE = 100
+DEFAULT_TRACE_WRITER_FLUSH_INTERVAL_MS = 500
+DEFAULT_TRACE_WRITER_MAX_PENDING = 10000
+DEFAULT_TRACE_WRITER_SPOOL_PATH = "data/trace_spool.jsonl"
+
+
+def _default_session_factory() -> AbstractContextManager:
+    """Sesión de BD propia del writer (commit/rollback/close gestionados)."""
+    from ..database import get_db_session
+    return get_db_session()
+
+
+class TraceWriter:
+    """
+    Buffer write-behind de CognitiveTrace con flush por tamaño/tiempo.
+
+    enqueue() es O(1) y no hace IO; el flush corre en un thread (asyncio.to_thread)
+    con su propia sesión de BD para no bloquear el event loop.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = DEFAULT_TRACE_WRITER_BATCH_SIZE,
+        flush_interval_ms: int = DEFAULT_TRACE_WRITER_FLUSH_INTERVAL_MS,
+        max_pending: int = DEFAULT_TRACE_WRITER_MAX_PENDING,
+        spool_path: Optional[str] = DEFAULT_TRACE_WRITER_SPOOL_PATH,
+        session_factory: Optional[Callable[[], AbstractContextManager]] = None,
+    ):
+        """
+        Args:
+            batch_size: Trazas por INSERT/commit (y umbral que dispara un flush)
+            flush_interval_ms: Intervalo máximo entre flushes
+            max_pending: Máximo de trazas en memoria antes de rechazar enqueue()
+            spool_path: Archivo JSONL para lotes que no se pudieron persistir
+                (None deshabilita el spool: los lotes fallidos solo se loguean)
+            session_factory: Callable que devuelve un context manager de Session
+                (default: get_db_session)
+        """
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(1, flush_interval_ms) / 1000.0
+        self.max_pending = max(self.batch_size, max_pending)
+        self.spool_path = spool_path
+        self._session_factory = session_factory or _default_session_factory
+
+        self._pending: List[_PendingEntry] = []
+        self._inflight: List[_PendingEntry] = []
+        self._lock = threading.Lock()  # Protege _pending / _inflight / _stats
+        self._flush_lock = threading.Lock()  # Un solo flush a la vez
+        self._spool_lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running = False
+
+        self._stats: Dict[str, int] = {
+            "enqueued": 0,
+            "rejected": 0,
+            "flushed": 0,
+            "batches": 0,
+            "spooled": 0,
+            "replayed": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # API para el AIGateway
+    # ------------------------------------------------------------------
+
+    @property
+    def is_running(self) -> bool:
+        """True mientras el loop de flush está activo."""
+        return self._running
+
+    def enqueue(self, trace: CognitiveTrace) -> bool:
+        """
+        Encola una traza para persistencia diferida.
+
+        Returns:
+            True si se encoló; False si el writer no está corriendo o el buffer
+            está lleno (el llamador debe persistir de forma síncrona)
+        """
+        if not self._running:
+            return False
+
+        if not trace.id:
+            trace.id = str(uuid.uuid4())
+
+        with self._lock:
+            if len(self._pending) >= self.max_pending:
+                self._stats["rejected"] += 1
+                return False
+            self._pending.append((trace, utc_now()))
+            self._stats["enqueued"] += 1
+            should_wake = len(self._pending) >= self.batch_size
+
+        if should_wake:
+            self._signal_flush()
+        return True
+
+    def pending_for_session(self, session_id: str) -> List[CognitiveTrace]:
+        """Trazas aún no confirmadas en BD para una sesión, en orden de encolado."""
+        with self._lock:
+            entries = self._inflight + self._pending
+        return [trace for trace, _ in entries if trace.session_id == session_id]
+
+    def latest_pending(self, session_id: str) -> Optional[CognitiveTrace]:
+        """Última traza pendiente de la sesión (None si todas están en BD)."""
+        pending = self.pending_for_session(session_id)
+        return pending[-1] if pending else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores del writer (para métricas/health)."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["pending"] = len(self._pending) + len(self._inflight)
+        stats["running"] = self._running
+        return stats
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida (lifespan)
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Arranca el loop de flush y reprocesa el spool pendiente."""
+        if self._running:
+            logger.warning("Trace writer already running")
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._running = True
+
+        await asyncio.to_thread(self.replay_spool)
+
+        self._task = asyncio.create_task(self._flush_loop())
+        self._task.add_done_callback(_log_task_errors)
+        logger.info(
+            "Trace writer started (batch_size=%d, flush_interval=%.3fs)",
+            self.batch_size, self.flush_interval
+        )
+
+    async def stop(self) -> None:
+        """Detiene el loop y hace flush final de todo lo pendiente."""
+        if not self._running:
+            return
+
+        self._running = False
+        if self._wake is not None:
+            self._wake.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=10.0)
+            except (asyncio.CancelledError, asyncio.TimeoutError):
+                self._task.cancel()
+            self._task = None
+
+        # Flush final (enqueue ya rechaza nuevas trazas)
+        await asyncio.to_thread(self.flush_sync)
+        await asyncio.to_thread(self.replay_spool)
+        logger.info("Trace writer stopped", extra={"stats": self.stats()})
+
+    async def flush(self) -> int:
+        """Persiste todo lo pendiente sin bloquear el event loop."""
+        return await asyncio.to_thread(self.flush_sync)
+
+    # ------------------------------------------------------------------
+    # Flush / fallback (corren en threads)
+    # ------------------------------------------------------------------
+
+    def flush_sync(self) -> int:
+        """
+        Persiste todas las trazas pendientes en lotes de batch_size.
+
+        Returns:
+            Número de trazas confirmadas en BD
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    if not self._pending:
+                        break
+                    batch = self._pending[:self.batch_size]
+                    del self._pending[:self.batch_size]
+                    self._inflight = batch
+
+                try:
+                    written += self._write_entries(batch)
+                finally:
+                    with self._lock:
+                        self._inflight = []
+        return written
+
+    def _write_entries(self, entries: List[_PendingEntry]) -> int:
+        """Un INSERT multi-fila; si falla, fila a fila y spool de lo que no entra."""
+        from ..database.repositories import TraceRepository
+
+        started_at = time.perf_counter()
+        try:
+            with self._session_factory() as db:
+                TraceRepository(db).bulk_create(
+                    [trace for trace, _ in entries],
+                    created_at=[ts for _, ts in entries],
+                )
+            with self._lock:
+                self._stats["flushed"] += len(entries)
+                self._stats["batches"] += 1
+            logger.debug(
+                "Trace batch flushed",
+                extra={
+                    "batch_size": len(entries),
+                    "duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
+                }
+            )
+            return len(entries)
+        except Exception as e:
+            logger.warning(
+                "Trace batch insert failed, retrying row by row: %s", e,
+                extra={"batch_size": len(entries)}
+            )
+
+        return self._write_entries_individually(entries)
+
+    def _write_entries_individually(self, entries: List[_PendingEntry]) -> int:
+        """Aísla filas inválidas; omite las ya persistidas (replays idempotentes)."""
+        from ..database.repositories import TraceRepository
+
+        written = 0
+        done_ids = set()
+        failed: List[_PendingEntry] = []
+        try:
+            with self._session_factory() as db:
+                repo = TraceRepository(db)
+                done_ids.update(repo.get_existing_ids([trace.id for trace, _ in entries]))
+                for trace, ts in entries:
+                    if trace.id in done_ids:
+                        continue
+                    try:
+                        repo.bulk_create([trace], created_at=[ts])
+                        done_ids.add(trace.id)
+                        written += 1
+                    except Exception:
+                        failed.append((trace, ts))
+        except Exception as e:
+            # BD inaccesible: todo lo no escrito va al spool
+            logger.error("Trace writer cannot reach database: %s", e, exc_info=True)
+            failed = [entry for entry in entries if entry[0].id not in done_ids]
+
+        with self._lock:
+            self._stats["flushed"] += written
+        if failed:
+            self._spool(failed)
+        return written
+
+    def _spool(self, entries: List[_PendingEntry]) -> None:
+        """Agrega trazas no persistidas al spool JSONL (fallback durable)."""
+        if not self.spool_path:
+            logger.error(
+                "Dropping %d traces: database write failed and spool is disabled",
+                len(entries)
+            )
+            return
+
+        try:
+            with self._spool_lock:
+                spool_dir = os.path.dirname(self.spool_path)
+                if spool_dir:
+                    os.makedirs(spool_dir, exist_ok=True)
+                with open(self.spool_path, "a", encoding="utf-8") as f:
+                    for trace, ts in entries:
+                        f.write(json.dumps({
+                            "trace": trace.model_dump(mode="json", by_alias=True),
+                            "created_at": ts.isoformat(),
+                        }, ensure_ascii=False) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+            with self._lock:
+                self._stats["spooled"] += len(entries)
+            logger.warning(
+                "Spooled %d traces to %s for later replay", len(entries), self.spool_path
+            )
+        except Exception as e:
+            logger.error(
+                "Failed to spool %d traces: %s", len(entries), e, exc_info=True
+            )
+
+    def replay_spool(self) -> int:
+        """
+        Reprocesa el spool: lo renombra (las fallas nuevas van a un spool limpio),
+        reintenta en lotes y elimina el archivo reprocesado.
+
+        Returns:
+            Número de trazas recuperadas
+        """
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return 0
+
+        replay_path = f"{self.spool_path}.replay"
+        with self._spool_lock:
+            # Un .replay previo (crash durante replay) se retoma primero
+            if not os.path.exists(replay_path):
+                os.replace(self.spool_path, replay_path)
+
+        entries: List[_PendingEntry] = []
+        with open(replay_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                    entries.append((
+                        CognitiveTrace.model_validate(record["trace"]),
+                        datetime.fromisoformat(record["created_at"]),
+                    ))
+                except Exception as e:
+                    logger.error(
+                        "Skipping corrupt trace spool line %d: %s", line_number, e
+                    )
+
+        recovered = 0
+        for start in range(0, len(entries), self.batch_size):
+            batch = entries[start:start + self.batch_size]
+            # Fila a fila directamente: un replay parcial previo dejaría duplicados
+            recovered += self._write_entries_individually(batch)
+
+        os.remove(replay_path)
+        with self._lock:
+            self._stats["replayed"] += recovered
+        if entries:
+            logger.info(
+                "Replayed trace spool: %d/%d traces recovered", recovered, len(entries)
+            )
+        return recovered
+
+    # ------------------------------------------------------------------
+    # Loop de flush
+    # ------------------------------------------------------------------
+
+    def _signal_flush(self) -> None:
+        """Despierta el loop de flush (seguro desde cualquier thread)."""
+        if self._loop is None or self._wake is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is self._loop:
+            self._wake.set()
+        else:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _flush_loop(self) -> None:
+        while self._running:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                # Nunca debe morir el loop: las trazas quedan pendientes para el próximo ciclo
+                logger.error("Trace writer flush failed: %s", e, exc_info=True)
+
+
+def _log_task_errors(task: "asyncio.Task") -> None:
+    """Log any unhandled exceptions from the flush task."""
+    try:
+        exc = task.exception()
+        if exc:
+            logger.error("Trace writer task failed: %s", exc, exc_info=exc)
+    except asyncio.CancelledError:
+        pass
+
+
+# Instancia global (una por worker), creada en el lifespan
+_global_trace_writer: Optional[TraceWriter] = None
+_trace_writer_lock = threading.Lock()
+
+
+def is_trace_write_behind_enabled() -> bool:
+    """TRACE_WRITE_BEHIND_ENABLED=true habilita la escritura diferida."""
+    return os.getenv("TRACE_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+
+
+def get_trace_writer() -> Optional[TraceWriter]:
+    """
+    Writer global si está corriendo, None en caso contrario.
+
+    El AIGateway usa escritura síncrona cuando devuelve None.
+    """
+    writer = _global_trace_writer
+    if writer is not None and writer.is_running:
+        return writer
+    return None
+
+
+async def start_trace_writer() -> Optional[TraceWriter]:
+    """Crea y arranca el writer global desde variables de entorno (lifespan startup)."""
+    global _global_trace_writer
+
+    if not is_trace_write_behind_enabled():
+        logger.info("Trace write-behind disabled (TRACE_WRITE_BEHIND_ENABLED=false)")
+        return None
+
+    with _trace_writer_lock:
+        if _global_trace_writer is None:
+            _global_trace_writer = TraceWriter(
+                batch_size=int(os.getenv("TRACE_WRITER_BATCH_SIZE", str(DEFAULT_TRACE_WRITER_BATCH_SIZE))),
+                flush_interval_ms=int(os.getenv(
+                    "TRACE_WRITER_FLUSH_INTERVAL_MS", str(DEFAULT_TRACE_WRITER_FLUSH_INTERVAL_MS)
+                )),
+                max_pending=int(os.getenv("TRACE_WRITER_MAX_PENDING", str(DEFAULT_TRACE_WRITER_MAX_PENDING))),
+                spool_path=os.getenv("TRACE_WRITER_SPOOL_PATH", DEFAULT_TRACE_WRITER_SPOOL_PATH) or None,
+            )
+        writer = _global_trace_writer
+
+    await writer.start()
+    return writer
+
+
+async def stop_trace_writer() -> None:
+    """Flush final y detención del writer global (lifespan shutdown)."""
+    global _global_trace_writer
+
+    with _trace_writer_lock:
+        writer = _global_trace_writer
+        _global_trace_writer = None
+
+    if writer is not None:
+        await writer.stop()
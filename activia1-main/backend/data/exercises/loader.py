@@ -7,6 +7,14 @@ Este módulo proporciona funciones para:
 3. Listar todos los ejercicios disponibles
 4. Filtrar ejercicios por dificultad, tags, etc.
 
+Al cargar se arma un snapshot inmutable del catálogo con índices invertidos
+(unidad, dificultad, tag, lenguaje, framework), estadísticas y filtros ya
+calculados: search() resuelve con intersecciones de conjuntos y conserva el
+orden de carga. Los archivos unit*.json se revisan por mtime cada
+EXERCISES_RELOAD_INTERVAL_SECONDS; solo se vuelven a parsear los que
+cambiaron y el snapshot nuevo reemplaza al anterior de una vez, así que los
+lectores nunca esperan a una recarga.
+
 Uso:
     from backend.data.exercises.loader import ExerciseLoader
     
@@ -15,9 +23,133 @@ Uso:
     all_exercises = loader.get_all()
 """
 
+import copy
 import json
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, FrozenSet, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Cada cuánto se revisan los mtime de los archivos (<= 0 desactiva la recarga)
+EXERCISES_RELOAD_INTERVAL_SECONDS = float(os.getenv("EXERCISES_RELOAD_INTERVAL_SECONDS", "5"))
+
+DEFAULT_LANGUAGE = "python"
+
+
+def _unit_number(exercise_id: str) -> Optional[int]:
+    """Número de unidad a partir del ID (ej: "U1-VAR-01" -> 1)."""
+    try:
+        return int(exercise_id.split('-')[0][1:])
+    except (ValueError, IndexError):
+        return None
+
+
+def _language(exercise: Dict[str, Any]) -> str:
+    """Lenguaje del ejercicio: meta.language, si no el del editor, si no python."""
+    language = exercise['meta'].get('language')
+    if not language:
+        language = exercise.get('ui_config', {}).get('editor_language')
+    return language or DEFAULT_LANGUAGE
+
+
+@dataclass(frozen=True)
+class _UnitFile:
+    """Contenido parseado de un archivo de unidad y su firma en disco."""
+    signature: Tuple[int, int]  # (st_mtime_ns, st_size)
+    exercises: Tuple[Dict[str, Any], ...]
+
+
+@dataclass(frozen=True)
+class _Catalog:
+    """Snapshot inmutable del catálogo: se reemplaza entero, nunca se modifica."""
+    files: Dict[str, _UnitFile] = field(default_factory=dict)
+    by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    position: Dict[str, int] = field(default_factory=dict)
+    by_unit: Dict[int, FrozenSet[str]] = field(default_factory=dict)
+    by_difficulty: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    by_tag: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    by_language: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    by_framework: Dict[str, FrozenSet[str]] = field(default_factory=dict)
+    stats: Dict[str, Any] = field(default_factory=dict)
+    filters: Dict[str, List[Any]] = field(default_factory=dict)
+
+
+def _build_catalog(files: Dict[str, _UnitFile], unit_order: List[str]) -> _Catalog:
+    """Arma índices, estadísticas y filtros de una sola pasada."""
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for unit_file in unit_order:
+        for exercise in files[unit_file].exercises:
+            by_id[exercise['id']] = exercise
+    position = {exercise_id: index for index, exercise_id in enumerate(by_id)}
+
+    indexes: Dict[str, Dict[Any, set]] = {
+        'unit': {}, 'difficulty': {}, 'tag': {}, 'language': {}, 'framework': {},
+    }
+    difficulty_counts = {'Easy': 0, 'Medium': 0, 'Hard': 0}
+    language_counts: Dict[str, int] = {}
+    framework_counts: Dict[str, int] = {}
+    total_time = 0
+
+    for exercise_id, exercise in by_id.items():
+        meta = exercise['meta']
+        difficulty = meta['difficulty']
+        language = _language(exercise)
+        framework = meta.get('framework')
+        unit = _unit_number(exercise_id)
+
+        indexes['difficulty'].setdefault(difficulty, set()).add(exercise_id)
+        indexes['language'].setdefault(language, set()).add(exercise_id)
+        for tag in meta['tags']:
+            indexes['tag'].setdefault(tag, set()).add(exercise_id)
+        if framework:
+            indexes['framework'].setdefault(framework, set()).add(exercise_id)
+            framework_counts[framework] = framework_counts.get(framework, 0) + 1
+        if unit is not None:
+            indexes['unit'].setdefault(unit, set()).add(exercise_id)
+
+        difficulty_counts[difficulty] = difficulty_counts.get(difficulty, 0) + 1
+        language_counts[language] = language_counts.get(language, 0) + 1
+        total_time += meta.get('estimated_time_min', 0)
+
+    frozen = {
+        name: {key: frozenset(ids) for key, ids in index.items()}
+        for name, index in indexes.items()
+    }
+    tags = sorted(frozen['tag'])
+
+    return _Catalog(
+        files=dict(files),
+        by_id=by_id,
+        position=position,
+        by_unit=frozen['unit'],
+        by_difficulty=frozen['difficulty'],
+        by_tag=frozen['tag'],
+        by_language=frozen['language'],
+        by_framework=frozen['framework'],
+        stats={
+            'total_exercises': len(by_id),
+            'by_difficulty': difficulty_counts,
+            'by_language': language_counts,
+            'by_framework': framework_counts,
+            'total_time_min': total_time,
+            'total_time_hours': round(total_time / 60, 1),
+            'unique_tags': len(tags),
+            'tags': tags,
+            'units': len(unit_order),
+        },
+        filters={
+            'difficulties': sorted(frozen['difficulty']),
+            'languages': sorted(frozen['language']),
+            'frameworks': sorted(frozen['framework']),
+            'tags': tags,
+            'units': sorted(frozen['unit']),
+        },
+    )
 
 
 class ExerciseLoader:
@@ -34,21 +166,127 @@ class ExerciseLoader:
         "unit7_springboot.json",
     ]
     
-    def __init__(self):
-        """Inicializa el loader."""
-        self._cache: Dict[str, Any] = {}
+    def __init__(
+        self,
+        exercises_dir: Optional[Path] = None,
+        reload_interval: Optional[float] = None,
+    ):
+        """
+        Inicializa el loader.
+
+        Args:
+            exercises_dir: Directorio de los unit*.json (default: EXERCISES_DIR)
+            reload_interval: Segundos entre revisiones de mtime
+                (default: EXERCISES_RELOAD_INTERVAL_SECONDS; <= 0 desactiva)
+        """
+        self.exercises_dir = Path(exercises_dir) if exercises_dir else self.EXERCISES_DIR
+        if reload_interval is None:
+            reload_interval = EXERCISES_RELOAD_INTERVAL_SECONDS
+        self.reload_interval = reload_interval
+        self._reload_lock = threading.Lock()
+        self._last_check = time.monotonic()
+        self._catalog = _Catalog()
         self._load_all_exercises()
     
-    def _load_all_exercises(self) -> None:
-        """Carga todos los ejercicios en el caché."""
-        for unit_file in self.UNITS:
-            file_path = self.EXERCISES_DIR / unit_file
-            if file_path.exists():
+    # ------------------------------------------------------------------
+    # Carga y recarga
+    # ------------------------------------------------------------------
+
+    def _unit_files(self) -> List[str]:
+        """UNITS en su orden y luego cualquier otro unit*.json del directorio."""
+        known = [name for name in self.UNITS if (self.exercises_dir / name).exists()]
+        extra = sorted(
+            path.name for path in self.exercises_dir.glob("unit*.json")
+            if path.name not in self.UNITS
+        )
+        return known + extra
+
+    def _load_all_exercises(self) -> bool:
+        """
+        Revisa los archivos y reemplaza el snapshot si alguno cambió.
+
+        Solo se parsean los archivos nuevos o con otra (mtime, tamaño); un
+        archivo con JSON inválido conserva su versión anterior.
+
+        Returns:
+            True si se publicó un snapshot nuevo
+        """
+        current = self._catalog
+        unit_order = self._unit_files()
+        files: Dict[str, _UnitFile] = {}
+        changed = list(current.files) != unit_order
+
+        for unit_file in unit_order:
+            file_path = self.exercises_dir / unit_file
+            previous = current.files.get(unit_file)
+            try:
+                stat = file_path.stat()
+            except OSError:
+                changed = True
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if previous is not None and previous.signature == signature:
+                files[unit_file] = previous
+                continue
+            try:
                 with open(file_path, 'r', encoding='utf-8') as f:
-                    exercises = json.load(f)
-                    for exercise in exercises:
-                        self._cache[exercise['id']] = exercise
-    
+                    exercises = tuple(json.load(f))
+            except (OSError, ValueError) as e:
+                logger.error("Could not load exercises from %s: %s", file_path, e)
+                if previous is not None:
+                    files[unit_file] = previous
+                continue
+            files[unit_file] = _UnitFile(signature=signature, exercises=exercises)
+            changed = True
+            if previous is not None:
+                logger.info("Exercise unit reloaded: %s (%d exercises)", unit_file, len(exercises))
+
+        if not changed:
+            return False
+        self._catalog = _build_catalog(files, [name for name in unit_order if name in files])
+        return True
+
+    def reload(self) -> bool:
+        """
+        Fuerza la revisión de los archivos de unidades.
+
+        Returns:
+            True si algún archivo cambió y se publicó un snapshot nuevo
+        """
+        with self._reload_lock:
+            self._last_check = time.monotonic()
+            return self._load_all_exercises()
+
+    def _current(self) -> _Catalog:
+        """
+        Snapshot vigente, revisando los archivos si venció el intervalo.
+
+        Solo un hilo recarga; el resto sigue leyendo el snapshot anterior en
+        lugar de esperar el lock.
+        """
+        if (
+            self.reload_interval > 0
+            and time.monotonic() - self._last_check >= self.reload_interval
+            and self._reload_lock.acquire(blocking=False)
+        ):
+            try:
+                self._last_check = time.monotonic()
+                self._load_all_exercises()
+            except Exception as e:
+                logger.error("Exercise catalog reload failed: %s", e)
+            finally:
+                self._reload_lock.release()
+        return self._catalog
+
+    @staticmethod
+    def _ordered(catalog: _Catalog, ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Ejercicios de `ids` en el orden de carga."""
+        return [catalog.by_id[i] for i in sorted(ids, key=catalog.position.__getitem__)]
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+
     def get_by_id(self, exercise_id: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene un ejercicio por su ID.
@@ -59,7 +297,7 @@ class ExerciseLoader:
         Returns:
             Diccionario con el ejercicio o None si no existe
         """
-        return self._cache.get(exercise_id)
+        return self._current().by_id.get(exercise_id)
     
     def get_all(self) -> List[Dict[str, Any]]:
         """
@@ -68,23 +306,20 @@ class ExerciseLoader:
         Returns:
             Lista de todos los ejercicios
         """
-        return list(self._cache.values())
+        return list(self._current().by_id.values())
     
     def get_by_unit(self, unit: int) -> List[Dict[str, Any]]:
         """
         Obtiene ejercicios de una unidad específica.
         
         Args:
-            unit: Número de unidad (1-5)
+            unit: Número de unidad (1-7)
         
         Returns:
             Lista de ejercicios de esa unidad
         """
-        unit_prefix = f"U{unit}-"
-        return [
-            ex for ex in self._cache.values()
-            if ex['id'].startswith(unit_prefix)
-        ]
+        catalog = self._current()
+        return self._ordered(catalog, catalog.by_unit.get(unit, ()))
     
     def get_by_difficulty(self, difficulty: str) -> List[Dict[str, Any]]:
         """
@@ -96,10 +331,8 @@ class ExerciseLoader:
         Returns:
             Lista de ejercicios con esa dificultad
         """
-        return [
-            ex for ex in self._cache.values()
-            if ex['meta']['difficulty'] == difficulty
-        ]
+        catalog = self._current()
+        return self._ordered(catalog, catalog.by_difficulty.get(difficulty, ()))
     
     def get_by_tag(self, tag: str) -> List[Dict[str, Any]]:
         """
@@ -111,10 +344,8 @@ class ExerciseLoader:
         Returns:
             Lista de ejercicios con ese tag
         """
-        return [
-            ex for ex in self._cache.values()
-            if tag in ex['meta']['tags']
-        ]
+        catalog = self._current()
+        return self._ordered(catalog, catalog.by_tag.get(tag, ()))
     
     def search(
         self,
@@ -135,41 +366,32 @@ class ExerciseLoader:
             framework: Filtrar por framework ("spring-boot")
         
         Returns:
-            Lista de ejercicios que cumplen los criterios
+            Lista de ejercicios que cumplen los criterios, en orden de carga
         """
-        results = self.get_all()
-        
+        catalog = self._current()
+        candidates: List[FrozenSet[str]] = []
+
         if difficulty:
-            results = [ex for ex in results if ex['meta']['difficulty'] == difficulty]
-        
+            candidates.append(catalog.by_difficulty.get(difficulty, frozenset()))
         if tags:
-            results = [
-                ex for ex in results
-                if any(tag in ex['meta']['tags'] for tag in tags)
-            ]
-        
+            candidates.append(frozenset().union(*(catalog.by_tag.get(tag, ()) for tag in tags)))
         if unit:
-            results = [ex for ex in results if ex['id'].startswith(f"U{unit}-")]
-        
+            candidates.append(catalog.by_unit.get(unit, frozenset()))
         if language:
-            results = [
-                ex for ex in results
-                if ex['meta'].get('language', 'python') == language
-            ]
-        
+            candidates.append(catalog.by_language.get(language, frozenset()))
         if framework:
-            results = [
-                ex for ex in results
-                if ex['meta'].get('framework') == framework
-            ]
-        
-        if language:
-            results = [
-                ex for ex in results
-                if ex['ui_config']['editor_language'] == language
-            ]
-        
-        return results
+            candidates.append(catalog.by_framework.get(framework, frozenset()))
+
+        if not candidates:
+            return list(catalog.by_id.values())
+
+        candidates.sort(key=len)
+        matches = set(candidates[0])
+        for ids in candidates[1:]:
+            if not matches:
+                break
+            matches &= ids
+        return self._ordered(catalog, matches)
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -178,44 +400,7 @@ class ExerciseLoader:
         Returns:
             Diccionario con estadísticas
         """
-        exercises = self.get_all()
-        
-        difficulty_counts = {
-            'Easy': 0,
-            'Medium': 0,
-            'Hard': 0,
-        }
-        
-        language_counts = {}
-        framework_counts = {}
-        total_time = 0
-        all_tags = set()
-        
-        for ex in exercises:
-            difficulty_counts[ex['meta']['difficulty']] += 1
-            total_time += ex['meta']['estimated_time_min']
-            all_tags.update(ex['meta']['tags'])
-            
-            # Conteo por lenguaje
-            lang = ex['meta'].get('language', 'python')
-            language_counts[lang] = language_counts.get(lang, 0) + 1
-            
-            # Conteo por framework
-            fw = ex['meta'].get('framework')
-            if fw:
-                framework_counts[fw] = framework_counts.get(fw, 0) + 1
-        
-        return {
-            'total_exercises': len(exercises),
-            'by_difficulty': difficulty_counts,
-            'by_language': language_counts,
-            'by_framework': framework_counts,
-            'total_time_min': total_time,
-            'total_time_hours': round(total_time / 60, 1),
-            'unique_tags': len(all_tags),
-            'tags': sorted(list(all_tags)),
-            'units': len(self.UNITS),
-        }
+        return copy.deepcopy(self._current().stats)
     
     def get_available_filters(self) -> Dict[str, List[str]]:
         """
@@ -224,34 +409,7 @@ class ExerciseLoader:
         Returns:
             Diccionario con listas de valores disponibles
         """
-        exercises = self.get_all()
-        
-        difficulties = set()
-        languages = set()
-        frameworks = set()
-        tags = set()
-        units = set()
-        
-        for ex in exercises:
-            difficulties.add(ex['meta']['difficulty'])
-            languages.add(ex['meta'].get('language', 'python'))
-            tags.update(ex['meta']['tags'])
-            
-            fw = ex['meta'].get('framework')
-            if fw:
-                frameworks.add(fw)
-            
-            # Extraer número de unidad del ID (ej: "U1-VAR-01" -> 1)
-            unit_num = int(ex['id'].split('-')[0][1:])
-            units.add(unit_num)
-        
-        return {
-            'difficulties': sorted(list(difficulties)),
-            'languages': sorted(list(languages)),
-            'frameworks': sorted(list(frameworks)),
-            'tags': sorted(list(tags)),
-            'units': sorted(list(units)),
-        }
+        return copy.deepcopy(self._current().filters)
 
 
 # Instancia global para uso directo
@@ -10,9 +10,16 @@ Provides:
 - Transaction management utilities
 - Background task session management (production pattern)
 """
-from .config import DatabaseConfig, get_db_session, init_database, get_db_config
+from .config import (
+    DatabaseConfig,
+    get_db_session,
+    get_async_db_session,
+    is_async_database_enabled,
+    init_database,
+    get_db_config,
+)
 from .base import Base
-from .transaction import transaction, transactional, TransactionManager
+from .transaction import transaction, async_transaction, transactional, TransactionManager
 
 # Background task session management (NEW - Production Pattern)
 from .background_session import (
@@ -49,6 +56,9 @@ from .repositories import (
     SessionRepository,
     TraceRepository,
     RiskRepository,
+    AsyncSessionRepository,
+    AsyncTraceRepository,
+    AsyncRiskRepository,
     EvaluationRepository,
     TraceSequenceRepository,
     ActivityRepository,
@@ -69,11 +79,14 @@ __all__ = [
     # Configuration
     "DatabaseConfig",
     "get_db_session",
+    "get_async_db_session",
+    "is_async_database_enabled",
     "init_database",
     "get_db_config",
     "Base",
     # Transaction management
     "transaction",
+    "async_transaction",
     "transactional",
     "TransactionManager",
     # Background task session management (NEW)
@@ -102,6 +115,9 @@ __all__ = [
     "SessionRepository",
     "TraceRepository",
     "RiskRepository",
+    "AsyncSessionRepository",
+    "AsyncTraceRepository",
+    "AsyncRiskRepository",
     "EvaluationRepository",
     "TraceSequenceRepository",
     "ActivityRepository",
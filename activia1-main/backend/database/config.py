@@ -12,7 +12,12 @@ to prevent race conditions in multi-worker deployments.
 
 FIX Cortez79: Load dotenv at module level to ensure DATABASE_URL is available
 before any database initialization occurs.
+
+Async engine (asyncpg / aiosqlite) for the event-loop hot path: the same
+DATABASE_URL is mapped to its async driver so request handlers can await
+DB round-trips instead of blocking the uvicorn worker.
 """
+import importlib.util
 import logging
 import os
 import threading
@@ -20,10 +25,11 @@ import threading
 # FIX Cortez79: Load .env FIRST before reading any environment variables
 from dotenv import load_dotenv
 load_dotenv()
-from contextlib import contextmanager
-from typing import Generator, Optional
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncGenerator, Generator, Optional
 
 from sqlalchemy import create_engine, event, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
@@ -41,6 +47,36 @@ def _import_all_models():
 _import_all_models()
 
 
+# Sync driver URL prefix -> (async driver URL prefix, module that must be importable)
+_ASYNC_DRIVERS = {
+    "postgresql+psycopg2://": ("postgresql+asyncpg://", "asyncpg"),
+    "postgresql://": ("postgresql+asyncpg://", "asyncpg"),
+    "postgres://": ("postgresql+asyncpg://", "asyncpg"),
+    "sqlite:///": ("sqlite+aiosqlite:///", "aiosqlite"),
+}
+
+
+def _to_async_url(database_url: str) -> Optional[str]:
+    """
+    Map a sync SQLAlchemy URL to its async driver equivalent.
+
+    Returns:
+        Async URL, or None if the backend has no supported async driver
+    """
+    for sync_prefix, (async_prefix, _module) in _ASYNC_DRIVERS.items():
+        if database_url.startswith(sync_prefix):
+            return async_prefix + database_url[len(sync_prefix):]
+    return None
+
+
+def _async_driver_module(database_url: str) -> Optional[str]:
+    """Name of the async driver module required for database_url."""
+    for sync_prefix, (_async_prefix, module) in _ASYNC_DRIVERS.items():
+        if database_url.startswith(sync_prefix):
+            return module
+    return None
+
+
 class DatabaseConfig:
     """
     Database configuration manager with production-ready connection pooling.
@@ -88,6 +124,9 @@ class DatabaseConfig:
 
         self._engine: Optional[Engine] = None
         self._session_factory: Optional[sessionmaker] = None
+        self._async_engine: Optional[AsyncEngine] = None
+        self._async_session_factory: Optional[async_sessionmaker] = None
+        self._async_lock = threading.Lock()
 
     def get_engine(self) -> Engine:
         """Get or create SQLAlchemy engine"""
@@ -139,6 +178,83 @@ class DatabaseConfig:
             )
         return self._session_factory
 
+    @property
+    def async_database_url(self) -> Optional[str]:
+        """DATABASE_URL mapped to its async driver (asyncpg / aiosqlite)."""
+        return _to_async_url(self.database_url)
+
+    def supports_async(self) -> bool:
+        """
+        Whether the async engine can be used for this database.
+
+        Requires DB_ASYNC_ENABLED (default true), a supported backend with its
+        async driver installed, and a database shared across connections:
+        in-memory SQLite would give the async engine a separate, empty DB.
+        """
+        if os.getenv("DB_ASYNC_ENABLED", "true").lower() != "true":
+            return False
+        if ":memory:" in self.database_url or self.async_database_url is None:
+            return False
+        driver = _async_driver_module(self.database_url)
+        return driver is not None and importlib.util.find_spec(driver) is not None
+
+    def get_async_engine(self) -> AsyncEngine:
+        """
+        Get or create the async SQLAlchemy engine.
+
+        Pool settings mirror the sync engine so both share the same limits.
+
+        Raises:
+            RuntimeError: If async access is not supported (see supports_async)
+        """
+        if self._async_engine is None:
+            with self._async_lock:
+                if self._async_engine is None:
+                    if not self.supports_async():
+                        raise RuntimeError(
+                            "Async database access not available for this DATABASE_URL "
+                            "(install asyncpg/aiosqlite or set DB_ASYNC_ENABLED=true)"
+                        )
+
+                    if self.database_url.startswith("sqlite"):
+                        self._async_engine = create_async_engine(
+                            self.async_database_url,
+                            echo=self.echo,
+                        )
+
+                        @event.listens_for(self._async_engine.sync_engine, "connect")
+                        def set_sqlite_pragma(dbapi_conn, connection_record):
+                            cursor = dbapi_conn.cursor()
+                            cursor.execute("PRAGMA foreign_keys=ON")
+                            cursor.close()
+                    else:
+                        self._async_engine = create_async_engine(
+                            self.async_database_url,
+                            echo=self.echo,
+                            pool_size=self.pool_size,
+                            max_overflow=self.max_overflow,
+                            pool_timeout=self.pool_timeout,
+                            pool_recycle=self.pool_recycle,
+                            pool_pre_ping=self.pool_pre_ping,
+                            pool_use_lifo=True,
+                            connect_args={
+                                "timeout": 10,  # Connection timeout in seconds
+                                "server_settings": {"statement_timeout": "30000"},  # Query timeout: 30s
+                            },
+                        )
+
+        return self._async_engine
+
+    def get_async_session_factory(self) -> async_sessionmaker:
+        """Get or create the async session factory"""
+        if self._async_session_factory is None:
+            self._async_session_factory = async_sessionmaker(
+                bind=self.get_async_engine(),
+                autoflush=False,
+                expire_on_commit=False,  # ORM objects stay readable after commit (no lazy IO)
+            )
+        return self._async_session_factory
+
     def create_all_tables(self):
         """Create all tables in the database"""
         Base.metadata.create_all(bind=self.get_engine())
@@ -153,12 +269,26 @@ class DatabaseConfig:
             self._engine.dispose()
             self._engine = None
             self._session_factory = None
+        if self._async_engine:
+            # Sync dispose of the async pool (for callers outside the event loop)
+            self._async_engine.sync_engine.dispose()
+            self._async_engine = None
+            self._async_session_factory = None
+
+    async def close_async(self):
+        """Close async and sync database connections (call from the event loop)"""
+        if self._async_engine:
+            await self._async_engine.dispose()
+            self._async_engine = None
+            self._async_session_factory = None
+        self.close()
 
 
 # Global database configuration instance
 # FIX Cortez67: Added thread lock for thread-safe singleton initialization
+# RLock: get_db_config() calls init_database() while already holding the lock
 _db_config: Optional[DatabaseConfig] = None
-_db_config_lock = threading.Lock()
+_db_config_lock = threading.RLock()
 
 
 def init_database(
@@ -235,6 +365,37 @@ def get_db_session() -> Generator[Session, None, None]:
         session.close()
 
 
+def is_async_database_enabled() -> bool:
+    """Whether async sessions (get_async_db_session) are available."""
+    return get_db_config().supports_async()
+
+
+@asynccontextmanager
+async def get_async_db_session() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Async context manager for database sessions (event-loop hot path)
+
+    Usage:
+        async with get_async_db_session() as session:
+            session.add(obj)
+            await session.commit()
+
+    Raises:
+        RuntimeError: If async access is not available (see is_async_database_enabled)
+    """
+    session_factory = get_db_config().get_async_session_factory()
+    session = session_factory()
+
+    try:
+        yield session
+        await session.commit()
+    except Exception:
+        await session.rollback()
+        raise
+    finally:
+        await session.close()
+
+
 def get_session() -> Session:
     """
     Get a new database session (manual management)
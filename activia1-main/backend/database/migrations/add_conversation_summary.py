@@ -0,0 +1,68 @@
+"""
+Migration: Add conversation_summary column to sessions
+
+Resumen incremental del historial conversacional: los turnos que quedan fuera
+de la ventana de cola (HISTORY_TAIL_MESSAGES) se resumen con el LLM y el
+resumen se guarda en la sesión, en lugar de recargar toda la conversación en
+cada interacción.
+
+Esta migracion:
+1. Agrega sessions.conversation_summary (JSONB en PostgreSQL, JSON en SQLite)
+
+El índice idx_session_created_desc (session_id, created_at) de cognitive_traces
+ya existente cubre la lectura de la cola (ORDER BY created_at DESC LIMIT n).
+
+Usage:
+    python -m backend.database.migrations.add_conversation_summary
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from sqlalchemy import inspect, text
+
+from backend.database.config import get_db_config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def add_conversation_summary_column(engine) -> bool:
+    """
+    Add sessions.conversation_summary if missing.
+
+    Returns:
+        True if the column was added, False if it already existed
+    """
+    columns = {col["name"] for col in inspect(engine).get_columns("sessions")}
+    if "conversation_summary" in columns:
+        logger.info("sessions.conversation_summary already exists, skipping")
+        return False
+
+    column_type = "JSONB" if engine.dialect.name == "postgresql" else "JSON"
+    with engine.connect() as conn:
+        conn.execute(text(f"ALTER TABLE sessions ADD COLUMN conversation_summary {column_type}"))
+        conn.commit()
+    logger.info(f"Added sessions.conversation_summary ({column_type})")
+    return True
+
+
+def run_migration():
+    """Run the complete migration."""
+    logger.info("=" * 60)
+    logger.info("Running conversation summary migration")
+    logger.info("=" * 60)
+
+    engine = get_db_config().get_engine()
+    add_conversation_summary_column(engine)
+
+    logger.info("=" * 60)
+    logger.info("Migration completed successfully!")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,159 @@
+"""
+Migration: ANN index (HNSW / IVFFlat) for knowledge_documents.embedding
+
+add_knowledge_rag creaba un indice IVFFlat con lists=100 sobre la tabla
+recien creada (vacia): los centroides se calculan al construir el indice,
+asi que quedaba entrenado sin datos y el recall era pobre. Al ingerir
+bibliografias completas la busqueda RAG necesita un indice ANN bien
+dimensionado.
+
+Esta migracion:
+1. Crea el indice segun RAG_ANN_INDEX:
+   - hnsw (default): m=RAG_HNSW_M, ef_construction=RAG_HNSW_EF_CONSTRUCTION.
+     No requiere datos previos y se mantiene solo al insertar.
+   - ivfflat: lists = filas/1000 (<= 1M filas) o sqrt(filas); conviene
+     ejecutarla despues de la carga inicial y repetirla (--rebuild) si la
+     coleccion crece mucho.
+2. Elimina el indice IVFFlat previo (idx_knowledge_embedding)
+3. ANALYZE knowledge_documents
+
+Los parametros de consulta (hnsw.ef_search, ivfflat.probes) se fijan por
+consulta en KnowledgeRepository (RAG_HNSW_EF_SEARCH, RAG_IVFFLAT_PROBES).
+
+Usage:
+    python -m backend.database.migrations.add_knowledge_ann_index [--rebuild]
+
+Note:
+    - Solo PostgreSQL con pgvector y columna embedding vector(384)
+    - CREATE INDEX CONCURRENTLY: no bloquea escrituras durante el build
+    - HNSW requiere pgvector >= 0.5.0
+"""
+import logging
+import math
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from sqlalchemy import text
+
+from backend.core.constants import RAG_ANN_INDEX_TYPE, RAG_HNSW_EF_CONSTRUCTION, RAG_HNSW_M
+from backend.database.config import get_db_config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LEGACY_INDEX_NAME = "idx_knowledge_embedding"
+HNSW_INDEX_NAME = "idx_knowledge_embedding_hnsw"
+IVFFLAT_INDEX_NAME = "idx_knowledge_embedding_ivfflat"
+
+# Memoria para construir el indice (HNSW se construye mucho mas rapido si el grafo entra en memoria)
+BUILD_MAINTENANCE_WORK_MEM = os.getenv("RAG_ANN_BUILD_MEMORY", "512MB")
+
+
+def has_vector_column(engine) -> bool:
+    """Check that knowledge_documents.embedding is a pgvector column."""
+    if engine.dialect.name != "postgresql":
+        return False
+    with engine.connect() as conn:
+        result = conn.execute(text("""
+            SELECT udt_name
+            FROM information_schema.columns
+            WHERE table_name = 'knowledge_documents'
+            AND column_name = 'embedding'
+        """))
+        row = result.fetchone()
+    return row is not None and row[0] == "vector"
+
+
+def ivfflat_lists(row_count: int) -> int:
+    """Lists recomendadas por pgvector: filas/1000 hasta 1M filas, luego sqrt(filas)."""
+    if row_count <= 1_000_000:
+        return max(10, row_count // 1000)
+    return int(math.sqrt(row_count))
+
+
+def ann_index_sql(index_type: str, row_count: int = 0) -> tuple:
+    """
+    Build the CREATE INDEX statement for the configured ANN index.
+
+    Returns:
+        (index_name, sql)
+    """
+    if index_type == "hnsw":
+        return HNSW_INDEX_NAME, (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {HNSW_INDEX_NAME} "
+            f"ON knowledge_documents USING hnsw (embedding vector_cosine_ops) "
+            f"WITH (m = {int(RAG_HNSW_M)}, ef_construction = {int(RAG_HNSW_EF_CONSTRUCTION)})"
+        )
+    if index_type == "ivfflat":
+        return IVFFLAT_INDEX_NAME, (
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {IVFFLAT_INDEX_NAME} "
+            f"ON knowledge_documents USING ivfflat (embedding vector_cosine_ops) "
+            f"WITH (lists = {ivfflat_lists(row_count)})"
+        )
+    raise ValueError(f"Unsupported RAG_ANN_INDEX: {index_type!r} (expected 'hnsw' or 'ivfflat')")
+
+
+def create_ann_index(engine, index_type: str = RAG_ANN_INDEX_TYPE, rebuild: bool = False) -> bool:
+    """
+    Create the ANN index and drop the other vector indexes.
+
+    Args:
+        engine: SQLAlchemy engine (PostgreSQL)
+        index_type: 'hnsw' or 'ivfflat'
+        rebuild: Drop and recreate the index (e.g. IVFFlat after large ingestions)
+
+    Returns:
+        True if the index exists after the migration
+    """
+    if not has_vector_column(engine):
+        logger.warning("knowledge_documents.embedding vector column not found, skipping ANN index")
+        return False
+
+    # CONCURRENTLY no puede ejecutarse dentro de una transaccion
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        row_count = conn.execute(text(
+            "SELECT count(*) FROM knowledge_documents WHERE embedding IS NOT NULL"
+        )).scalar() or 0
+        index_name, index_sql = ann_index_sql(index_type, row_count)
+
+        if index_type == "ivfflat" and row_count < 1000:
+            logger.warning(
+                f"Only {row_count} embeddings: IVFFlat centroids will be poor. "
+                "Re-run with --rebuild after loading the knowledge base, or use RAG_ANN_INDEX=hnsw"
+            )
+
+        if rebuild:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+
+        conn.execute(text(f"SET maintenance_work_mem = '{BUILD_MAINTENANCE_WORK_MEM}'"))
+        logger.info(f"Creating {index_type} index {index_name} over {row_count} embeddings")
+        conn.execute(text(index_sql))
+
+        for stale in {LEGACY_INDEX_NAME, HNSW_INDEX_NAME, IVFFLAT_INDEX_NAME} - {index_name}:
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {stale}"))
+
+        conn.execute(text("ANALYZE knowledge_documents"))
+
+    logger.info(f"Index {index_name} ready")
+    return True
+
+
+def run_migration(rebuild: bool = False):
+    """Run the complete migration."""
+    logger.info("=" * 60)
+    logger.info("Running knowledge ANN index migration")
+    logger.info("=" * 60)
+
+    engine = get_db_config().get_engine()
+    create_ann_index(engine, rebuild=rebuild)
+
+    logger.info("=" * 60)
+    logger.info("Migration completed successfully!")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    run_migration(rebuild="--rebuild" in sys.argv[1:])
@@ -6,7 +6,7 @@ Cortez87: Implementacion de RAG para enriquecer respuestas de agentes.
 Esta migracion:
 1. Habilita la extension pgvector si no existe
 2. Crea la tabla knowledge_documents con columna vector(384)
-3. Crea indices para busqueda vectorial (IVFFlat)
+3. Crea el indice ANN para busqueda vectorial (HNSW, ver add_knowledge_ann_index)
 4. Crea indices para filtros frecuentes
 
 Usage:
@@ -27,7 +27,8 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirna
 from sqlalchemy import text
 from sqlalchemy.exc import ProgrammingError, OperationalError
 
-from backend.database.config import get_engine, get_db_session
+from backend.database.config import get_db_config, get_db_session
+from backend.database.migrations.add_knowledge_ann_index import create_ann_index
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -142,17 +143,8 @@ def create_indexes(engine, use_vector: bool = True):
         ("idx_knowledge_active", "CREATE INDEX IF NOT EXISTS idx_knowledge_active ON knowledge_documents(deleted_at, content_type)"),
     ]
 
-    # Vector index (IVFFlat) - only if pgvector available
-    if use_vector:
-        indexes.append((
-            "idx_knowledge_embedding",
-            """
-            CREATE INDEX IF NOT EXISTS idx_knowledge_embedding
-            ON knowledge_documents
-            USING ivfflat (embedding vector_cosine_ops)
-            WITH (lists = 100)
-            """
-        ))
+    # Vector index: created by add_knowledge_ann_index.create_ann_index
+    # (an IVFFlat index built here would be trained on an empty table)
 
     with engine.connect() as conn:
         for idx_name, idx_sql in indexes:
@@ -198,7 +190,7 @@ def run_migration():
     logger.info("Cortez87: Running RAG Knowledge Documents Migration")
     logger.info("=" * 60)
 
-    engine = get_engine()
+    engine = get_db_config().get_engine()
 
     # Step 1: Check if pgvector is available
     pgvector_available = check_pgvector_available(engine)
@@ -219,6 +211,10 @@ def run_migration():
     # Step 5: Create indexes
     create_indexes(engine, use_vector=use_vector)
 
+    # Step 6: ANN index over the embedding column
+    if use_vector:
+        create_ann_index(engine)
+
     logger.info("=" * 60)
     logger.info("Migration completed successfully!")
     if not use_vector:
@@ -0,0 +1,63 @@
+"""
+Migration: Add research_export_jobs table
+
+Exportaciones de investigación en background (services/export_jobs.py): el
+request crea un job y los workers lo reclaman con alquiler (lease) mediante
+SELECT ... FOR UPDATE SKIP LOCKED. El artefacto se guarda por partes en el
+almacenamiento de archivos y se descarga con soporte de Range.
+
+Esta migracion:
+1. Crea research_export_jobs con los índices (status, lease_expires_at) del claim
+   y (scope_key, status) del watermark incremental
+
+Usage:
+    python -m backend.database.migrations.add_research_export_jobs
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from sqlalchemy import inspect
+
+from backend.database.config import get_db_config
+from backend.database.models import ResearchExportJobDB
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def create_research_export_jobs_table(engine) -> bool:
+    """
+    Create research_export_jobs if missing.
+
+    Returns:
+        True if the table was created, False if it already existed
+    """
+    if inspect(engine).has_table(ResearchExportJobDB.__tablename__):
+        logger.info("research_export_jobs already exists, skipping")
+        return False
+
+    ResearchExportJobDB.__table__.create(bind=engine)
+    logger.info("Created research_export_jobs")
+    return True
+
+
+def run_migration():
+    """Run the complete migration."""
+    logger.info("=" * 60)
+    logger.info("Running research export jobs migration")
+    logger.info("=" * 60)
+
+    engine = get_db_config().get_engine()
+    create_research_export_jobs_table(engine)
+
+    logger.info("=" * 60)
+    logger.info("Migration completed successfully!")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,61 @@
+"""
+Migration: Add risk_analysis_jobs table
+
+Cola durable del análisis de riesgo (backend "database" de core/risk_queue.py):
+el request encola un job por interacción y los workers lo reclaman con
+SELECT ... FOR UPDATE SKIP LOCKED. Los jobs pendientes sobreviven a un deploy.
+
+Esta migracion:
+1. Crea risk_analysis_jobs con el índice (status, available_at) que usa el claim
+
+Usage:
+    python -m backend.database.migrations.add_risk_analysis_jobs
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from sqlalchemy import inspect
+
+from backend.database.config import get_db_config
+from backend.database.models import RiskAnalysisJobDB
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def create_risk_analysis_jobs_table(engine) -> bool:
+    """
+    Create risk_analysis_jobs if missing.
+
+    Returns:
+        True if the table was created, False if it already existed
+    """
+    if inspect(engine).has_table(RiskAnalysisJobDB.__tablename__):
+        logger.info("risk_analysis_jobs already exists, skipping")
+        return False
+
+    RiskAnalysisJobDB.__table__.create(bind=engine)
+    logger.info("Created risk_analysis_jobs")
+    return True
+
+
+def run_migration():
+    """Run the complete migration."""
+    logger.info("=" * 60)
+    logger.info("Running risk analysis queue migration")
+    logger.info("=" * 60)
+
+    engine = get_db_config().get_engine()
+    create_risk_analysis_jobs_table(engine)
+
+    logger.info("=" * 60)
+    logger.info("Migration completed successfully!")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,111 @@
+"""
+Migration: Add session_rollups table
+
+Agregados incrementales por sesión (conteos por tipo de interacción, suma y
+cantidad de ai_involvement, histograma de estados cognitivos, bloqueos,
+riesgos por tipo y nivel, primera/última traza). Los repositorios de trazas
+y riesgos los actualizan en la misma transacción de cada insert; los
+dashboards docentes y los reportes leen una fila por sesión.
+
+Esta migracion:
+1. Crea session_rollups (unique session_id)
+2. Recalcula el agregado de las sesiones existentes en lotes (backfill),
+   leyendo solo las columnas necesarias de trazas y riesgos
+
+Es idempotente: el backfill reconstruye cada agregado desde cero.
+
+Usage:
+    python -m backend.database.migrations.add_session_rollups
+"""
+import logging
+import os
+import sys
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(__file__)))))
+
+from sqlalchemy import inspect
+
+from backend.database.config import get_db_config
+from backend.database.models import SessionDB, SessionRollupDB
+from backend.database.repositories import SessionRollupRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKFILL_BATCH_SIZE = 200
+
+
+def create_session_rollups_table(engine) -> bool:
+    """
+    Create session_rollups if missing.
+
+    Returns:
+        True if the table was created, False if it already existed
+    """
+    if inspect(engine).has_table(SessionRollupDB.__tablename__):
+        logger.info("session_rollups already exists, skipping")
+        return False
+
+    SessionRollupDB.__table__.create(bind=engine)
+    logger.info("Created session_rollups")
+    return True
+
+
+def backfill_session_rollups(session_factory, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+    """
+    Rebuild the rollup of every existing session, one commit per batch.
+
+    Args:
+        session_factory: Callable returning a SQLAlchemy Session
+        batch_size: Sessions per batch
+
+    Returns:
+        Number of rollups written
+    """
+    written = 0
+    last_id = ""
+    while True:
+        db = session_factory()
+        try:
+            session_ids = [
+                row[0] for row in (
+                    db.query(SessionDB.id)
+                    .filter(SessionDB.id > last_id)
+                    .order_by(SessionDB.id)
+                    .limit(batch_size)
+                    .all()
+                )
+            ]
+            if not session_ids:
+                break
+            written += SessionRollupRepository(db).rebuild(session_ids)
+            db.commit()
+            last_id = session_ids[-1]
+            logger.info("Backfilled rollups up to session %s (%d written)", last_id, written)
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    return written
+
+
+def run_migration():
+    """Run the complete migration."""
+    logger.info("=" * 60)
+    logger.info("Running session rollups migration")
+    logger.info("=" * 60)
+
+    db_config = get_db_config()
+    create_session_rollups_table(db_config.get_engine())
+    written = backfill_session_rollups(db_config.get_session_factory())
+    logger.info("Backfilled %d session rollups", written)
+
+    logger.info("=" * 60)
+    logger.info("Migration completed successfully!")
+    logger.info("=" * 60)
+
+
+if __name__ == "__main__":
+    run_migration()
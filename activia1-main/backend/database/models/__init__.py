@@ -8,7 +8,7 @@ full backward compatibility with existing code that imports from models.py.
 
 Organization:
 - base.py: Common utilities (JSONBCompatible, utc_now, Base, BaseModel)
-- session.py: SessionDB - Learning sessions
+- session.py: SessionDB, SessionRollupDB - Learning sessions and their aggregates
 - trace.py: CognitiveTraceDB, TraceSequenceDB - N4 cognitive traceability
 - risk.py: RiskDB - Detected risks
 - evaluation.py: EvaluationDB - Process evaluations
@@ -16,7 +16,7 @@ Organization:
 - activity.py: ActivityDB - Learning activities
 - student_profile.py: StudentProfileDB - Student profiles
 - git.py: GitTraceDB - Git N2 traceability
-- reports.py: CourseReportDB, RemediationPlanDB, RiskAlertDB - Institutional reports
+- reports.py: CourseReportDB, RemediationPlanDB, RiskAlertDB, ResearchExportJobDB - Institutional reports
 - simulation.py: InterviewSessionDB, IncidentSimulationDB, SimulatorEventDB
 - lti.py: LTIDeploymentDB, LTISessionDB - LTI 1.3 integration
 - subject.py: SubjectDB - Subject/course organization
@@ -41,9 +41,9 @@ from .base import (
 )
 
 # Core domain models
-from .session import SessionDB
+from .session import SessionDB, SessionRollupDB
 from .trace import CognitiveTraceDB, TraceSequenceDB
-from .risk import RiskDB
+from .risk import RiskDB, RiskAnalysisJobDB
 from .evaluation import EvaluationDB
 from .user import UserDB
 from .activity import ActivityDB
@@ -57,6 +57,7 @@ from .reports import (
     CourseReportDB,
     RemediationPlanDB,
     RiskAlertDB,
+    ResearchExportJobDB,
 )
 
 # Simulations
@@ -108,9 +109,11 @@ __all__ = [
     "_utc_now",  # Legacy alias
     # Core domain
     "SessionDB",
+    "SessionRollupDB",
     "CognitiveTraceDB",
     "TraceSequenceDB",
     "RiskDB",
+    "RiskAnalysisJobDB",
     "EvaluationDB",
     "UserDB",
     "ActivityDB",
@@ -121,6 +124,7 @@ __all__ = [
     "CourseReportDB",
     "RemediationPlanDB",
     "RiskAlertDB",
+    "ResearchExportJobDB",
     # Simulations
     "InterviewSessionDB",
     "IncidentSimulationDB",
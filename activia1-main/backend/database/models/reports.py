@@ -7,9 +7,10 @@ Provides:
 - CourseReportDB: Course-level aggregate reports
 - RemediationPlanDB: Student remediation plans
 - RiskAlertDB: Institutional risk alerts
+- ResearchExportJobDB: Background research data exports
 """
 from sqlalchemy import (
-    Column, String, Text, Float, Integer, DateTime,
+    Column, String, Text, Float, Integer, BigInteger, Boolean, DateTime,
     ForeignKey, JSON, Index, CheckConstraint
 )
 from sqlalchemy.orm import relationship
@@ -283,3 +284,61 @@ class RiskAlertDB(Base, BaseModel):
             name='ck_alert_status_valid'
         ),
     )
+
+
+class ResearchExportJobDB(Base, BaseModel):
+    """
+    Research data export processed by a background worker.
+
+    The worker claims pending jobs (or running jobs whose lease expired after a
+    crash or deploy) with SELECT ... FOR UPDATE SKIP LOCKED, streams the export
+    into chunks in file storage and renews the lease while it writes. A restart
+    rebuilds the artifact from scratch over the same frozen [since, watermark]
+    window, so the output does not change.
+
+    Incremental jobs export only rows created after the watermark of the last
+    completed job with the same scope (same filters and format).
+    """
+
+    __tablename__ = "research_export_jobs"
+
+    requested_by = Column(String(36), ForeignKey("users.id", ondelete="SET NULL"), nullable=True, index=True)
+    # pending | running | completed | failed | rejected (privacy validation failed)
+    status = Column(String(20), nullable=False, default="pending")
+    # ExportRequest serialized (filters, format, k-anonymity)
+    request = Column(JSON, nullable=False)
+    # Hash of the filters/format: jobs with the same scope chain their watermarks
+    scope_key = Column(String(64), nullable=False)
+    incremental = Column(Boolean, nullable=False, default=False)
+
+    # created_at window: (since, watermark]; frozen on the first claim
+    since = Column(DateTime, nullable=True)
+    watermark = Column(DateTime, nullable=True)
+
+    # Progress: rows processed per data type ({"sessions": 120, "traces": 48000})
+    progress = Column(JSON, default=dict)
+    records_processed = Column(Integer, nullable=False, default=0)
+
+    # Artifact: ordered chunks in file storage [{"path": ..., "size": ...}]
+    artifact_chunks = Column(JSON, default=list)
+    file_size = Column(BigInteger, nullable=True)
+    media_type = Column(String(100), nullable=True)
+    file_extension = Column(String(20), nullable=True)
+    validation = Column(JSON, nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    lease_expires_at = Column(DateTime, nullable=True)
+    started_at = Column(DateTime, nullable=True)
+    completed_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        # Query: claim pending jobs / expired leases
+        Index('idx_export_job_status_lease', 'status', 'lease_expires_at'),
+        # Query: last completed watermark of a scope
+        Index('idx_export_job_scope_status', 'scope_key', 'status'),
+        CheckConstraint(
+            "status IN ('pending', 'running', 'completed', 'failed', 'rejected')",
+            name='ck_export_job_status_valid'
+        ),
+    )
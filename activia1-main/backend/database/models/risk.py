@@ -5,10 +5,11 @@ Cortez42: Extracted from monolithic models.py (1,772 lines)
 
 Provides:
 - RiskDB: Database model for detected risks
+- RiskAnalysisJobDB: Durable queue of pending risk analyses (database backend)
 """
 from sqlalchemy import (
     Column, String, Text, Float, Boolean, DateTime, ForeignKey, JSON,
-    Index, CheckConstraint
+    Index, Integer, CheckConstraint
 )
 from sqlalchemy.orm import relationship
 
@@ -78,3 +79,33 @@ class RiskDB(Base, BaseModel):
             name='ck_risk_level_valid'
         ),
     )
+
+
+class RiskAnalysisJobDB(Base, BaseModel):
+    """
+    Pending AR-IA analysis for one interaction (risk_queue database backend).
+
+    Workers claim rows with SELECT ... FOR UPDATE SKIP LOCKED and lease them by
+    moving available_at forward; a row whose lease expires (worker crash or
+    deploy) becomes claimable again. Rows are deleted once their risks are
+    persisted; status 'dead' keeps jobs that exhausted their retries.
+    """
+
+    __tablename__ = "risk_analysis_jobs"
+
+    # RiskAnalysisJob serialized (traces, classification, attempts)
+    payload = Column(JSON, nullable=False)
+    # pending | running | retry | dead
+    status = Column(String(20), nullable=False, default="pending")
+    attempts = Column(Integer, nullable=False, default=0)
+    # Next time the job may be claimed (lease end while running, backoff on retry)
+    available_at = Column(DateTime, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    __table_args__ = (
+        Index('idx_risk_job_status_available', 'status', 'available_at'),
+        CheckConstraint(
+            "status IN ('pending', 'running', 'retry', 'dead')",
+            name='ck_risk_job_status_valid'
+        ),
+    )
@@ -5,9 +5,10 @@ Cortez42: Extracted from monolithic models.py (1,772 lines)
 
 Provides:
 - SessionDB: Database model for learning sessions with N4 traceability metadata
+- SessionRollupDB: Incremental per-session aggregates for dashboards
 """
 from sqlalchemy import (
-    Column, String, DateTime, ForeignKey, Index, CheckConstraint
+    Column, String, DateTime, Float, Integer, ForeignKey, Index, CheckConstraint
 )
 from sqlalchemy.orm import relationship
 
@@ -81,6 +82,17 @@ class SessionDB(Base, BaseModel):
     #   "competencies_demonstrated": ["abstraction", "debugging"]
     # }
 
+    # Rolling LLM summary of turns older than the history tail window
+    conversation_summary = Column(JSONBCompatible, nullable=True)
+    # {
+    #   "text": "El estudiante implementó una cola circular...",
+    #   "covered_until": "2025-01-01T10:00:00",  # created_at of last summarized trace
+    #   "covered_trace_id": "uuid",
+    #   "window_start": "2025-01-01T10:02:00",   # tail start when summarized
+    #   "message_count": 40,
+    #   "updated_at": "timestamp"
+    # }
+
     # Relationships
     user = relationship("UserDB", back_populates="sessions")
     traces = relationship(
@@ -110,6 +122,10 @@ class SessionDB(Base, BaseModel):
     trace_sequences = relationship(
         "TraceSequenceDB", back_populates="session", cascade="all, delete-orphan"
     )
+    rollup = relationship(
+        "SessionRollupDB", back_populates="session", uselist=False,
+        cascade="all, delete-orphan", passive_deletes=True
+    )
     # FIX Cortez83: Add teacher_interventions relationship for bidirectional navigation
     teacher_interventions = relationship(
         "TeacherInterventionDB",
@@ -140,3 +156,55 @@ class SessionDB(Base, BaseModel):
             name='ck_session_simulator_type_valid'
         ),
     )
+
+
+class SessionRollupDB(Base, BaseModel):
+    """
+    Per-session aggregates maintained incrementally on every trace/risk write.
+
+    Teacher and report dashboards read one small row per session instead of
+    loading every CognitiveTraceDB (with its content) and counting in Python.
+    The counters are updated in the same transaction that inserts the traces
+    or risks (see SessionRollupRepository), so they never drift from the
+    rows they summarize.
+    """
+
+    __tablename__ = "session_rollups"
+
+    session_id = Column(
+        String(36),
+        ForeignKey("sessions.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True
+    )
+    student_id = Column(String(100), nullable=False, index=True)
+    activity_id = Column(String(100), nullable=False, index=True)
+
+    # Traces
+    trace_count = Column(Integer, nullable=False, default=0)
+    interaction_counts = Column(JSONBCompatible, default=dict)  # {interaction_type: n}
+    cognitive_state_counts = Column(JSONBCompatible, default=dict)  # {cognitive_state: n}
+    ai_involvement_sum = Column(Float, nullable=False, default=0.0)
+    ai_involvement_count = Column(Integer, nullable=False, default=0)
+    blocked_count = Column(Integer, nullable=False, default=0)
+    strategy_change_count = Column(Integer, nullable=False, default=0)
+    first_trace_at = Column(DateTime, nullable=True)
+    last_trace_at = Column(DateTime, nullable=True)
+
+    # Risks
+    risk_count = Column(Integer, nullable=False, default=0)
+    risk_type_counts = Column(JSONBCompatible, default=dict)  # {risk_type: n}
+    risk_level_counts = Column(JSONBCompatible, default=dict)  # {risk_level: n}
+
+    session = relationship("SessionDB", back_populates="rollup")
+
+    __table_args__ = (
+        Index('idx_rollup_activity_student', 'activity_id', 'student_id'),
+    )
+
+    @property
+    def ai_involvement_avg(self) -> float:
+        """Average ai_involvement over all traces (0.0 without traces)."""
+        if not self.ai_involvement_count:
+            return 0.0
+        return self.ai_involvement_sum / self.ai_involvement_count
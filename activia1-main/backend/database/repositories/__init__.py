@@ -11,15 +11,18 @@ Each repository has been extracted into its own module for better maintainabilit
 - session_repository.py: SessionRepository
 - trace_repository.py: TraceRepository
 - risk_repository.py: RiskRepository
+- rollup_repository.py: SessionRollupRepository (incremental per-session aggregates)
 - evaluation_repository.py: EvaluationRepository
 - activity_repository.py: ActivityRepository
 - user_repository.py: UserRepository
 - exercise_repository.py: Exercise-related repositories
 - git_repository.py: GitTraceRepository (N2-level Git traceability)
-- institutional_repository.py: CourseReportRepository, RemediationPlanRepository, RiskAlertRepository
+- institutional_repository.py: CourseReportRepository, RemediationPlanRepository, RiskAlertRepository,
+  ResearchExportJobRepository
 - simulator_repository.py: InterviewSessionRepository, IncidentSimulationRepository, SimulatorEventRepository
 - lti_repository.py: LTIDeploymentRepository, LTISessionRepository
 - profile_repository.py: StudentProfileRepository, SubjectRepository, TraceSequenceRepository
+- async_repositories.py: AsyncSessionRepository, AsyncTraceRepository, AsyncRiskRepository
 
 All 24 repository classes have been extracted from the original monolithic file.
 """
@@ -35,10 +38,18 @@ from .base import (
 from .session_repository import SessionRepository
 from .trace_repository import TraceRepository
 from .risk_repository import RiskRepository
+from .rollup_repository import SessionRollupRepository
 from .evaluation_repository import EvaluationRepository
 from .activity_repository import ActivityRepository
 from .user_repository import UserRepository
 
+# Async repositories for the interaction hot path
+from .async_repositories import (
+    AsyncSessionRepository,
+    AsyncTraceRepository,
+    AsyncRiskRepository,
+)
+
 # Exercise-related repositories
 from .exercise_repository import (
     ExerciseRepository,
@@ -57,6 +68,7 @@ from .institutional_repository import (
     CourseReportRepository,
     RemediationPlanRepository,
     RiskAlertRepository,
+    ResearchExportJobRepository,
 )
 
 # Simulator repositories (Cortez46)
@@ -97,9 +109,14 @@ __all__ = [
     "SessionRepository",
     "TraceRepository",
     "RiskRepository",
+    "SessionRollupRepository",
     "EvaluationRepository",
     "ActivityRepository",
     "UserRepository",
+    # Async repositories (interaction hot path)
+    "AsyncSessionRepository",
+    "AsyncTraceRepository",
+    "AsyncRiskRepository",
     # Exercise repositories (refactored)
     "ExerciseRepository",
     "ExerciseHintRepository",
@@ -113,6 +130,7 @@ __all__ = [
     "CourseReportRepository",
     "RemediationPlanRepository",
     "RiskAlertRepository",
+    "ResearchExportJobRepository",
     # Simulator (Cortez46)
     "InterviewSessionRepository",
     "IncidentSimulationRepository",
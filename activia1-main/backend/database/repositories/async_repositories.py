@@ -0,0 +1,250 @@
+"""
+Async Repositories - Non-blocking DB access for the interaction hot path.
+
+Provides:
+- AsyncSessionRepository: session lookup
+- AsyncTraceRepository: trace persistence and history reads
+- AsyncRiskRepository: risk persistence and reads
+
+Same query semantics as the sync repositories (SessionRepository,
+TraceRepository, RiskRepository) but over an AsyncSession, so the AI Gateway
+can await DB round-trips without blocking the uvicorn event loop. ORM row
+construction and session rollup deltas are shared with the sync repositories.
+
+Unlike the sync repositories, writes only flush: the caller owns the
+transaction (async_transaction() in the interactions router, or the commit
+of get_async_db_session), so every trace and risk of an interaction commits
+or rolls back together.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+import logging
+
+from sqlalchemy import desc, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from ..models import SessionDB, CognitiveTraceDB, RiskDB, SessionRollupDB
+from ...models.trace import CognitiveTrace
+from ...models.risk import Risk
+from backend.core.constants import utc_now
+from .trace_repository import _trace_to_db
+from .risk_repository import _risk_to_db
+from .rollup_repository import build_deltas, locked_rollups_statement, seed_statement
+
+logger = logging.getLogger(__name__)
+
+
+async def _apply_rollups(db: AsyncSession, traces: Sequence[Any] = (), risks: Sequence[Any] = ()) -> None:
+    """Async SessionRollupRepository.apply_traces/apply_risks (does not commit)."""
+    deltas = build_deltas(traces=traces, risks=risks)
+    if not deltas:
+        return
+    stmt = seed_statement(db.get_bind().dialect.name)
+    if stmt is not None:
+        await db.execute(stmt, [delta.seed_row() for delta in deltas.values()])
+    else:
+        result = await db.execute(
+            select(SessionRollupDB.session_id).where(SessionRollupDB.session_id.in_(list(deltas)))
+        )
+        existing = set(result.scalars())
+        missing = [delta.seed_row() for sid, delta in deltas.items() if sid not in existing]
+        if missing:
+            await db.execute(insert(SessionRollupDB), missing)
+    result = await db.execute(locked_rollups_statement(list(deltas)))
+    for rollup in result.scalars():
+        deltas[rollup.session_id].apply(rollup)
+    await db.flush()
+
+
+class AsyncSessionRepository:
+    """Async repository for session lookups."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def get_by_id(self, session_id: str, load_relations: bool = False) -> Optional[SessionDB]:
+        """
+        Get session by ID with optional eager loading.
+
+        Args:
+            session_id: Session ID to retrieve
+            load_relations: If True, loads traces and risks in same query (prevents N+1)
+
+        Returns:
+            SessionDB instance if found, None otherwise
+        """
+        stmt = select(SessionDB).where(SessionDB.id == session_id)
+
+        if load_relations:
+            stmt = stmt.options(
+                selectinload(SessionDB.traces),
+                selectinload(SessionDB.risks),
+                selectinload(SessionDB.evaluations)
+            )
+
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def update_conversation_summary(
+        self,
+        session_id: str,
+        summary: Dict[str, Any]
+    ) -> Optional[SessionDB]:
+        """Store the rolling conversation summary on the session."""
+        db_session = await self.get_by_id(session_id)
+        if not db_session:
+            return None
+        db_session.conversation_summary = summary
+        db_session.updated_at = utc_now()
+        await self.db.flush()
+        return db_session
+
+
+class AsyncTraceRepository:
+    """Async repository for cognitive trace operations."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def create(self, trace: CognitiveTrace) -> CognitiveTraceDB:
+        """
+        Create a new cognitive trace (flushed, committed by the caller).
+
+        Args:
+            trace: CognitiveTrace domain model
+
+        Returns:
+            Created CognitiveTraceDB instance
+        """
+        db_trace = _trace_to_db(trace)
+        try:
+            self.db.add(db_trace)
+            await self.db.flush()
+            await _apply_rollups(self.db, traces=[db_trace])
+            await self.db.refresh(db_trace)
+        except Exception as e:
+            logger.error("Failed to create trace: %s", str(e), exc_info=True)
+            raise
+        return db_trace
+
+    async def get_by_session(
+        self,
+        session_id: str,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[CognitiveTraceDB]:
+        """
+        Get all traces for a session.
+
+        Args:
+            session_id: Session ID
+            limit: Maximum records to return (default 100)
+            offset: Records to skip (default 0)
+
+        Returns:
+            List of traces ordered by creation date
+        """
+        stmt = (
+            select(CognitiveTraceDB)
+            .where(CognitiveTraceDB.session_id == session_id)
+            .order_by(CognitiveTraceDB.created_at)
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def get_recent_by_session(
+        self,
+        session_id: str,
+        limit: int = 20,
+        interaction_types: Optional[Sequence[str]] = None
+    ) -> List[CognitiveTraceDB]:
+        """Get the newest traces of a session (tail window), oldest first."""
+        stmt = select(CognitiveTraceDB).where(CognitiveTraceDB.session_id == session_id)
+        if interaction_types:
+            stmt = stmt.where(CognitiveTraceDB.interaction_type.in_(list(interaction_types)))
+        stmt = stmt.order_by(desc(CognitiveTraceDB.created_at)).limit(limit)
+        result = await self.db.execute(stmt)
+        rows = list(result.scalars().all())
+        rows.reverse()
+        return rows
+
+    async def get_latest_by_session(self, session_id: str) -> Optional[CognitiveTraceDB]:
+        """Get only the latest trace for a session."""
+        stmt = (
+            select(CognitiveTraceDB)
+            .where(CognitiveTraceDB.session_id == session_id)
+            .order_by(desc(CognitiveTraceDB.created_at))
+            .limit(1)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalars().first()
+
+    async def get_by_student(self, student_id: str, limit: int = 100) -> List[CognitiveTraceDB]:
+        """Get recent traces for a student (session preloaded, no lazy IO)."""
+        stmt = (
+            select(CognitiveTraceDB)
+            .where(CognitiveTraceDB.student_id == student_id)
+            .options(selectinload(CognitiveTraceDB.session))
+            .order_by(desc(CognitiveTraceDB.created_at))
+            .limit(limit)
+        )
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+
+class AsyncRiskRepository:
+    """Async repository for risk operations."""
+
+    def __init__(self, db_session: AsyncSession):
+        self.db = db_session
+
+    async def create(self, risk: Risk) -> RiskDB:
+        """
+        Create a new risk (flushed, committed by the caller).
+
+        Args:
+            risk: Risk domain model
+
+        Returns:
+            Created RiskDB instance
+        """
+        db_risk = _risk_to_db(risk)
+        try:
+            self.db.add(db_risk)
+            await self.db.flush()
+            await _apply_rollups(self.db, risks=[db_risk])
+            await self.db.refresh(db_risk)
+        except Exception as e:
+            logger.error("Failed to create risk: %s", str(e), exc_info=True)
+            raise
+        return db_risk
+
+    async def get_by_session(
+        self,
+        session_id: str,
+        resolved: Optional[bool] = None,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[RiskDB]:
+        """
+        Get all risks for a session.
+
+        Args:
+            session_id: Session ID to filter by
+            resolved: Optional filter by resolution status
+            limit: Maximum records to return (default 100)
+            offset: Records to skip (default 0)
+
+        Returns:
+            List of risks ordered by creation date (newest first)
+        """
+        stmt = select(RiskDB).where(RiskDB.session_id == session_id)
+
+        if resolved is not None:
+            stmt = stmt.where(RiskDB.resolved.is_(resolved))
+
+        stmt = stmt.order_by(desc(RiskDB.created_at)).limit(limit).offset(offset)
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
@@ -5,15 +5,16 @@ Cortez46: Extracted from repositories.py (5,134 lines)
 
 SPRINT 5 - HU-SYS-008: Integración Git
 """
-from typing import List, Optional
+from typing import List, Optional, Sequence
 from uuid import uuid4
 from datetime import datetime
 import logging
 
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
 
 from ..models import GitTraceDB
+from ...models.git_trace import GitTrace
 from .base import BaseRepository
 
 logger = logging.getLogger(__name__)
@@ -129,6 +130,82 @@ class GitTraceRepository(BaseRepository):
         )
         return git_trace
 
+    def bulk_create(self, traces: Sequence[GitTrace]) -> int:
+        """
+        Insert many Git traces in a single multi-row INSERT and one commit.
+
+        Used by GitIntegrationAgent.capture_session_commits so a session sync
+        does not pay add/commit/refresh per commit. No ORM objects are returned.
+
+        Args:
+            traces: GitTrace domain models
+
+        Returns:
+            Number of rows inserted
+        """
+        if not traces:
+            return 0
+
+        rows = [
+            {
+                "id": trace.id,
+                "session_id": trace.session_id,
+                "student_id": trace.student_id,
+                "activity_id": trace.activity_id,
+                "event_type": trace.event_type.value,
+                "commit_hash": trace.commit_hash,
+                "commit_message": trace.commit_message,
+                "author_name": trace.author_name,
+                "author_email": trace.author_email,
+                "timestamp": trace.timestamp,
+                "branch_name": trace.branch_name,
+                "parent_commits": trace.parent_commits,
+                "files_changed": [f.model_dump() for f in trace.files_changed],
+                "total_lines_added": trace.total_lines_added,
+                "total_lines_deleted": trace.total_lines_deleted,
+                "diff": trace.diff,
+                "is_merge": trace.is_merge,
+                "is_revert": trace.is_revert,
+                "detected_patterns": [p.value for p in trace.detected_patterns],
+                "complexity_delta": trace.complexity_delta,
+                "related_cognitive_traces": trace.related_cognitive_traces,
+                "cognitive_state_during_commit": trace.cognitive_state_during_commit,
+                "time_since_last_interaction_minutes": trace.time_since_last_interaction_minutes,
+                "repo_path": trace.repo_path,
+                "remote_url": trace.remote_url,
+            }
+            for trace in traces
+        ]
+
+        try:
+            self.db.execute(insert(GitTraceDB), rows)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error("Failed to bulk insert %d git traces: %s", len(rows), str(e), exc_info=True)
+            raise
+
+        logger.info(
+            "Git traces bulk created: %d for session %s",
+            len(rows),
+            rows[0]["session_id"],
+        )
+        return len(rows)
+
+    def get_existing_commit_hashes(self, session_id: str, commit_hashes: Sequence[str]) -> set:
+        """Return the subset of commit_hashes already captured for the session."""
+        if not commit_hashes:
+            return set()
+        rows = (
+            self.db.query(GitTraceDB.commit_hash)
+            .filter(
+                GitTraceDB.session_id == session_id,
+                GitTraceDB.commit_hash.in_(list(commit_hashes)),
+            )
+            .all()
+        )
+        return {row[0] for row in rows}
+
     def get_by_id(self, trace_id: str) -> Optional[GitTraceDB]:
         """Get Git trace by ID."""
         return self.db.query(GitTraceDB).filter(GitTraceDB.id == trace_id).first()
@@ -7,18 +7,19 @@ FIX Cortez83: Added try/except with rollback for database operations
 SPRINT 5:
 - HU-DOC-009: Reportes Institucionales
 - HU-DOC-010: Gestión de Riesgos Institucionales
+- ResearchExportJobRepository: background research data exports
 """
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
-from datetime import datetime
+from datetime import datetime, timedelta
 import logging
 
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import desc, func, or_
 from sqlalchemy.exc import SQLAlchemyError
 
 from backend.core.constants import utc_now
-from ..models import CourseReportDB, RemediationPlanDB, RiskAlertDB
+from ..models import CourseReportDB, RemediationPlanDB, RiskAlertDB, ResearchExportJobDB
 from .base import BaseRepository
 
 logger = logging.getLogger(__name__)
@@ -559,3 +560,170 @@ class RiskAlertRepository(BaseRepository):
             extra={"alert_id": alert.id}
         )
         return alert
+
+
+class ResearchExportJobRepository(BaseRepository):
+    """
+    Repository for background research export jobs.
+
+    Workers claim jobs with a lease (lease_expires_at) and renew it with
+    heartbeat(); a job whose lease expires is claimable again.
+    """
+
+    def create(
+        self,
+        request: Dict[str, Any],
+        scope_key: str,
+        incremental: bool = False,
+        requested_by: Optional[str] = None,
+    ) -> ResearchExportJobDB:
+        """
+        Create a pending export job.
+
+        Args:
+            request: ExportRequest serialized (model_dump(mode="json"))
+            scope_key: Hash of the filters/format (chains incremental watermarks)
+            incremental: Export only rows created after the last completed job of the scope
+            requested_by: User who requested the export
+
+        Returns:
+            Created ResearchExportJobDB instance
+        """
+        job = ResearchExportJobDB(
+            id=str(uuid4()),
+            requested_by=requested_by,
+            status="pending",
+            request=request,
+            scope_key=scope_key,
+            incremental=incremental,
+            progress={},
+            artifact_chunks=[],
+        )
+        try:
+            self.db.add(job)
+            self.db.commit()
+            self.db.refresh(job)
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("Failed to create export job: %s", str(e), exc_info=True)
+            raise
+
+        logger.info(
+            "Research export job created: %s",
+            job.id,
+            extra={"job_id": job.id, "incremental": incremental, "requested_by": requested_by},
+        )
+        return job
+
+    def get_by_id(self, job_id: str) -> Optional[ResearchExportJobDB]:
+        """Get export job by ID."""
+        return self.db.query(ResearchExportJobDB).filter(ResearchExportJobDB.id == job_id).first()
+
+    def get_last_watermark(self, scope_key: str) -> Optional[datetime]:
+        """Watermark of the last completed job of a scope (None if there is none)."""
+        return (
+            self.db.query(func.max(ResearchExportJobDB.watermark))
+            .filter(
+                ResearchExportJobDB.scope_key == scope_key,
+                ResearchExportJobDB.status == "completed",
+            )
+            .scalar()
+        )
+
+    def claim(self, lease_seconds: int, watermark_lag_seconds: int = 0) -> Optional[ResearchExportJobDB]:
+        """
+        Claim the oldest pending job (or a running job whose lease expired).
+
+        On the first claim the created_at window is frozen: watermark = now -
+        watermark_lag_seconds and, for incremental jobs, since = watermark of the
+        last completed job of the scope. Restarts reuse the same window.
+
+        The lag keeps rows whose created_at was stamped before the claim but
+        whose transaction commits after the export read them out of this
+        window; they fall after the watermark and the next job picks them up.
+
+        Returns:
+            Claimed job (status running, lease renewed) or None
+        """
+        now = utc_now()
+        job = (
+            self.db.query(ResearchExportJobDB)
+            .filter(
+                or_(
+                    ResearchExportJobDB.status == "pending",
+                    (ResearchExportJobDB.status == "running")
+                    & (ResearchExportJobDB.lease_expires_at < now),
+                )
+            )
+            .order_by(ResearchExportJobDB.created_at)
+            .with_for_update(skip_locked=True)
+            .first()
+        )
+        if job is None:
+            self.db.rollback()
+            return None
+
+        job.status = "running"
+        job.attempts = (job.attempts or 0) + 1
+        job.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        job.started_at = now
+        job.last_error = None
+        if job.watermark is None:
+            job.watermark = now - timedelta(seconds=watermark_lag_seconds)
+            if job.incremental:
+                job.since = self.get_last_watermark(job.scope_key)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def heartbeat(
+        self,
+        job_id: str,
+        lease_seconds: int,
+        progress: Dict[str, int],
+        artifact_chunks: List[Dict[str, Any]],
+    ) -> bool:
+        """
+        Renew the lease and store progress.
+
+        Returns:
+            False if the job is no longer running (the worker must stop)
+        """
+        updated = (
+            self.db.query(ResearchExportJobDB)
+            .filter(ResearchExportJobDB.id == job_id, ResearchExportJobDB.status == "running")
+            .update(
+                {
+                    ResearchExportJobDB.lease_expires_at: utc_now() + timedelta(seconds=lease_seconds),
+                    ResearchExportJobDB.progress: dict(progress),
+                    ResearchExportJobDB.records_processed: sum(progress.values()),
+                    ResearchExportJobDB.artifact_chunks: list(artifact_chunks),
+                    ResearchExportJobDB.updated_at: utc_now(),
+                },
+                synchronize_session=False,
+            )
+        )
+        self.db.commit()
+        return bool(updated)
+
+    def finish(self, job_id: str, status: str, **values: Any) -> None:
+        """
+        Move a job to a final (or back to pending) status.
+
+        Args:
+            job_id: Job ID
+            status: completed | failed | rejected | pending (released for a retry)
+            **values: Other columns to update (file_size, validation, last_error, ...)
+        """
+        fields = {
+            ResearchExportJobDB.status: status,
+            ResearchExportJobDB.lease_expires_at: None,
+            ResearchExportJobDB.updated_at: utc_now(),
+            **{getattr(ResearchExportJobDB, name): value for name, value in values.items()},
+        }
+        if status in ("completed", "failed", "rejected"):
+            fields[ResearchExportJobDB.completed_at] = utc_now()
+        self.db.query(ResearchExportJobDB).filter(ResearchExportJobDB.id == job_id).update(
+            fields, synchronize_session=False
+        )
+        self.db.commit()
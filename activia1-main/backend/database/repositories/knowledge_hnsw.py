@@ -0,0 +1,243 @@
+"""
+HNSW Graph - Vecinos más cercanos aproximados (NumPy) para el índice RAG sin pgvector.
+
+Implementación de Hierarchical Navigable Small World (Malkov & Yashunin) sobre
+los vectores normalizados de KnowledgeVectorIndex. El grafo guarda solo la
+adyacencia (ids de fila); los vectores se leen de la matriz del índice en
+cada llamada, por lo que el grafo no duplica memoria ni depende de que la
+matriz se realoque al crecer.
+
+- Similitud = producto punto (vectores ya normalizados -> coseno).
+- Cada expansión de nodo evalúa a todos sus vecinos con un único gather +
+  matvec NumPy.
+- Búsqueda filtrada: el grafo se recorre completo (los nodos excluidos siguen
+  sirviendo de puente) pero solo los nodos permitidos por la máscara entran
+  al resultado. Así también se ignoran los tombstones del índice.
+
+No es thread-safe por sí mismo: KnowledgeVectorIndex serializa el acceso.
+"""
+import heapq
+import math
+import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ...core.constants import RAG_HNSW_EF_CONSTRUCTION, RAG_HNSW_M
+
+
+class HNSWGraph:
+    """Grafo HNSW cuyos nodos son filas de una matriz de vectores normalizados."""
+
+    def __init__(
+        self,
+        m: int = RAG_HNSW_M,
+        ef_construction: int = RAG_HNSW_EF_CONSTRUCTION,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            m: Vecinos por nodo en las capas superiores (2*m en la capa 0)
+            ef_construction: Tamaño de la lista de candidatos al insertar
+            seed: Semilla para la asignación de niveles (tests reproducibles)
+        """
+        self.m = max(2, m)
+        self.m0 = 2 * self.m
+        self.ef_construction = max(self.m, ef_construction)
+        self._level_mult = 1.0 / math.log(self.m)
+        self._rng = random.Random(seed)
+        self._layers: List[Dict[int, List[int]]] = []
+        self._entry: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._layers[0]) if self._layers else 0
+
+    def __contains__(self, node: int) -> bool:
+        return bool(self._layers) and node in self._layers[0]
+
+    @property
+    def max_level(self) -> int:
+        return len(self._layers) - 1
+
+    # ------------------------------------------------------------------
+    # Inserción
+    # ------------------------------------------------------------------
+
+    def add(self, node: int, matrix: np.ndarray) -> None:
+        """Inserta la fila `node` de `matrix` en el grafo."""
+        if node in self:
+            return
+        vector = matrix[node]
+        level = int(-math.log(1.0 - self._rng.random()) * self._level_mult)
+
+        if self._entry is None:
+            self._layers = [{node: []} for _ in range(level + 1)]
+            self._entry = node
+            return
+
+        entry = self._entry
+        for layer in range(self.max_level, level, -1):
+            entry = self._greedy_closest(vector, entry, layer, matrix)
+
+        entry_points = [entry]
+        for layer in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(vector, entry_points, self.ef_construction, layer, matrix)
+            max_degree = self.m0 if layer == 0 else self.m
+            neighbors = self._select_neighbors(found, self.m, matrix)
+            adjacency = self._layers[layer]
+            adjacency[node] = neighbors
+            for neighbor in neighbors:
+                links = adjacency[neighbor]
+                links.append(node)
+                if len(links) > max_degree:
+                    adjacency[neighbor] = self._prune(neighbor, links, max_degree, matrix)
+            entry_points = [n for _, n in found]
+
+        if level > self.max_level:
+            for _ in range(self.max_level + 1, level + 1):
+                self._layers.append({node: []})
+            self._entry = node
+
+    def _prune(self, node: int, links: List[int], max_degree: int, matrix: np.ndarray) -> List[int]:
+        similarities = matrix[links] @ matrix[node]
+        ranked = sorted(zip(similarities.tolist(), links), reverse=True)
+        return self._select_neighbors(ranked, max_degree, matrix)
+
+    @staticmethod
+    def _select_neighbors(
+        ranked: Sequence[Tuple[float, int]],
+        count: int,
+        matrix: np.ndarray,
+    ) -> List[int]:
+        """
+        Heurística de selección de vecinos (algoritmo 4 del paper).
+
+        Un candidato se descarta si está más cerca de un vecino ya elegido que
+        del nodo base; mantiene aristas "largas" entre clusters. Si quedan
+        huecos se completan con los descartados más cercanos.
+        """
+        if len(ranked) <= count:
+            return [candidate for _, candidate in ranked]
+
+        nodes = [candidate for _, candidate in ranked]
+        similarities = np.fromiter((similarity for similarity, _ in ranked), dtype=np.float32)
+        vectors = matrix[nodes]
+        # Similitudes entre candidatos (una sola multiplicación de matrices)
+        gram = vectors @ vectors.T
+        # closest[i] = máxima similitud de i con los vecinos ya elegidos
+        closest = np.full(len(nodes), -np.inf, dtype=np.float32)
+
+        selected: List[int] = []
+        skipped: List[int] = []
+        for position, candidate in enumerate(nodes):
+            if len(selected) >= count:
+                break
+            if closest[position] > similarities[position]:
+                skipped.append(candidate)
+                continue
+            selected.append(candidate)
+            np.maximum(closest, gram[position], out=closest)
+        for candidate in skipped:
+            if len(selected) >= count:
+                break
+            selected.append(candidate)
+        return selected
+
+    # ------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------
+
+    def _greedy_closest(self, query: np.ndarray, entry: int, layer: int, matrix: np.ndarray) -> int:
+        adjacency = self._layers[layer]
+        best = entry
+        best_similarity = float(matrix[entry] @ query)
+        improved = True
+        while improved:
+            improved = False
+            links = adjacency.get(best)
+            if not links:
+                break
+            similarities = matrix[links] @ query
+            position = int(np.argmax(similarities))
+            if similarities[position] > best_similarity:
+                best_similarity = float(similarities[position])
+                best = links[position]
+                improved = True
+        return best
+
+    def _search_layer(
+        self,
+        query: np.ndarray,
+        entry_points: Sequence[int],
+        ef: int,
+        layer: int,
+        matrix: np.ndarray,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Tuple[float, int]]:
+        """
+        Búsqueda best-first en una capa.
+
+        Returns:
+            Hasta `ef` pares (similarity, node) de nodos permitidos, de mayor a menor
+        """
+        adjacency = self._layers[layer]
+        visited = set(entry_points)
+        entry_similarities = (matrix[list(entry_points)] @ query).tolist()
+
+        candidates: List[Tuple[float, int]] = []   # max-heap por similitud (negada)
+        results: List[Tuple[float, int]] = []      # min-heap de los mejores ef
+        for similarity, node in zip(entry_similarities, entry_points):
+            heapq.heappush(candidates, (-similarity, node))
+            if allowed is None or allowed[node]:
+                heapq.heappush(results, (similarity, node))
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            negative, current = heapq.heappop(candidates)
+            if len(results) >= ef and -negative < results[0][0]:
+                break
+            fresh = [n for n in adjacency.get(current, ()) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            similarities = (matrix[fresh] @ query).tolist()
+            for similarity, node in zip(similarities, fresh):
+                if len(results) < ef or similarity > results[0][0]:
+                    heapq.heappush(candidates, (-similarity, node))
+                    if allowed is None or allowed[node]:
+                        heapq.heappush(results, (similarity, node))
+                        if len(results) > ef:
+                            heapq.heappop(results)
+
+        return sorted(results, reverse=True)
+
+    def search(
+        self,
+        query: np.ndarray,
+        limit: int,
+        ef: int,
+        matrix: np.ndarray,
+        allowed: Optional[np.ndarray] = None,
+    ) -> List[Tuple[float, int]]:
+        """
+        Vecinos aproximados de `query` (normalizado).
+
+        Args:
+            limit: Resultados a devolver
+            ef: Tamaño de la lista dinámica en la capa 0 (>= limit)
+            allowed: Máscara booleana por fila; None permite todos los nodos
+
+        Returns:
+            Lista de (similarity, node) de mayor a menor
+        """
+        if self._entry is None or limit <= 0:
+            return []
+        entry = self._entry
+        for layer in range(self.max_level, 0, -1):
+            entry = self._greedy_closest(query, entry, layer, matrix)
+        found = self._search_layer(query, [entry], max(ef, limit), 0, matrix, allowed)
+        return found[:limit]
+
+
+__all__ = ["HNSWGraph"]
@@ -0,0 +1,497 @@
+"""
+Knowledge Vector Index - Índice vectorial en memoria para búsqueda RAG sin pgvector.
+
+Cuando pgvector no está disponible (SQLite en despliegues de campus, tests),
+KnowledgeRepository calculaba la similitud coseno documento por documento en
+Python puro, cargando además el contenido completo de cada fila. Este índice:
+
+- Mantiene los embeddings normalizados en una matriz float32 contigua
+  (una fila por documento, indexada por doc id).
+- Responde top-k con un único producto matriz-vector + np.argpartition.
+- Aplica los filtros (unit, content_type, difficulty, materia_code) como
+  máscaras booleanas precalculadas sobre columnas codificadas como enteros.
+- Se actualiza incrementalmente desde el repositorio (create, bulk_create,
+  update, soft_delete) y sincroniza cambios hechos por otros procesos
+  leyendo solo las filas con updated_at >= última marca de agua.
+- A partir de RAG_ANN_MIN_DOCUMENTS documentos construye en segundo plano un
+  grafo HNSW (knowledge_hnsw.py) y responde con búsqueda aproximada; hasta
+  que el grafo está listo, y para filtros que dejan pocos candidatos, sigue
+  usando la búsqueda exacta.
+
+Hay un índice por engine de SQLAlchemy (WeakKeyDictionary), compartido por
+todas las instancias de KnowledgeRepository del proceso.
+"""
+import logging
+import threading
+import time
+import weakref
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ...core.constants import (
+    RAG_ANN_MIN_DOCUMENTS,
+    RAG_HNSW_EF_SEARCH,
+    RAG_INDEX_SYNC_INTERVAL_SECONDS,
+)
+from ..models.knowledge import KnowledgeDocumentDB
+from .knowledge_hnsw import HNSWGraph
+
+logger = logging.getLogger(__name__)
+
+# Columnas filtrables (mismas claves que acepta search_similar)
+FILTER_FIELDS: Tuple[str, ...] = ("unit", "content_type", "difficulty", "materia_code")
+
+_INITIAL_CAPACITY = 256
+
+# Margen al releer desde la marca de agua: tolera relojes desfasados entre
+# workers y transacciones que confirman con un updated_at anterior
+_SYNC_OVERLAP = timedelta(minutes=5)
+
+
+def _as_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+class KnowledgeVectorIndex:
+    """
+    Índice vectorial sobre embeddings de documentos: exacto (fuerza bruta
+    vectorizada) o aproximado (HNSW) según la cantidad de candidatos.
+
+    Thread-safe: las mutaciones y búsquedas se serializan con un RLock; el
+    costo de una búsqueda exacta es un matvec sobre N x dim float32.
+    """
+
+    def __init__(
+        self,
+        sync_interval_seconds: float = RAG_INDEX_SYNC_INTERVAL_SECONDS,
+        ann_min_documents: int = RAG_ANN_MIN_DOCUMENTS,
+        ef_search: int = RAG_HNSW_EF_SEARCH,
+    ):
+        """
+        Args:
+            sync_interval_seconds: Intervalo mínimo entre sincronizaciones con la BD
+            ann_min_documents: Candidatos a partir de los cuales se usa HNSW (<= 0 desactiva)
+            ef_search: Tamaño por defecto de la lista de candidatos HNSW por consulta
+        """
+        self.sync_interval_seconds = sync_interval_seconds
+        self.ann_min_documents = ann_min_documents
+        self.ef_search = ef_search
+        self._lock = threading.RLock()
+        self._dim: Optional[int] = None
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._codes: Dict[str, np.ndarray] = {f: np.zeros(0, dtype=np.int32) for f in FILTER_FIELDS}
+        self._vocab: Dict[str, Dict[str, int]] = {f: {} for f in FILTER_FIELDS}
+        self._row_ids: List[Optional[str]] = []
+        self._id_to_row: Dict[str, int] = {}
+        self._versions: Dict[str, Optional[datetime]] = {}
+        self._size = 0          # filas usadas (vivas + tombstones)
+        self._dead = 0          # tombstones pendientes de compactar
+        self._mask_cache: Dict[Tuple[Tuple[str, str], ...], np.ndarray] = {}
+        self._loaded = False
+        self._watermark: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._ann: Optional[HNSWGraph] = None
+        self._ann_building = False
+        # Se incrementa al compactar: invalida grafos construidos sobre filas viejas
+        self._generation = 0
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    def __len__(self) -> int:
+        return self._size - self._dead
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._id_to_row
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "documents": len(self),
+                "tombstones": self._dead,
+                "dimension": self._dim,
+                "capacity": int(self._matrix.shape[0]),
+                "memory_bytes": int(self._matrix.nbytes),
+                "loaded": self._loaded,
+                "ann_nodes": len(self._ann) if self._ann is not None else None,
+                "ann_building": self._ann_building,
+            }
+
+    # ------------------------------------------------------------------
+    # Mutaciones
+    # ------------------------------------------------------------------
+
+    def upsert(
+        self,
+        doc_id: str,
+        embedding: Optional[Sequence[float]],
+        attributes: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Agrega o reemplaza un documento.
+
+        Documentos sin embedding o con una dimensión distinta a la del índice
+        se eliminan del índice (no participan de la búsqueda).
+
+        Returns:
+            True si el documento quedó indexado
+        """
+        with self._lock:
+            self._remove_locked(doc_id)
+            if not embedding:
+                return False
+
+            vector = np.asarray(embedding, dtype=np.float32).ravel()
+            if self._dim is None:
+                self._dim = int(vector.shape[0])
+                self._matrix = np.zeros((_INITIAL_CAPACITY, self._dim), dtype=np.float32)
+                self._alive = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+                for field in FILTER_FIELDS:
+                    self._codes[field] = np.full(_INITIAL_CAPACITY, -1, dtype=np.int32)
+            elif vector.shape[0] != self._dim:
+                logger.warning(
+                    "Skipping knowledge document %s: embedding dimension %d != index dimension %d",
+                    doc_id, vector.shape[0], self._dim
+                )
+                return False
+
+            norm = float(np.linalg.norm(vector))
+            if norm > 0:
+                vector = vector / norm
+
+            self._ensure_capacity(self._size + 1)
+            row = self._size
+            self._matrix[row] = vector
+            self._alive[row] = True
+            attributes = attributes or {}
+            for field in FILTER_FIELDS:
+                self._codes[field][row] = self._code_for(field, attributes.get(field))
+            self._row_ids.append(doc_id)
+            self._id_to_row[doc_id] = row
+            self._size += 1
+            self._mask_cache.clear()
+            if self._ann is not None:
+                self._ann.add(row, self._matrix)
+            self._maybe_compact_locked()
+            return True
+
+    def remove(self, doc_id: str) -> bool:
+        """Quita un documento del índice (tombstone + compactación diferida)."""
+        with self._lock:
+            removed = self._remove_locked(doc_id)
+            if removed:
+                self._maybe_compact_locked()
+            return removed
+
+    def _maybe_compact_locked(self) -> None:
+        if self._dead > max(_INITIAL_CAPACITY, self._size // 4):
+            self._compact_locked()
+
+    def _remove_locked(self, doc_id: str) -> bool:
+        self._versions.pop(doc_id, None)
+        row = self._id_to_row.pop(doc_id, None)
+        if row is None:
+            return False
+        self._alive[row] = False
+        self._row_ids[row] = None
+        self._dead += 1
+        self._mask_cache.clear()
+        return True
+
+    def _code_for(self, field: str, value: Any) -> int:
+        if value is None:
+            return -1
+        vocab = self._vocab[field]
+        key = str(value)
+        if key not in vocab:
+            vocab[key] = len(vocab)
+        return vocab[key]
+
+    def _ensure_capacity(self, needed: int) -> None:
+        capacity = self._matrix.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        matrix = np.zeros((new_capacity, self._dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+        alive = np.zeros(new_capacity, dtype=bool)
+        alive[:self._size] = self._alive[:self._size]
+        self._alive = alive
+        for field in FILTER_FIELDS:
+            codes = np.full(new_capacity, -1, dtype=np.int32)
+            codes[:self._size] = self._codes[field][:self._size]
+            self._codes[field] = codes
+
+    def _compact_locked(self) -> None:
+        keep = np.flatnonzero(self._alive[:self._size])
+        capacity = max(_INITIAL_CAPACITY, self._matrix.shape[0])
+        matrix = np.zeros((capacity, self._dim), dtype=np.float32)
+        matrix[:len(keep)] = self._matrix[keep]
+        self._matrix = matrix
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(keep)] = True
+        self._alive = alive
+        for field in FILTER_FIELDS:
+            codes = np.full(capacity, -1, dtype=np.int32)
+            codes[:len(keep)] = self._codes[field][keep]
+            self._codes[field] = codes
+        self._row_ids = [self._row_ids[i] for i in keep]
+        self._id_to_row = {doc_id: row for row, doc_id in enumerate(self._row_ids)}
+        self._size = len(keep)
+        self._dead = 0
+        self._mask_cache.clear()
+        # Las filas cambiaron de posición: el grafo se reconstruye
+        self._generation += 1
+        self._ann = None
+
+    # ------------------------------------------------------------------
+    # Búsqueda
+    # ------------------------------------------------------------------
+
+    def _filter_mask(self, filters: Dict[str, Any]) -> Optional[np.ndarray]:
+        """Máscara de filas vivas que cumplen los filtros (cacheada hasta la próxima mutación)."""
+        active = tuple(sorted(
+            (field, str(filters[field])) for field in FILTER_FIELDS if filters.get(field)
+        ))
+        mask = self._mask_cache.get(active)
+        if mask is not None:
+            return mask
+
+        mask = self._alive[:self._size].copy()
+        for field, value in active:
+            code = self._vocab[field].get(value)
+            if code is None:
+                mask[:] = False
+                break
+            mask &= self._codes[field][:self._size] == code
+        self._mask_cache[active] = mask
+        return mask
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        filters: Optional[Dict[str, Any]] = None,
+        limit: int = 5,
+        min_similarity: float = 0.5,
+        ef_search: Optional[int] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Top-k documentos por similitud coseno.
+
+        Args:
+            ef_search: Candidatos HNSW para esta consulta (default: self.ef_search)
+
+        Returns:
+            Lista de (doc_id, similarity) ordenada de mayor a menor
+        """
+        if limit <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32).ravel()
+
+        with self._lock:
+            if self._dim is None or not self._id_to_row:
+                return []
+            if query.shape[0] != self._dim:
+                return []
+            norm = float(np.linalg.norm(query))
+            if norm == 0:
+                return []
+
+            query = query / norm
+            mask = self._filter_mask(filters or {})
+            candidates = np.flatnonzero(mask)
+            if candidates.size == 0:
+                return []
+
+            self._maybe_start_ann_build_locked()
+            if self._ann is not None and candidates.size >= self.ann_min_documents:
+                ef = max(ef_search or self.ef_search, limit)
+                return [
+                    (self._row_ids[row], score)
+                    for score, row in self._ann.search(query, limit, ef, self._matrix, allowed=mask)
+                    if score >= min_similarity
+                ]
+
+            # Un único matvec; sin filtros se evita el gather de filas
+            if candidates.size == self._size:
+                scores = self._matrix[:self._size] @ query
+            else:
+                scores = self._matrix[candidates] @ query
+
+            k = min(limit, scores.shape[0])
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+
+            results = []
+            for pos in top:
+                score = float(scores[pos])
+                if score < min_similarity:
+                    break
+                row = int(pos) if candidates.size == self._size else int(candidates[pos])
+                results.append((self._row_ids[row], score))
+            return results
+
+    # ------------------------------------------------------------------
+    # HNSW
+    # ------------------------------------------------------------------
+
+    def _maybe_start_ann_build_locked(self) -> None:
+        if (
+            self.ann_min_documents <= 0
+            or self._ann is not None
+            or self._ann_building
+            or len(self) < self.ann_min_documents
+        ):
+            return
+        self._ann_building = True
+        threading.Thread(
+            target=self.build_ann,
+            name="knowledge-hnsw-build",
+            daemon=True,
+        ).start()
+
+    def build_ann(self) -> bool:
+        """
+        Construye el grafo HNSW sobre las filas vivas.
+
+        Bloqueante; normalmente corre en un hilo de fondo mientras las
+        búsquedas siguen siendo exactas. Las filas existentes no se modifican
+        in-place, así que el grafo se arma sin tomar el lock y al final se
+        agregan las filas insertadas mientras tanto.
+
+        Returns:
+            True si el grafo quedó publicado; False si una compactación lo invalidó
+        """
+        try:
+            with self._lock:
+                self._ann_building = True
+                generation = self._generation
+                size = self._size
+                matrix = self._matrix
+                rows = np.flatnonzero(self._alive[:size])
+
+            started = time.perf_counter()
+            graph = HNSWGraph()
+            for row in rows.tolist():
+                graph.add(row, matrix)
+
+            with self._lock:
+                if generation != self._generation:
+                    logger.info("Knowledge HNSW build discarded: index compacted during build")
+                    return False
+                for row in range(size, self._size):
+                    if self._alive[row]:
+                        graph.add(row, self._matrix)
+                self._ann = graph
+            logger.info(
+                "Knowledge HNSW graph built: %d nodes in %.1f s",
+                len(graph), time.perf_counter() - started
+            )
+            return True
+        except Exception as e:
+            logger.error("Knowledge HNSW build failed: %s", e, exc_info=True)
+            return False
+        finally:
+            self._ann_building = False
+
+    # ------------------------------------------------------------------
+    # Sincronización con la BD
+    # ------------------------------------------------------------------
+
+    def ensure_synced(self, db: Session) -> None:
+        """Carga inicial o sincronización incremental si venció el intervalo."""
+        now = time.monotonic()
+        if self._loaded and now - self._last_sync < self.sync_interval_seconds:
+            return
+        with self._lock:
+            if self._loaded and now - self._last_sync < self.sync_interval_seconds:
+                return
+            self._sync_locked(db)
+            self._last_sync = time.monotonic()
+
+    def _sync_locked(self, db: Session) -> None:
+        columns = [
+            KnowledgeDocumentDB.id,
+            KnowledgeDocumentDB.embedding_json,
+            KnowledgeDocumentDB.deleted_at,
+            KnowledgeDocumentDB.updated_at,
+        ] + [getattr(KnowledgeDocumentDB, field) for field in FILTER_FIELDS]
+
+        # Sin contenido: solo lo necesario para indexar
+        stmt = select(*columns)
+        if self._loaded and self._watermark is not None:
+            stmt = stmt.where(KnowledgeDocumentDB.updated_at >= self._watermark - _SYNC_OVERLAP)
+        else:
+            stmt = stmt.where(
+                KnowledgeDocumentDB.deleted_at.is_(None),
+                KnowledgeDocumentDB.embedding_json.isnot(None),
+            )
+
+        started = time.perf_counter()
+        rows = db.execute(stmt).all()
+        self.apply_rows(rows)
+        if not self._loaded:
+            logger.info(
+                "Knowledge vector index loaded: %d documents in %.1f ms",
+                len(self), (time.perf_counter() - started) * 1000
+            )
+        self._loaded = True
+
+    def apply_rows(self, rows: Iterable[Any]) -> None:
+        """Aplica filas (id, embedding_json, deleted_at, updated_at, filtros) al índice."""
+        with self._lock:
+            for row in rows:
+                updated_at = _as_naive_utc(row.updated_at)
+                if row.deleted_at is not None:
+                    self.remove(row.id)
+                elif row.id not in self._id_to_row or self._versions.get(row.id) != updated_at:
+                    if self.upsert(
+                        row.id,
+                        row.embedding_json,
+                        {field: getattr(row, field) for field in FILTER_FIELDS},
+                    ):
+                        self._versions[row.id] = updated_at
+                if updated_at is not None and (self._watermark is None or updated_at > self._watermark):
+                    self._watermark = updated_at
+
+    def index_document(self, doc: KnowledgeDocumentDB) -> None:
+        """Refleja en el índice un documento recién escrito por este proceso."""
+        if not self._loaded:
+            # Se indexará completo en la primera búsqueda
+            return
+        self.apply_rows([doc])
+
+
+# Un índice por engine (bases distintas -> índices distintos)
+_indexes: "weakref.WeakKeyDictionary[Any, KnowledgeVectorIndex]" = weakref.WeakKeyDictionary()
+_indexes_lock = threading.Lock()
+
+
+def get_knowledge_index(db: Session) -> KnowledgeVectorIndex:
+    """Índice vectorial del engine al que está ligada la sesión."""
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    index = _indexes.get(engine)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(engine)
+            if index is None:
+                index = KnowledgeVectorIndex()
+                _indexes[engine] = index
+    return index
+
+
+__all__ = ["KnowledgeVectorIndex", "get_knowledge_index", "FILTER_FIELDS"]
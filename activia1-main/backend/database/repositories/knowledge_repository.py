@@ -8,21 +8,31 @@ de conocimiento: creacion, lectura, actualizacion, eliminacion logica,
 y especialmente busqueda por similitud vectorial.
 
 La busqueda vectorial utiliza pgvector para encontrar documentos
-semanticamente relacionados con una consulta.
+semanticamente relacionados con una consulta, sobre el indice HNSW/IVFFlat
+de la migracion add_knowledge_ann_index (ef_search/probes por consulta y
+umbral de similitud dentro del SQL). Sin pgvector (SQLite) se usa
+KnowledgeVectorIndex: matriz NumPy en memoria con top-k vectorizado, o
+grafo HNSW en memoria para colecciones grandes.
 """
 import logging
+import weakref
 from datetime import datetime, timezone
 from typing import List, Optional, Dict, Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 from sqlalchemy import select, and_, func, text
 from sqlalchemy.orm import Session
 
+from ...core.constants import RAG_HNSW_EF_SEARCH, RAG_IVFFLAT_PROBES
 from ..models.knowledge import KnowledgeDocumentDB
 from .base import BaseRepository
+from .knowledge_index import FILTER_FIELDS, get_knowledge_index
 
 logger = logging.getLogger(__name__)
 
+# Version de pgvector por engine (habilita iterative scans en >= 0.8)
+_pgvector_versions: "weakref.WeakKeyDictionary[Any, tuple]" = weakref.WeakKeyDictionary()
+
 
 class KnowledgeRepository(BaseRepository):
     """
@@ -101,6 +111,8 @@ class KnowledgeRepository(BaseRepository):
             if embedding:
                 self._store_vector_embedding(doc.id, embedding)
 
+            get_knowledge_index(self.db).index_document(doc)
+
             logger.debug(f"Created knowledge document: {doc.id}")
             return doc
 
@@ -122,7 +134,7 @@ class KnowledgeRepository(BaseRepository):
 
             self.db.execute(text(
                 "UPDATE knowledge_documents "
-                "SET embedding = :embedding::vector "
+                "SET embedding = CAST(:embedding AS vector) "
                 "WHERE id = :doc_id"
             ), {"embedding": embedding_str, "doc_id": str(doc_id)})
             self.db.commit()
@@ -184,7 +196,8 @@ class KnowledgeRepository(BaseRepository):
         query_embedding: List[float],
         filters: Optional[Dict[str, Any]] = None,
         limit: int = 5,
-        min_similarity: float = 0.5
+        min_similarity: float = 0.5,
+        ef_search: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Busca documentos semanticamente similares a una consulta.
@@ -201,6 +214,8 @@ class KnowledgeRepository(BaseRepository):
                 - materia_code: Codigo de materia
             limit: Maximo numero de resultados
             min_similarity: Umbral minimo de similitud (0-1)
+            ef_search: Candidatos del indice HNSW para esta consulta
+                (mayor = mejor recall, mas lento; default RAG_HNSW_EF_SEARCH)
 
         Returns:
             Lista de documentos con su score de similitud, ordenados
@@ -208,17 +223,20 @@ class KnowledgeRepository(BaseRepository):
         """
         filters = filters or {}
 
-        # First try pgvector search
-        try:
-            return self._search_with_pgvector(
-                query_embedding, filters, limit, min_similarity
-            )
-        except Exception as e:
-            logger.debug(f"pgvector search failed, using JSON fallback: {e}")
-
-        # Fallback to JSON-based search (slower but works with SQLite)
+        # First try pgvector search (solo PostgreSQL: en SQLite siempre falla)
+        if self.db.get_bind().dialect.name == "postgresql":
+            try:
+                return self._search_with_pgvector(
+                    query_embedding, filters, limit, min_similarity, ef_search
+                )
+            except Exception as e:
+                # Una sentencia fallida aborta la transaccion en PostgreSQL
+                self.db.rollback()
+                logger.debug(f"pgvector search failed, using JSON fallback: {e}")
+
+        # Fallback: indice vectorial en memoria sobre embedding_json
         return self._search_with_json_fallback(
-            query_embedding, filters, limit, min_similarity
+            query_embedding, filters, limit, min_similarity, ef_search
         )
 
     def _search_with_pgvector(
@@ -226,16 +244,26 @@ class KnowledgeRepository(BaseRepository):
         query_embedding: List[float],
         filters: Dict[str, Any],
         limit: int,
-        min_similarity: float
+        min_similarity: float,
+        ef_search: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Search using pgvector's native vector operations.
 
-        Uses cosine distance for similarity calculation.
+        Uses cosine distance for similarity calculation. The similarity
+        threshold is part of the WHERE clause, so LIMIT counts only rows
+        above it; with pgvector >= 0.8 iterative index scans keep reading
+        the HNSW/IVFFlat index until LIMIT rows pass the filters.
         """
-        # Build WHERE conditions
-        where_clauses = ["deleted_at IS NULL"]
-        params = {"limit": limit}
+        self._configure_ann_search(limit, ef_search)
+
+        # cosine_distance returns 0 for identical, 2 for opposite; similarity
+        # is 1 - (distance / 2), so similarity >= min <=> distance <= 2 * (1 - min)
+        where_clauses = [
+            "deleted_at IS NULL",
+            "(embedding <=> CAST(:query_embedding AS vector)) <= :max_distance",
+        ]
+        params = {"limit": limit, "max_distance": 2 * (1 - min_similarity)}
 
         if filters.get("unit"):
             where_clauses.append("unit = :unit")
@@ -256,18 +284,16 @@ class KnowledgeRepository(BaseRepository):
         embedding_str = "[" + ",".join(str(x) for x in query_embedding) + "]"
         params["query_embedding"] = embedding_str
 
-        # Query using cosine distance
-        # cosine_distance returns 0 for identical, 2 for opposite
-        # We convert to similarity: 1 - (distance / 2)
+        # ORDER BY the bare distance expression so the ANN index is used
         sql = text(f"""
             SELECT
                 id, content, title, summary, content_type,
                 unit, topic, difficulty, materia_code, extra_data,
-                1 - (embedding <=> :query_embedding::vector) / 2 as similarity
+                1 - (embedding <=> CAST(:query_embedding AS vector)) / 2 as similarity
             FROM knowledge_documents
             WHERE {where_clause}
                 AND embedding IS NOT NULL
-            ORDER BY embedding <=> :query_embedding::vector
+            ORDER BY embedding <=> CAST(:query_embedding AS vector)
             LIMIT :limit
         """)
 
@@ -277,7 +303,7 @@ class KnowledgeRepository(BaseRepository):
         documents = []
         for row in rows:
             similarity = float(row.similarity) if row.similarity else 0
-            if similarity >= min_similarity:
+            if similarity >= min_similarity:  # float rounding at the boundary
                 documents.append({
                     "id": str(row.id),
                     "content": row.content,
@@ -294,62 +320,102 @@ class KnowledgeRepository(BaseRepository):
 
         return documents
 
+    def _configure_ann_search(self, limit: int, ef_search: Optional[int]) -> None:
+        """
+        Set per-query ANN parameters for the current transaction.
+
+        set_config(..., true) behaves like SET LOCAL and accepts bind
+        parameters. Iterative HNSW scans (pgvector >= 0.8) are enabled
+        only when the installed extension supports them: pgvector reserves
+        the hnsw.* prefix, so unknown settings raise an error.
+        """
+        sql = (
+            "SELECT set_config('hnsw.ef_search', :ef_search, true), "
+            "set_config('ivfflat.probes', :probes, true)"
+        )
+        if self._pgvector_version() >= (0, 8):
+            sql += ", set_config('hnsw.iterative_scan', 'strict_order', true)"
+        self.db.execute(
+            text(sql),
+            {
+                # ef_search < LIMIT silently truncates HNSW results
+                "ef_search": str(max(ef_search or RAG_HNSW_EF_SEARCH, limit)),
+                "probes": str(RAG_IVFFLAT_PROBES),
+            },
+        )
+
+    def _pgvector_version(self) -> tuple:
+        """Installed pgvector version, cached per engine ((0,) if unknown)."""
+        bind = self.db.get_bind()
+        engine = getattr(bind, "engine", bind)
+        version = _pgvector_versions.get(engine)
+        if version is None:
+            raw = self.db.execute(
+                text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+            ).scalar()
+            try:
+                version = tuple(int(part) for part in str(raw).split(".")[:2])
+            except ValueError:
+                version = (0,)
+            _pgvector_versions[engine] = version
+        return version
+
     def _search_with_json_fallback(
         self,
         query_embedding: List[float],
         filters: Dict[str, Any],
         limit: int,
-        min_similarity: float
+        min_similarity: float,
+        ef_search: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Fallback search using JSON-stored embeddings.
 
-        Calculates cosine similarity in Python. Slower but works
-        without pgvector (e.g., SQLite in tests).
+        Top-k via KnowledgeVectorIndex (un matvec NumPy + argpartition, filtros
+        como mascaras); solo se cargan de BD las filas completas de los k
+        resultados.
         """
-        # Get all documents matching filters
-        conditions = [KnowledgeDocumentDB.deleted_at.is_(None)]
-
-        if filters.get("unit"):
-            conditions.append(KnowledgeDocumentDB.unit == filters["unit"])
-        if filters.get("content_type"):
-            conditions.append(KnowledgeDocumentDB.content_type == filters["content_type"])
-        if filters.get("difficulty"):
-            conditions.append(KnowledgeDocumentDB.difficulty == filters["difficulty"])
-        if filters.get("materia_code"):
-            conditions.append(KnowledgeDocumentDB.materia_code == filters["materia_code"])
+        index = get_knowledge_index(self.db)
+        index.ensure_synced(self.db)
+
+        # content_type, unit, difficulty y materia_code se filtran en el indice
+        hits = index.search(
+            query_embedding,
+            {field: filters.get(field) for field in FILTER_FIELDS},
+            limit,
+            min_similarity,
+            ef_search,
+        )
+        if not hits:
+            return []
 
-        stmt = (
-            select(KnowledgeDocumentDB)
-            .where(and_(*conditions))
+        stmt = select(KnowledgeDocumentDB).where(
+            KnowledgeDocumentDB.id.in_([doc_id for doc_id, _ in hits]),
+            KnowledgeDocumentDB.deleted_at.is_(None)
         )
-        docs = list(self.db.execute(stmt).scalars().all())
+        docs = {doc.id: doc for doc in self.db.execute(stmt).scalars().all()}
 
-        # Calculate similarity for each document
         results = []
-        for doc in docs:
-            if not doc.embedding_json:
+        for doc_id, similarity in hits:
+            doc = docs.get(doc_id)
+            if doc is None:
+                # Borrado por otro proceso despues de la ultima sincronizacion
                 continue
-
-            similarity = self._cosine_similarity(query_embedding, doc.embedding_json)
-            if similarity >= min_similarity:
-                results.append({
-                    "id": str(doc.id),
-                    "content": doc.content,
-                    "title": doc.title,
-                    "summary": doc.summary,
-                    "content_type": doc.content_type,
-                    "unit": doc.unit,
-                    "topic": doc.topic,
-                    "difficulty": doc.difficulty,
-                    "materia_code": doc.materia_code,
-                    "similarity": similarity,
-                    "metadata": doc.extra_data or {}
-                })
-
-        # Sort by similarity descending and limit
-        results.sort(key=lambda x: x["similarity"], reverse=True)
-        return results[:limit]
+            results.append({
+                "id": str(doc.id),
+                "content": doc.content,
+                "title": doc.title,
+                "summary": doc.summary,
+                "content_type": doc.content_type,
+                "unit": doc.unit,
+                "topic": doc.topic,
+                "difficulty": doc.difficulty,
+                "materia_code": doc.materia_code,
+                "similarity": similarity,
+                "metadata": doc.extra_data or {}
+            })
+
+        return results
 
     @staticmethod
     def _cosine_similarity(vec1: List[float], vec2: List[float]) -> float:
@@ -381,22 +447,34 @@ class KnowledgeRepository(BaseRepository):
             Cantidad de documentos insertados
         """
         db_docs = []
+        rows = []
         for doc_data in documents:
+            doc_data = dict(doc_data)
             embedding = doc_data.pop("embedding", None)
+            # ID asignado aqui: evita un SELECT por documento tras el commit
+            doc_data.setdefault("id", str(uuid4()))
             doc = KnowledgeDocumentDB(
                 embedding_json=embedding,
                 **doc_data
             )
             db_docs.append(doc)
+            rows.append((doc_data, embedding))
 
         try:
             self.db.add_all(db_docs)
             self.db.commit()
 
             # Store vector embeddings if available
-            for i, doc in enumerate(db_docs):
-                if documents[i].get("embedding"):
-                    self._store_vector_embedding(doc.id, documents[i]["embedding"])
+            index = get_knowledge_index(self.db)
+            for doc_data, embedding in rows:
+                if embedding:
+                    self._store_vector_embedding(doc_data["id"], embedding)
+                if index.is_loaded:
+                    index.upsert(
+                        doc_data["id"],
+                        embedding,
+                        {field: doc_data.get(field) for field in FILTER_FIELDS},
+                    )
 
             logger.info(f"Bulk created {len(db_docs)} knowledge documents")
             return len(db_docs)
@@ -433,6 +511,9 @@ class KnowledgeRepository(BaseRepository):
                 self._store_vector_embedding(doc.id, embedding)
                 self.db.commit()
 
+            # Filtros o embedding pueden haber cambiado
+            get_knowledge_index(self.db).index_document(doc)
+
             return doc
 
         except Exception as e:
@@ -450,6 +531,7 @@ class KnowledgeRepository(BaseRepository):
 
         try:
             self.db.commit()
+            get_knowledge_index(self.db).remove(doc_id)
             logger.debug(f"Soft deleted document: {doc_id}")
             return True
         except Exception as e:
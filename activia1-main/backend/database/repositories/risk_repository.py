@@ -7,8 +7,9 @@ Provides:
 - RiskRepository: CRUD operations for risks
 - Batch loading to prevent N+1 queries
 - Orphan trace cleanup utilities
+- Session rollups updated in the same transaction as the inserts
 """
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence
 from uuid import uuid4
 import logging
 
@@ -19,10 +20,35 @@ from ..models import RiskDB, SessionDB, CognitiveTraceDB
 from ...models.risk import Risk, RiskType, RiskLevel
 from backend.core.constants import utc_now
 from .base import _safe_enum_to_str
+from .rollup_repository import SessionRollupRepository
 
 logger = logging.getLogger(__name__)
 
 
+def _risk_to_db(risk: Risk) -> RiskDB:
+    """Build the ORM row for a Risk (shared by sync and async repositories)."""
+    return RiskDB(
+        id=risk.id or str(uuid4()),
+        session_id=risk.session_id,
+        student_id=risk.student_id,
+        activity_id=risk.activity_id,
+        risk_type=_safe_enum_to_str(risk.risk_type, RiskType),
+        risk_level=_safe_enum_to_str(risk.risk_level, RiskLevel),
+        dimension=risk.dimension.value,
+        description=risk.description,
+        impact=risk.impact,
+        evidence=risk.evidence,
+        trace_ids=risk.trace_ids,
+        root_cause=risk.root_cause,
+        impact_assessment=risk.impact_assessment,
+        recommendations=risk.recommendations,
+        pedagogical_intervention=risk.pedagogical_intervention,
+        resolved=risk.resolved,
+        resolution_notes=risk.resolution_notes,
+        detected_by=risk.detected_by,
+    )
+
+
 class RiskRepository:
     """Repository for risk operations."""
 
@@ -39,29 +65,12 @@ class RiskRepository:
         Returns:
             Created RiskDB instance
         """
-        db_risk = RiskDB(
-            id=risk.id or str(uuid4()),
-            session_id=risk.session_id,
-            student_id=risk.student_id,
-            activity_id=risk.activity_id,
-            risk_type=_safe_enum_to_str(risk.risk_type, RiskType),
-            risk_level=_safe_enum_to_str(risk.risk_level, RiskLevel),
-            dimension=risk.dimension.value,
-            description=risk.description,
-            impact=risk.impact,
-            evidence=risk.evidence,
-            trace_ids=risk.trace_ids,
-            root_cause=risk.root_cause,
-            impact_assessment=risk.impact_assessment,
-            recommendations=risk.recommendations,
-            pedagogical_intervention=risk.pedagogical_intervention,
-            resolved=risk.resolved,
-            resolution_notes=risk.resolution_notes,
-            detected_by=risk.detected_by,
-        )
+        db_risk = _risk_to_db(risk)
         # FIX Cortez84 HIGH-REPO-001: Use commit instead of flush for persistence
         try:
             self.db.add(db_risk)
+            self.db.flush()
+            SessionRollupRepository(self.db).apply_risks([db_risk])
             self.db.commit()
             self.db.refresh(db_risk)
         except Exception as e:
@@ -70,6 +79,41 @@ class RiskRepository:
             raise
         return db_risk
 
+    def bulk_create(self, risks: Sequence[Risk]) -> int:
+        """
+        Insert many risks with a single commit.
+
+        Used by the risk analysis queue: the risks of a whole batch of jobs
+        are written together instead of add/commit/refresh per risk.
+
+        Args:
+            risks: Risk domain models
+
+        Returns:
+            Number of rows inserted
+        """
+        if not risks:
+            return 0
+
+        db_risks = [_risk_to_db(risk) for risk in risks]
+        try:
+            self.db.add_all(db_risks)
+            self.db.flush()
+            SessionRollupRepository(self.db).apply_risks(db_risks)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error("Failed to bulk insert %d risks: %s", len(risks), str(e), exc_info=True)
+            raise
+        return len(risks)
+
+    def get_existing_ids(self, risk_ids: Sequence[str]) -> set:
+        """Return the subset of risk_ids already persisted (idempotent redelivery)."""
+        if not risk_ids:
+            return set()
+        rows = self.db.query(RiskDB.id).filter(RiskDB.id.in_(list(risk_ids))).all()
+        return {row[0] for row in rows}
+
     def get_by_id(self, risk_id: str) -> Optional[RiskDB]:
         """Get risk by ID."""
         return self.db.query(RiskDB).filter(RiskDB.id == risk_id).first()
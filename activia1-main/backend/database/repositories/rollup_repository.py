@@ -0,0 +1,313 @@
+"""
+Session Rollup Repository - Incremental per-session aggregates.
+
+Provides:
+- SessionRollupRepository: maintain and read SessionRollupDB rows
+- RollupDelta: aggregates of a batch of traces/risks (shared with the async repositories)
+
+The write paths (TraceRepository, RiskRepository and their async variants)
+call apply_traces/apply_risks in the same transaction that inserts the rows:
+the rollup row is created if missing (INSERT ... ON CONFLICT DO NOTHING),
+locked with SELECT ... FOR UPDATE and incremented. Dashboards then read one
+row per session instead of every trace.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+import logging
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.orm import Session
+
+from ..models import CognitiveTraceDB, RiskDB, SessionRollupDB
+from backend.core.constants import utc_now
+
+logger = logging.getLogger(__name__)
+
+# Columns needed to rebuild a rollup (no content, no N4 dimension JSON)
+_TRACE_ROLLUP_COLUMNS = (
+    CognitiveTraceDB.session_id,
+    CognitiveTraceDB.student_id,
+    CognitiveTraceDB.activity_id,
+    CognitiveTraceDB.interaction_type,
+    CognitiveTraceDB.cognitive_state,
+    CognitiveTraceDB.ai_involvement,
+    CognitiveTraceDB.trace_metadata,
+    CognitiveTraceDB.created_at,
+)
+_RISK_ROLLUP_COLUMNS = (
+    RiskDB.session_id,
+    RiskDB.student_id,
+    RiskDB.activity_id,
+    RiskDB.risk_type,
+    RiskDB.risk_level,
+)
+
+
+def _field(record: Any, name: str) -> Any:
+    """Read a field from an ORM row, a Row or a bulk INSERT dict."""
+    if isinstance(record, dict):
+        return record.get(name)
+    return getattr(record, name, None)
+
+
+def _naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """DateTime columns are stored naive UTC; compare in the same form."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _merge_counts(current: Optional[Dict[str, int]], delta: Dict[str, int]) -> Dict[str, int]:
+    """New dict (reassigned so SQLAlchemy flushes the JSON column)."""
+    merged = dict(current or {})
+    for key, count in delta.items():
+        merged[key] = merged.get(key, 0) + count
+    return merged
+
+
+class RollupDelta:
+    """Aggregates of a batch of traces/risks for one session."""
+
+    __slots__ = (
+        "session_id", "student_id", "activity_id",
+        "trace_count", "interaction_counts", "cognitive_state_counts",
+        "ai_involvement_sum", "ai_involvement_count",
+        "blocked_count", "strategy_change_count",
+        "first_trace_at", "last_trace_at",
+        "risk_count", "risk_type_counts", "risk_level_counts",
+    )
+
+    def __init__(self, session_id: str, student_id: str, activity_id: str):
+        self.session_id = session_id
+        self.student_id = student_id
+        self.activity_id = activity_id
+        self.trace_count = 0
+        self.interaction_counts: Dict[str, int] = defaultdict(int)
+        self.cognitive_state_counts: Dict[str, int] = defaultdict(int)
+        self.ai_involvement_sum = 0.0
+        self.ai_involvement_count = 0
+        self.blocked_count = 0
+        self.strategy_change_count = 0
+        self.first_trace_at: Optional[datetime] = None
+        self.last_trace_at: Optional[datetime] = None
+        self.risk_count = 0
+        self.risk_type_counts: Dict[str, int] = defaultdict(int)
+        self.risk_level_counts: Dict[str, int] = defaultdict(int)
+
+    def add_trace(self, trace: Any) -> None:
+        self.trace_count += 1
+        interaction_type = _field(trace, "interaction_type")
+        if interaction_type:
+            self.interaction_counts[interaction_type] += 1
+        cognitive_state = _field(trace, "cognitive_state")
+        if cognitive_state:
+            self.cognitive_state_counts[cognitive_state] += 1
+        # Mismo criterio que los endpoints: ai_involvement nulo cuenta como 0.0
+        self.ai_involvement_sum += _field(trace, "ai_involvement") or 0.0
+        self.ai_involvement_count += 1
+        metadata = _field(trace, "trace_metadata") or {}
+        if metadata.get("blocked"):
+            self.blocked_count += 1
+        if metadata.get("strategy_change"):
+            self.strategy_change_count += 1
+        created_at = _naive_utc(_field(trace, "created_at") or utc_now())
+        if self.first_trace_at is None or created_at < self.first_trace_at:
+            self.first_trace_at = created_at
+        if self.last_trace_at is None or created_at > self.last_trace_at:
+            self.last_trace_at = created_at
+
+    def add_risk(self, risk: Any) -> None:
+        self.risk_count += 1
+        self.risk_type_counts[_field(risk, "risk_type") or "unknown"] += 1
+        self.risk_level_counts[_field(risk, "risk_level") or "unknown"] += 1
+
+    def seed_row(self) -> Dict[str, Any]:
+        """Values for the INSERT that creates a missing rollup row."""
+        return {
+            "session_id": self.session_id,
+            "student_id": self.student_id,
+            "activity_id": self.activity_id,
+        }
+
+    def apply(self, rollup: SessionRollupDB) -> None:
+        """Add this delta to a (locked) rollup row."""
+        if self.trace_count:
+            rollup.trace_count = (rollup.trace_count or 0) + self.trace_count
+            rollup.interaction_counts = _merge_counts(rollup.interaction_counts, self.interaction_counts)
+            rollup.cognitive_state_counts = _merge_counts(
+                rollup.cognitive_state_counts, self.cognitive_state_counts
+            )
+            rollup.ai_involvement_sum = (rollup.ai_involvement_sum or 0.0) + self.ai_involvement_sum
+            rollup.ai_involvement_count = (rollup.ai_involvement_count or 0) + self.ai_involvement_count
+            rollup.blocked_count = (rollup.blocked_count or 0) + self.blocked_count
+            rollup.strategy_change_count = (rollup.strategy_change_count or 0) + self.strategy_change_count
+            first_trace_at = _naive_utc(rollup.first_trace_at)
+            if first_trace_at is None or self.first_trace_at < first_trace_at:
+                rollup.first_trace_at = self.first_trace_at
+            last_trace_at = _naive_utc(rollup.last_trace_at)
+            if last_trace_at is None or self.last_trace_at > last_trace_at:
+                rollup.last_trace_at = self.last_trace_at
+        if self.risk_count:
+            rollup.risk_count = (rollup.risk_count or 0) + self.risk_count
+            rollup.risk_type_counts = _merge_counts(rollup.risk_type_counts, self.risk_type_counts)
+            rollup.risk_level_counts = _merge_counts(rollup.risk_level_counts, self.risk_level_counts)
+        rollup.updated_at = utc_now()
+
+
+def build_deltas(
+    traces: Iterable[Any] = (),
+    risks: Iterable[Any] = (),
+) -> Dict[str, RollupDelta]:
+    """Group traces/risks (ORM rows or INSERT dicts) into one delta per session."""
+    deltas: Dict[str, RollupDelta] = {}
+
+    def _delta(record: Any) -> RollupDelta:
+        session_id = _field(record, "session_id")
+        delta = deltas.get(session_id)
+        if delta is None:
+            delta = RollupDelta(session_id, _field(record, "student_id"), _field(record, "activity_id"))
+            deltas[session_id] = delta
+        return delta
+
+    for trace in traces:
+        _delta(trace).add_trace(trace)
+    for risk in risks:
+        _delta(risk).add_risk(risk)
+    return deltas
+
+
+def seed_statement(dialect_name: str):
+    """
+    INSERT that creates missing rollup rows without failing on a concurrent insert.
+
+    Returns None for dialects without ON CONFLICT (the caller inserts only the
+    rows it did not find).
+    """
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    return dialect_insert(SessionRollupDB).on_conflict_do_nothing(index_elements=["session_id"])
+
+
+def locked_rollups_statement(session_ids: Sequence[str]):
+    """SELECT ... FOR UPDATE in a fixed order (no deadlocks between writers)."""
+    return (
+        select(SessionRollupDB)
+        .where(SessionRollupDB.session_id.in_(sorted(session_ids)))
+        .order_by(SessionRollupDB.session_id)
+        .with_for_update()
+        # Long-lived sessions (expire_on_commit=False) may hold a stale copy
+        .execution_options(populate_existing=True)
+    )
+
+
+class SessionRollupRepository:
+    """Repository for incremental per-session aggregates."""
+
+    def __init__(self, db_session: Session):
+        self.db = db_session
+
+    def apply_traces(self, traces: Sequence[Any]) -> None:
+        """
+        Add traces to their session rollups.
+
+        Does not commit: call it inside the transaction that inserts the traces.
+
+        Args:
+            traces: Inserted traces (CognitiveTraceDB rows or bulk INSERT dicts)
+        """
+        self._apply(build_deltas(traces=traces))
+
+    def apply_risks(self, risks: Sequence[Any]) -> None:
+        """
+        Add risks to their session rollups.
+
+        Does not commit: call it inside the transaction that inserts the risks.
+
+        Args:
+            risks: Inserted risks (RiskDB rows)
+        """
+        self._apply(build_deltas(risks=risks))
+
+    def _apply(self, deltas: Dict[str, RollupDelta]) -> None:
+        if not deltas:
+            return
+        self._ensure_rows(deltas)
+        for rollup in self.db.execute(locked_rollups_statement(list(deltas))).scalars():
+            deltas[rollup.session_id].apply(rollup)
+        self.db.flush()
+
+    def _ensure_rows(self, deltas: Dict[str, RollupDelta]) -> None:
+        stmt = seed_statement(self.db.get_bind().dialect.name)
+        if stmt is not None:
+            self.db.execute(stmt, [delta.seed_row() for delta in deltas.values()])
+            return
+        existing = set(
+            self.db.execute(
+                select(SessionRollupDB.session_id)
+                .where(SessionRollupDB.session_id.in_(list(deltas)))
+            ).scalars()
+        )
+        missing = [delta.seed_row() for sid, delta in deltas.items() if sid not in existing]
+        if missing:
+            self.db.execute(insert(SessionRollupDB), missing)
+
+    def get_by_session(self, session_id: str) -> Optional[SessionRollupDB]:
+        """Get the rollup of a session (None if it has no traces or risks yet)."""
+        return (
+            self.db.query(SessionRollupDB)
+            .filter(SessionRollupDB.session_id == session_id)
+            .first()
+        )
+
+    def get_by_session_ids(self, session_ids: List[str]) -> Dict[str, SessionRollupDB]:
+        """
+        Batch load rollups for multiple sessions.
+
+        Returns:
+            Dict mapping session_id to its rollup (sessions without one are absent)
+        """
+        if not session_ids:
+            return {}
+        rollups = (
+            self.db.query(SessionRollupDB)
+            .filter(SessionRollupDB.session_id.in_(session_ids))
+            .all()
+        )
+        return {rollup.session_id: rollup for rollup in rollups}
+
+    def rebuild(self, session_ids: Sequence[str]) -> int:
+        """
+        Recompute rollups from the persisted traces and risks.
+
+        Used by the backfill migration and to repair a rollup. Reads only the
+        columns the aggregates need. Does not commit.
+
+        Returns:
+            Number of rollups written
+        """
+        session_ids = list(session_ids)
+        if not session_ids:
+            return 0
+
+        traces = self.db.execute(
+            select(*_TRACE_ROLLUP_COLUMNS)
+            .where(CognitiveTraceDB.session_id.in_(session_ids))
+        ).mappings()
+        risks = self.db.execute(
+            select(*_RISK_ROLLUP_COLUMNS)
+            .where(RiskDB.session_id.in_(session_ids))
+        ).mappings()
+        deltas = build_deltas(traces=[dict(row) for row in traces], risks=[dict(row) for row in risks])
+
+        self.db.execute(delete(SessionRollupDB).where(SessionRollupDB.session_id.in_(session_ids)))
+        for delta in deltas.values():
+            rollup = SessionRollupDB(**delta.seed_row())
+            delta.apply(rollup)
+            self.db.add(rollup)
+        self.db.flush()
+        return len(deltas)
@@ -9,7 +9,7 @@ Provides:
 - Batch loading for multiple sessions
 - Pessimistic locking for concurrent updates
 """
-from typing import List, Optional, Dict
+from typing import Any, List, Optional, Dict
 from uuid import uuid4
 import logging
 
@@ -248,6 +248,29 @@ class SessionRepository:
             logger.error("Database operation failed: %s", str(e), exc_info=True)
             raise
 
+    def update_conversation_summary(
+        self,
+        session_id: str,
+        summary: Dict[str, Any]
+    ) -> Optional[SessionDB]:
+        """
+        Store the rolling conversation summary (turns older than the history tail).
+
+        No row lock: the summary is derived data and last-writer-wins is fine.
+        """
+        try:
+            session = self.db.query(SessionDB).filter(SessionDB.id == session_id).first()
+            if not session:
+                return None
+            session.conversation_summary = summary
+            session.updated_at = utc_now()
+            self.db.commit()
+            return session
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error("Database operation failed: %s", str(e), exc_info=True)
+            raise
+
     def exists(self, session_id: str) -> bool:
         """Check if session exists without loading full object."""
         return self.db.query(
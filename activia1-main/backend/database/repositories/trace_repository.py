@@ -7,21 +7,53 @@ Provides:
 - TraceRepository: CRUD operations for cognitive traces
 - Batch loading to prevent N+1 queries
 - Filtered queries with pagination
+- Bulk INSERT for the write-behind trace writer
+- Session rollups updated in the same transaction as the inserts
 """
-from typing import List, Optional, Dict, Tuple
+from datetime import datetime
+from typing import Any, List, Optional, Dict, Sequence, Tuple
 from uuid import uuid4
 import logging
 
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import desc, or_, and_
+from sqlalchemy.orm import Session, joinedload, load_only
+from sqlalchemy import desc, insert, or_, and_
 
 from ..models import CognitiveTraceDB
 from ...models.trace import CognitiveTrace, TraceLevel, InteractionType
 from .base import _safe_enum_to_str, _safe_cognitive_state_to_str
+from .rollup_repository import SessionRollupRepository
 
 logger = logging.getLogger(__name__)
 
 
+def _trace_to_row(trace: CognitiveTrace) -> Dict[str, Any]:
+    """Column values for a CognitiveTrace (ORM construction and bulk INSERT)."""
+    return dict(
+        id=trace.id or str(uuid4()),
+        session_id=trace.session_id,
+        student_id=trace.student_id,
+        activity_id=trace.activity_id,
+        trace_level=_safe_enum_to_str(trace.trace_level, TraceLevel),
+        interaction_type=_safe_enum_to_str(trace.interaction_type, InteractionType),
+        content=trace.content,
+        context=trace.context,
+        trace_metadata=trace.trace_metadata,
+        cognitive_state=_safe_cognitive_state_to_str(trace.cognitive_state),
+        cognitive_intent=trace.cognitive_intent,
+        decision_justification=trace.decision_justification,
+        alternatives_considered=trace.alternatives_considered,
+        strategy_type=trace.strategy_type,
+        ai_involvement=trace.ai_involvement,
+        parent_trace_id=trace.parent_trace_id,
+        agent_id=trace.agent_id,
+    )
+
+
+def _trace_to_db(trace: CognitiveTrace) -> CognitiveTraceDB:
+    """Build the ORM row for a CognitiveTrace (shared by sync and async repositories)."""
+    return CognitiveTraceDB(**_trace_to_row(trace))
+
+
 class TraceRepository:
     """Repository for cognitive trace operations."""
 
@@ -38,28 +70,12 @@ class TraceRepository:
         Returns:
             Created CognitiveTraceDB instance
         """
-        db_trace = CognitiveTraceDB(
-            id=trace.id or str(uuid4()),
-            session_id=trace.session_id,
-            student_id=trace.student_id,
-            activity_id=trace.activity_id,
-            trace_level=_safe_enum_to_str(trace.trace_level, TraceLevel),
-            interaction_type=_safe_enum_to_str(trace.interaction_type, InteractionType),
-            content=trace.content,
-            context=trace.context,
-            trace_metadata=trace.trace_metadata,
-            cognitive_state=_safe_cognitive_state_to_str(trace.cognitive_state),
-            cognitive_intent=trace.cognitive_intent,
-            decision_justification=trace.decision_justification,
-            alternatives_considered=trace.alternatives_considered,
-            strategy_type=trace.strategy_type,
-            ai_involvement=trace.ai_involvement,
-            parent_trace_id=trace.parent_trace_id,
-            agent_id=trace.agent_id,
-        )
+        db_trace = _trace_to_db(trace)
         # FIX Cortez84 HIGH-REPO-001: Use commit instead of flush for persistence
         try:
             self.db.add(db_trace)
+            self.db.flush()
+            SessionRollupRepository(self.db).apply_traces([db_trace])
             self.db.commit()
             self.db.refresh(db_trace)
         except Exception as e:
@@ -68,6 +84,56 @@ class TraceRepository:
             raise
         return db_trace
 
+    def bulk_create(
+        self,
+        traces: Sequence[CognitiveTrace],
+        created_at: Optional[Sequence[datetime]] = None
+    ) -> int:
+        """
+        Insert many traces in a single multi-row INSERT and one commit.
+
+        Used by the write-behind TraceWriter: one commit per batch instead of
+        add/commit/refresh per trace. No ORM objects are returned. The session
+        rollups are updated in the same commit.
+
+        Args:
+            traces: CognitiveTrace domain models
+            created_at: Optional per-trace timestamps (enqueue time), same order
+                as traces, so history ordering reflects when traces were produced
+
+        Returns:
+            Number of rows inserted
+        """
+        if not traces:
+            return 0
+
+        rows = [_trace_to_row(trace) for trace in traces]
+        if created_at is not None:
+            for row, ts in zip(rows, created_at):
+                row["created_at"] = ts
+                row["updated_at"] = ts
+
+        try:
+            self.db.execute(insert(CognitiveTraceDB), rows)
+            SessionRollupRepository(self.db).apply_traces(rows)
+            self.db.commit()
+        except Exception as e:
+            self.db.rollback()
+            logger.error("Failed to bulk insert %d traces: %s", len(rows), str(e), exc_info=True)
+            raise
+        return len(rows)
+
+    def get_existing_ids(self, trace_ids: Sequence[str]) -> set:
+        """Return the subset of trace_ids already persisted (idempotent replays)."""
+        if not trace_ids:
+            return set()
+        rows = (
+            self.db.query(CognitiveTraceDB.id)
+            .filter(CognitiveTraceDB.id.in_(list(trace_ids)))
+            .all()
+        )
+        return {row[0] for row in rows}
+
     def get_by_id(self, trace_id: str) -> Optional[CognitiveTraceDB]:
         """Get trace by ID."""
         return self.db.query(CognitiveTraceDB).filter(CognitiveTraceDB.id == trace_id).first()
@@ -98,6 +164,94 @@ class TraceRepository:
             .all()
         )
 
+    def get_timeline_by_session(
+        self,
+        session_id: str,
+        limit: int = 100,
+        offset: int = 0
+    ) -> List[CognitiveTraceDB]:
+        """
+        Get the traces of a session without content or N4 dimension JSON.
+
+        For views that only need the sequence of states (cognitive path):
+        avoids transferring the large text columns of every trace.
+
+        Args:
+            session_id: Session ID
+            limit: Maximum records to return (default 100)
+            offset: Records to skip (default 0)
+
+        Returns:
+            List of partially loaded traces ordered by creation date
+        """
+        return (
+            self.db.query(CognitiveTraceDB)
+            .options(load_only(
+                CognitiveTraceDB.id,
+                CognitiveTraceDB.created_at,
+                CognitiveTraceDB.cognitive_state,
+                CognitiveTraceDB.cognitive_intent,
+                CognitiveTraceDB.ai_involvement,
+                CognitiveTraceDB.trace_metadata,
+                CognitiveTraceDB.decision_justification,
+            ))
+            .filter(CognitiveTraceDB.session_id == session_id)
+            .order_by(CognitiveTraceDB.created_at)
+            .limit(limit)
+            .offset(offset)
+            .all()
+        )
+
+    def get_recent_by_session(
+        self,
+        session_id: str,
+        limit: int = 20,
+        interaction_types: Optional[Sequence[str]] = None
+    ) -> List[CognitiveTraceDB]:
+        """
+        Get the newest traces of a session (tail window), in chronological order.
+
+        ORDER BY created_at DESC LIMIT n walks idx_session_created_desc backwards,
+        so cost is bounded by limit regardless of session length.
+
+        Args:
+            session_id: Session ID
+            limit: Maximum records to return (newest first in SQL)
+            interaction_types: Optional interaction_type values to include
+
+        Returns:
+            Up to `limit` newest traces, oldest first
+        """
+        query = self.db.query(CognitiveTraceDB).filter(CognitiveTraceDB.session_id == session_id)
+        if interaction_types:
+            query = query.filter(CognitiveTraceDB.interaction_type.in_(list(interaction_types)))
+        rows = query.order_by(desc(CognitiveTraceDB.created_at)).limit(limit).all()
+        rows.reverse()
+        return rows
+
+    def get_by_session_window(
+        self,
+        session_id: str,
+        after: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+        interaction_types: Optional[Sequence[str]] = None,
+        limit: int = 200
+    ) -> List[CognitiveTraceDB]:
+        """
+        Get traces created in (after, before), oldest first.
+
+        Used to feed the incremental conversation summary with the turns that
+        fell out of the tail window since the last summary.
+        """
+        query = self.db.query(CognitiveTraceDB).filter(CognitiveTraceDB.session_id == session_id)
+        if after is not None:
+            query = query.filter(CognitiveTraceDB.created_at > after)
+        if before is not None:
+            query = query.filter(CognitiveTraceDB.created_at < before)
+        if interaction_types:
+            query = query.filter(CognitiveTraceDB.interaction_type.in_(list(interaction_types)))
+        return query.order_by(CognitiveTraceDB.created_at).limit(limit).all()
+
     def get_latest_by_session(self, session_id: str) -> Optional[CognitiveTraceDB]:
         """Get only the latest trace for a session."""
         return (
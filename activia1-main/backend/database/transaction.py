@@ -6,7 +6,8 @@ ensuring atomicity and consistency across multiple repository operations.
 """
 from functools import wraps
 from typing import Callable, TypeVar, Any
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 
@@ -72,6 +73,47 @@ def transaction(session: Session, description: str = ""):
         logger.debug("Transaction %s completed", tx_id)
 
 
+@asynccontextmanager
+async def async_transaction(session: AsyncSession, description: str = ""):
+    """
+    Async counterpart of transaction() for an AsyncSession.
+
+    The async repositories only flush, so everything written inside the block
+    commits together on exit or rolls back together on exception.
+
+    Args:
+        session: SQLAlchemy AsyncSession
+        description: Description of the transaction for logging
+
+    Yields:
+        AsyncSession: The same session, within a transaction
+
+    Example:
+        async with async_transaction(async_db, "Process student interaction"):
+            await trace_repo.create(...)
+            await risk_repo.create(...)
+    """
+    tx_id = id(session)
+    logger.debug("Async transaction %s started: %s", tx_id, description)
+    try:
+        yield session
+        await session.commit()
+        logger.debug("Async transaction %s committed successfully", tx_id)
+    except Exception as e:
+        await session.rollback()
+        logger.error(
+            "Async transaction %s rolled back due to error",
+            tx_id,
+            extra={
+                "description": description,
+                "error": str(e),
+                "error_type": type(e).__name__
+            },
+            exc_info=True
+        )
+        raise
+
+
 def transactional(description: str = ""):
     """
     Decorator for methods that should run within a single transaction.
@@ -8,11 +8,18 @@ Components:
 - anonymizer: Data anonymization with k-anonymity
 - exporter: Multi-format export (JSON, CSV, Excel)
 - validators: Privacy and compliance validation
+- streaming: Row-by-row export for large datasets (NDJSON, CSV, Excel write-only)
 """
 
 from .anonymizer import DataAnonymizer, AnonymizationConfig
 from .exporter import ResearchDataExporter, ExportFormat, ExportConfig
-from .validators import PrivacyValidator, GDPRCompliance, ValidationResult
+from .validators import (
+    PrivacyValidator,
+    IncrementalPrivacyValidator,
+    GDPRCompliance,
+    ValidationResult,
+)
+from .streaming import StreamingResearchExporter, StreamingExportResult
 
 __all__ = [
     "DataAnonymizer",
@@ -21,6 +28,9 @@ __all__ = [
     "ExportFormat",
     "ExportConfig",
     "PrivacyValidator",
+    "IncrementalPrivacyValidator",
     "GDPRCompliance",
     "ValidationResult",
+    "StreamingResearchExporter",
+    "StreamingExportResult",
 ]
\ No newline at end of file
@@ -10,6 +10,8 @@ Key Features:
 - PII suppression: Removes personally identifiable information
 - Generalization: Aggregates sensitive attributes
 - Noise addition: Differential privacy for numerical data
+- Batch anonymization: column-oriented processing of record batches
+  (unique IDs hashed once per batch, NumPy Laplace noise over whole columns)
 
 References:
 - Sweeney, L. (2002). k-anonymity: A model for protecting privacy
@@ -20,13 +22,22 @@ References:
 import hashlib
 import logging
 import random
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
 
+import numpy as np
 from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 
+# Default bound of the ID hash cache (identifiers kept across batches)
+DEFAULT_HASH_CACHE_SIZE = 100_000
+
+# Marks a derived field that a record of a batch does not get
+# (e.g. duration_minutes of a session without end_time)
+_ABSENT = object()
+
 
 class AnonymizationConfig(BaseModel):
     """Configuration for data anonymization"""
@@ -83,15 +94,22 @@ class DataAnonymizer:
         >>> print(anon_trace["score"])  # 8.5 (or with noise if enabled)
     """
 
-    def __init__(self, config: Optional[AnonymizationConfig] = None):
+    def __init__(
+        self,
+        config: Optional[AnonymizationConfig] = None,
+        hash_cache_size: int = DEFAULT_HASH_CACHE_SIZE,
+    ):
         """
         Initialize anonymizer with configuration
 
         Args:
             config: Anonymization configuration (uses defaults if None)
+            hash_cache_size: Maximum identifiers kept in the hash cache
         """
         self.config = config or AnonymizationConfig()
+        self.hash_cache_size = max(0, hash_cache_size)
         self._hash_cache: Dict[str, str] = {}  # Cache for consistent hashing
+        self._rng = np.random.default_rng()
         logger.info(
             "DataAnonymizer initialized",
             extra={
@@ -106,7 +124,8 @@ class DataAnonymizer:
         Hash an identifier (student_id, session_id) irreversibly
 
         Uses SHA-256 with salt to prevent rainbow table attacks.
-        Results are cached for consistency within the same export.
+        Results are cached (up to hash_cache_size identifiers, oldest evicted
+        first); hashing is deterministic, so evictions never change the output.
 
         Args:
             identifier: Original ID to hash
@@ -122,9 +141,29 @@ class DataAnonymizer:
         hash_obj = hashlib.sha256(salted.encode("utf-8"))
         hashed = hash_obj.hexdigest()[:12]  # First 12 chars for readability
 
-        self._hash_cache[identifier] = hashed
+        if self.hash_cache_size:
+            if len(self._hash_cache) >= self.hash_cache_size:
+                # dicts keep insertion order: drop the oldest entry
+                del self._hash_cache[next(iter(self._hash_cache))]
+            self._hash_cache[identifier] = hashed
         return hashed
 
+    def hash_ids(self, identifiers: Sequence[Any]) -> List[str]:
+        """
+        Hash a column of identifiers, each distinct value once
+
+        Args:
+            identifiers: Original IDs (repeated values are common: one
+                student_id per trace)
+
+        Returns:
+            Hashed IDs in the same order
+        """
+        unique = dict.fromkeys(identifiers)
+        for identifier in unique:
+            unique[identifier] = self.hash_id(identifier)
+        return [unique[identifier] for identifier in identifiers]
+
     def generalize_timestamp(self, timestamp: datetime) -> str:
         """
         Generalize timestamp to week or month level
@@ -171,6 +210,29 @@ class DataAnonymizer:
         noisy_value = max(0.0, min(10.0, value + noise))
         return round(noisy_value, 2)
 
+    def add_laplace_noise_batch(
+        self, values: Sequence[Optional[float]], sensitivity: float = 1.0
+    ) -> List[Optional[float]]:
+        """
+        Add Laplace noise to a whole column of scores
+
+        Draws every sample in one NumPy call; None values are kept as None.
+
+        Args:
+            values: Original values
+            sensitivity: Sensitivity of the query (max change from one record)
+
+        Returns:
+            Values with added noise, clamped to [0, 10] and rounded to 2 decimals
+        """
+        if not self.config.add_noise_to_scores:
+            return list(values)
+
+        array = np.array([np.nan if v is None else v for v in values], dtype=float)
+        scale = sensitivity / self.config.noise_epsilon
+        noisy = np.clip(array + self._rng.laplace(0.0, scale, size=array.shape), 0.0, 10.0).round(2)
+        return [None if np.isnan(original) else float(value) for original, value in zip(array, noisy)]
+
     def suppress_pii_fields(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Remove PII fields from data dictionary
@@ -326,6 +388,154 @@ class DataAnonymizer:
 
         return anon_session
 
+    # ------------------------------------------------------------------
+    # Batch (column-oriented) anonymization
+    # ------------------------------------------------------------------
+
+    def anonymize_batch(self, data_type: str, records: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Anonymize a batch of records of one data type
+
+        Same output as calling anonymize_<type>() on each record (noise aside),
+        but the batch is processed as columns: identifiers are hashed once per
+        distinct value and noise is drawn for a whole column at a time.
+
+        Args:
+            data_type: sessions | traces | evaluations | risks
+            records: Original records
+
+        Returns:
+            Anonymized records in the same order
+
+        Raises:
+            ValueError: If data_type is unknown
+        """
+        anonymize_columns = self._column_anonymizers().get(data_type)
+        if anonymize_columns is None:
+            raise ValueError(f"Unknown data type: {data_type}")
+
+        anonymized: List[Dict[str, Any]] = []
+        start = 0
+        while start < len(records):
+            # Columns need the same fields in every row: split on key changes
+            keys = records[start].keys()
+            end = start + 1
+            while end < len(records) and records[end].keys() == keys:
+                end += 1
+            rows = records[start:end]
+            columns = anonymize_columns({key: [row[key] for row in rows] for key in keys})
+            for index in range(len(rows)):
+                record = {}
+                for key, values in columns.items():
+                    value = values[index]
+                    if value is not _ABSENT:
+                        record[key] = value
+                anonymized.append(record)
+            start = end
+        return anonymized
+
+    def anonymize_columns(self, data_type: str, columns: Dict[str, Sequence[Any]]) -> Dict[str, List[Any]]:
+        """
+        Anonymize a column-oriented batch ({field: [value per record]})
+
+        Every column must have one value per record. Derived fields that only
+        some records get (duration_minutes of open sessions) are None for the rest.
+
+        Args:
+            data_type: sessions | traces | evaluations | risks
+            columns: Original columns
+
+        Returns:
+            Anonymized columns
+
+        Raises:
+            ValueError: If data_type is unknown
+        """
+        anonymize_columns = self._column_anonymizers().get(data_type)
+        if anonymize_columns is None:
+            raise ValueError(f"Unknown data type: {data_type}")
+        return {
+            key: [None if value is _ABSENT else value for value in values]
+            for key, values in anonymize_columns({key: list(values) for key, values in columns.items()}).items()
+        }
+
+    def _column_anonymizers(self):
+        return {
+            "sessions": self._anonymize_session_columns,
+            "traces": self._anonymize_trace_columns,
+            "evaluations": self._anonymize_evaluation_columns,
+            "risks": self._anonymize_risk_columns,
+        }
+
+    def _suppress_pii_columns(self, columns: Dict[str, list]) -> Dict[str, list]:
+        if not self.config.suppress_pii:
+            return dict(columns)
+        suppressed = set(self.config.suppress_fields)
+        return {k: v for k, v in columns.items() if k not in suppressed}
+
+    def _generalize_column(self, timestamps: Iterable[datetime]) -> List[str]:
+        return [self.generalize_timestamp(timestamp) for timestamp in timestamps]
+
+    def _hash_id_columns(self, anon: Dict[str, list], columns: Dict[str, list], session_field: str) -> None:
+        if "student_id" in columns:
+            anon["student_hash"] = self.hash_ids(columns["student_id"])
+        if session_field in columns:
+            anon["session_hash"] = self.hash_ids(columns[session_field])
+
+    def _anonymize_trace_columns(self, columns: Dict[str, list]) -> Dict[str, list]:
+        anon = self._suppress_pii_columns(columns)
+        self._hash_id_columns(anon, columns, "session_id")
+        if "activity_id" in columns:
+            anon["activity_id"] = columns["activity_id"]
+        if "created_at" in columns:
+            anon["week"] = self._generalize_column(columns["created_at"])
+        if "timestamp" in columns:
+            anon["week"] = self._generalize_column(columns["timestamp"])
+        if "ai_involvement" in columns and self.config.add_noise_to_scores:
+            anon["ai_involvement"] = self.add_laplace_noise_batch(columns["ai_involvement"], sensitivity=0.1)
+        return anon
+
+    def _anonymize_evaluation_columns(self, columns: Dict[str, list]) -> Dict[str, list]:
+        anon = self._suppress_pii_columns(columns)
+        self._hash_id_columns(anon, columns, "session_id")
+        if "overall_score" in columns and self.config.add_noise_to_scores:
+            anon["overall_score"] = self.add_laplace_noise_batch(columns["overall_score"], sensitivity=1.0)
+        if "dimensions" in columns and self.config.add_noise_to_scores:
+            # Every dimension score of the batch in one draw, then regrouped per record
+            dimensions = columns["dimensions"]
+            noisy = iter(self.add_laplace_noise_batch(
+                [score for dims in dimensions for score in dims.values()], sensitivity=1.0
+            ))
+            anon["dimensions"] = [{dim: next(noisy) for dim in dims} for dims in dimensions]
+        if "created_at" in columns:
+            anon["week"] = self._generalize_column(columns["created_at"])
+        return anon
+
+    def _anonymize_risk_columns(self, columns: Dict[str, list]) -> Dict[str, list]:
+        anon = self._suppress_pii_columns(columns)
+        self._hash_id_columns(anon, columns, "session_id")
+        for field in ["risk_type", "dimension", "risk_level", "description"]:
+            if field in columns:
+                anon[field] = columns[field]
+        if "created_at" in columns:
+            anon["week"] = self._generalize_column(columns["created_at"])
+        return anon
+
+    def _anonymize_session_columns(self, columns: Dict[str, list]) -> Dict[str, list]:
+        anon = self._suppress_pii_columns(columns)
+        self._hash_id_columns(anon, columns, "id")
+        for field in ["activity_id", "mode", "status"]:
+            if field in columns:
+                anon[field] = columns[field]
+        if "start_time" in columns:
+            anon["week"] = self._generalize_column(columns["start_time"])
+        if "start_time" in columns and "end_time" in columns:
+            anon["duration_minutes"] = [
+                round((end - start).total_seconds() / 60, 1) if end else _ABSENT
+                for start, end in zip(columns["start_time"], columns["end_time"])
+            ]
+        return anon
+
     def check_k_anonymity(self, records: List[Dict[str, Any]], quasi_identifiers: List[str]) -> int:
         """
         Check k-anonymity level of dataset
@@ -341,12 +551,10 @@ class DataAnonymizer:
         if not records:
             return 0
 
-        # Group by quasi-identifier combination
-        equivalence_classes: Dict[tuple, int] = {}
-        for record in records:
-            # Create tuple of quasi-identifier values
-            qi_tuple = tuple(record.get(qi, None) for qi in quasi_identifiers)
-            equivalence_classes[qi_tuple] = equivalence_classes.get(qi_tuple, 0) + 1
+        # Group by quasi-identifier combination (one counted pass)
+        equivalence_classes = Counter(
+            tuple(record.get(qi, None) for qi in quasi_identifiers) for record in records
+        )
 
         # Return minimum class size
         min_k = min(equivalence_classes.values()) if equivalence_classes else 0
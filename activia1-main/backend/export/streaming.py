@@ -0,0 +1,384 @@
+"""
+Streaming Research Export - Row-by-row anonymization and serialization
+
+ResearchDataExporter builds the whole dataset in memory before serializing
+it. For semester-wide exports (hundreds of thousands of traces) that means
+several GB of dicts plus the serialized copy. The streaming exporter instead
+consumes an iterator of (data_type, record) pairs, anonymizes each record,
+feeds it to an IncrementalPrivacyValidator and writes it straight to a
+binary sink (a spooled temp file, a storage object, ...).
+
+Formats:
+- JSON: NDJSON, one {"type": ..., "data": {...}} line per record and a
+  trailing {"metadata": {...}} line
+- CSV: one section per data type ("# TRACES" header, as the frontend export),
+  columns taken from the first record of each section
+- Excel: openpyxl write-only workbook (rows go to disk, not to the cell model)
+
+With compress=True, JSON and CSV are written through a gzip encoder (.gz);
+Excel files are already ZIP containers and are written as-is.
+
+Records must arrive grouped by data type (all sessions, then all traces, ...).
+They are anonymized in batches (DataAnonymizer.anonymize_batch); with
+workers > 1 the batches of large exports are fanned out to a process pool.
+"""
+
+import codecs
+import csv
+import gzip
+import io
+import json
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from .anonymizer import AnonymizationConfig, DataAnonymizer
+from .exporter import ExportConfig, ExportFormat, ResearchDataExporter
+from .validators import IncrementalPrivacyValidator, ValidationResult
+
+logger = logging.getLogger(__name__)
+
+# Serialized text is buffered and handed to the sink in chunks of this size
+_FLUSH_THRESHOLD_CHARS = 64 * 1024
+
+# (records_written) -> None
+ProgressCallback = Callable[[int], None]
+
+_DATA_TYPES = ("sessions", "traces", "evaluations", "risks")
+
+# Anonymizer of each pool process (built once by the pool initializer)
+_worker_anonymizer: Optional[DataAnonymizer] = None
+
+
+def _init_anonymizer_worker(config: AnonymizationConfig) -> None:
+    global _worker_anonymizer
+    _worker_anonymizer = DataAnonymizer(config)
+
+
+def _anonymize_in_worker(data_type: str, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _worker_anonymizer.anonymize_batch(data_type, records)
+
+
+class StreamingExportResult(BaseModel):
+    """Outcome of a streaming export"""
+
+    record_counts: Dict[str, int] = Field(
+        default_factory=dict, description="Records written per data type"
+    )
+    total_records: int = Field(default=0, description="Total records written")
+    validation: ValidationResult = Field(description="Privacy validation of the written records")
+    media_type: str = Field(description="Content type of the written file")
+    file_extension: str = Field(description="File extension (e.g. 'ndjson.gz')")
+
+    @property
+    def data_types(self) -> List[str]:
+        return list(self.record_counts.keys())
+
+
+def _cell_value(value: Any) -> Any:
+    """Flatten complex values for CSV/Excel cells"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False, default=str)
+    return value
+
+
+class _TextChunkWriter:
+    """Buffers text and writes it encoded to a binary sink in large chunks"""
+
+    def __init__(self, sink: BinaryIO, encoding: str = "utf-8"):
+        self._sink = sink
+        # Incremental encoder: utf-8-sig writes the BOM once, not per chunk
+        self._encoder = codecs.getincrementalencoder(encoding)()
+        self.buffer = io.StringIO()
+
+    def maybe_flush(self) -> None:
+        if self.buffer.tell() >= _FLUSH_THRESHOLD_CHARS:
+            self.flush()
+
+    def flush(self, final: bool = False) -> None:
+        text = self.buffer.getvalue()
+        if text or final:
+            self._sink.write(self._encoder.encode(text, final=final))
+        self.buffer.seek(0)
+        self.buffer.truncate()
+
+
+class _NDJSONWriter:
+    def __init__(self, sink: BinaryIO, config: ExportConfig):
+        self._out = _TextChunkWriter(sink)
+
+    def start_section(self, data_type: str, first_record: Dict[str, Any]) -> None:
+        pass
+
+    def write(self, data_type: str, record: Dict[str, Any]) -> None:
+        self._out.buffer.write(
+            json.dumps({"type": data_type, "data": record}, ensure_ascii=False, default=str)
+        )
+        self._out.buffer.write("\n")
+        self._out.maybe_flush()
+
+    def finish(self, metadata: Optional[Dict[str, Any]]) -> None:
+        if metadata is not None:
+            self._out.buffer.write(json.dumps({"metadata": metadata}, ensure_ascii=False, default=str))
+            self._out.buffer.write("\n")
+        self._out.flush(final=True)
+
+
+class _CSVWriter:
+    def __init__(self, sink: BinaryIO, config: ExportConfig):
+        self._out = _TextChunkWriter(sink, config.csv_encoding)
+        self._delimiter = config.csv_delimiter
+        self._writer: Optional[csv.DictWriter] = None
+
+    def start_section(self, data_type: str, first_record: Dict[str, Any]) -> None:
+        self._out.buffer.write(f"\n# {data_type.upper()}\n")
+        self._writer = csv.DictWriter(
+            self._out.buffer,
+            fieldnames=list(first_record.keys()),
+            delimiter=self._delimiter,
+            extrasaction="ignore",
+        )
+        self._writer.writeheader()
+
+    def write(self, data_type: str, record: Dict[str, Any]) -> None:
+        self._writer.writerow({key: _cell_value(value) for key, value in record.items()})
+        self._out.maybe_flush()
+
+    def finish(self, metadata: Optional[Dict[str, Any]]) -> None:
+        self._out.flush(final=True)
+
+
+class _ExcelWriter:
+    def __init__(self, sink: BinaryIO, config: ExportConfig):
+        try:
+            from openpyxl import Workbook
+            from openpyxl.cell import WriteOnlyCell
+            from openpyxl.styles import Font, PatternFill
+        except ImportError:
+            logger.error("openpyxl not installed. Run: pip install openpyxl")
+            raise ImportError(
+                "Excel export requires openpyxl. Install with: pip install openpyxl"
+            )
+
+        self._sink = sink
+        self._config = config
+        self._workbook = Workbook(write_only=True)
+        self._cell = WriteOnlyCell
+        self._header_font = Font(color="FFFFFF", bold=True)
+        self._header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        self._sheet = None
+        self._fieldnames: List[str] = []
+
+    def start_section(self, data_type: str, first_record: Dict[str, Any]) -> None:
+        sheet_names = self._config.excel_sheet_names or {}
+        self._sheet = self._workbook.create_sheet(title=sheet_names.get(data_type, data_type[:31]))
+        self._fieldnames = list(first_record.keys())
+        header = []
+        for field in self._fieldnames:
+            cell = self._cell(self._sheet, value=field)
+            cell.font = self._header_font
+            cell.fill = self._header_fill
+            header.append(cell)
+        self._sheet.append(header)
+
+    def write(self, data_type: str, record: Dict[str, Any]) -> None:
+        self._sheet.append([_cell_value(record.get(field, "")) for field in self._fieldnames])
+
+    def finish(self, metadata: Optional[Dict[str, Any]]) -> None:
+        if metadata is not None:
+            ws_meta = self._workbook.create_sheet(title="Metadata", index=0)
+            ws_meta.append(["Export Metadata"])
+            for key, value in metadata.items():
+                ws_meta.append([key, str(value)])
+        self._workbook.save(self._sink)
+
+
+_WRITERS = {
+    ExportFormat.JSON: (_NDJSONWriter, "application/x-ndjson", "ndjson"),
+    ExportFormat.CSV: (_CSVWriter, "text/csv", "csv"),
+    ExportFormat.EXCEL: (
+        _ExcelWriter,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        "xlsx",
+    ),
+}
+
+
+class StreamingResearchExporter:
+    """
+    Anonymizes, validates and writes research records one at a time
+
+    Memory use is bounded by the write buffer plus the validator counters,
+    independent of the number of records exported.
+
+    Example:
+        >>> exporter = StreamingResearchExporter(anonymizer, validator, ExportConfig(format="csv"))
+        >>> with tempfile.SpooledTemporaryFile() as sink:
+        ...     result = exporter.export(records, sink)
+        ...     if result.validation.is_valid:
+        ...         sink.seek(0)  # release the file
+    """
+
+    def __init__(
+        self,
+        anonymizer: DataAnonymizer,
+        validator: IncrementalPrivacyValidator,
+        config: Optional[ExportConfig] = None,
+        progress_every: int = 1000,
+        batch_size: int = 500,
+        workers: int = 1,
+    ):
+        """
+        Initialize streaming exporter
+
+        Args:
+            anonymizer: Anonymizer applied to each record
+            validator: Validator that observes each anonymized record
+            config: Export configuration (JSON = NDJSON in streaming mode)
+            progress_every: Records between on_progress callbacks
+            batch_size: Records anonymized together (column-oriented)
+            workers: Processes anonymizing batches; the pool is only started
+                once an export fills a second batch (small exports stay in process)
+        """
+        self.config = config or ExportConfig(format=ExportFormat.JSON)
+        if self.config.format not in _WRITERS:
+            raise ValueError(f"Unsupported streaming format: {self.config.format}")
+        self.anonymizer = anonymizer
+        self.validator = validator
+        self.progress_every = max(1, progress_every)
+        self.batch_size = max(1, batch_size)
+        self.workers = max(1, workers)
+
+    @property
+    def compressed(self) -> bool:
+        """Excel is already a ZIP container; only text formats are gzipped"""
+        return self.config.compress and self.config.format != ExportFormat.EXCEL
+
+    def export(
+        self,
+        records: Iterable[Tuple[str, Dict[str, Any]]],
+        sink: BinaryIO,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> StreamingExportResult:
+        """
+        Export a stream of raw records
+
+        Args:
+            records: (data_type, raw record) pairs grouped by data type
+            sink: Binary file-like object receiving the export
+            on_progress: Called with the number of records written so far
+
+        Returns:
+            Record counts and privacy validation of what was written
+        """
+        writer_cls, media_type, extension = _WRITERS[self.config.format]
+        target = gzip.GzipFile(fileobj=sink, mode="wb") if self.compressed else sink
+        counts: Dict[str, int] = {}
+        total = 0
+
+        try:
+            writer = writer_cls(target, self.config)
+            for data_type, batch in self._anonymized_batches(records):
+                if data_type not in counts:
+                    writer.start_section(data_type, batch[0])
+                    counts[data_type] = 0
+                for record in batch:
+                    writer.write(data_type, record)
+                    self.validator.observe(record)
+                    counts[data_type] += 1
+                    total += 1
+                    if on_progress is not None and total % self.progress_every == 0:
+                        on_progress(total)
+
+            metadata = None
+            if self.config.include_metadata:
+                metadata = ResearchDataExporter(self.config).generate_metadata(
+                    record_count=total, data_types=list(counts.keys())
+                )
+            writer.finish(metadata)
+        finally:
+            if target is not sink:
+                target.close()  # Writes the gzip trailer; does not close the sink
+
+        if on_progress is not None:
+            on_progress(total)
+
+        logger.info(
+            "Streaming export completed",
+            extra={"format": self.config.format, "total_records": total, "record_counts": counts},
+        )
+        return StreamingExportResult(
+            record_counts=counts,
+            total_records=total,
+            validation=self.validator.result(),
+            media_type="application/gzip" if self.compressed else media_type,
+            file_extension=f"{extension}.gz" if self.compressed else extension,
+        )
+
+    def _raw_batches(
+        self, records: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """Group the raw stream into batches of one data type"""
+        seen = set()
+        current_type = None
+        batch: List[Dict[str, Any]] = []
+        for data_type, raw in records:
+            if data_type != current_type:
+                if data_type not in _DATA_TYPES:
+                    raise ValueError(f"Unknown data type: {data_type}")
+                if data_type in seen:
+                    raise ValueError(f"Records for '{data_type}' are not contiguous")
+                if batch:
+                    yield current_type, batch
+                    batch = []
+                seen.add(data_type)
+                current_type = data_type
+            batch.append(raw)
+            if len(batch) >= self.batch_size:
+                yield current_type, batch
+                batch = []
+        if batch:
+            yield current_type, batch
+
+    def _anonymized_batches(
+        self, records: Iterable[Tuple[str, Dict[str, Any]]]
+    ) -> Iterator[Tuple[str, List[Dict[str, Any]]]]:
+        """Anonymize the batches in order, in process or in a process pool"""
+        raw_batches = self._raw_batches(records)
+        if self.workers == 1:
+            for data_type, batch in raw_batches:
+                yield data_type, self.anonymizer.anonymize_batch(data_type, batch)
+            return
+
+        first = next(raw_batches, None)
+        if first is None:
+            return
+        second = next(raw_batches, None)
+        if second is None:
+            # A single batch does not pay for starting the pool
+            yield first[0], self.anonymizer.anonymize_batch(*first)
+            return
+
+        # spawn: forking a server process with live threads is unsafe
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_anonymizer_worker,
+            initargs=(self.anonymizer.config,),
+        ) as pool:
+            # At most 2 batches per worker in flight: memory stays bounded
+            in_flight: deque = deque()
+            for data_type, batch in (first, second):
+                in_flight.append((data_type, pool.submit(_anonymize_in_worker, data_type, batch)))
+            for data_type, batch in raw_batches:
+                if len(in_flight) >= 2 * self.workers:
+                    done_type, future = in_flight.popleft()
+                    yield done_type, future.result()
+                in_flight.append((data_type, pool.submit(_anonymize_in_worker, data_type, batch)))
+            while in_flight:
+                done_type, future = in_flight.popleft()
+                yield done_type, future.result()
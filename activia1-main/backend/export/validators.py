@@ -19,6 +19,7 @@ References:
 
 import logging
 import re
+from collections import Counter
 from typing import Any, Dict, List, Optional, Set
 
 from pydantic import BaseModel, Field
@@ -93,6 +94,11 @@ class PrivacyValidator:
             extra={"min_k": min_k, "check_l_diversity": check_l_diversity},
         )
 
+    # Precompiled once: a single alternation rejects clean values in one scan;
+    # only values that match it are checked pattern by pattern
+    _PII_ANY = re.compile("|".join(f"(?:{pattern})" for pattern in PII_PATTERNS.values()))
+    _PII_COMPILED = {pii_type: re.compile(pattern) for pii_type, pattern in PII_PATTERNS.items()}
+
     def detect_pii_in_text(self, text: str) -> List[str]:
         """
         Detect potential PII in text using regex patterns
@@ -103,11 +109,12 @@ class PrivacyValidator:
         Returns:
             List of detected PII types
         """
-        detected = []
-        for pii_type, pattern in self.PII_PATTERNS.items():
-            if re.search(pattern, str(text)):
-                detected.append(pii_type)
-        return detected
+        text = str(text)
+        if not self._PII_ANY.search(text):
+            return []
+        return [
+            pii_type for pii_type, pattern in self._PII_COMPILED.items() if pattern.search(text)
+        ]
 
     def check_for_pii(self, records: List[Dict[str, Any]]) -> ValidationResult:
         """
@@ -185,19 +192,14 @@ class PrivacyValidator:
             result.warnings.append("No records to validate")
             return result
 
-        # Group by quasi-identifier combination
-        equivalence_classes: Dict[tuple, List[int]] = {}
-        for idx, record in enumerate(records):
-            qi_tuple = tuple(record.get(qi, None) for qi in quasi_identifiers)
-            if qi_tuple not in equivalence_classes:
-                equivalence_classes[qi_tuple] = []
-            equivalence_classes[qi_tuple].append(idx)
+        # Group by quasi-identifier combination (one counted pass)
+        equivalence_classes = Counter(
+            tuple(record.get(qi, None) for qi in quasi_identifiers) for record in records
+        )
 
         # Find minimum class size
-        min_class_size = min(len(v) for v in equivalence_classes.values())
-        avg_class_size = sum(len(v) for v in equivalence_classes.values()) / len(
-            equivalence_classes
-        )
+        min_class_size = min(equivalence_classes.values())
+        avg_class_size = len(records) / len(equivalence_classes)
 
         result.metrics["k_anonymity_achieved"] = min_class_size
         result.metrics["k_anonymity_required"] = self.min_k
@@ -337,6 +339,142 @@ class PrivacyValidator:
         return combined_result
 
 
+class IncrementalPrivacyValidator(PrivacyValidator):
+    """
+    Privacy validation over a stream of records
+
+    Produces the same result as PrivacyValidator.validate() but keeps only
+    counters (equivalence class sizes, offending field names), so exports can
+    be validated while they are written instead of holding every record.
+
+    Example:
+        >>> validator = IncrementalPrivacyValidator(quasi_identifiers=["activity_id", "week"])
+        >>> for record in anonymized_records:
+        ...     validator.observe(record)
+        >>> result = validator.result()
+    """
+
+    ID_FIELDS = ("student_id", "session_id", "user_id")
+    EXPECTED_HASHED = ("student_hash", "session_hash")
+
+    def __init__(
+        self,
+        min_k: int = 5,
+        quasi_identifiers: Optional[List[str]] = None,
+        check_l_diversity: bool = False,
+    ):
+        """
+        Initialize incremental validator
+
+        Args:
+            min_k: Minimum k for k-anonymity (default: 5)
+            quasi_identifiers: Fields that could be used for re-identification
+            check_l_diversity: Whether to check l-diversity (default: False)
+        """
+        super().__init__(min_k=min_k, check_l_diversity=check_l_diversity)
+        self.quasi_identifiers = list(quasi_identifiers or [])
+        self.record_count = 0
+        self._equivalence_classes: Dict[tuple, int] = {}
+        self._pii_found: Dict[str, Set[str]] = {}
+        self._forbidden_found: Set[str] = set()
+        self._unhashed_found: Set[str] = set()
+        self._missing_hashed: Set[str] = set()
+
+    def observe(self, record: Dict[str, Any]) -> None:
+        """
+        Account for one anonymized record
+
+        Args:
+            record: Anonymized record about to be exported
+        """
+        self.record_count += 1
+
+        for field, value in record.items():
+            if field.lower() in self.FORBIDDEN_FIELDS:
+                self._forbidden_found.add(field)
+            if value is None:
+                continue
+            detected = self.detect_pii_in_text(str(value))
+            if detected:
+                self._pii_found.setdefault(field, set()).update(detected)
+
+        for field in self.ID_FIELDS:
+            if field in record:
+                self._unhashed_found.add(field)
+        for field in self.EXPECTED_HASHED:
+            if field not in record:
+                self._missing_hashed.add(field)
+
+        if self.quasi_identifiers:
+            qi_tuple = tuple(record.get(qi, None) for qi in self.quasi_identifiers)
+            self._equivalence_classes[qi_tuple] = self._equivalence_classes.get(qi_tuple, 0) + 1
+
+    def result(self) -> ValidationResult:
+        """
+        Validation result for every record observed so far
+
+        Returns:
+            Combined validation result (same errors and metrics as validate())
+        """
+        result = ValidationResult(is_valid=True)
+
+        if self._forbidden_found:
+            result.is_valid = False
+            result.errors.append(
+                f"Forbidden fields found: {', '.join(self._forbidden_found)}"
+            )
+        for field, pii_types in self._pii_found.items():
+            result.is_valid = False
+            result.errors.append(
+                f"PII detected in field '{field}': {', '.join(pii_types)}"
+            )
+        result.metrics["pii_fields_detected"] = len(self._pii_found)
+        result.metrics["forbidden_fields_detected"] = len(self._forbidden_found)
+
+        if self._unhashed_found:
+            result.is_valid = False
+            result.errors.append(
+                f"Unhashed identifiers found: {', '.join(self._unhashed_found)}"
+            )
+        if self._missing_hashed:
+            result.warnings.append(
+                f"Missing hashed identifiers: {', '.join(self._missing_hashed)}"
+            )
+        result.metrics["unhashed_ids_found"] = len(self._unhashed_found)
+        result.metrics["missing_hashed_ids"] = len(self._missing_hashed)
+
+        if self.quasi_identifiers:
+            if not self._equivalence_classes:
+                result.warnings.append("No records to validate")
+            else:
+                sizes = self._equivalence_classes.values()
+                min_class_size = min(sizes)
+                result.metrics["k_anonymity_achieved"] = min_class_size
+                result.metrics["k_anonymity_required"] = self.min_k
+                result.metrics["average_class_size"] = round(
+                    self.record_count / len(self._equivalence_classes), 1
+                )
+                result.metrics["total_equivalence_classes"] = len(self._equivalence_classes)
+                result.metrics["total_records"] = self.record_count
+                if min_class_size < self.min_k:
+                    result.is_valid = False
+                    result.errors.append(
+                        f"k-anonymity requirement not met: k={min_class_size} < {self.min_k}"
+                    )
+                    result.errors.append(
+                        "Recommendation: Increase generalization or reduce granularity"
+                    )
+
+        if result.is_valid:
+            logger.info("✅ Privacy validation PASSED", extra=result.metrics)
+        else:
+            logger.error(
+                "❌ Privacy validation FAILED",
+                extra={"errors": result.errors, "metrics": result.metrics},
+            )
+        return result
+
+
 class GDPRCompliance:
     """
     GDPR Article 89 compliance checker for research data
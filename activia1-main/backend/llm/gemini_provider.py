@@ -188,15 +188,14 @@ class GeminiProvider(LLMProvider):
             }
         }
         """
-        system_instruction = None
+        system_parts = []
         contents = []
         
         for msg in messages:
             if msg.role == LLMRole.SYSTEM:
-                # Gemini uses separate systemInstruction field
-                system_instruction = {
-                    "parts": [{"text": msg.content}]
-                }
+                # Gemini uses separate systemInstruction field; multiple system
+                # messages (prompt + conversation summary) are all kept, in order
+                system_parts.append(msg.content)
             else:
                 # Convert user/assistant to Gemini format
                 role = "user" if msg.role == LLMRole.USER else "model"
@@ -206,8 +205,10 @@ class GeminiProvider(LLMProvider):
                 })
         
         payload = {"contents": contents}
-        if system_instruction:
-            payload["systemInstruction"] = system_instruction
+        if system_parts:
+            payload["systemInstruction"] = {
+                "parts": [{"text": "\n\n".join(system_parts)}]
+            }
             
         return payload
 
@@ -0,0 +1,81 @@
+"""
+Microbenchmark: costo de construir el AIGateway de cada request.
+
+Compara la construcción completa (motor cognitivo, gobernanza con sus regex
+de PII, historial y registro de tareas por request) contra la construcción
+sobre un GatewayPipeline compartido, que es lo que hace get_ai_gateway.
+
+Uso:
+    python -m backend.scripts.bench_gateway_construction --iterations 20000
+"""
+import argparse
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+from backend.core.ai_gateway import AIGateway
+from backend.core.gateway.pipeline import GatewayPipeline
+from backend.llm import LLMProviderFactory
+
+
+def _measure(build: Callable[[], object], iterations: int, rounds: int) -> Dict[str, float]:
+    # Calentamiento (imports perezosos, caches de re)
+    for _ in range(min(1000, iterations)):
+        build()
+
+    per_call_us: List[float] = []
+    for _ in range(rounds):
+        gc.collect()
+        start = time.perf_counter()
+        for _ in range(iterations):
+            build()
+        per_call_us.append((time.perf_counter() - start) / iterations * 1e6)
+
+    gc.collect()
+    gen0_before = gc.get_stats()[0]["collections"]
+    tracemalloc.start()
+    snapshot_start = tracemalloc.take_snapshot()
+    kept = [build() for _ in range(1000)]
+    snapshot_end = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in snapshot_end.compare_to(snapshot_start, "filename"))
+    del kept
+    gen0_collections = gc.get_stats()[0]["collections"] - gen0_before
+
+    return {
+        "median_us": statistics.median(per_call_us),
+        "min_us": min(per_call_us),
+        "bytes_per_gateway": allocated / 1000,
+        "gen0_gc_per_1000": gen0_collections,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark AIGateway per-request construction")
+    parser.add_argument("--iterations", type=int, default=20000, help="Gateways per round")
+    parser.add_argument("--rounds", type=int, default=5, help="Timed rounds (median reported)")
+    args = parser.parse_args()
+
+    llm = LLMProviderFactory.create("mock", {})
+    pipeline = GatewayPipeline.build(llm_provider=llm)
+
+    results = {
+        "per_request_components": _measure(lambda: AIGateway(llm_provider=llm), args.iterations, args.rounds),
+        "shared_pipeline": _measure(lambda: AIGateway(pipeline=pipeline), args.iterations, args.rounds),
+    }
+
+    print(f"{'mode':<24}{'median µs':>12}{'min µs':>10}{'bytes/gw':>12}{'gen0 GC/1k':>12}")
+    for mode, stats in results.items():
+        print(
+            f"{mode:<24}{stats['median_us']:>12.2f}{stats['min_us']:>10.2f}"
+            f"{stats['bytes_per_gateway']:>12.0f}{stats['gen0_gc_per_1000']:>12d}"
+        )
+    speedup = results["per_request_components"]["median_us"] / results["shared_pipeline"]["median_us"]
+    print(f"\nspeedup: {speedup:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
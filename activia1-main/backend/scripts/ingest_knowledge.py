@@ -135,17 +135,16 @@ def infer_unit_from_path(file_path: Path, source_root: Path) -> Optional[str]:
     return None
 
 
-async def process_file(
+def build_document(
     file_path: Path,
     source_root: Path,
-    embedding_provider,
     materia_code: str,
     unit: Optional[str] = None,
     content_type: Optional[str] = None,
     difficulty: str = "intermedio"
 ) -> Optional[Dict[str, Any]]:
     """
-    Procesa un archivo y genera su documento para ingesta.
+    Lee un archivo y arma su documento para ingesta (sin embedding).
     """
     # Leer contenido
     content = read_file_content(file_path)
@@ -158,13 +157,8 @@ async def process_file(
     inferred_unit = unit or infer_unit_from_path(file_path, source_root)
     inferred_type = content_type or infer_content_type(file_path, content)
 
-    # Generar embedding (usando primeros N caracteres)
+    # Texto a vectorizar: primeros N caracteres
     text_for_embedding = content[:MAX_EMBEDDING_CHARS]
-    try:
-        embedding = await embedding_provider.embed(text_for_embedding)
-    except Exception as e:
-        logger.error(f"Failed to generate embedding for {file_path}: {e}")
-        return None
 
     # Construir documento
     doc = {
@@ -175,7 +169,7 @@ async def process_file(
         "difficulty": difficulty,
         "materia_code": materia_code,
         "source_file": str(file_path),
-        "embedding": embedding,
+        "embedding": None,
         "metadata": {
             "file_size": len(content),
             "embedding_chars": len(text_for_embedding),
@@ -185,6 +179,34 @@ async def process_file(
     return doc
 
 
+def embedding_text(doc: Dict[str, Any]) -> str:
+    """Texto del documento que se vectoriza."""
+    return doc["content"][:MAX_EMBEDDING_CHARS]
+
+
+async def process_file(
+    file_path: Path,
+    source_root: Path,
+    embedding_provider,
+    materia_code: str,
+    unit: Optional[str] = None,
+    content_type: Optional[str] = None,
+    difficulty: str = "intermedio"
+) -> Optional[Dict[str, Any]]:
+    """
+    Procesa un archivo y genera su documento para ingesta.
+    """
+    doc = build_document(file_path, source_root, materia_code, unit, content_type, difficulty)
+    if doc is None:
+        return None
+    try:
+        doc["embedding"] = await embedding_provider.embed(embedding_text(doc))
+    except Exception as e:
+        logger.error(f"Failed to generate embedding for {file_path}: {e}")
+        return None
+    return doc
+
+
 async def ingest_directory(
     source_path: Path,
     materia_code: str,
@@ -234,36 +256,44 @@ async def ingest_directory(
 
     logger.info(f"Found {len(files)} files to process")
 
-    # Procesar archivos
-    documents_to_create = []
-    processed = 0
+    # Leer archivos
+    candidates = []
     failed = 0
 
     for file_path in files:
         logger.info(f"Processing: {file_path.name}")
 
-        doc = await process_file(
+        doc = build_document(
             file_path=file_path,
             source_root=source_path,
-            embedding_provider=embedding_provider,
             materia_code=materia_code,
             unit=unit,
             content_type=content_type,
             difficulty=difficulty
         )
-
         if doc:
-            documents_to_create.append(doc)
-            processed += 1
-
-            if dry_run:
-                logger.info(
-                    f"  [DRY-RUN] Would create: {doc['title'][:50]}... "
-                    f"(type={doc['content_type']}, unit={doc['unit']})"
-                )
+            candidates.append(doc)
         else:
             failed += 1
 
+    # Vectorizar todo junto: el proveedor agrupa en requests multi-input
+    result = await embedding_provider.embed_many([embedding_text(doc) for doc in candidates])
+    documents_to_create = []
+    for i, doc in enumerate(candidates):
+        if i in result.failures:
+            logger.error(f"Failed to generate embedding for {doc['source_file']}: {result.failures[i]}")
+            failed += 1
+            continue
+        doc["embedding"] = result.embeddings[i]
+        documents_to_create.append(doc)
+
+        if dry_run:
+            logger.info(
+                f"  [DRY-RUN] Would create: {doc['title'][:50]}... "
+                f"(type={doc['content_type']}, unit={doc['unit']})"
+            )
+    processed = len(documents_to_create)
+
     # Insertar en base de datos (si no es dry-run)
     if not dry_run and documents_to_create:
         logger.info(f"\nInserting {len(documents_to_create)} documents into database...")
@@ -0,0 +1,492 @@
+"""
+Export Jobs - Exportaciones de investigación fuera del request.
+
+POST /export/research-data hace toda la exportación dentro del request: una
+exportación de varios años excede el timeout del worker y, si se corta, se
+pierde. Con los jobs, el request solo crea una fila en research_export_jobs y
+un pool de threads propio la procesa:
+
+- Claim con alquiler (lease) renovado en cada heartbeat; si el proceso muere,
+  el alquiler vence y otro worker retoma el job desde cero sobre la misma
+  ventana [since, watermark] (la salida no cambia).
+- Progreso: filas procesadas por tipo de dato, visibles en GET /export/jobs/{id}.
+- Artefacto por partes (EXPORT_JOB_CHUNK_BYTES) en services/file_storage; se
+  descarga con soporte de Range.
+- Validación de privacidad incremental (k-anonymity + GDPR Art. 89): si falla,
+  las partes se borran y el job queda rejected.
+- Incremental: solo las filas creadas después del watermark del último job
+  completado con el mismo alcance (mismos filtros y formato). El watermark es
+  el momento del claim menos EXPORT_JOB_WATERMARK_LAG_SECONDS, para no saltear
+  filas de transacciones que confirman después de la lectura.
+
+Deshabilitar con EXPORT_JOBS_ENABLED=false (los jobs quedan pending).
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from contextlib import AbstractContextManager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from ..core.constants import (
+    EXPORT_JOBS_ENABLED,
+    EXPORT_JOB_CHUNK_BYTES,
+    EXPORT_JOB_LEASE_SECONDS,
+    EXPORT_JOB_MAX_ATTEMPTS,
+    EXPORT_JOB_POLL_INTERVAL_SECONDS,
+    EXPORT_JOB_WATERMARK_LAG_SECONDS,
+    EXPORT_JOB_WORKERS,
+)
+from .file_storage import FileStorageService, get_file_storage
+from .research_export import (
+    apply_gdpr_check,
+    build_anonymization_config,
+    iter_research_records,
+    run_research_export,
+)
+
+logger = logging.getLogger(__name__)
+
+# Filas entre heartbeats (renovación del alquiler + progreso)
+DEFAULT_HEARTBEAT_EVERY = 5000
+
+
+def _default_session_factory() -> AbstractContextManager:
+    """Sesión de BD propia de los workers (commit/rollback/close gestionados)."""
+    from ..database import get_db_session
+    return get_db_session()
+
+
+def export_scope_key(request: Dict[str, Any]) -> str:
+    """
+    Alcance de un ExportRequest serializado: mismos filtros y formato.
+
+    Los jobs incrementales encadenan watermarks solo dentro del mismo alcance.
+    """
+    canonical = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ChunkedArtifactSink:
+    """
+    Sink binario que corta lo escrito en partes de chunk_size bytes.
+
+    Cada parte completa se entrega a save_chunk(index, data) -> path; en
+    memoria queda como máximo una parte. Sin seek: gzip y openpyxl (ZIP en
+    modo streaming) solo necesitan write/tell/flush.
+    """
+
+    def __init__(self, save_chunk: Callable[[int, bytes], str], chunk_size: int = EXPORT_JOB_CHUNK_BYTES):
+        self._save_chunk = save_chunk
+        self.chunk_size = max(1, chunk_size)
+        self._buffer = bytearray()
+        self._written = 0
+        self.chunks: List[Dict[str, Any]] = []
+
+    def write(self, data: bytes) -> int:
+        self._buffer += data
+        self._written += len(data)
+        while len(self._buffer) >= self.chunk_size:
+            self._emit(bytes(self._buffer[:self.chunk_size]))
+            del self._buffer[:self.chunk_size]
+        return len(data)
+
+    def tell(self) -> int:
+        return self._written
+
+    def flush(self) -> None:
+        # Las partes se cortan por tamaño; close() entrega la última
+        pass
+
+    def close(self) -> None:
+        if self._buffer:
+            self._emit(bytes(self._buffer))
+            self._buffer = bytearray()
+
+    @property
+    def size(self) -> int:
+        return self._written
+
+    def _emit(self, data: bytes) -> None:
+        path = self._save_chunk(len(self.chunks), data)
+        self.chunks.append({"path": path, "size": len(data)})
+
+
+class _JobInterrupted(Exception):
+    """El job dejó de pertenecer a este worker (shutdown o alquiler perdido)."""
+
+
+class ExportJobRunner:
+    """
+    Pool de workers que procesan research_export_jobs.
+
+    Los workers son threads propios (la exportación es CPU + IO síncrono) con
+    su propia sesión de BD; el almacenamiento (async) se invoca en el event
+    loop de la aplicación.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[FileStorageService] = None,
+        session_factory: Optional[Callable[[], AbstractContextManager]] = None,
+        workers: int = EXPORT_JOB_WORKERS,
+        poll_interval_seconds: float = EXPORT_JOB_POLL_INTERVAL_SECONDS,
+        lease_seconds: int = EXPORT_JOB_LEASE_SECONDS,
+        max_attempts: int = EXPORT_JOB_MAX_ATTEMPTS,
+        chunk_size: int = EXPORT_JOB_CHUNK_BYTES,
+        heartbeat_every: int = DEFAULT_HEARTBEAT_EVERY,
+        watermark_lag_seconds: int = EXPORT_JOB_WATERMARK_LAG_SECONDS,
+    ):
+        """
+        Args:
+            storage: Almacenamiento de los artefactos (default: get_file_storage())
+            session_factory: Callable que devuelve un context manager de Session
+                (default: get_db_session)
+            workers: Threads que procesan jobs
+            poll_interval_seconds: Espera entre consultas cuando no hay jobs
+            lease_seconds: Duración del alquiler de un job reclamado
+            max_attempts: Intentos antes de marcar el job como failed
+            chunk_size: Bytes por parte del artefacto
+            heartbeat_every: Filas entre renovaciones del alquiler
+            watermark_lag_seconds: Margen restado al watermark por transacciones en curso
+        """
+        self._storage = storage
+        self._session_factory = session_factory or _default_session_factory
+        self.workers = max(1, workers)
+        self.poll_interval = max(0.01, poll_interval_seconds)
+        self.lease_seconds = max(1, lease_seconds)
+        self.max_attempts = max(1, max_attempts)
+        self.chunk_size = max(1, chunk_size)
+        self.heartbeat_every = max(1, heartbeat_every)
+        self.watermark_lag_seconds = max(0, watermark_lag_seconds)
+
+        self._worker_prefix = f"{socket.gethostname()}-{os.getpid()}"
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._threads: List[threading.Thread] = []
+        self._stop = threading.Event()
+        self._running = False
+        self._lock = threading.Lock()  # Protege _stats
+        self._stats: Dict[str, int] = {
+            "claimed": 0,
+            "completed": 0,
+            "rejected": 0,
+            "failed": 0,
+            "released": 0,
+            "records_exported": 0,
+        }
+
+    @property
+    def storage(self) -> FileStorageService:
+        if self._storage is None:
+            self._storage = get_file_storage()
+        return self._storage
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["running"] = self._running
+        stats["workers"] = self.workers
+        return stats
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida (lifespan)
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Arranca los threads del pool."""
+        if self._running:
+            return
+
+        self._loop = asyncio.get_running_loop()
+        self._stop.clear()
+        self._running = True
+        self._threads = [
+            threading.Thread(
+                target=self._worker_loop,
+                name=f"export-job-worker-{index}",
+                daemon=True,
+            )
+            for index in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info("Export job workers started (workers=%d)", self.workers)
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """
+        Detiene los workers.
+
+        Un job en curso se interrumpe en el próximo heartbeat y vuelve a
+        pending; lo retoma el próximo proceso.
+        """
+        if not self._running:
+            return
+
+        self._running = False
+        self._stop.set()
+        threads, self._threads = self._threads, []
+
+        def _join() -> None:
+            deadline = time.monotonic() + timeout
+            for thread in threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+
+        await asyncio.to_thread(_join)
+        self._loop = None
+        logger.info("Export job workers stopped", extra={"stats": self.stats()})
+
+    def _worker_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                processed = self.process_next()
+            except Exception as e:
+                # Nunca debe morir el worker: el job queda con su alquiler y se retoma
+                logger.error("Export job worker error: %s", e, exc_info=True)
+                processed = False
+            if not processed:
+                self._stop.wait(self.poll_interval)
+
+    # ------------------------------------------------------------------
+    # Procesamiento (corre en threads)
+    # ------------------------------------------------------------------
+
+    def _call(self, coro) -> Any:
+        """Corre una corrutina del almacenamiento desde un thread del pool."""
+        if self._loop is not None and self._loop.is_running():
+            return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+        return asyncio.run(coro)
+
+    def _repository(self, db):
+        from ..database.repositories import ResearchExportJobRepository
+        return ResearchExportJobRepository(db)
+
+    def process_next(self) -> bool:
+        """
+        Reclama un job y lo procesa hasta un estado final.
+
+        Returns:
+            True si había un job para procesar
+        """
+        with self._session_factory() as db:
+            job = self._repository(db).claim(self.lease_seconds, self.watermark_lag_seconds)
+            if job is None:
+                return False
+            job_id = job.id
+            attempts = job.attempts
+            snapshot = {
+                "request": dict(job.request),
+                "since": job.since,
+                "watermark": job.watermark,
+                "artifact_chunks": list(job.artifact_chunks or []),
+            }
+
+        self._count("claimed")
+        # Partes de un intento anterior interrumpido
+        self._delete_chunks(snapshot["artifact_chunks"])
+
+        if attempts > self.max_attempts:
+            self._finish(job_id, "failed", artifact_chunks=[], last_error="Max attempts exceeded")
+            self._count("failed")
+            return True
+
+        self.run_job(job_id, attempts, **snapshot)
+        return True
+
+    def run_job(
+        self,
+        job_id: str,
+        attempts: int,
+        request: Dict[str, Any],
+        since: Any,
+        watermark: Any,
+        artifact_chunks: Optional[List[Dict[str, Any]]] = None,
+    ) -> str:
+        """
+        Exporta un job reclamado a partes en el almacenamiento.
+
+        Returns:
+            Estado final: completed | rejected | failed | pending (reintento o interrupción)
+        """
+        from ..api.schemas.export import ExportRequest
+
+        export_request = ExportRequest.model_validate(request)
+        anon_config = build_anonymization_config(export_request)
+        prefix = f"exports/{job_id}"
+        sink = ChunkedArtifactSink(
+            lambda index, data: self._call(self.storage.save_artifact_chunk(prefix, index, data)),
+            self.chunk_size,
+        )
+        progress: Dict[str, int] = {}
+        started_at = time.perf_counter()
+
+        try:
+            with self._session_factory() as db:
+                records = iter_research_records(
+                    db, export_request, created_after=since, created_before=watermark
+                )
+                result = run_research_export(
+                    db,
+                    export_request,
+                    sink,
+                    anon_config=anon_config,
+                    records=self._track(job_id, records, progress, sink),
+                )
+            sink.close()
+        except _JobInterrupted:
+            self._delete_chunks(sink.chunks)
+            self._finish(job_id, "pending", attempts=max(0, attempts - 1), artifact_chunks=[])
+            self._count("released")
+            logger.info("Export job %s interrupted, released for another worker", job_id)
+            return "pending"
+        except Exception as e:
+            self._delete_chunks(sink.chunks)
+            status = "failed" if attempts >= self.max_attempts else "pending"
+            self._finish(job_id, status, artifact_chunks=[], progress=progress, last_error=str(e)[:2000])
+            self._count("failed" if status == "failed" else "released")
+            logger.error("Export job %s failed (attempt %d): %s", job_id, attempts, e, exc_info=True)
+            return status
+
+        validation = result.validation
+        if result.total_records:
+            apply_gdpr_check(validation, anon_config)
+        validation_report = {
+            "is_valid": validation.is_valid,
+            "errors": validation.errors,
+            "warnings": validation.warnings,
+            "metrics": validation.metrics,
+        }
+
+        if result.total_records and not validation.is_valid:
+            # El artefacto nunca queda disponible si no pasa la validación
+            self._delete_chunks(sink.chunks)
+            self._finish(
+                job_id, "rejected",
+                artifact_chunks=[], progress=progress,
+                records_processed=result.total_records, validation=validation_report,
+            )
+            self._count("rejected")
+            logger.warning("Export job %s rejected by privacy validation", job_id, extra=validation_report)
+            return "rejected"
+
+        self._finish(
+            job_id, "completed",
+            artifact_chunks=sink.chunks,
+            progress=progress,
+            records_processed=result.total_records,
+            file_size=sink.size,
+            media_type=result.media_type,
+            file_extension=result.file_extension,
+            validation=validation_report,
+        )
+        self._count("completed")
+        self._count("records_exported", result.total_records)
+        logger.info(
+            "Export job %s completed",
+            job_id,
+            extra={
+                "records": result.total_records,
+                "chunks": len(sink.chunks),
+                "file_size_bytes": sink.size,
+                "duration_ms": round((time.perf_counter() - started_at) * 1000, 2),
+            },
+        )
+        return "completed"
+
+    def _track(
+        self,
+        job_id: str,
+        records: Iterator[Tuple[str, Dict[str, Any]]],
+        progress: Dict[str, int],
+        sink: ChunkedArtifactSink,
+    ) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Cuenta filas por tipo y renueva el alquiler cada heartbeat_every filas."""
+        processed = 0
+        for data_type, record in records:
+            progress[data_type] = progress.get(data_type, 0) + 1
+            processed += 1
+            if processed % self.heartbeat_every == 0:
+                self._heartbeat(job_id, progress, sink)
+            yield data_type, record
+
+    def _heartbeat(self, job_id: str, progress: Dict[str, int], sink: ChunkedArtifactSink) -> None:
+        if self._stop.is_set():
+            raise _JobInterrupted(job_id)
+        with self._session_factory() as db:
+            alive = self._repository(db).heartbeat(job_id, self.lease_seconds, progress, sink.chunks)
+        if not alive:
+            raise _JobInterrupted(job_id)
+
+    def _finish(self, job_id: str, status: str, **values: Any) -> None:
+        with self._session_factory() as db:
+            self._repository(db).finish(job_id, status, **values)
+
+    def _delete_chunks(self, chunks: List[Dict[str, Any]]) -> None:
+        for chunk in chunks or []:
+            try:
+                self._call(self.storage.delete_file(chunk["path"]))
+            except Exception as e:
+                logger.warning("Failed to delete export chunk %s: %s", chunk.get("path"), e)
+
+    def _count(self, outcome: str, amount: int = 1) -> None:
+        with self._lock:
+            self._stats[outcome] += amount
+
+
+# Instancia global (una por worker uvicorn), creada en el lifespan
+_export_job_runner: Optional[ExportJobRunner] = None
+_export_job_runner_lock = threading.Lock()
+
+
+def get_export_job_runner() -> Optional[ExportJobRunner]:
+    """Runner global si está corriendo, None en caso contrario."""
+    runner = _export_job_runner
+    if runner is not None and runner.is_running:
+        return runner
+    return None
+
+
+async def start_export_job_runner() -> Optional[ExportJobRunner]:
+    """Crea y arranca los workers de exportación (lifespan startup)."""
+    global _export_job_runner
+
+    if not EXPORT_JOBS_ENABLED:
+        logger.info("Export job workers disabled (EXPORT_JOBS_ENABLED=false)")
+        return None
+
+    with _export_job_runner_lock:
+        if _export_job_runner is None:
+            _export_job_runner = ExportJobRunner()
+        runner = _export_job_runner
+
+    await runner.start()
+    return runner
+
+
+async def stop_export_job_runner() -> None:
+    """Detiene los workers (lifespan shutdown); el job en curso vuelve a pending."""
+    global _export_job_runner
+
+    with _export_job_runner_lock:
+        runner = _export_job_runner
+        _export_job_runner = None
+
+    if runner is not None:
+        await runner.stop()
+
+
+__all__ = [
+    "ChunkedArtifactSink",
+    "ExportJobRunner",
+    "export_scope_key",
+    "get_export_job_runner",
+    "start_export_job_runner",
+    "stop_export_job_runner",
+]
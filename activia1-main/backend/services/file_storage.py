@@ -173,6 +173,14 @@ class StorageProvider(ABC):
         """Verifica si el archivo existe."""
         pass
 
+    async def save_bytes(self, path: str, data: bytes) -> str:
+        """Guarda bytes en una ruta relativa exacta (partes de artefactos)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support save_bytes")
+
+    async def read_range(self, path: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Lee length bytes desde offset (None = hasta el final)."""
+        raise NotImplementedError(f"{type(self).__name__} does not support read_range")
+
 
 class LocalStorageProvider(StorageProvider):
     """Almacenamiento local en disco (desarrollo)."""
@@ -245,6 +253,28 @@ class LocalStorageProvider(StorageProvider):
         _ensure_path_within_base(self.base_dir, file_path)
         return file_path.exists()
 
+    async def save_bytes(self, path: str, data: bytes) -> str:
+        _validate_path_component(path, "path")
+        file_path = self.base_dir / path
+        _ensure_path_within_base(self.base_dir, file_path)
+
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        # Escritura atómica: una parte a medio escribir nunca queda visible
+        tmp_path = file_path.with_name(file_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, file_path)
+        return path
+
+    async def read_range(self, path: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        _validate_path_component(path, "path")
+        file_path = self.base_dir / path
+        _ensure_path_within_base(self.base_dir, file_path)
+
+        with open(file_path, "rb") as f:
+            f.seek(offset)
+            return f.read() if length is None else f.read(length)
+
 
 class FileStorageService:
     """Servicio principal de almacenamiento de archivos."""
@@ -335,6 +365,25 @@ class FileStorageService:
         """Obtiene URL de acceso al archivo."""
         return await self.provider.get_url(path)
 
+    async def save_artifact_chunk(self, path_prefix: str, index: int, data: bytes) -> str:
+        """
+        Guarda una parte de un artefacto generado (ej: exportaciones por partes).
+
+        Args:
+            path_prefix: Carpeta del artefacto (ej: "exports/<job_id>")
+            index: Número de parte (define el orden de lectura)
+            data: Contenido de la parte
+
+        Returns:
+            Ruta relativa de la parte
+        """
+        _validate_path_component(path_prefix, "path_prefix")
+        return await self.provider.save_bytes(f"{path_prefix}/part-{index:05d}", data)
+
+    async def read_file_range(self, path: str, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Lee un rango de bytes de un archivo (descargas con Range)."""
+        return await self.provider.read_range(path, offset, length)
+
 
 # Singleton with thread safety (FIX Cortez91 HIGH-S01)
 import threading
@@ -0,0 +1,372 @@
+"""
+Git Analytics Engine - Estadísticas de commits cacheadas por repositorio
+
+El dashboard de Git Analytics se refresca constantemente durante las semanas
+de proyecto. Antes cada request corría `git log --numstat` (bloqueante, dentro
+del handler async) sobre toda la ventana y reparseaba el historial completo.
+
+El motor:
+- Cachea por repositorio las estadísticas parseadas de cada commit (por SHA).
+- En cada request solo resuelve HEAD (un `git rev-parse`, y como mucho uno cada
+  GIT_ANALYTICS_HEAD_CHECK_SECONDS); si HEAD avanzó lee solo `<último>..HEAD`.
+- Relee la ventana completa únicamente si se pide un período más largo que el
+  cacheado o si el historial fue reescrito (rebase/force push).
+- Ejecuta git con asyncio.create_subprocess_exec, con un límite global de
+  procesos concurrentes y timeout.
+
+Las métricas (contribuidores, tendencias, calidad) se calculan sobre el cache.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..core.constants import (
+    GIT_ANALYTICS_CACHE_MAX_REPOS,
+    GIT_ANALYTICS_HEAD_CHECK_SECONDS,
+    GIT_ANALYTICS_MAX_CONCURRENCY,
+    GIT_ANALYTICS_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Separadores de `git log --pretty`: no aparecen en mensajes ni nombres
+_RECORD_SEP = "\x1e"
+_FIELD_SEP = "\x1f"
+_LOG_FORMAT = f"--pretty=format:{_RECORD_SEP}%H{_FIELD_SEP}%an{_FIELD_SEP}%ae{_FIELD_SEP}%ct{_FIELD_SEP}%ad{_FIELD_SEP}%s"
+
+CONVENTIONAL_PREFIXES = ("feat:", "fix:", "docs:", "style:", "refactor:", "test:", "chore:")
+
+
+class GitCommandError(Exception):
+    """Un comando git terminó con error o excedió el timeout."""
+
+
+@dataclass(frozen=True)
+class CommitStat:
+    """Estadísticas de un commit (inmutables: el SHA las identifica)."""
+
+    sha: str
+    author: str
+    email: str
+    committed_at: datetime  # Fecha de commit (la que filtra --since)
+    date: str  # Fecha de autor ISO (agrupa las tendencias por día)
+    message: str
+    insertions: int = 0
+    deletions: int = 0
+
+
+@dataclass
+class _RepoCache:
+    commits: Dict[str, CommitStat] = field(default_factory=dict)
+    head: Optional[str] = None
+    branch: str = "main"
+    covered_since: Optional[datetime] = None  # Inicio de la ventana leída
+    head_checked_at: float = 0.0  # time.monotonic() del último rev-parse
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def parse_git_log(output: str) -> List[CommitStat]:
+    """
+    Parsea la salida de `git log --numstat` con _LOG_FORMAT.
+
+    Args:
+        output: stdout de git log
+
+    Returns:
+        Commits en el orden de git log (más reciente primero)
+    """
+    commits = []
+    for record in output.split(_RECORD_SEP):
+        if not record.strip():
+            continue
+        header, _, numstat = record.partition("\n")
+        parts = header.split(_FIELD_SEP)
+        if len(parts) != 6:
+            logger.debug("Could not parse git log header: %s", header)
+            continue
+        sha, author, email, committed_ts, author_date, message = parts
+
+        insertions = deletions = 0
+        for line in numstat.splitlines():
+            stat = line.split("\t")
+            if len(stat) != 3:
+                continue
+            # "-" = archivo binario
+            try:
+                insertions += int(stat[0]) if stat[0] != "-" else 0
+                deletions += int(stat[1]) if stat[1] != "-" else 0
+            except ValueError:
+                logger.debug("Could not parse git stat line: %s", line)
+
+        commits.append(CommitStat(
+            sha=sha,
+            author=author,
+            email=email,
+            committed_at=datetime.fromtimestamp(int(committed_ts), tz=timezone.utc),
+            date=author_date,
+            message=message,
+            insertions=insertions,
+            deletions=deletions,
+        ))
+    return commits
+
+
+def compute_git_analytics(commits: List[CommitStat], days: int) -> Dict[str, Any]:
+    """
+    Métricas del dashboard a partir de los commits de la ventana.
+
+    Returns:
+        Dict con metrics, contributors (top 10), trends (últimos 30 días) y
+        quality_indicators (mismo formato que GitAnalyticsResponse)
+    """
+    contributors: Dict[str, Dict[str, Any]] = {}
+    trends: Dict[str, Dict[str, Any]] = {}
+    total_insertions = total_deletions = 0
+    conventional_commits = 0
+    message_length = 0
+
+    for commit in commits:
+        contributor = contributors.setdefault(commit.author, {
+            "name": commit.author,
+            "email": commit.email,
+            "commits": 0,
+            "insertions": 0,
+            "deletions": 0,
+        })
+        contributor["commits"] += 1
+        contributor["insertions"] += commit.insertions
+        contributor["deletions"] += commit.deletions
+
+        day = commit.date[:10]  # YYYY-MM-DD
+        trend = trends.setdefault(day, {"date": day, "commits": 0, "insertions": 0, "deletions": 0})
+        trend["commits"] += 1
+        trend["insertions"] += commit.insertions
+        trend["deletions"] += commit.deletions
+
+        total_insertions += commit.insertions
+        total_deletions += commit.deletions
+        message_length += len(commit.message)
+        if commit.message.startswith(CONVENTIONAL_PREFIXES):
+            conventional_commits += 1
+
+    total_commits = len(commits)
+    code_churn = total_insertions + total_deletions
+    avg_commits_per_day = total_commits / days if days > 0 else 0
+    avg_commit_size = code_churn / total_commits if total_commits > 0 else 0
+    # deletions/insertions cerca de 1 indica refactoring
+    refactoring_ratio = min(total_deletions / total_insertions, 1.0) if total_insertions > 0 else 0
+
+    contributors_list = [
+        {**contributor, "percentage": contributor["commits"] / total_commits * 100}
+        for contributor in contributors.values()
+    ]
+    contributors_list.sort(key=lambda c: c["commits"], reverse=True)
+
+    conventional_commits_ratio = conventional_commits / total_commits if total_commits > 0 else 0
+    avg_message_length = message_length / total_commits if total_commits > 0 else 0
+    message_quality_score = min(
+        (conventional_commits_ratio * 50)  # 50 puntos por conventional commits
+        + (min(avg_message_length / 50, 1.0) * 50),  # 50 puntos por mensajes descriptivos
+        100,
+    )
+
+    return {
+        "metrics": {
+            "total_commits": total_commits,
+            "avg_commits_per_day": round(avg_commits_per_day, 2),
+            "total_insertions": total_insertions,
+            "total_deletions": total_deletions,
+            "code_churn": code_churn,
+            "avg_commit_size": round(avg_commit_size, 2),
+            "refactoring_ratio": round(refactoring_ratio, 2),
+        },
+        "contributors": contributors_list[:10],
+        "trends": sorted(trends.values(), key=lambda t: t["date"])[-30:],
+        "quality_indicators": {
+            "message_quality_score": round(message_quality_score, 2),
+            "avg_message_length": round(avg_message_length, 2),
+            "conventional_commits_ratio": round(conventional_commits_ratio, 2),
+        },
+    }
+
+
+class GitAnalyticsEngine:
+    """
+    Cache incremental de estadísticas de commits por repositorio.
+
+    Example:
+        >>> engine = get_git_analytics_engine()
+        >>> analytics = await engine.get_analytics("/repos/grupo-3", days=30)
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = GIT_ANALYTICS_MAX_CONCURRENCY,
+        timeout_seconds: float = GIT_ANALYTICS_TIMEOUT_SECONDS,
+        head_check_seconds: float = GIT_ANALYTICS_HEAD_CHECK_SECONDS,
+        max_repos: int = GIT_ANALYTICS_CACHE_MAX_REPOS,
+    ):
+        """
+        Args:
+            max_concurrency: Procesos git simultáneos (entre todos los repos)
+            timeout_seconds: Timeout de cada comando git
+            head_check_seconds: Intervalo mínimo entre resoluciones de HEAD de un repo
+                (0 = en cada request)
+            max_repos: Repositorios cacheados (se descarta el menos usado)
+        """
+        self.timeout_seconds = timeout_seconds
+        self.head_check_seconds = max(0.0, head_check_seconds)
+        self.max_repos = max(1, max_repos)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._repos: "OrderedDict[str, _RepoCache]" = OrderedDict()
+        self._stats = {"git_commands": 0, "full_loads": 0, "incremental_loads": 0, "cache_hits": 0}
+
+    def stats(self) -> Dict[str, int]:
+        return {**self._stats, "repos": len(self._repos)}
+
+    def invalidate(self, repo_path: Optional[str] = None) -> None:
+        """Descarta el cache de un repositorio (o de todos)."""
+        if repo_path is None:
+            self._repos.clear()
+        else:
+            self._repos.pop(os.path.normpath(repo_path), None)
+
+    async def _git(self, repo_path: str, *args: str, check: bool = True) -> Tuple[int, str]:
+        async with self._semaphore:
+            self._stats["git_commands"] += 1
+            process = await asyncio.create_subprocess_exec(
+                "git", *args,
+                cwd=repo_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), self.timeout_seconds)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise GitCommandError(f"git {args[0]} timed out after {self.timeout_seconds}s")
+
+        if check and process.returncode != 0:
+            raise GitCommandError(f"Git command failed: {stderr.decode('utf-8', 'replace').strip()}")
+        return process.returncode, stdout.decode("utf-8", "replace")
+
+    async def _log(self, repo_path: str, *args: str) -> List[CommitStat]:
+        _, output = await self._git(repo_path, "log", _LOG_FORMAT, "--date=iso", "--numstat", *args)
+        return parse_git_log(output)
+
+    def _repo_cache(self, repo_path: str) -> _RepoCache:
+        cache = self._repos.get(repo_path)
+        if cache is None:
+            cache = self._repos[repo_path] = _RepoCache()
+            while len(self._repos) > self.max_repos:
+                self._repos.popitem(last=False)
+        else:
+            self._repos.move_to_end(repo_path)
+        return cache
+
+    async def get_commits(self, repo_path: str, since: datetime) -> Tuple[List[CommitStat], str]:
+        """
+        Commits desde since (fecha de commit), leyendo de git solo lo nuevo.
+
+        Args:
+            repo_path: Ruta del repositorio (ya validada)
+            since: Inicio de la ventana (naive = UTC)
+
+        Returns:
+            (commits de la ventana, más reciente primero; rama actual)
+        """
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        repo_path = os.path.normpath(repo_path)
+        cache = self._repo_cache(repo_path)
+
+        async with cache.lock:
+            await self._refresh(repo_path, cache, since)
+            commits = [c for c in cache.commits.values() if c.committed_at >= since]
+
+        commits.sort(key=lambda c: c.committed_at, reverse=True)
+        return commits, cache.branch
+
+    async def _refresh(self, repo_path: str, cache: _RepoCache, since: datetime) -> None:
+        covered = cache.covered_since is not None and cache.covered_since <= since
+        if covered and time.monotonic() - cache.head_checked_at < self.head_check_seconds:
+            self._stats["cache_hits"] += 1
+            return
+
+        # HEAD y rama en un solo proceso
+        _, output = await self._git(repo_path, "rev-parse", "HEAD", "--abbrev-ref", "HEAD")
+        head, branch = (output.split() + ["", ""])[:2]
+        cache.head_checked_at = time.monotonic()
+        cache.branch = branch or "main"
+
+        if covered and head == cache.head:
+            self._stats["cache_hits"] += 1
+            return
+
+        if covered and cache.head and await self._is_ancestor(repo_path, cache.head, head):
+            new_commits = await self._log(repo_path, f"{cache.head}..{head}")
+            for commit in new_commits:
+                cache.commits[commit.sha] = commit
+            cache.head = head
+            self._stats["incremental_loads"] += 1
+            logger.debug("Git analytics: %d new commits in %s", len(new_commits), repo_path)
+            return
+
+        # Primera lectura, ventana más larga o historial reescrito
+        window_start = min(since, cache.covered_since) if covered else since
+        commits = await self._log(repo_path, f"--since={window_start.isoformat()}", head)
+        cache.commits = {commit.sha: commit for commit in commits}
+        cache.head = head
+        cache.covered_since = window_start
+        self._stats["full_loads"] += 1
+        logger.debug("Git analytics: loaded %d commits from %s", len(commits), repo_path)
+
+    async def _is_ancestor(self, repo_path: str, ancestor: str, head: str) -> bool:
+        returncode, _ = await self._git(repo_path, "merge-base", "--is-ancestor", ancestor, head, check=False)
+        return returncode == 0
+
+    async def get_analytics(self, repo_path: str, days: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        Analytics del dashboard para los últimos days días.
+
+        Returns:
+            Dict con repository, branch, period y las métricas de compute_git_analytics
+        """
+        now = now or datetime.now()
+        start_date = now - timedelta(days=days)
+        since = start_date.astimezone(timezone.utc)  # naive = hora local del servidor
+        commits, branch = await self.get_commits(repo_path, since)
+        return {
+            "repository": os.path.basename(os.path.normpath(repo_path)),
+            "branch": branch,
+            "period": {"start": start_date.isoformat(), "end": now.isoformat()},
+            **compute_git_analytics(commits, days),
+        }
+
+
+# Instancia global (una por worker uvicorn)
+_git_analytics_engine: Optional[GitAnalyticsEngine] = None
+
+
+def get_git_analytics_engine() -> GitAnalyticsEngine:
+    """Motor de git analytics compartido entre requests."""
+    global _git_analytics_engine
+    if _git_analytics_engine is None:
+        _git_analytics_engine = GitAnalyticsEngine()
+    return _git_analytics_engine
+
+
+__all__ = [
+    "CommitStat",
+    "GitAnalyticsEngine",
+    "GitCommandError",
+    "compute_git_analytics",
+    "get_git_analytics_engine",
+    "parse_git_log",
+]
@@ -0,0 +1,256 @@
+"""
+Research Export Service - Streaming export of anonymized research data.
+
+Reads sessions, traces, evaluations and risks with server-side cursors
+(yield_per) and only the exported columns, and hands the rows to
+StreamingResearchExporter, which anonymizes them in batches. Nothing is materialized as a full list:
+memory stays flat whatever the date range.
+
+Provides:
+- iter_research_records: (data_type, record) pairs for an export request
+- build_anonymization_config: AnonymizationConfig for an export request
+- apply_gdpr_check: add GDPR Article 89 safeguards to a privacy validation
+- run_research_export: anonymize + validate + write an export to a sink
+"""
+import logging
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..core.constants import (
+    EXPORT_ANONYMIZE_BATCH_SIZE,
+    EXPORT_ANONYMIZE_WORKERS,
+    EXPORT_STREAM_BATCH_SIZE,
+)
+from ..database.models import (
+    SessionDB,
+    CognitiveTraceDB,
+    RiskDB,
+    EvaluationDB,
+)
+from ..export import (
+    AnonymizationConfig,
+    DataAnonymizer,
+    ExportConfig,
+    GDPRCompliance,
+    IncrementalPrivacyValidator,
+    StreamingExportResult,
+    StreamingResearchExporter,
+    ValidationResult,
+)
+from ..export.streaming import ProgressCallback
+
+logger = logging.getLogger(__name__)
+
+# Quasi-identifiers: fields that combined could identify someone
+RESEARCH_QUASI_IDENTIFIERS = ["activity_id", "week"]
+
+_SESSION_COLUMNS = (
+    SessionDB.id,
+    SessionDB.student_id,
+    SessionDB.activity_id,
+    SessionDB.mode,
+    SessionDB.status,
+    SessionDB.start_time,
+    SessionDB.end_time,
+    SessionDB.created_at,
+)
+_TRACE_COLUMNS = (
+    CognitiveTraceDB.id,
+    CognitiveTraceDB.session_id,
+    CognitiveTraceDB.student_id,
+    CognitiveTraceDB.activity_id,
+    CognitiveTraceDB.trace_level,
+    CognitiveTraceDB.interaction_type,
+    CognitiveTraceDB.cognitive_state,
+    CognitiveTraceDB.cognitive_intent,
+    CognitiveTraceDB.ai_involvement,
+    CognitiveTraceDB.content,
+    CognitiveTraceDB.created_at,
+    CognitiveTraceDB.trace_metadata,
+)
+_EVALUATION_COLUMNS = (
+    EvaluationDB.id,
+    EvaluationDB.session_id,
+    EvaluationDB.student_id,
+    EvaluationDB.activity_id,
+    EvaluationDB.overall_competency_level,
+    EvaluationDB.overall_score,
+    EvaluationDB.dimensions,
+    EvaluationDB.key_strengths,
+    EvaluationDB.improvement_areas,
+    EvaluationDB.created_at,
+)
+_RISK_COLUMNS = (
+    RiskDB.id,
+    RiskDB.session_id,
+    RiskDB.student_id,
+    RiskDB.activity_id,
+    RiskDB.risk_type,
+    RiskDB.risk_level,
+    RiskDB.dimension,
+    RiskDB.description,
+    RiskDB.evidence,
+    RiskDB.recommendations,
+    RiskDB.resolved,
+    RiskDB.created_at,
+)
+
+
+def _session_filters(request: Any) -> list:
+    filters = []
+    if request.start_date:
+        filters.append(SessionDB.start_time >= request.start_date)
+    if request.end_date:
+        filters.append(SessionDB.start_time <= request.end_date)
+    if request.activity_ids:
+        filters.append(SessionDB.activity_id.in_(request.activity_ids))
+    return filters
+
+
+def _stream(db: Session, stmt, batch_size: int) -> Iterator[Dict[str, Any]]:
+    # yield_per: server-side cursor on PostgreSQL, batches of rows elsewhere
+    result = db.execute(stmt.execution_options(yield_per=batch_size))
+    for row in result.mappings():
+        yield dict(row)
+
+
+def _created_window(model, created_after: Optional[datetime], created_before: Optional[datetime]) -> list:
+    filters = []
+    if created_after is not None:
+        filters.append(model.created_at > created_after)
+    if created_before is not None:
+        filters.append(model.created_at <= created_before)
+    return filters
+
+
+def iter_research_records(
+    db: Session,
+    request: Any,
+    batch_size: int = EXPORT_STREAM_BATCH_SIZE,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """
+    Stream the raw records of an export request grouped by data type.
+
+    Child tables are filtered with a subquery on sessions instead of an IN
+    list of every matching session id.
+
+    Args:
+        db: Database session
+        request: ExportRequest (filters and include_* flags)
+        batch_size: Rows fetched per cursor round-trip
+        created_after: Only rows created after this instant (incremental exports)
+        created_before: Only rows created up to this instant (inclusive)
+
+    Yields:
+        (data_type, record) with data_type in sessions/traces/evaluations/risks
+    """
+    filters = _session_filters(request)
+    session_ids = select(SessionDB.id).where(*filters).scalar_subquery()
+
+    if request.include_sessions:
+        stmt = select(*_SESSION_COLUMNS).where(
+            *filters, *_created_window(SessionDB, created_after, created_before)
+        )
+        for record in _stream(db, stmt, batch_size):
+            yield "sessions", record
+
+    sections = (
+        ("traces", request.include_traces, CognitiveTraceDB, _TRACE_COLUMNS),
+        ("evaluations", request.include_evaluations, EvaluationDB, _EVALUATION_COLUMNS),
+        ("risks", request.include_risks, RiskDB, _RISK_COLUMNS),
+    )
+    for data_type, included, model, columns in sections:
+        if not included:
+            continue
+        stmt = select(*columns).where(*_created_window(model, created_after, created_before))
+        if filters:
+            stmt = stmt.where(model.session_id.in_(session_ids))
+        for record in _stream(db, stmt, batch_size):
+            yield data_type, record
+
+
+def build_anonymization_config(request: Any) -> AnonymizationConfig:
+    """AnonymizationConfig used for research exports (same as the inline export)."""
+    return AnonymizationConfig(
+        k_anonymity=request.k_anonymity,
+        suppress_pii=True,
+        generalize_timestamps=True,
+        add_noise_to_scores=request.add_noise,
+        noise_epsilon=request.noise_epsilon,
+    )
+
+
+def apply_gdpr_check(
+    validation_result: ValidationResult, anon_config: AnonymizationConfig
+) -> ValidationResult:
+    """
+    Combine a privacy validation with the GDPR Article 89 safeguards check.
+
+    Returns:
+        The same validation result, updated in place
+    """
+    gdpr_result = GDPRCompliance.check_article_89_compliance(
+        anonymization_config=anon_config.model_dump(),
+        validation_result=validation_result,
+    )
+    validation_result.metrics.update(gdpr_result.metrics)
+    validation_result.is_valid &= gdpr_result.is_valid
+    validation_result.errors.extend(gdpr_result.errors)
+    return validation_result
+
+
+def run_research_export(
+    db: Session,
+    request: Any,
+    sink: BinaryIO,
+    anon_config: Optional[AnonymizationConfig] = None,
+    on_progress: Optional[ProgressCallback] = None,
+    batch_size: int = EXPORT_STREAM_BATCH_SIZE,
+    records: Optional[Iterator[Tuple[str, Dict[str, Any]]]] = None,
+) -> StreamingExportResult:
+    """
+    Anonymize, validate and write an export request to a binary sink.
+
+    Synchronous (DB cursor + file IO): call it from a thread in async code.
+    The sink receives the data before validation finishes, so callers must
+    only release it when result.validation.is_valid.
+
+    Args:
+        db: Database session
+        request: ExportRequest
+        sink: Binary file-like object (spooled temp file, storage upload, ...)
+        anon_config: Anonymization config (default: build_anonymization_config)
+        on_progress: Called with the number of records written so far
+        batch_size: Rows fetched per cursor round-trip
+        records: Records to export (default: iter_research_records(db, request))
+
+    Returns:
+        Record counts, media type and privacy validation of the export
+    """
+    anon_config = anon_config or build_anonymization_config(request)
+    exporter = StreamingResearchExporter(
+        anonymizer=DataAnonymizer(anon_config),
+        validator=IncrementalPrivacyValidator(
+            min_k=request.k_anonymity,
+            quasi_identifiers=RESEARCH_QUASI_IDENTIFIERS,
+        ),
+        config=ExportConfig(
+            format=request.format,
+            compress=request.compress,
+            include_metadata=True,
+        ),
+        batch_size=EXPORT_ANONYMIZE_BATCH_SIZE,
+        workers=EXPORT_ANONYMIZE_WORKERS,
+    )
+    if records is None:
+        records = iter_research_records(db, request, batch_size)
+    return exporter.export(
+        records,
+        sink,
+        on_progress=on_progress,
+    )
@@ -9,16 +9,44 @@ FIX Cortez36: Consolidated from duplicate implementations in:
 
 This module provides a secure sandbox for executing student Python code
 with restricted builtins and resource limits.
+
+Async callers should use run_python_code(), which runs on the warm worker
+pool (sandbox_pool.py) when enabled and otherwise in a thread, so the event
+loop is never blocked by a test run.
+
+Submissions with several hidden tests should use run_python_tests(): the code
+is validated once and all tests run in one sandboxed worker process (one
+forked child per test, each with its own stdin, timeout and output capture).
 """
+import asyncio
+import json
 import os
 import subprocess
+import sys
 import tempfile
 import time
 import logging
-from typing import Tuple
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 logger = logging.getLogger(__name__)
 
+TIMEOUT_ERROR_MESSAGE = "Error: Tiempo de ejecución excedido"
+
+SANDBOX_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+
+# Margin over the expected batch duration before the worker is considered hung
+WORKER_GRACE_SECONDS = 5.0
+
+
+def sandbox_env() -> Dict[str, str]:
+    """Minimal environment for sandbox interpreters."""
+    return {
+        'PATH': os.environ.get('PATH', ''),
+        'PYTHONDONTWRITEBYTECODE': '1',
+        'PYTHONUNBUFFERED': '1',
+    }
+
 # ==========================================================================
 # Security Constants
 # ==========================================================================
@@ -207,18 +235,14 @@ def execute_python_code(code: str, test_input: str, timeout_seconds: int = 5) ->
             capture_output=True,
             text=True,
             timeout=timeout_seconds,
-            env={  # Minimal environment
-                'PATH': os.environ.get('PATH', ''),
-                'PYTHONDONTWRITEBYTECODE': '1',
-                'PYTHONUNBUFFERED': '1',
-            }
+            env=sandbox_env()  # Minimal environment
         )
         execution_time = int((time.time() - start_time) * 1000)
 
         return result.stdout.strip(), result.stderr.strip(), execution_time
     except subprocess.TimeoutExpired:
         logger.warning("Code execution timed out after %d seconds", timeout_seconds)
-        return "", "Error: Tiempo de ejecución excedido", timeout_seconds * 1000
+        return "", TIMEOUT_ERROR_MESSAGE, timeout_seconds * 1000
     except Exception as e:
         # FIX Cortez36: Added exc_info for stack trace
         logger.error("Code execution failed: %s", str(e), exc_info=True)
@@ -226,3 +250,159 @@ def execute_python_code(code: str, test_input: str, timeout_seconds: int = 5) ->
     finally:
         if os.path.exists(temp_file):
             os.remove(temp_file)
+
+
+async def run_python_code(code: str, test_input: str, timeout_seconds: int = 5) -> Tuple[str, str, int]:
+    """
+    Async version of execute_python_code for request handlers.
+
+    Uses the warm sandbox worker pool when it is running (SANDBOX_POOL_ENABLED)
+    and otherwise runs execute_python_code in a worker thread.
+
+    Returns:
+        Tuple of (stdout, stderr, execution_time_ms)
+    """
+    from .sandbox_pool import get_sandbox_pool
+
+    pool = get_sandbox_pool()
+    if pool is not None:
+        return await pool.execute(code, test_input, timeout_seconds)
+    return await asyncio.to_thread(execute_python_code, code, test_input, timeout_seconds)
+
+
+# ==========================================================================
+# Multi-test harness
+# ==========================================================================
+
+@dataclass
+class SandboxTest:
+    """One hidden test: stdin plus optional code appended to the student code."""
+    input: str = ""
+    suffix: str = ""
+
+
+@dataclass
+class SandboxTestResult:
+    """Output of one test; same fields as the execute_python_code tuple."""
+    stdout: str
+    stderr: str
+    execution_time_ms: int
+    timed_out: bool = False
+
+
+def build_test_batch(
+    code: str,
+    tests: Sequence[SandboxTest],
+    timeout_seconds: int,
+    parallel: int = 1
+) -> Dict[str, Any]:
+    """Batch job for sandbox_worker: one sandboxed program per test."""
+    wrapper = create_sandbox_wrapper(timeout_seconds)
+    return {
+        "tests": [
+            {"source": wrapper + code + test.suffix, "input": str(test.input)}
+            for test in tests
+        ],
+        "timeout": timeout_seconds,
+        "parallel": max(1, parallel),
+    }
+
+
+def parse_test_result(result: Dict[str, Any], timeout_seconds: int) -> SandboxTestResult:
+    """Converts a worker result into a SandboxTestResult (timeouts as in execute_python_code)."""
+    if result.get("timed_out"):
+        return SandboxTestResult("", TIMEOUT_ERROR_MESSAGE, timeout_seconds * 1000, timed_out=True)
+    return SandboxTestResult(
+        result.get("stdout", "").strip(),
+        result.get("stderr", "").strip(),
+        int(result.get("elapsed_ms", 0)),
+    )
+
+
+def batch_deadline(test_count: int, timeout_seconds: int, parallel: int) -> float:
+    """Upper bound for a whole batch: every test hitting its timeout."""
+    rounds = -(-test_count // max(1, parallel))
+    return rounds * timeout_seconds + WORKER_GRACE_SECONDS
+
+
+def execute_python_tests(
+    code: str,
+    tests: Sequence[SandboxTest],
+    timeout_seconds: int = 5,
+    parallel: int = 1
+) -> List[SandboxTestResult]:
+    """
+    Execute all tests of one submission in a single sandboxed interpreter.
+
+    The code is validated once; sandbox_worker.py then runs each test in its
+    own forked child with per-test stdin, timeout and output capture, up to
+    `parallel` tests at a time. Without os.fork (Windows) it falls back to
+    one execute_python_code call per test.
+
+    Args:
+        code: The Python code to execute
+        tests: Tests to run (stdin and optional code suffix)
+        timeout_seconds: Maximum execution time per test
+        parallel: Tests running at the same time (1 = deterministic timing)
+
+    Returns:
+        One SandboxTestResult per test, in order
+    """
+    if not tests:
+        return []
+
+    is_safe, error_message = validate_code_security(code)
+    if not is_safe:
+        return [SandboxTestResult("", error_message, 0) for _ in tests]
+
+    if not hasattr(os, "fork"):
+        return [
+            SandboxTestResult(*execute_python_code(code + test.suffix, test.input, timeout_seconds))
+            for test in tests
+        ]
+
+    batch = build_test_batch(code, tests, timeout_seconds, parallel)
+    try:
+        process = subprocess.run(
+            [sys.executable, '-I', SANDBOX_WORKER_SCRIPT],
+            input=json.dumps(batch) + "\n",
+            capture_output=True,
+            text=True,
+            timeout=batch_deadline(len(tests), timeout_seconds, parallel),
+            env=sandbox_env()
+        )
+        # First line is the worker's ready signal, the last one the batch result
+        results = json.loads(process.stdout.strip().splitlines()[-1])["results"]
+        return [parse_test_result(result, timeout_seconds) for result in results]
+    except subprocess.TimeoutExpired:
+        logger.warning("Test batch timed out (%d tests, %ds each)", len(tests), timeout_seconds)
+        return [SandboxTestResult("", TIMEOUT_ERROR_MESSAGE, timeout_seconds * 1000, timed_out=True) for _ in tests]
+    except Exception as e:
+        logger.error("Test batch execution failed: %s", str(e), exc_info=True)
+        return [SandboxTestResult("", f"Error: {str(e)}", 0) for _ in tests]
+
+
+async def run_python_tests(
+    code: str,
+    tests: Sequence[SandboxTest],
+    timeout_seconds: int = 5,
+    parallel: Optional[int] = None
+) -> List[SandboxTestResult]:
+    """
+    Async version of execute_python_tests for request handlers.
+
+    Uses the warm sandbox worker pool when it is running; otherwise launches
+    one worker process in a thread.
+
+    Args:
+        parallel: Tests running at the same time (default: SANDBOX_TEST_PARALLELISM, 1)
+    """
+    from .sandbox_pool import get_sandbox_pool
+
+    if parallel is None:
+        parallel = int(os.getenv("SANDBOX_TEST_PARALLELISM", "1"))
+
+    pool = get_sandbox_pool()
+    if pool is not None:
+        return await pool.execute_tests(code, tests, timeout_seconds, parallel)
+    return await asyncio.to_thread(execute_python_tests, code, tests, timeout_seconds, parallel)
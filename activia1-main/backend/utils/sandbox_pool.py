@@ -0,0 +1,376 @@
+"""
+Sandbox Pool - Workers pre-arrancados para ejecutar código de estudiantes
+
+execute_python_code escribe un archivo temporal y arranca un intérprete nuevo
+por cada test oculto; para los programas cortos de las unidades 1-5 casi todo
+el tiempo es el arranque de Python. El SandboxPool mantiene SANDBOX_POOL_SIZE
+procesos sandbox_worker ya inicializados que ejecutan cada trabajo en un hijo
+forkeado (ver sandbox_worker.py), con la misma validación y el mismo wrapper
+de restricciones que el camino síncrono.
+
+- API asyncio: execute() no bloquea el event loop
+- Límites por trabajo: CPU/memoria (setrlimit en el hijo) y wall clock
+- Reciclado: un worker se reemplaza tras SANDBOX_POOL_MAX_JOBS trabajos o
+  ante cualquier límite excedido (timeout, CPU, memoria)
+- Batch de tests: execute_tests() corre todos los tests de una entrega en
+  un único worker (ver run_python_tests en sandbox.py)
+- Backpressure: si todos los workers están ocupados, los trabajos esperan
+  un worker libre en orden de llegada
+
+Solo POSIX (requiere os.fork). Habilitar con SANDBOX_POOL_ENABLED=true; si
+está deshabilitado, run_python_code() ejecuta execute_python_code en un thread.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from .sandbox import (
+    SANDBOX_WORKER_SCRIPT,
+    TIMEOUT_ERROR_MESSAGE,
+    WORKER_GRACE_SECONDS,
+    SandboxTest,
+    SandboxTestResult,
+    sandbox_env,
+    batch_deadline,
+    build_test_batch,
+    create_sandbox_wrapper,
+    execute_python_code,
+    execute_python_tests,
+    parse_test_result,
+    validate_code_security,
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SANDBOX_POOL_SIZE = 4
+DEFAULT_SANDBOX_POOL_MAX_JOBS = 200
+
+# Una respuesta incluye stdout + stderr (hasta 1MB cada uno, escapados en JSON)
+_PROTOCOL_LINE_LIMIT = 8 * 1024 * 1024
+
+
+def is_sandbox_pool_enabled() -> bool:
+    """SANDBOX_POOL_ENABLED=true y plataforma con os.fork."""
+    return os.getenv("SANDBOX_POOL_ENABLED", "false").lower() == "true" and hasattr(os, "fork")
+
+
+class _Worker:
+    """Proceso sandbox_worker y su contador de trabajos."""
+
+    def __init__(self, process: asyncio.subprocess.Process):
+        self.process = process
+        self.jobs = 0
+
+    @property
+    def pid(self) -> int:
+        return self.process.pid
+
+
+class SandboxPool:
+    """
+    Pool de workers sandbox con API asyncio.
+
+    Los workers son procesos del event loop que llamó a start(); execute()
+    debe usarse desde ese mismo loop.
+    """
+
+    def __init__(
+        self,
+        size: int = DEFAULT_SANDBOX_POOL_SIZE,
+        max_jobs_per_worker: int = DEFAULT_SANDBOX_POOL_MAX_JOBS,
+        python_executable: Optional[str] = None,
+    ):
+        """
+        Args:
+            size: Cantidad de workers
+            max_jobs_per_worker: Trabajos antes de reciclar un worker
+            python_executable: Intérprete para los workers (default: sys.executable)
+        """
+        self.size = max(1, size)
+        self.max_jobs_per_worker = max(1, max_jobs_per_worker)
+        self.python_executable = python_executable or sys.executable
+
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: Set[_Worker] = set()
+        self._recycling: Set[asyncio.Task] = set()
+        self._running = False
+
+        self._stats: Dict[str, int] = {
+            "jobs": 0,
+            "timeouts": 0,
+            "recycled": 0,
+            "fallbacks": 0,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Arranca los workers y espera a que estén listos."""
+        if self._running:
+            return
+        self._idle = asyncio.Queue()
+        workers = await asyncio.gather(*(self._spawn() for _ in range(self.size)))
+        for worker in workers:
+            self._idle.put_nowait(worker)
+        self._running = True
+        logger.info(
+            "Sandbox pool started (workers: %d, max jobs per worker: %d)",
+            self.size, self.max_jobs_per_worker
+        )
+
+    async def stop(self) -> None:
+        """Detiene todos los workers (los trabajos en curso se descartan)."""
+        self._running = False
+        for task in list(self._recycling):
+            task.cancel()
+        if self._recycling:
+            await asyncio.gather(*self._recycling, return_exceptions=True)
+        await asyncio.gather(*(self._kill(worker) for worker in list(self._workers)))
+        logger.info("Sandbox pool stopped (%s)", self._stats)
+
+    async def _spawn(self) -> _Worker:
+        process = await asyncio.create_subprocess_exec(
+            self.python_executable, "-I", SANDBOX_WORKER_SCRIPT,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            limit=_PROTOCOL_LINE_LIMIT,
+            env=sandbox_env(),  # Mismo entorno mínimo que execute_python_code
+        )
+        ready = await process.stdout.readline()
+        if not ready:
+            raise RuntimeError("sandbox worker exited during startup")
+        worker = _Worker(process)
+        self._workers.add(worker)
+        return worker
+
+    async def _kill(self, worker: _Worker) -> None:
+        self._workers.discard(worker)
+        if worker.process.returncode is None:
+            try:
+                worker.process.kill()
+            except ProcessLookupError:
+                pass
+        await worker.process.wait()
+
+    async def _recycle(self, worker: _Worker) -> None:
+        """Reemplaza un worker por uno nuevo y lo devuelve al pool."""
+        await self._kill(worker)
+        self._stats["recycled"] += 1
+        try:
+            replacement = await self._spawn()
+        except Exception as e:
+            logger.error("Failed to respawn sandbox worker: %s", e, exc_info=True)
+            return
+        if self._running:
+            self._idle.put_nowait(replacement)
+        else:
+            await self._kill(replacement)
+
+    def _schedule_recycle(self, worker: _Worker) -> None:
+        task = asyncio.create_task(self._recycle(worker))
+        self._recycling.add(task)
+        task.add_done_callback(self._recycling.discard)
+
+    # ------------------------------------------------------------------
+    # Ejecución
+    # ------------------------------------------------------------------
+
+    async def _run_on_worker(self, job: Dict[str, Any], deadline: float) -> Optional[Dict[str, Any]]:
+        """
+        Envía un trabajo a un worker libre y devuelve su respuesta.
+
+        Returns:
+            Respuesta del worker, o None si no respondió dentro de `deadline`
+
+        Raises:
+            ConnectionError u otros errores de IO si el worker se rompió
+        """
+        worker = await self._idle.get()
+        worker.jobs += 1
+        self._stats["jobs"] += 1
+        try:
+            worker.process.stdin.write((json.dumps(job) + "\n").encode("utf-8"))
+            await worker.process.stdin.drain()
+            line = await asyncio.wait_for(worker.process.stdout.readline(), timeout=deadline)
+            if not line:
+                raise ConnectionError("sandbox worker exited")
+            result = json.loads(line)
+        except asyncio.TimeoutError:
+            logger.warning("Sandbox worker %d unresponsive, recycling", worker.pid)
+            self._stats["timeouts"] += 1
+            self._schedule_recycle(worker)
+            return None
+        except Exception as e:
+            logger.error("Sandbox worker %d failed: %s", worker.pid, e)
+            self._stats["fallbacks"] += 1
+            self._schedule_recycle(worker)
+            raise
+        except BaseException:
+            # Cancelación con el trabajo en vuelo: el worker queda desincronizado
+            self._schedule_recycle(worker)
+            raise
+
+        if result.get("breach") or worker.jobs >= self.max_jobs_per_worker:
+            self._schedule_recycle(worker)
+        else:
+            self._idle.put_nowait(worker)
+        return result
+
+    def _available(self) -> bool:
+        return self._running and bool(self._workers or self._recycling)
+
+    async def execute(
+        self,
+        code: str,
+        test_input: str,
+        timeout_seconds: int = 5
+    ) -> Tuple[str, str, int]:
+        """
+        Ejecuta código en un worker del pool.
+
+        Misma validación y mismo contrato que execute_python_code.
+
+        Returns:
+            Tuple of (stdout, stderr, execution_time_ms)
+        """
+        is_safe, error_message = validate_code_security(code)
+        if not is_safe:
+            return "", error_message, 0
+
+        if not self._available():
+            self._stats["fallbacks"] += 1
+            return await asyncio.to_thread(execute_python_code, code, test_input, timeout_seconds)
+
+        job = {
+            "source": create_sandbox_wrapper(timeout_seconds) + code,
+            "input": test_input,
+            "timeout": timeout_seconds,
+        }
+        try:
+            result = await self._run_on_worker(job, timeout_seconds + WORKER_GRACE_SECONDS)
+        except Exception:
+            # Worker roto: el trabajo corre por el camino síncrono
+            return await asyncio.to_thread(execute_python_code, code, test_input, timeout_seconds)
+
+        if result is None or result.get("timed_out"):
+            if result is not None:
+                self._stats["timeouts"] += 1
+            logger.warning("Code execution timed out after %d seconds", timeout_seconds)
+            return "", TIMEOUT_ERROR_MESSAGE, timeout_seconds * 1000
+
+        return result["stdout"].strip(), result["stderr"].strip(), result["elapsed_ms"]
+
+    async def execute_tests(
+        self,
+        code: str,
+        tests: Sequence[SandboxTest],
+        timeout_seconds: int = 5,
+        parallel: int = 1
+    ) -> List[SandboxTestResult]:
+        """
+        Ejecuta todos los tests de una entrega en un único worker.
+
+        Mismo contrato que execute_python_tests: validación única, un hijo
+        por test y resultados en orden.
+        """
+        if not tests:
+            return []
+
+        is_safe, error_message = validate_code_security(code)
+        if not is_safe:
+            return [SandboxTestResult("", error_message, 0) for _ in tests]
+
+        if not self._available():
+            self._stats["fallbacks"] += 1
+            return await asyncio.to_thread(execute_python_tests, code, tests, timeout_seconds, parallel)
+
+        job = build_test_batch(code, tests, timeout_seconds, parallel)
+        try:
+            result = await self._run_on_worker(job, batch_deadline(len(tests), timeout_seconds, parallel))
+        except Exception:
+            return await asyncio.to_thread(execute_python_tests, code, tests, timeout_seconds, parallel)
+
+        if result is None:
+            return [
+                SandboxTestResult("", TIMEOUT_ERROR_MESSAGE, timeout_seconds * 1000, timed_out=True)
+                for _ in tests
+            ]
+        parsed = [parse_test_result(test_result, timeout_seconds) for test_result in result["results"]]
+        self._stats["timeouts"] += sum(1 for test_result in parsed if test_result.timed_out)
+        return parsed
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = dict(self._stats)
+        stats["workers"] = len(self._workers)
+        stats["idle"] = self._idle.qsize() if self._idle is not None else 0
+        stats["running"] = self._running
+        return stats
+
+
+# ============================================================================
+# Instancia global (lifespan de FastAPI)
+# ============================================================================
+
+_global_sandbox_pool: Optional[SandboxPool] = None
+_sandbox_pool_lock = threading.Lock()
+
+
+def get_sandbox_pool() -> Optional[SandboxPool]:
+    """Pool global si está corriendo, None en caso contrario."""
+    pool = _global_sandbox_pool
+    if pool is not None and pool.is_running:
+        return pool
+    return None
+
+
+async def start_sandbox_pool() -> Optional[SandboxPool]:
+    """Crea y arranca el pool global desde variables de entorno (lifespan startup)."""
+    global _global_sandbox_pool
+
+    if not is_sandbox_pool_enabled():
+        logger.info("Sandbox pool disabled (SANDBOX_POOL_ENABLED=false or no os.fork)")
+        return None
+
+    with _sandbox_pool_lock:
+        if _global_sandbox_pool is None:
+            _global_sandbox_pool = SandboxPool(
+                size=int(os.getenv("SANDBOX_POOL_SIZE", str(DEFAULT_SANDBOX_POOL_SIZE))),
+                max_jobs_per_worker=int(os.getenv(
+                    "SANDBOX_POOL_MAX_JOBS", str(DEFAULT_SANDBOX_POOL_MAX_JOBS)
+                )),
+            )
+        pool = _global_sandbox_pool
+
+    await pool.start()
+    return pool
+
+
+async def stop_sandbox_pool() -> None:
+    """Detiene el pool global (lifespan shutdown)."""
+    global _global_sandbox_pool
+
+    with _sandbox_pool_lock:
+        pool = _global_sandbox_pool
+        _global_sandbox_pool = None
+
+    if pool is not None:
+        await pool.stop()
+
+
+__all__ = [
+    "SandboxPool",
+    "get_sandbox_pool",
+    "start_sandbox_pool",
+    "stop_sandbox_pool",
+    "is_sandbox_pool_enabled",
+]
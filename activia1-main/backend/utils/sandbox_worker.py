@@ -0,0 +1,285 @@
+"""
+Sandbox worker - proceso pre-arrancado del SandboxPool.
+
+Se ejecuta como `python -I sandbox_worker.py` y solo usa la stdlib (con -I el
+paquete backend no está en sys.path). Protocolo: una línea JSON por trabajo en
+stdin ({"source", "input", "timeout"}) y una línea JSON de respuesta en stdout.
+
+Por cada programa hace fork de un hijo que ejecuta el wrapper del sandbox
+(create_sandbox_wrapper + código del estudiante) con stdin/stdout/stderr
+redirigidos a pipes. El intérprete ya está inicializado y los módulos que usa
+el wrapper (math, resource) ya están importados, así que el costo por trabajo
+es un fork en lugar de arrancar Python. Cada hijo parte de un espacio de
+nombres limpio: un trabajo no ve lo que dejó el anterior.
+
+Límites por trabajo:
+- CPU y memoria: los aplica el propio wrapper con setrlimit dentro del hijo
+- Wall clock: este proceso mata al hijo (SIGKILL) al vencer el timeout
+- Salida: se capturan como máximo MAX_OUTPUT_BYTES por stream
+
+Un trabajo batch ({"tests": [...]}) ejecuta todos los tests de una entrega en
+este mismo proceso, un hijo por test (opcionalmente varios a la vez). También
+se usa sin pool: execute_python_tests lanza un único `python -I
+sandbox_worker.py`, le pasa el batch por stdin y lee la respuesta.
+"""
+import builtins
+import json
+import linecache
+import os
+import selectors
+import signal
+import sys
+import time
+import traceback
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - el pool solo se usa en POSIX
+    resource = None
+
+MAX_OUTPUT_BYTES = 1024 * 1024
+
+try:
+    _MAX_FD = os.sysconf("SC_OPEN_MAX")
+except (AttributeError, ValueError, OSError):  # pragma: no cover
+    _MAX_FD = 1024
+
+# Códigos de salida del hijo
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_MEMORY = 3
+
+# Señales que indican un límite excedido (CPU, memoria, wall clock)
+_LIMIT_SIGNALS = {
+    getattr(signal, "SIGXCPU", None),
+    signal.SIGKILL,
+    signal.SIGSEGV,
+}
+
+
+def _run_child(source: str, stdin_r: int, stdout_w: int, stderr_w: int) -> None:
+    """Proceso hijo: redirige stdio, ejecuta el código y termina con os._exit."""
+    os.dup2(stdin_r, 0)
+    os.dup2(stdout_w, 1)
+    os.dup2(stderr_w, 2)
+    # Cierra todo lo heredado: protocolo del worker y pipes de otros hijos
+    os.closerange(3, _MAX_FD)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+    # Las líneas del código aparecen en los tracebacks como en un archivo .py
+    linecache.cache["<sandbox>"] = (len(source), None, source.splitlines(True), "<sandbox>")
+
+    exit_code = EXIT_OK
+    try:
+        exec(compile(source, "<sandbox>", "exec"), {"__name__": "__main__", "__builtins__": builtins})
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            exit_code = e.code or EXIT_OK
+        else:
+            exit_code = EXIT_ERROR
+            sys.stderr.write(f"{e.code}\n")
+    except BaseException as e:
+        exit_code = EXIT_MEMORY if isinstance(e, MemoryError) else EXIT_ERROR
+        try:
+            # Sin el frame de este módulo: el traceback empieza en el código del estudiante
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        except BaseException:
+            os.write(2, f"{type(e).__name__}\n".encode())
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except BaseException:
+                pass
+    os._exit(exit_code)
+
+
+class _Child:
+    """Hijo forkeado en ejecución: pipes, buffers de salida y deadline."""
+
+    def __init__(self, source: str, data: bytes, timeout: float):
+        stdin_r, self.stdin_w = os.pipe()
+        self.stdout_r, stdout_w = os.pipe()
+        self.stderr_r, stderr_w = os.pipe()
+
+        self.start = time.monotonic()
+        self.deadline = self.start + timeout
+        self.pid = os.fork()
+        if self.pid == 0:
+            _run_child(source, stdin_r, stdout_w, stderr_w)
+
+        for fd in (stdin_r, stdout_w, stderr_w):
+            os.close(fd)
+        self.data = data
+        self.chunks = {self.stdout_r: [], self.stderr_r: []}
+        self.sizes = {self.stdout_r: 0, self.stderr_r: 0}
+        self.open_reads = 2
+        self.timed_out = False
+
+    def register(self, selector: selectors.BaseSelector) -> None:
+        for fd in (self.stdout_r, self.stderr_r):
+            selector.register(fd, selectors.EVENT_READ, self)
+        if self.data:
+            os.set_blocking(self.stdin_w, False)
+            selector.register(self.stdin_w, selectors.EVENT_WRITE, self)
+        else:
+            self._close_stdin(selector)
+
+    def _close_stdin(self, selector: selectors.BaseSelector) -> None:
+        if self.stdin_w is None:
+            return
+        if self.stdin_w in selector.get_map():
+            selector.unregister(self.stdin_w)
+        os.close(self.stdin_w)
+        self.stdin_w = None
+
+    def handle(self, fd: int, selector: selectors.BaseSelector) -> None:
+        """Procesa un evento de uno de los pipes del hijo."""
+        if fd == self.stdin_w:
+            try:
+                written = os.write(fd, self.data)
+            except (BrokenPipeError, BlockingIOError):
+                written = len(self.data)
+            self.data = self.data[written:]
+            if not self.data:
+                self._close_stdin(selector)
+            return
+
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            selector.unregister(fd)
+            self.open_reads -= 1
+            return
+        if self.sizes[fd] < MAX_OUTPUT_BYTES:
+            self.chunks[fd].append(chunk[:MAX_OUTPUT_BYTES - self.sizes[fd]])
+        self.sizes[fd] += len(chunk)
+
+    def kill(self, selector: selectors.BaseSelector) -> None:
+        """Wall clock vencido: SIGKILL y se descarta lo que quede por leer."""
+        self.timed_out = True
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        for fd in (self.stdout_r, self.stderr_r):
+            if fd in selector.get_map():
+                selector.unregister(fd)
+        self.open_reads = 0
+
+    def finish(self, selector: selectors.BaseSelector) -> dict:
+        """Espera al hijo, cierra los pipes y arma el resultado."""
+        self._close_stdin(selector)
+        while True:
+            pid, status = os.waitpid(self.pid, os.WNOHANG)
+            if pid:
+                break
+            if time.monotonic() >= self.deadline:
+                # Cerró stdout/stderr pero sigue corriendo
+                self.kill(selector)
+            time.sleep(0.001)
+        elapsed_ms = int((time.monotonic() - self.start) * 1000)
+        os.close(self.stdout_r)
+        os.close(self.stderr_r)
+
+        term_signal = os.WTERMSIG(status) if os.WIFSIGNALED(status) else None
+        exit_code = os.WEXITSTATUS(status) if os.WIFEXITED(status) else None
+        timed_out = self.timed_out or term_signal in (getattr(signal, "SIGXCPU", None), signal.SIGKILL)
+        return {
+            "stdout": b"".join(self.chunks[self.stdout_r]).decode("utf-8", errors="replace"),
+            "stderr": b"".join(self.chunks[self.stderr_r]).decode("utf-8", errors="replace"),
+            "timed_out": timed_out,
+            "breach": timed_out or term_signal in _LIMIT_SIGNALS or exit_code == EXIT_MEMORY,
+            "exit_code": exit_code,
+            "elapsed_ms": elapsed_ms,
+        }
+
+
+def run_programs(programs: list, timeout: float, parallel: int = 1) -> list:
+    """
+    Ejecuta cada (source, input) en su propio hijo, hasta `parallel` a la vez.
+
+    Cada programa tiene su propio stdin, captura de salida y timeout (medido
+    desde su fork). Los resultados vuelven en el orden de `programs`.
+    """
+    results = [None] * len(programs)
+    pending = list(enumerate(programs))
+    pending.reverse()
+    running = {}
+    selector = selectors.DefaultSelector()
+    try:
+        while pending or running:
+            while pending and len(running) < max(1, parallel):
+                index, (source, data) = pending.pop()
+                child = _Child(source, data, timeout)
+                child.register(selector)
+                running[child] = index
+
+            now = time.monotonic()
+            for child in running:
+                if child.open_reads and now >= child.deadline:
+                    child.kill(selector)
+
+            finished = [child for child in running if not child.open_reads]
+            for child in finished:
+                results[running.pop(child)] = child.finish(selector)
+            if finished:
+                continue
+
+            wait = min(child.deadline for child in running) - time.monotonic()
+            for key, _ in selector.select(max(0.0, wait)):
+                key.data.handle(key.fd, selector)
+    finally:
+        selector.close()
+    return results
+
+
+def run_job(job: dict) -> dict:
+    """
+    Trabajo simple ({"source", "input", "timeout"}) o batch de tests
+    ({"tests": [{"source", "input"}], "timeout", "parallel"}).
+    """
+    timeout = float(job.get("timeout", 5))
+    if "tests" not in job:
+        data = str(job.get("input", "")).encode("utf-8")
+        return run_programs([(job["source"], data)], timeout)[0]
+
+    programs = [
+        (test["source"], str(test.get("input", "")).encode("utf-8"))
+        for test in job["tests"]
+    ]
+    results = run_programs(programs, timeout, int(job.get("parallel", 1)))
+    return {"results": results, "breach": any(result["breach"] for result in results)}
+
+
+def main() -> None:
+    # El protocolo usa descriptores propios: los hijos reemplazan 0/1/2
+    protocol_in = os.fdopen(os.dup(0), "rb")
+    protocol_out = os.dup(1)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if resource is not None:
+        try:
+            resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+        except (ValueError, OSError):
+            pass
+
+    # El wrapper importa math en cada hijo: precargarlo aquí lo deja en sys.modules tras el fork
+    __import__("math")
+
+    # Señal de listo para el pool
+    os.write(protocol_out, b'{"ready": true}\n')
+
+    for line in protocol_in:
+        try:
+            result = run_job(json.loads(line))
+        except Exception as e:
+            result = {"stdout": "", "stderr": f"Error: {e}", "timed_out": False,
+                      "breach": True, "exit_code": None, "elapsed_ms": 0}
+        payload = (json.dumps(result) + "\n").encode("utf-8")
+        while payload:
+            payload = payload[os.write(protocol_out, payload):]
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Tests para la capa de persistencia async (hot path de interacciones)
+
+Verifica:
+- Conversión de DATABASE_URL a drivers async (asyncpg / aiosqlite)
+- Detección de soporte async (SQLite en memoria queda en camino sync)
+- AsyncSessionRepository / AsyncTraceRepository / AsyncRiskRepository
+  sobre SQLite en archivo con aiosqlite
+- async_transaction: las trazas de una interacción se confirman o revierten juntas
+- resolve_repo_result con repos sync y async
+"""
+import pytest
+import pytest_asyncio
+from uuid import uuid4
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.config import DatabaseConfig, _to_async_url
+from backend.database.models import Base
+from backend.database.transaction import async_transaction
+from backend.database.repositories import (
+    SessionRepository,
+    TraceRepository,
+    AsyncSessionRepository,
+    AsyncTraceRepository,
+    AsyncRiskRepository,
+)
+from backend.core.gateway.protocols import resolve_repo_result
+from backend.models.trace import CognitiveTrace, TraceLevel, InteractionType
+from backend.models.risk import Risk, RiskType, RiskLevel, RiskDimension
+
+pytest.importorskip("aiosqlite")
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def db_path(tmp_path):
+    """SQLite file shared by the sync (setup) and async (under test) engines"""
+    path = tmp_path / "async_repos.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+def session_id(db_path):
+    """Create a learning session with the sync repository"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine)()
+    try:
+        return SessionRepository(db).create("student_001", "prog2_tp1", "TUTOR").id
+    finally:
+        db.close()
+        engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def async_db(db_path):
+    """AsyncSession over aiosqlite"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+    async with factory() as session:
+        yield session
+    await engine.dispose()
+
+
+def _trace(session_id: str, interaction_type: InteractionType, content: str) -> CognitiveTrace:
+    return CognitiveTrace(
+        session_id=session_id,
+        student_id="student_001",
+        activity_id="prog2_tp1",
+        trace_level=TraceLevel.N4_COGNITIVO,
+        interaction_type=interaction_type,
+        content=content,
+    )
+
+
+# ============================================================================
+# DatabaseConfig async support
+# ============================================================================
+
+class TestAsyncDatabaseUrl:
+    """Mapeo de URLs sync a drivers async"""
+
+    @pytest.mark.parametrize("sync_url,async_url", [
+        ("postgresql://u:p@db/ai", "postgresql+asyncpg://u:p@db/ai"),
+        ("postgresql+psycopg2://u:p@db/ai", "postgresql+asyncpg://u:p@db/ai"),
+        ("sqlite:///./ai_native.db", "sqlite+aiosqlite:///./ai_native.db"),
+    ])
+    def test_to_async_url(self, sync_url, async_url):
+        assert _to_async_url(sync_url) == async_url
+
+    def test_unsupported_backend_returns_none(self):
+        assert _to_async_url("mysql://u:p@db/ai") is None
+
+    def test_memory_sqlite_not_async(self):
+        """Una DB en memoria no se comparte entre engines: queda en camino sync"""
+        assert DatabaseConfig("sqlite:///:memory:").supports_async() is False
+
+    def test_file_sqlite_supports_async(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("DB_ASYNC_ENABLED", raising=False)
+        assert DatabaseConfig(f"sqlite:///{tmp_path / 'x.db'}").supports_async() is True
+
+    def test_async_disabled_by_env(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("DB_ASYNC_ENABLED", "false")
+        assert DatabaseConfig(f"sqlite:///{tmp_path / 'x.db'}").supports_async() is False
+
+    def test_get_async_engine_raises_when_unsupported(self):
+        with pytest.raises(RuntimeError):
+            DatabaseConfig("sqlite:///:memory:").get_async_engine()
+
+    @pytest.mark.asyncio
+    async def test_async_session_roundtrip_and_close(self, db_path, session_id, monkeypatch):
+        monkeypatch.delenv("DB_ASYNC_ENABLED", raising=False)
+        config = DatabaseConfig(f"sqlite:///{db_path}")
+        factory = config.get_async_session_factory()
+        async with factory() as session:
+            db_session = await AsyncSessionRepository(session).get_by_id(session_id)
+        assert db_session is not None
+        await config.close_async()
+        assert config._async_engine is None
+
+
+# ============================================================================
+# Async repositories
+# ============================================================================
+
+class TestAsyncRepositories:
+    """Repos async con la misma semántica que los sync"""
+
+    @pytest.mark.asyncio
+    async def test_session_get_by_id(self, async_db, session_id):
+        repo = AsyncSessionRepository(async_db)
+        db_session = await repo.get_by_id(session_id)
+        assert db_session.student_id == "student_001"
+        assert await repo.get_by_id("non_existent_id") is None
+
+    @pytest.mark.asyncio
+    async def test_trace_create_and_history(self, async_db, session_id):
+        repo = AsyncTraceRepository(async_db)
+        first = await repo.create(_trace(session_id, InteractionType.STUDENT_PROMPT, "¿Qué es una cola?"))
+        second = await repo.create(_trace(session_id, InteractionType.AI_RESPONSE, "Una estructura FIFO..."))
+
+        history = await repo.get_by_session(session_id)
+        assert [t.id for t in history] == [first.id, second.id]
+
+        latest = await repo.get_latest_by_session(session_id)
+        assert latest.id == second.id
+
+        by_student = await repo.get_by_student("student_001", limit=10)
+        assert len(by_student) == 2
+        # Sesión precargada: accesible sin IO lazy fuera del event loop
+        assert by_student[0].session.id == session_id
+
+    @pytest.mark.asyncio
+    async def test_risk_create_and_filter(self, async_db, session_id):
+        repo = AsyncRiskRepository(async_db)
+        risk = Risk(
+            id=str(uuid4()),
+            session_id=session_id,
+            student_id="student_001",
+            activity_id="prog2_tp1",
+            risk_type=RiskType.COGNITIVE_DELEGATION,
+            risk_level=RiskLevel.HIGH,
+            dimension=RiskDimension.COGNITIVE,
+            description="Delegación total detectada en el prompt",
+            evidence=["Dame el código completo"],
+        )
+        db_risk = await repo.create(risk)
+        assert db_risk.risk_level == RiskLevel.HIGH.value
+
+        assert len(await repo.get_by_session(session_id)) == 1
+        assert await repo.get_by_session(session_id, resolved=True) == []
+
+
+def _committed_trace_count(db_path, session_id) -> int:
+    """Trazas visibles desde otra conexión (solo lo confirmado)"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    db = sessionmaker(bind=engine)()
+    try:
+        return len(TraceRepository(db).get_by_session(session_id))
+    finally:
+        db.close()
+        engine.dispose()
+
+
+class TestAsyncTransaction:
+    """Los repos async solo hacen flush: el commit es de la transacción"""
+
+    @pytest.mark.asyncio
+    async def test_traces_commit_together(self, async_db, db_path, session_id):
+        repo = AsyncTraceRepository(async_db)
+        async with async_transaction(async_db, "test"):
+            await repo.create(_trace(session_id, InteractionType.STUDENT_PROMPT, "¿Qué es una cola?"))
+            await repo.create(_trace(session_id, InteractionType.AI_RESPONSE, "Una estructura FIFO..."))
+
+        assert _committed_trace_count(db_path, session_id) == 2
+
+    @pytest.mark.asyncio
+    async def test_failure_rolls_back_every_trace(self, async_db, db_path, session_id):
+        repo = AsyncTraceRepository(async_db)
+        with pytest.raises(RuntimeError):
+            async with async_transaction(async_db, "test"):
+                await repo.create(_trace(session_id, InteractionType.STUDENT_PROMPT, "¿Qué es una cola?"))
+                raise RuntimeError("LLM falló a mitad de la interacción")
+
+        assert _committed_trace_count(db_path, session_id) == 0
+
+
+class TestResolveRepoResult:
+    """El gateway acepta repos sync y async indistintamente"""
+
+    @pytest.mark.asyncio
+    async def test_passthrough_sync_value(self):
+        assert await resolve_repo_result(42) == 42
+
+    @pytest.mark.asyncio
+    async def test_awaits_coroutine(self):
+        async def _value():
+            return "async"
+        assert await resolve_repo_result(_value()) == "async"
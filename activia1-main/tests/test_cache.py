@@ -439,6 +439,73 @@ class TestRedisCache:
             assert result is None
 
 
+class TestRedisCacheTags:
+    """Tests for tag-indexed invalidation"""
+
+    @pytest.fixture
+    def memory_cache(self, monkeypatch):
+        monkeypatch.delenv("REDIS_URL", raising=False)
+        from backend.core.redis_cache import RedisCache
+        return RedisCache(ttl_seconds=60)
+
+    @pytest.mark.unit
+    def test_fallback_invalidates_only_tagged_entries(self, memory_cache):
+        """Fallback invalidation deletes exactly the tagged keys"""
+        memory_cache.set("p1", "r1", session_id="s1", student_id="st1", activity_id="a1")
+        memory_cache.set("p2", "r2", session_id="s2", student_id="st1", activity_id="a1")
+        memory_cache.set("p3", "r3")
+
+        assert memory_cache.invalidate_session("s1") == 1
+        assert memory_cache.get("p1") is None
+        assert memory_cache.get("p2") == "r2"
+        assert memory_cache.get("p3") == "r3"
+
+        assert memory_cache.invalidate_student("st1") == 1
+        assert memory_cache.get("p2") is None
+        assert memory_cache.get("p3") == "r3"
+        assert memory_cache.invalidate_activity("a1") == 0
+
+    @pytest.mark.unit
+    def test_fallback_pattern_invalidation_keeps_other_entries(self, memory_cache):
+        """Pattern invalidation in memory no longer wipes the whole cache"""
+        memory_cache.set("p1", "r1")
+        key = memory_cache._generate_cache_key("p1")
+
+        assert memory_cache.invalidate_by_pattern("nomatch*") == 0
+        assert memory_cache.get("p1") == "r1"
+        assert memory_cache.invalidate_by_pattern(key[len(memory_cache.prefix):]) == 1
+        assert memory_cache.get("p1") is None
+
+    @pytest.mark.unit
+    def test_redis_set_registers_tags_in_pipeline(self, redis_cache_mock):
+        """Tagged SET writes entry and tag SETs in one pipeline"""
+        pipe = redis_cache_mock._mock_client.pipeline.return_value
+        redis_cache_mock.set("prompt", "response", session_id="s1", activity_id="a1")
+
+        key = redis_cache_mock._generate_cache_key("prompt")
+        pipe.setex.assert_called_once_with(key, 3600, "response")
+        pipe.sadd.assert_any_call("llm_cache:tag:session:s1", key)
+        pipe.sadd.assert_any_call("llm_cache:tag:activity:a1", key)
+        pipe.execute.assert_called_once()
+        redis_cache_mock._mock_client.setex.assert_not_called()
+
+    @pytest.mark.unit
+    def test_redis_invalidate_session_does_not_scan(self, redis_cache_mock):
+        """Session invalidation deletes tag members without SCAN"""
+        client = redis_cache_mock._mock_client
+        read_pipe, write_pipe = MagicMock(), MagicMock()
+        read_pipe.execute.return_value = [{"llm_cache:a", "llm_cache:b"}]
+        write_pipe.execute.return_value = [2, 1]
+        client.pipeline.side_effect = [read_pipe, write_pipe]
+
+        assert redis_cache_mock.invalidate_session("s1") == 2
+
+        read_pipe.smembers.assert_called_once_with("llm_cache:tag:session:s1")
+        assert set(write_pipe.delete.call_args_list[0][0]) == {"llm_cache:a", "llm_cache:b"}
+        write_pipe.delete.assert_called_with("llm_cache:tag:session:s1")
+        client.scan.assert_not_called()
+
+
 # ============================================================================
 # Thread Safety Tests
 # ============================================================================
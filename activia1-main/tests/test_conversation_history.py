@@ -0,0 +1,250 @@
+"""
+Tests para el historial conversacional con ventana de cola y resumen incremental
+
+Verifica:
+- get_recent_by_session devuelve las N trazas más nuevas en orden cronológico
+- Recorte por presupuesto de tokens (se descartan primero los mensajes viejos)
+- Inyección del resumen como mensaje SYSTEM
+- Cuándo corresponde regenerar el resumen y su persistencia en la sesión
+- GeminiProvider conserva múltiples mensajes SYSTEM
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.conversation_history import ConversationHistoryLoader, SUMMARY_PREFIX
+from backend.database.models import Base, SessionDB
+from backend.database.repositories import SessionRepository, TraceRepository
+from backend.llm.base import LLMMessage, LLMRole
+from backend.models.trace import CognitiveTrace, TraceLevel, InteractionType
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def session_factory():
+    """Shared in-memory DB; returns a get_db_session-like context manager factory"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine)
+
+    @contextmanager
+    def _factory():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    yield _factory
+    engine.dispose()
+
+
+@pytest.fixture
+def session_id(session_factory):
+    with session_factory() as db:
+        return SessionRepository(db).create("student_001", "prog2_tp1", "TUTOR").id
+
+
+def _seed_dialog(session_factory, session_id: str, turns: int) -> datetime:
+    """Crea `turns` pares pregunta/respuesta con created_at crecientes."""
+    base = datetime(2025, 1, 1, 10, 0, 0)
+    traces = []
+    for i in range(turns):
+        for offset, (itype, content) in enumerate((
+            (InteractionType.STUDENT_PROMPT, f"pregunta {i}"),
+            (InteractionType.AI_RESPONSE, f"respuesta {i}"),
+        )):
+            trace = CognitiveTrace(
+                session_id=session_id,
+                student_id="student_001",
+                activity_id="prog2_tp1",
+                trace_level=TraceLevel.N4_COGNITIVO,
+                interaction_type=itype,
+                content=content,
+            )
+            trace.created_at = base + timedelta(minutes=2 * i + offset)
+            traces.append(trace)
+    with session_factory() as db:
+        repo = TraceRepository(db)
+        for trace in traces:
+            db_trace = repo.create(trace)
+            db_trace.created_at = trace.created_at
+        db.commit()
+    return base
+
+
+def _trace(itype: InteractionType, content: str, created_at=None):
+    return SimpleNamespace(interaction_type=itype.value, content=content, created_at=created_at)
+
+
+# ============================================================================
+# Repository tail window
+# ============================================================================
+
+class TestRecentBySession:
+
+    def test_returns_newest_in_chronological_order(self, session_factory, session_id):
+        _seed_dialog(session_factory, session_id, turns=5)
+        with session_factory() as db:
+            tail = TraceRepository(db).get_recent_by_session(session_id, limit=3)
+            assert [t.content for t in tail] == ["respuesta 3", "pregunta 4", "respuesta 4"]
+
+    def test_filters_interaction_types(self, session_factory, session_id):
+        _seed_dialog(session_factory, session_id, turns=3)
+        with session_factory() as db:
+            tail = TraceRepository(db).get_recent_by_session(
+                session_id, limit=10,
+                interaction_types=[InteractionType.STUDENT_PROMPT.value],
+            )
+            assert [t.content for t in tail] == ["pregunta 0", "pregunta 1", "pregunta 2"]
+
+    def test_window_between_bounds(self, session_factory, session_id):
+        base = _seed_dialog(session_factory, session_id, turns=3)
+        with session_factory() as db:
+            window = TraceRepository(db).get_by_session_window(
+                session_id, after=base, before=base + timedelta(minutes=4),
+            )
+            assert [t.content for t in window] == ["respuesta 0", "pregunta 1", "respuesta 1"]
+
+
+# ============================================================================
+# Message building
+# ============================================================================
+
+class TestBuildMessages:
+
+    def test_token_budget_keeps_newest(self):
+        loader = ConversationHistoryLoader(llm_provider=None, token_budget=10)
+        traces = [
+            _trace(InteractionType.STUDENT_PROMPT, "a" * 20),   # 5 tokens
+            _trace(InteractionType.AI_RESPONSE, "b" * 20),      # 5 tokens
+            _trace(InteractionType.STUDENT_PROMPT, "c" * 20),   # 5 tokens
+        ]
+        messages = loader.build_messages(traces)
+        assert [m.content[0] for m in messages] == ["b", "c"]
+
+    def test_newest_message_truncated_instead_of_dropped(self):
+        loader = ConversationHistoryLoader(llm_provider=None, token_budget=5)
+        messages = loader.build_messages([_trace(InteractionType.STUDENT_PROMPT, "x" * 100)])
+        assert len(messages) == 1
+        assert len(messages[0].content) == 20
+
+    def test_uses_provider_count_tokens(self):
+        provider = Mock()
+        provider.count_tokens.return_value = 100
+        loader = ConversationHistoryLoader(llm_provider=provider, token_budget=250)
+        traces = [_trace(InteractionType.STUDENT_PROMPT, f"m{i}") for i in range(4)]
+        assert len(loader.build_messages(traces)) == 2
+
+    def test_summary_prepended_as_system(self):
+        loader = ConversationHistoryLoader(llm_provider=None)
+        messages = loader.build_messages(
+            [_trace(InteractionType.STUDENT_PROMPT, "¿Y ahora?")],
+            summary={"text": "El estudiante implementó una cola circular."},
+        )
+        assert messages[0].role == LLMRole.SYSTEM
+        assert messages[0].content.startswith(SUMMARY_PREFIX)
+        assert messages[1].role == LLMRole.USER
+
+    def test_summary_ignored_when_disabled(self):
+        loader = ConversationHistoryLoader(llm_provider=None, summary_enabled=False)
+        messages = loader.build_messages([], summary={"text": "resumen"})
+        assert messages == []
+
+
+# ============================================================================
+# Incremental summary
+# ============================================================================
+
+class TestSummary:
+
+    def test_needs_summary_only_when_window_full(self):
+        loader = ConversationHistoryLoader(llm_provider=Mock(), tail_messages=2)
+        t0 = datetime(2025, 1, 1, 10, 0)
+        full = [
+            _trace(InteractionType.STUDENT_PROMPT, "p", t0),
+            _trace(InteractionType.AI_RESPONSE, "r", t0 + timedelta(minutes=1)),
+        ]
+        assert loader.needs_summary(full[:1], None) is False
+        assert loader.needs_summary(full, None) is True
+        assert loader.needs_summary(full, {"covered_until": (t0 - timedelta(minutes=1)).isoformat()}) is True
+        assert loader.needs_summary(full, {"covered_until": t0.isoformat()}) is False
+
+    @pytest.mark.asyncio
+    async def test_refresh_summarizes_older_turns_and_persists(self, session_factory, session_id):
+        _seed_dialog(session_factory, session_id, turns=6)
+        llm = Mock()
+        llm.count_tokens.return_value = 1
+        llm.generate = AsyncMock(return_value=Mock(content="  Resumen de los turnos 0 a 3.  "))
+        loader = ConversationHistoryLoader(
+            llm_provider=llm, tail_messages=4, summary_min_new_messages=4,
+            session_factory=session_factory,
+        )
+
+        with session_factory() as db:
+            tail = loader.fetch_tail(TraceRepository(db), session_id)
+            db.expunge_all()
+        assert loader.needs_summary(tail, None)
+
+        task = loader.schedule_summary_refresh(session_id, tail, None)
+        summary = await task
+
+        # 12 mensajes, 4 en la cola: se resumen los 8 anteriores
+        assert summary["text"] == "Resumen de los turnos 0 a 3."
+        assert summary["message_count"] == 8
+        prompt = llm.generate.call_args.args[0][1].content
+        assert "pregunta 0" in prompt and "respuesta 3" in prompt
+        assert "pregunta 4" not in prompt
+
+        with session_factory() as db:
+            stored = db.query(SessionDB).filter(SessionDB.id == session_id).first()
+            assert stored.conversation_summary["text"] == summary["text"]
+        assert loader.needs_summary(tail, summary) is False
+
+    @pytest.mark.asyncio
+    async def test_refresh_skipped_below_minimum(self, session_factory, session_id):
+        base = _seed_dialog(session_factory, session_id, turns=3)
+        llm = Mock()
+        llm.generate = AsyncMock()
+        loader = ConversationHistoryLoader(
+            llm_provider=llm, tail_messages=4, summary_min_new_messages=10,
+            session_factory=session_factory,
+        )
+        result = await loader.refresh_summary(session_id, before=base + timedelta(minutes=5))
+        assert result is None
+        llm.generate.assert_not_called()
+
+
+# ============================================================================
+# Gemini system messages
+# ============================================================================
+
+def test_gemini_concatenates_system_messages():
+    from backend.llm.gemini_provider import GeminiProvider
+
+    provider = GeminiProvider.__new__(GeminiProvider)
+    payload = provider._convert_messages_to_gemini_format([
+        LLMMessage(role=LLMRole.SYSTEM, content="Sos un tutor."),
+        LLMMessage(role=LLMRole.SYSTEM, content=f"{SUMMARY_PREFIX}\nresumen"),
+        LLMMessage(role=LLMRole.USER, content="hola"),
+    ])
+    text = payload["systemInstruction"]["parts"][0]["text"]
+    assert text.startswith("Sos un tutor.") and text.endswith("resumen")
+    assert len(payload["contents"]) == 1
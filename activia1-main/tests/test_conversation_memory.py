@@ -5,6 +5,7 @@ Verifica que:
 1. El tutor AI carga historial de conversación de la sesión
 2. Los simuladores profesionales cargan historial de conversación de la sesión
 3. El historial se convierte correctamente a mensajes LLM
+4. Solo se lee la cola de la sesión (get_recent_by_session), no la sesión completa
 """
 import pytest
 from unittest.mock import Mock, patch
@@ -27,7 +28,7 @@ def mock_trace_repo():
     repo = Mock()
     
     # Simular historial de 2 interacciones previas
-    repo.get_by_session.return_value = [
+    repo.get_recent_by_session.return_value = [
         Mock(
             interaction_type=InteractionType.STUDENT_PROMPT.value,
             content="¿Qué es un algoritmo?"
@@ -79,7 +80,8 @@ class TestTutorConversationMemory:
         history = gateway._load_conversation_history(session_id)
         
         # Verificar que se llamó al repositorio
-        mock_trace_repo.get_by_session.assert_called_once_with(session_id)
+        mock_trace_repo.get_recent_by_session.assert_called_once()
+        assert mock_trace_repo.get_recent_by_session.call_args.args[0] == session_id
         
         # Verificar que se cargaron 4 mensajes (2 USER, 2 ASSISTANT)
         assert len(history) == 4
@@ -118,7 +120,8 @@ class TestSimulatorConversationMemory:
         history = simulator._load_conversation_history(session_id)
         
         # Verificar que se llamó al repositorio
-        mock_trace_repo.get_by_session.assert_called_once_with(session_id)
+        mock_trace_repo.get_recent_by_session.assert_called_once()
+        assert mock_trace_repo.get_recent_by_session.call_args.args[0] == session_id
         
         # Verificar que se cargaron 4 mensajes
         assert len(history) == 4
@@ -156,7 +159,8 @@ class TestSimulatorConversationMemory:
         )
         
         # Verificar que se cargó el historial
-        mock_trace_repo.get_by_session.assert_called_once_with(session_id)
+        mock_trace_repo.get_recent_by_session.assert_called_once()
+        assert mock_trace_repo.get_recent_by_session.call_args.args[0] == session_id
         
         # Verificar que se llamó al LLM provider
         mock_llm_provider.generate.assert_called_once()
@@ -195,7 +199,8 @@ class TestSimulatorConversationMemory:
         )
         
         # Verificar que se cargó el historial (indirectamente)
-        mock_trace_repo.get_by_session.assert_called_once_with(session_id)
+        mock_trace_repo.get_recent_by_session.assert_called_once()
+        assert mock_trace_repo.get_recent_by_session.call_args.args[0] == session_id
         
         # Verificar que se generó respuesta
         assert response is not None
@@ -207,7 +212,7 @@ class TestConversationMemoryIntegration:
     
     def test_empty_session_no_history(self, mock_trace_repo):
         """Test: Sesión sin historial devuelve lista vacía"""
-        mock_trace_repo.get_by_session.return_value = []
+        mock_trace_repo.get_recent_by_session.return_value = []
         
         gateway = AIGateway(
             trace_repo=mock_trace_repo,
@@ -217,18 +222,18 @@ class TestConversationMemoryIntegration:
         history = gateway._load_conversation_history("empty_session")
         
         assert history == []
-        mock_trace_repo.get_by_session.assert_called_once()
+        mock_trace_repo.get_recent_by_session.assert_called_once()
     
     def test_filters_only_relevant_interaction_types(self):
         """Test: Solo se convierten STUDENT_PROMPT y AI_RESPONSE/TUTOR_INTERVENTION"""
         repo = Mock()
-        repo.get_by_session.return_value = [
+        repo.get_recent_by_session.return_value = [
             Mock(
                 interaction_type=InteractionType.STUDENT_PROMPT.value,
                 content="Pregunta 1"
             ),
             Mock(
-                interaction_type=InteractionType.AGENT_REASONING.value,  # No debe incluirse
+                interaction_type=InteractionType.HYPOTHESIS_FORMULATION.value,  # No debe incluirse
                 content="Razonamiento interno"
             ),
             Mock(
@@ -3,6 +3,7 @@ Tests for Data Export Module
 
 Tests for:
 - DataAnonymizer (k-anonymity, hashing, PII suppression)
+- DataAnonymizer batch API (same output as per-record anonymization)
 - ResearchDataExporter (JSON, CSV, Excel)
 - PrivacyValidator (k-anonymity, PII detection)
 - GDPRCompliance (Article 89 safeguards)
@@ -288,6 +289,69 @@ class TestDataAnonymizer:
         assert "score" in anonymized
 
 
+# =============================================================================
+# DataAnonymizer Batch Tests
+# =============================================================================
+
+
+class TestDataAnonymizerBatch:
+    """Batch (column-oriented) anonymization"""
+
+    def test_batch_matches_per_record(self, sample_trace, sample_evaluation, sample_risk):
+        """Test anonymize_batch gives the same records as the per-record methods"""
+        anonymizer = DataAnonymizer()
+        session = {
+            "id": "session_abc",
+            "student_id": "student_001",
+            "activity_id": "prog2_tp1",
+            "mode": "TUTOR",
+            "start_time": datetime(2025, 11, 15, 10, 0),
+            "end_time": datetime(2025, 11, 15, 10, 45),
+        }
+        open_session = {**session, "id": "session_def", "end_time": None}
+
+        cases = [
+            ("traces", [sample_trace, {**sample_trace, "student_id": "student_002"}], anonymizer.anonymize_trace),
+            ("evaluations", [sample_evaluation], anonymizer.anonymize_evaluation),
+            ("risks", [sample_risk], anonymizer.anonymize_risk),
+            ("sessions", [session, open_session], anonymizer.anonymize_session),
+        ]
+        for data_type, records, anonymize in cases:
+            batch = anonymizer.anonymize_batch(data_type, records)
+            expected = [anonymize(record) for record in records]
+            assert batch == expected
+            assert [list(record) for record in batch] == [list(record) for record in expected]
+
+        assert "duration_minutes" not in anonymizer.anonymize_batch("sessions", [open_session])[0]
+
+    def test_batch_unknown_data_type(self):
+        """Test unknown data types are rejected"""
+        with pytest.raises(ValueError):
+            DataAnonymizer().anonymize_batch("users", [{"id": "u1"}])
+
+    def test_hash_cache_is_bounded(self):
+        """Test the hash cache never exceeds its size and hashes stay stable"""
+        anonymizer = DataAnonymizer(hash_cache_size=2)
+        first = anonymizer.hash_ids(["a", "b", "a", "c", "d"])
+
+        assert len(anonymizer._hash_cache) == 2
+        assert first[0] == first[2] == anonymizer.hash_id("a")
+
+    def test_noise_batch(self, sample_evaluation):
+        """Test column noise keeps None and the [0, 10] range"""
+        config = AnonymizationConfig(add_noise_to_scores=True, noise_epsilon=0.1)
+        anonymizer = DataAnonymizer(config)
+
+        noisy = anonymizer.add_laplace_noise_batch([6.5, None, 9.9] * 50)
+
+        assert noisy[1] is None
+        assert all(0.0 <= value <= 10.0 for value in noisy if value is not None)
+        assert noisy[::3] != [6.5] * 50
+
+        batch = anonymizer.anonymize_batch("evaluations", [sample_evaluation] * 3)
+        assert all(set(record["dimensions"]) == set(sample_evaluation["dimensions"]) for record in batch)
+
+
 # =============================================================================
 # ResearchDataExporter Tests
 # =============================================================================
@@ -413,6 +477,15 @@ class TestPrivacyValidator:
 
         assert "ip_address" in detected
 
+    def test_detect_pii_in_text_multiple_types(self):
+        """Test PII detection reports every type present in the text"""
+        validator = PrivacyValidator()
+
+        detected = validator.detect_pii_in_text("ana@example.com desde 10.0.0.1, SSN 123-45-6789")
+
+        assert detected == ["email", "ssn", "ip_address"]
+        assert validator.detect_pii_in_text("2025-W47") == []
+
     def test_check_for_pii_clean_data(self, multiple_traces):
         """Test PII check with clean anonymized data"""
         validator = PrivacyValidator()
@@ -0,0 +1,150 @@
+"""
+Tests para el caché de embeddings en dos niveles
+
+Verifica:
+- Codificación binaria float32 little-endian (1.5 KB por vector de 384)
+- Nivel en memoria: LRU acotado
+- Nivel Redis: un MGET por lote, promoción al LRU, SET EX en pipeline
+- Errores de Redis degradan a miss
+- Hit rate por nivel en Prometheus (record_cache_lookups)
+- Integración con OllamaEmbeddingProvider: consultas repetidas sin HTTP
+"""
+import json
+
+import httpx
+import numpy as np
+import pytest
+
+from backend.core.embedding_cache import EmbeddingCache, decode_embedding, encode_embedding
+from backend.core.embeddings import OllamaEmbeddingProvider
+
+
+class FakeRedis:
+    """Subconjunto binario de redis-py usado por EmbeddingCache."""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.ttls = {}
+        self.mget_calls = 0
+        self.pipelines = 0
+        self.fail = fail
+
+    def mget(self, keys):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.mget_calls += 1
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.pipelines += 1
+        parent = self
+
+        class Pipe:
+            def __init__(self):
+                self.ops = []
+
+            def set(self, key, value, ex=None):
+                self.ops.append((key, value, ex))
+
+            def execute(self):
+                for key, value, ex in self.ops:
+                    assert isinstance(value, bytes)
+                    parent.data[key] = value
+                    parent.ttls[key] = ex
+
+        return Pipe()
+
+
+@pytest.fixture(autouse=True)
+def no_redis_url(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+
+def test_binary_roundtrip():
+    vector = np.random.default_rng(0).normal(size=384).tolist()
+    raw = encode_embedding(vector)
+    assert len(raw) == 384 * 4
+    np.testing.assert_allclose(decode_embedding(raw), vector, rtol=1e-6)
+    assert decode_embedding(b"abc") is None
+
+
+def test_memory_tier_lru():
+    cache = EmbeddingCache(max_entries=2, redis_client=None)
+    cache.set("a", [1.0, 2.0])
+    cache.set("b", [3.0, 4.0])
+    assert cache.get("a") == [1.0, 2.0]   # "a" pasa a ser el más reciente
+    cache.set("c", [5.0, 6.0])
+
+    assert cache.get_many(["a", "b", "c"]) == [[1.0, 2.0], None, [5.0, 6.0]]
+    stats = cache.get_stats()
+    assert stats["memory_entries"] == 2
+    assert stats["memory_hits"] == 3
+
+
+def test_redis_tier_batches_and_promotes():
+    redis_client = FakeRedis()
+    writer = EmbeddingCache(redis_client=redis_client, ttl_seconds=60)
+    writer.set_many({"a": [1.0, 2.0], "b": [3.0, 4.0]})
+    assert redis_client.pipelines == 1
+    assert redis_client.ttls == {"emb_cache:a": 60, "emb_cache:b": 60}
+
+    # Otro worker: LRU vacío, mismo Redis
+    reader = EmbeddingCache(redis_client=redis_client)
+    assert reader.get_many(["a", "b", "z"]) == [[1.0, 2.0], [3.0, 4.0], None]
+    assert redis_client.mget_calls == 1
+
+    # Segunda lectura: desde memoria
+    assert reader.get_many(["a", "b"]) == [[1.0, 2.0], [3.0, 4.0]]
+    assert redis_client.mget_calls == 1
+    stats = reader.get_stats()
+    assert stats["redis_hits"] == 2 and stats["redis_misses"] == 1
+    assert stats["memory_hit_rate"] == pytest.approx(2 / 5)
+
+
+def test_redis_errors_are_misses():
+    cache = EmbeddingCache(redis_client=FakeRedis(fail=True))
+    cache.set("a", [1.0])               # no lanza
+    cache.clear()
+    assert cache.get_many(["a"]) == [None]
+
+
+def test_hit_rate_exported_to_prometheus():
+    from backend.api.monitoring.metrics import get_metrics_registry
+
+    registry = get_metrics_registry()
+    cache = EmbeddingCache(redis_client=None)
+    cache.set("k", [1.0])
+    before = registry.get_sample_value("ai_native_cache_hits_total", {"cache_type": "embedding_memory"}) or 0
+    cache.get_many(["k", "k", "missing"])
+
+    hits = registry.get_sample_value("ai_native_cache_hits_total", {"cache_type": "embedding_memory"})
+    assert hits - before == 2
+    # Ratio calculado con los contadores del propio cache: 2 aciertos de 3 consultas
+    rate = registry.get_sample_value("ai_native_cache_hit_rate_percent", {"cache_type": "embedding_memory"})
+    assert rate == pytest.approx(200 / 3)
+
+
+@pytest.mark.asyncio
+async def test_provider_repeated_queries_skip_ollama():
+    requests = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        requests.append(body)
+        return httpx.Response(200, json={"embeddings": [[0.25] * 4 for _ in body["input"]]})
+
+    provider = OllamaEmbeddingProvider(
+        base_url="http://ollama.test",
+        cache=EmbeddingCache(redis_client=FakeRedis()),
+    )
+    provider._client = httpx.AsyncClient(base_url="http://ollama.test", transport=httpx.MockTransport(handler))
+
+    first = await provider.embed("¿Qué es una cola?")
+    second = await provider.embed("¿Qué es una cola?")
+    batch = await provider.embed_batch(["¿Qué es una cola?", "¿Qué es una pila?"])
+
+    assert first == second == batch[0] == [0.25] * 4
+    assert [body["input"] for body in requests] == [["¿Qué es una cola?"], ["¿Qué es una pila?"]]
+    await provider.close()
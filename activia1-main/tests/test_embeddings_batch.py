@@ -0,0 +1,172 @@
+"""
+Tests para el batch de embeddings de OllamaEmbeddingProvider
+
+Verifica:
+- Un request multi-input a /api/embed por lote, textos deduplicados
+- Lotes adaptados al largo de los textos (límite de caracteres)
+- Consulta de cache del lote completo en un round-trip (get_many/set_many)
+- Fallas reportadas por texto (bisección), nunca vectores en cero
+- Fallback a /api/embeddings en servidores Ollama sin /api/embed
+"""
+import json
+
+import httpx
+import pytest
+
+from backend.core.embeddings import (
+    EmbeddingBatchError,
+    OllamaEmbeddingProvider,
+)
+
+
+def _vector(text):
+    return [float(len(text)), 1.0, 0.5]
+
+
+class Recorder:
+    """Transport falso de Ollama que registra los requests."""
+
+    def __init__(self, fail_on=None, batch_endpoint=True):
+        self.requests = []
+        self.fail_on = fail_on
+        self.batch_endpoint = batch_endpoint
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests.append((request.url.path, body))
+        if request.url.path == "/api/embed":
+            if not self.batch_endpoint:
+                return httpx.Response(404, text="404 page not found")
+            if self.fail_on and any(self.fail_on in text for text in body["input"]):
+                return httpx.Response(500, json={"error": "input too long"})
+            return httpx.Response(200, json={"embeddings": [_vector(t) for t in body["input"]]})
+        return httpx.Response(200, json={"embedding": _vector(body["prompt"])})
+
+    @property
+    def batch_inputs(self):
+        return [body["input"] for path, body in self.requests if path == "/api/embed"]
+
+
+class FakeBatchCache:
+    def __init__(self, initial=None):
+        self.data = dict(initial or {})
+        self.get_many_calls = 0
+        self.set_many_calls = []
+
+    def get_many(self, keys):
+        self.get_many_calls += 1
+        return [self.data.get(key) for key in keys]
+
+    def set_many(self, mapping):
+        self.set_many_calls.append(dict(mapping))
+        self.data.update(mapping)
+
+
+def _provider(recorder, **kwargs):
+    provider = OllamaEmbeddingProvider(base_url="http://ollama.test", **kwargs)
+    provider._client = httpx.AsyncClient(
+        base_url="http://ollama.test",
+        transport=httpx.MockTransport(recorder),
+    )
+    return provider
+
+
+@pytest.mark.asyncio
+async def test_single_request_with_deduplication():
+    recorder = Recorder()
+    provider = _provider(recorder)
+
+    texts = ["cola", "pila", "cola", "arbol binario", "pila"]
+    embeddings = await provider.embed_batch(texts)
+
+    assert embeddings == [_vector(t) for t in texts]
+    assert len(recorder.batch_inputs) == 1
+    assert sorted(recorder.batch_inputs[0]) == ["arbol binario", "cola", "pila"]
+    await provider.close()
+
+
+@pytest.mark.asyncio
+async def test_batches_adapt_to_text_length():
+    recorder = Recorder()
+    provider = _provider(recorder, max_batch_size=10, max_batch_chars=100)
+
+    texts = ["a" * 90, "b" * 80] + [f"corto {i}" for i in range(6)]
+    result = await provider.embed_many(texts)
+
+    assert result.ok
+    assert all(sum(len(t) for t in batch) <= 100 or len(batch) == 1 for batch in recorder.batch_inputs)
+    # Los cortos viajan juntos; los largos, solos
+    assert ["b" * 80] in recorder.batch_inputs and ["a" * 90] in recorder.batch_inputs
+    assert len(recorder.batch_inputs) == 3
+    await provider.close()
+
+
+@pytest.mark.asyncio
+async def test_failures_reported_not_zero_vectors():
+    recorder = Recorder(fail_on="roto")
+    provider = _provider(recorder)
+
+    texts = ["uno", "dos", "texto roto", "tres"]
+    result = await provider.embed_many(texts)
+
+    assert set(result.failures) == {2}
+    assert "HTTP 500" in result.failures[2]
+    assert result.embeddings[2] is None
+    assert result.embeddings[0] == _vector("uno")
+
+    with pytest.raises(EmbeddingBatchError) as exc_info:
+        await provider.embed_batch(texts)
+    assert exc_info.value.result.embeddings[3] == _vector("tres")
+    await provider.close()
+
+
+@pytest.mark.asyncio
+async def test_cache_checked_in_one_round_trip():
+    recorder = Recorder()
+    cache = FakeBatchCache()
+    provider = _provider(recorder, cache=cache)
+    cache.data[provider._cache_key("cola")] = [9.0, 9.0, 9.0]
+
+    embeddings = await provider.embed_batch(["cola", "pila", "grafo"])
+
+    assert embeddings[0] == [9.0, 9.0, 9.0]
+    assert cache.get_many_calls == 1
+    assert recorder.batch_inputs == [["pila", "grafo"]]
+    assert set(cache.set_many_calls[0]) == {provider._cache_key("pila"), provider._cache_key("grafo")}
+
+    # Segunda pasada: todo desde cache, sin requests
+    await provider.embed_batch(["cola", "pila", "grafo"])
+    assert len(recorder.requests) == 1
+    await provider.close()
+
+
+@pytest.mark.asyncio
+async def test_legacy_endpoint_fallback():
+    recorder = Recorder(batch_endpoint=False)
+    provider = _provider(recorder)
+
+    embeddings = await provider.embed_batch(["cola", "pila"])
+    assert embeddings == [_vector("cola"), _vector("pila")]
+
+    await provider.embed("grafo")
+    paths = [path for path, _ in recorder.requests]
+    assert paths.count("/api/embed") == 1  # se detecta una sola vez
+    assert paths.count("/api/embeddings") == 3
+    await provider.close()
+
+
+@pytest.mark.asyncio
+async def test_connection_error_fails_batch_without_bisecting():
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        raise httpx.ConnectError("connection refused", request=request)
+
+    provider = _provider(handler)
+    result = await provider.embed_many(["a", "b", "c", "d"])
+
+    assert set(result.failures) == {0, 1, 2, 3}
+    assert "ConnectError" in result.failures[0]
+    assert len(calls) == 1
+    await provider.close()
@@ -0,0 +1,170 @@
+"""
+Tests para el catálogo indexado de ejercicios JSON
+
+Verifica:
+- search() por intersección de índices con el orden de carga
+- Estadísticas y filtros precalculados (copias, no el snapshot)
+- Recarga por mtime solo de los archivos que cambiaron
+- Unidades nuevas sin reiniciar y JSON inválido conserva la versión anterior
+"""
+import json
+import os
+
+import pytest
+
+from backend.data.exercises.loader import ExerciseLoader
+
+
+def _exercise(exercise_id, difficulty="Easy", tags=("Variables",), language=None, framework=None):
+    meta = {
+        "title": exercise_id,
+        "difficulty": difficulty,
+        "estimated_time_min": 30,
+        "tags": list(tags),
+    }
+    if language:
+        meta["language"] = language
+    if framework:
+        meta["framework"] = framework
+    return {
+        "id": exercise_id,
+        "meta": meta,
+        "ui_config": {"editor_language": language or "python"},
+    }
+
+
+def _write(path, exercises, mtime_ns=None):
+    path.write_text(json.dumps(exercises), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.fixture
+def exercises_dir(tmp_path):
+    _write(tmp_path / "unit1_fundamentals.json", [
+        _exercise("U1-VAR-01", tags=["Variables", "Fundamentos"]),
+        _exercise("U1-LOOP-01", difficulty="Medium", tags=["Bucles"]),
+    ])
+    _write(tmp_path / "unit6_java_fundamentals.json", [
+        _exercise("U6-JAVA-01", tags=["Java", "Variables"], language="java"),
+    ])
+    _write(tmp_path / "unit7_springboot.json", [
+        _exercise("U7-SPRING-01", difficulty="Hard", tags=["Java"], language="java", framework="spring-boot"),
+    ])
+    return tmp_path
+
+
+@pytest.fixture
+def loader(exercises_dir):
+    return ExerciseLoader(exercises_dir=exercises_dir, reload_interval=0)
+
+
+def ids(exercises):
+    return [exercise["id"] for exercise in exercises]
+
+
+class TestSearch:
+    def test_no_filters_returns_all_in_load_order(self, loader):
+        assert ids(loader.search()) == ["U1-VAR-01", "U1-LOOP-01", "U6-JAVA-01", "U7-SPRING-01"]
+
+    def test_tags_are_or_and_filters_are_and(self, loader):
+        assert ids(loader.search(tags=["Bucles", "Java"])) == ["U1-LOOP-01", "U6-JAVA-01", "U7-SPRING-01"]
+        assert ids(loader.search(tags=["Variables"], language="java")) == ["U6-JAVA-01"]
+        assert ids(loader.search(language="java", framework="spring-boot", difficulty="Hard")) == ["U7-SPRING-01"]
+
+    def test_unit_and_unknown_values(self, loader):
+        assert ids(loader.search(unit=1)) == ["U1-VAR-01", "U1-LOOP-01"]
+        assert loader.search(unit=3) == []
+        assert loader.search(tags=["Inexistente"], language="python") == []
+        assert loader.search(difficulty="Extreme") == []
+
+    def test_language_defaults_to_python(self, loader):
+        assert ids(loader.search(language="python")) == ["U1-VAR-01", "U1-LOOP-01"]
+
+    def test_single_index_getters(self, loader):
+        assert ids(loader.get_by_unit(7)) == ["U7-SPRING-01"]
+        assert ids(loader.get_by_difficulty("Medium")) == ["U1-LOOP-01"]
+        assert ids(loader.get_by_tag("Java")) == ["U6-JAVA-01", "U7-SPRING-01"]
+        assert loader.get_by_id("U6-JAVA-01")["meta"]["language"] == "java"
+
+
+class TestPrecomputed:
+    def test_stats(self, loader):
+        stats = loader.get_stats()
+        assert stats["total_exercises"] == 4
+        assert stats["by_difficulty"] == {"Easy": 2, "Medium": 1, "Hard": 1}
+        assert stats["by_language"] == {"python": 2, "java": 2}
+        assert stats["by_framework"] == {"spring-boot": 1}
+        assert stats["total_time_min"] == 120
+        assert stats["total_time_hours"] == 2.0
+        assert stats["units"] == 3
+
+    def test_filters(self, loader):
+        assert loader.get_available_filters() == {
+            "difficulties": ["Easy", "Hard", "Medium"],
+            "languages": ["java", "python"],
+            "frameworks": ["spring-boot"],
+            "tags": ["Bucles", "Fundamentos", "Java", "Variables"],
+            "units": [1, 6, 7],
+        }
+
+    def test_callers_cannot_mutate_snapshot(self, loader):
+        loader.get_stats()["by_difficulty"]["Easy"] = 99
+        loader.get_available_filters()["tags"].append("X")
+        assert loader.get_stats()["by_difficulty"]["Easy"] == 2
+        assert "X" not in loader.get_available_filters()["tags"]
+
+
+class TestReload:
+    def test_unchanged_files_keep_snapshot(self, loader):
+        catalog = loader._catalog
+        assert loader.reload() is False
+        assert loader._catalog is catalog
+
+    def test_changed_file_is_reparsed(self, loader, exercises_dir):
+        java_file = loader._catalog.files["unit6_java_fundamentals.json"]
+        _write(exercises_dir / "unit1_fundamentals.json", [
+            _exercise("U1-VAR-01", difficulty="Hard", tags=["Variables"]),
+        ], mtime_ns=1_000_000_000)
+
+        assert loader.reload() is True
+        assert loader.get_by_id("U1-LOOP-01") is None
+        assert ids(loader.search(difficulty="Hard")) == ["U1-VAR-01", "U7-SPRING-01"]
+        assert loader.get_stats()["total_exercises"] == 3
+        # Los archivos sin cambios no se vuelven a parsear
+        assert loader._catalog.files["unit6_java_fundamentals.json"] is java_file
+
+    def test_new_unit_file_is_discovered(self, loader, exercises_dir):
+        _write(exercises_dir / "unit8_extra.json", [_exercise("U8-EXTRA-01", tags=["Nuevo"])])
+
+        assert loader.reload() is True
+        assert ids(loader.search(unit=8)) == ["U8-EXTRA-01"]
+        assert "Nuevo" in loader.get_available_filters()["tags"]
+        assert loader.get_stats()["units"] == 4
+
+    def test_removed_unit_file_is_dropped(self, loader, exercises_dir):
+        (exercises_dir / "unit7_springboot.json").unlink()
+
+        assert loader.reload() is True
+        assert loader.search(framework="spring-boot") == []
+
+    def test_invalid_json_keeps_previous_version(self, loader, exercises_dir):
+        path = exercises_dir / "unit1_fundamentals.json"
+        path.write_text("[{ roto", encoding="utf-8")
+        os.utime(path, ns=(2_000_000_000, 2_000_000_000))
+
+        loader.reload()
+        assert ids(loader.search(unit=1)) == ["U1-VAR-01", "U1-LOOP-01"]
+
+    def test_interval_triggers_check_on_read(self, exercises_dir):
+        loader = ExerciseLoader(exercises_dir=exercises_dir, reload_interval=0.01)
+        _write(exercises_dir / "unit8_extra.json", [_exercise("U8-EXTRA-01")])
+        loader._last_check -= 1
+
+        assert loader.get_by_id("U8-EXTRA-01") is not None
+
+    def test_disabled_interval_never_checks_on_read(self, loader, exercises_dir):
+        _write(exercises_dir / "unit8_extra.json", [_exercise("U8-EXTRA-01")])
+        loader._last_check -= 3600
+
+        assert loader.get_by_id("U8-EXTRA-01") is None
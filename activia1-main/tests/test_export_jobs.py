@@ -0,0 +1,282 @@
+"""
+Tests para las exportaciones de investigación en background (services/export_jobs.py)
+
+Verifica:
+- ChunkedArtifactSink corta lo escrito en partes de tamaño fijo
+- Un job reclamado se exporta por partes al almacenamiento con progreso por tipo de dato
+- Un job que no pasa la validación de privacidad queda rejected y sin partes
+- Incremental: solo filas creadas después del watermark (claim - margen) del último job del mismo alcance
+- Reinicio: un alquiler vencido se vuelve a reclamar con la misma ventana; un job interrumpido vuelve a pending
+- GET /export/jobs/{id}/download soporta Range (206/416) y responde 409 si el job no terminó
+"""
+import gzip
+import json
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.api.deps import require_admin_role
+from backend.api.main import app
+from backend.api.routers import export as export_router
+from backend.database import get_db_session
+from backend.database.models import Base, CognitiveTraceDB, ResearchExportJobDB, SessionDB
+from backend.database.repositories import ResearchExportJobRepository, institutional_repository
+from backend.services.export_jobs import ChunkedArtifactSink, ExportJobRunner, export_scope_key
+from backend.services.file_storage import FileStorageService, LocalStorageProvider
+
+SESSIONS_ONLY = {"include_traces": False, "include_evaluations": False, "include_risks": False}
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def session_factory():
+    """Shared in-memory DB; returns a get_db_session-like context manager factory"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def _factory():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    yield _factory
+    engine.dispose()
+
+
+@pytest.fixture
+def storage(tmp_path):
+    return FileStorageService(LocalStorageProvider(str(tmp_path)))
+
+
+def _add_sessions(session_factory, count, created_at, with_traces=False):
+    with session_factory() as db:
+        for i in range(count):
+            session_id = str(uuid.uuid4())
+            db.add(SessionDB(
+                id=session_id, student_id=f"student_{i}", activity_id="prog2_tp1",
+                mode="TUTOR", status="completed", start_time=datetime(2025, 3, 3, 10, 0),
+                created_at=created_at,
+            ))
+            if with_traces:
+                db.flush()
+                db.add(CognitiveTraceDB(
+                    id=str(uuid.uuid4()), session_id=session_id, student_id=f"student_{i}",
+                    activity_id="prog2_tp1", trace_level="n4_cognitivo",
+                    interaction_type="student_prompt", content="contenido", ai_involvement=0.5,
+                    created_at=created_at,
+                ))
+
+
+def _create_job(session_factory, incremental=False, **request):
+    request = {"activity_ids": ["prog2_tp1"], **request}
+    with session_factory() as db:
+        return ResearchExportJobRepository(db).create(
+            request=request, scope_key=export_scope_key(request), incremental=incremental,
+        ).id
+
+
+def _job(session_factory, job_id) -> ResearchExportJobDB:
+    with session_factory() as db:
+        return ResearchExportJobRepository(db).get_by_id(job_id)
+
+
+def _runner(storage, session_factory, **kwargs) -> ExportJobRunner:
+    return ExportJobRunner(storage=storage, session_factory=session_factory, **kwargs)
+
+
+def _artifact(tmp_path, job) -> bytes:
+    return b"".join((tmp_path / chunk["path"]).read_bytes() for chunk in job.artifact_chunks)
+
+
+# ============================================================================
+# Sink y runner
+# ============================================================================
+
+class TestChunkedArtifactSink:
+
+    def test_splits_into_fixed_size_chunks(self):
+        saved = {}
+
+        def save(index, data):
+            saved[index] = data
+            return f"part-{index}"
+
+        sink = ChunkedArtifactSink(save, chunk_size=10)
+        sink.write(b"a" * 7)
+        sink.write(b"b" * 18)
+        sink.close()
+
+        assert [chunk["size"] for chunk in sink.chunks] == [10, 10, 5]
+        assert b"".join(saved[i] for i in range(3)) == b"a" * 7 + b"b" * 18
+        assert sink.tell() == sink.size == 25
+
+
+class TestExportJobRunner:
+
+    def test_job_exported_in_chunks(self, session_factory, storage, tmp_path):
+        _add_sessions(session_factory, 5, datetime(2025, 3, 3, 10, 0), with_traces=True)
+        job_id = _create_job(session_factory, include_evaluations=False, include_risks=False, compress=True)
+
+        assert _runner(storage, session_factory, chunk_size=256, heartbeat_every=2).process_next()
+
+        job = _job(session_factory, job_id)
+        assert job.status == "completed"
+        assert job.progress == {"sessions": 5, "traces": 5}
+        assert job.records_processed == 10
+        assert len(job.artifact_chunks) > 1
+        assert job.file_size == sum(chunk["size"] for chunk in job.artifact_chunks)
+        lines = gzip.decompress(_artifact(tmp_path, job)).decode("utf-8").splitlines()
+        assert len(lines) == 11  # 10 registros + metadata
+        assert job.validation["is_valid"] is True
+
+    def test_no_pending_jobs(self, session_factory, storage):
+        assert _runner(storage, session_factory).process_next() is False
+
+    def test_privacy_failure_rejects_job(self, session_factory, storage, tmp_path):
+        _add_sessions(session_factory, 3, datetime(2025, 3, 3, 10, 0))
+        job_id = _create_job(session_factory, k_anonymity=20, **SESSIONS_ONLY)
+
+        _runner(storage, session_factory, chunk_size=64).process_next()
+
+        job = _job(session_factory, job_id)
+        assert job.status == "rejected"
+        assert job.artifact_chunks == []
+        assert not list((tmp_path / "exports").rglob("part-*"))
+
+    def test_incremental_exports_rows_after_last_watermark(self, session_factory, storage, tmp_path, monkeypatch):
+        clock = {"now": datetime(2025, 3, 10, 12, 0)}
+        monkeypatch.setattr(institutional_repository, "utc_now", lambda: clock["now"])
+        runner = _runner(storage, session_factory, watermark_lag_seconds=60)
+        _add_sessions(session_factory, 5, datetime(2025, 3, 3, 10, 0))
+        first_id = _create_job(session_factory, incremental=True, **SESSIONS_ONLY)
+        runner.process_next()
+        first = _job(session_factory, first_id)
+        assert first.records_processed == 5
+        assert first.watermark == datetime(2025, 3, 10, 11, 59)  # claim - lag
+
+        # Entre los dos claims; el segundo lote cae dentro del margen del segundo claim
+        _add_sessions(session_factory, 5, datetime(2025, 3, 10, 12, 30))
+        _add_sessions(session_factory, 5, datetime(2025, 3, 10, 12, 59, 30))
+        clock["now"] = datetime(2025, 3, 10, 13, 0)
+        second_id = _create_job(session_factory, incremental=True, **SESSIONS_ONLY)
+        runner.process_next()
+
+        second = _job(session_factory, second_id)
+        assert second.since == first.watermark
+        assert second.records_processed == 5
+        lines = _artifact(tmp_path, second).decode("utf-8").splitlines()
+        assert [json.loads(line).get("type") for line in lines] == ["sessions"] * 5 + [None]
+
+        # Las filas dentro del margen (transacciones que pudieron confirmar tarde) van al job siguiente
+        clock["now"] = datetime(2025, 3, 10, 14, 0)
+        third_id = _create_job(session_factory, incremental=True, **SESSIONS_ONLY)
+        runner.process_next()
+        assert _job(session_factory, third_id).records_processed == 5
+
+
+class TestRestart:
+
+    def test_expired_lease_is_reclaimed_with_same_window(self, session_factory):
+        job_id = _create_job(session_factory)
+        with session_factory() as db:
+            first = ResearchExportJobRepository(db).claim(lease_seconds=60)
+            watermark = first.watermark
+            assert ResearchExportJobRepository(db).claim(lease_seconds=60) is None
+            first.lease_expires_at = datetime(2000, 1, 1)
+            db.commit()
+
+            reclaimed = ResearchExportJobRepository(db).claim(lease_seconds=60)
+
+        assert reclaimed.id == job_id
+        assert reclaimed.attempts == 2
+        assert reclaimed.watermark == watermark
+
+    def test_interrupted_job_released(self, session_factory, storage, tmp_path):
+        _add_sessions(session_factory, 5, datetime(2025, 3, 3, 10, 0))
+        job_id = _create_job(session_factory, **SESSIONS_ONLY)
+        runner = _runner(storage, session_factory, chunk_size=16, heartbeat_every=2)
+        runner._stop.set()  # shutdown en curso: el primer heartbeat interrumpe
+
+        runner.process_next()
+
+        job = _job(session_factory, job_id)
+        assert job.status == "pending"
+        assert job.attempts == 0
+        assert not list((tmp_path / "exports").rglob("part-*"))
+
+        runner._stop.clear()
+        runner.process_next()
+        assert _job(session_factory, job_id).status == "completed"
+
+
+# ============================================================================
+# Endpoints
+# ============================================================================
+
+class TestJobEndpoints:
+
+    @pytest.fixture
+    def client(self, session_factory, storage, monkeypatch):
+        def _db():
+            with session_factory() as db:
+                yield db
+
+        monkeypatch.setattr(export_router, "get_file_storage", lambda: storage)
+        app.dependency_overrides[get_db_session] = _db
+        app.dependency_overrides[require_admin_role] = lambda: {"user_id": None, "roles": ["admin"]}
+        with TestClient(app) as test_client:
+            yield test_client
+        app.dependency_overrides.clear()
+
+    def test_create_and_download_with_range(self, client, session_factory, storage, tmp_path):
+        _add_sessions(session_factory, 5, datetime(2025, 3, 3, 10, 0))
+        response = client.post("/api/v1/export/jobs", json={
+            "activity_ids": ["prog2_tp1"], **SESSIONS_ONLY,
+        })
+        assert response.status_code == 202
+        job_id = response.json()["job_id"]
+
+        assert client.get(f"/api/v1/export/jobs/{job_id}/download").status_code == 409
+
+        _runner(storage, session_factory, chunk_size=100).process_next()
+        status = client.get(f"/api/v1/export/jobs/{job_id}").json()
+        assert status["status"] == "completed"
+        assert status["progress"] == {"sessions": 5}
+        full = client.get(status["download_url"])
+        assert full.status_code == 200
+        assert full.content == _artifact(tmp_path, _job(session_factory, job_id))
+
+        partial = client.get(status["download_url"], headers={"Range": "bytes=90-209"})
+        assert partial.status_code == 206
+        assert partial.content == full.content[90:210]
+        assert partial.headers["content-range"] == f"bytes 90-209/{len(full.content)}"
+
+        tail = client.get(status["download_url"], headers={"Range": "bytes=-10"})
+        assert tail.content == full.content[-10:]
+
+        out_of_range = client.get(status["download_url"], headers={"Range": f"bytes={len(full.content)}-"})
+        assert out_of_range.status_code == 416
+
+    def test_unknown_job(self, client):
+        assert client.get(f"/api/v1/export/jobs/{uuid.uuid4()}").status_code == 404
@@ -0,0 +1,246 @@
+"""
+Tests para la exportación streaming de datos de investigación
+
+Verifica:
+- IncrementalPrivacyValidator da las mismas métricas y errores que PrivacyValidator.validate()
+- NDJSON comprimido con gzip, CSV por secciones y Excel en modo write-only
+- Anonimización por lotes en un pool de procesos con la misma salida que en el proceso
+- Lectura por cursor con solo las columnas exportadas y filtro por subconsulta de sesiones
+- POST /export/research-data/download entrega el archivo solo si pasa la validación de privacidad
+"""
+import gzip
+import io
+import json
+import uuid
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.api.deps import require_admin_role
+from backend.api.main import app
+from backend.api.schemas.export import ExportRequest
+from backend.database import get_db_session
+from backend.database.models import Base, CognitiveTraceDB, RiskDB, SessionDB
+from backend.export import (
+    AnonymizationConfig,
+    DataAnonymizer,
+    ExportConfig,
+    ExportFormat,
+    IncrementalPrivacyValidator,
+    PrivacyValidator,
+    StreamingResearchExporter,
+)
+from backend.services.research_export import iter_research_records, run_research_export
+
+QUASI_IDENTIFIERS = ["activity_id", "week"]
+
+
+def _raw_records(count=6, activity_id="prog2_tp1"):
+    records = []
+    for i in range(count):
+        records.append(("sessions", {
+            "id": f"session_{i}",
+            "student_id": f"student_{i % 3}",
+            "activity_id": activity_id,
+            "mode": "TUTOR",
+            "status": "completed",
+            "start_time": datetime(2025, 3, 3, 10, 0),
+            "end_time": None,
+            "created_at": datetime(2025, 3, 3, 10, 0),
+        }))
+    for i in range(count):
+        records.append(("traces", {
+            "id": f"trace_{i}",
+            "session_id": f"session_{i}",
+            "student_id": f"student_{i % 3}",
+            "activity_id": activity_id,
+            "content": "¿Qué es una cola circular?",
+            "ai_involvement": 0.4,
+            "trace_metadata": {"blocked": False},
+            "created_at": datetime(2025, 3, 4, 11, 0),
+        }))
+    return records
+
+
+def _exporter(fmt=ExportFormat.JSON, compress=False, min_k=5, **kwargs):
+    return StreamingResearchExporter(
+        anonymizer=DataAnonymizer(AnonymizationConfig()),
+        validator=IncrementalPrivacyValidator(min_k=min_k, quasi_identifiers=QUASI_IDENTIFIERS),
+        config=ExportConfig(format=fmt, compress=compress),
+        **kwargs,
+    )
+
+
+class TestIncrementalPrivacyValidator:
+
+    def test_matches_batch_validation(self):
+        anonymizer = DataAnonymizer(AnonymizationConfig())
+        records = [anonymizer.anonymize_trace(raw) for _, raw in _raw_records() if "content" in raw]
+        records.append({"activity_id": "otra", "week": "2025-W10", "student_id": "x", "email": "a@b.com"})
+
+        incremental = IncrementalPrivacyValidator(min_k=5, quasi_identifiers=QUASI_IDENTIFIERS)
+        for record in records:
+            incremental.observe(record)
+
+        expected = PrivacyValidator(min_k=5).validate(records, QUASI_IDENTIFIERS)
+        result = incremental.result()
+        assert result.is_valid is expected.is_valid is False
+        assert result.metrics == expected.metrics
+        assert sorted(result.errors) == sorted(expected.errors)
+
+
+class TestStreamingResearchExporter:
+
+    def test_ndjson_gzip(self):
+        sink = io.BytesIO()
+        progress = []
+
+        result = _exporter(compress=True, progress_every=5).export(iter(_raw_records()), sink, progress.append)
+
+        lines = [json.loads(line) for line in gzip.decompress(sink.getvalue()).decode("utf-8").splitlines()]
+        assert [line["type"] for line in lines[:-1]] == ["sessions"] * 6 + ["traces"] * 6
+        assert "student_id" not in lines[0]["data"]
+        assert lines[-1]["metadata"]["total_records"] == 12
+        assert result.record_counts == {"sessions": 6, "traces": 6}
+        assert result.file_extension == "ndjson.gz"
+        assert result.validation.is_valid
+        assert progress == [5, 10, 12]
+
+    def test_csv_sections(self):
+        sink = io.BytesIO()
+
+        _exporter(ExportFormat.CSV).export(iter(_raw_records()), sink)
+
+        text = sink.getvalue().decode("utf-8-sig")
+        assert "# SESSIONS" in text and "# TRACES" in text
+        assert '"{""blocked"": false}"' in text  # JSON aplanado en la celda
+
+    def test_excel_write_only(self):
+        openpyxl = pytest.importorskip("openpyxl")
+        sink = io.BytesIO()
+
+        _exporter(ExportFormat.EXCEL, compress=True).export(iter(_raw_records()), sink)
+
+        workbook = openpyxl.load_workbook(io.BytesIO(sink.getvalue()), read_only=True)
+        assert workbook.sheetnames == ["Metadata", "sessions", "traces"]
+        assert len(list(workbook["traces"].iter_rows())) == 7  # encabezado + 6 filas
+
+    def test_process_pool_matches_in_process(self):
+        sinks = []
+        for workers in (1, 2):
+            sink = io.BytesIO()
+            result = _exporter(batch_size=2, workers=workers).export(iter(_raw_records()), sink)
+            assert result.record_counts == {"sessions": 6, "traces": 6}
+            sinks.append(sink.getvalue())
+
+        # Los lotes vuelven en orden: misma salida salvo el timestamp de la metadata
+        assert sinks[0].splitlines()[:-1] == sinks[1].splitlines()[:-1]
+
+    def test_small_classes_fail_validation(self):
+        result = _exporter(min_k=20).export(iter(_raw_records()), io.BytesIO())
+        assert result.validation.is_valid is False
+
+    def test_interleaved_types_rejected(self):
+        records = _raw_records(1) + _raw_records(1)
+        with pytest.raises(ValueError):
+            _exporter().export(iter(records), io.BytesIO())
+
+
+# ============================================================================
+# Base de datos y endpoint
+# ============================================================================
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(6):
+        activity_id = "prog2_tp1" if i < 5 else "prog2_tp2"
+        session_id = str(uuid.uuid4())
+        session.add(SessionDB(
+            id=session_id, student_id=f"student_{i}", activity_id=activity_id,
+            mode="TUTOR", status="completed", start_time=datetime(2025, 3, 3, 10, 0),
+        ))
+        session.flush()
+        session.add(CognitiveTraceDB(
+            id=str(uuid.uuid4()), session_id=session_id, student_id=f"student_{i}",
+            activity_id=activity_id, trace_level="n4_cognitivo", interaction_type="student_prompt",
+            content="contenido", ai_involvement=0.5, created_at=datetime(2025, 3, 3, 10, 5),
+        ))
+        session.add(RiskDB(
+            id=str(uuid.uuid4()), session_id=session_id, student_id=f"student_{i}",
+            activity_id=activity_id, risk_type="cognitive_delegation", risk_level="medium",
+            dimension="cognitive", description="Delegación", created_at=datetime(2025, 3, 3, 10, 6),
+        ))
+    session.commit()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+class TestResearchExportService:
+
+    def test_filters_children_by_session_subquery(self, db):
+        request = ExportRequest(activity_ids=["prog2_tp1"], include_evaluations=False)
+
+        records = list(iter_research_records(db, request, batch_size=2))
+
+        counts = {}
+        for data_type, _ in records:
+            counts[data_type] = counts.get(data_type, 0) + 1
+        assert counts == {"sessions": 5, "traces": 5, "risks": 5}
+        trace = next(record for data_type, record in records if data_type == "traces")
+        assert "response" not in trace and "content" in trace
+
+    def test_run_research_export(self, db):
+        request = ExportRequest(activity_ids=["prog2_tp1"], include_evaluations=False, format="csv")
+        sink = io.BytesIO()
+
+        result = run_research_export(db, request, sink)
+
+        assert result.total_records == 15
+        assert result.validation.is_valid
+        assert sink.getvalue().decode("utf-8-sig").count("# ") == 3
+
+
+class TestDownloadEndpoint:
+
+    @pytest.fixture
+    def client(self, db):
+        app.dependency_overrides[get_db_session] = lambda: db
+        app.dependency_overrides[require_admin_role] = lambda: {"user_id": "admin", "roles": ["admin"]}
+        with TestClient(app) as test_client:
+            yield test_client
+        app.dependency_overrides.clear()
+
+    def test_download_streams_file(self, client):
+        response = client.post("/api/v1/export/research-data/download", json={
+            "activity_ids": ["prog2_tp1"], "include_evaluations": False, "compress": True,
+        })
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/gzip"
+        assert response.headers["x-total-records"] == "15"
+        lines = gzip.decompress(response.content).decode("utf-8").splitlines()
+        assert len(lines) == 16  # 15 registros + metadata
+
+    def test_download_blocked_when_k_not_met(self, client):
+        response = client.post("/api/v1/export/research-data/download", json={
+            "include_evaluations": False, "k_anonymity": 20,
+        })
+
+        assert response.status_code == 400
+        error = response.json()["error"]
+        assert error["error_code"] == "PRIVACY_VALIDATION_ERROR"
+        assert error["message"] == "Privacy validation failed"
+        assert "k-anonymity requirement not met: k=3 < 20" in error["extra"]["errors"]
+        assert error["extra"]["metrics"]["k_anonymity_required"] == 20
@@ -413,4 +413,88 @@ class TestGatewayPerformance:
             )
 
         # Should complete without errors
-        assert True
\ No newline at end of file
+        assert True
+
+@pytest.mark.unit
+@pytest.mark.gateway
+class TestGatewayStreaming:
+    """Tests for AIGateway.process_interaction_stream (token streaming)"""
+
+    @pytest.fixture
+    def streaming_gateway(self):
+        """Gateway with an async streaming mock provider and mock repositories"""
+        from backend.llm.mock import MockLLMProvider as AsyncMockProvider
+
+        session_repo = Mock()
+        session_repo.get_by_id = Mock(return_value=Mock(
+            id="stream-session", student_id="student-1", activity_id="activity-1", mode="TUTOR"
+        ))
+        trace_repo = Mock()
+        trace_repo.create = Mock(return_value=Mock(id="trace-1"))
+        trace_repo.get_by_session = Mock(return_value=[])
+        trace_repo.get_by_student = Mock(return_value=[])
+
+        return AIGateway(
+            llm_provider=AsyncMockProvider({"delay": 0}),
+            session_repo=session_repo,
+            trace_repo=trace_repo,
+        )
+
+    async def _collect(self, gateway, prompt):
+        return [
+            event async for event in gateway.process_interaction_stream(
+                session_id="stream-session", prompt=prompt
+            )
+        ]
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_classification_tokens_and_done(self, streaming_gateway):
+        """Classification comes first, then tokens, then the full result"""
+        events = await self._collect(streaming_gateway, "¿Qué es una cola circular en estructuras de datos?")
+        names = [e["event"] for e in events]
+
+        assert names[0] == "classification"
+        assert names[-1] == "done"
+        assert names.count("token") > 1
+
+    @pytest.mark.asyncio
+    async def test_streamed_tokens_match_persisted_response(self, streaming_gateway):
+        """Concatenated tokens equal the response stored in the AI_RESPONSE trace"""
+        events = await self._collect(streaming_gateway, "¿Qué es una cola circular en estructuras de datos?")
+        streamed = "".join(e["data"] for e in events if e["event"] == "token")
+        done = events[-1]["data"]
+
+        assert streamed.strip() == done["response"]
+        persisted = [c.args[0] for c in streaming_gateway.trace_repo.create.call_args_list]
+        ai_traces = [t for t in persisted if t.interaction_type == InteractionType.AI_RESPONSE]
+        assert len(ai_traces) == 1
+        assert ai_traces[0].content == done["response"]
+
+    @pytest.mark.asyncio
+    async def test_blocked_prompt_streams_full_response_once(self, streaming_gateway):
+        """Blocked prompts never reach the LLM and emit the pedagogical message as one token"""
+        events = await self._collect(streaming_gateway, "Dame el código completo de una cola")
+        tokens = [e for e in events if e["event"] == "token"]
+
+        assert events[0]["data"]["blocked"] is True
+        assert len(tokens) == 1
+        assert events[-1]["data"]["blocked"] is True
+
+    @pytest.mark.asyncio
+    async def test_stream_propagates_gateway_errors(self, streaming_gateway):
+        """Errors raised by the flow surface when consuming the stream"""
+        streaming_gateway.session_repo.get_by_id = Mock(return_value=None)
+
+        with pytest.raises(ValueError):
+            await self._collect(streaming_gateway, "¿Qué es una cola circular en estructuras de datos?")
+
+    @pytest.mark.asyncio
+    async def test_non_streaming_flow_does_not_use_generate_stream(self, streaming_gateway):
+        """process_interaction keeps calling generate() when no stream is active"""
+        streaming_gateway.llm.generate_stream = Mock(side_effect=AssertionError("stream used"))
+
+        result = await streaming_gateway.process_interaction(
+            session_id="stream-session", prompt="¿Qué es una cola circular en estructuras de datos?"
+        )
+
+        assert result["response"]
@@ -0,0 +1,82 @@
+"""
+Tests para los componentes compartidos del AIGateway (GatewayPipeline)
+
+Verifica:
+- Los gateways construidos sobre un pipeline reutilizan motor, gobernanza,
+  historial, caches y LLM
+- El estado por request (repositorios, resúmenes del turno) no se comparte
+- La configuración del pipeline es de solo lectura
+- Sin pipeline se conserva la construcción completa (backward compatibility)
+- El registro de tareas en background es común a todos los gateways
+"""
+from types import MappingProxyType
+from unittest.mock import Mock
+
+import pytest
+
+from backend.core.ai_gateway import AIGateway
+from backend.core.gateway.pipeline import BackgroundTaskRegistry, GatewayPipeline
+from backend.llm.mock import MockLLMProvider
+
+
+@pytest.fixture
+def pipeline():
+    return GatewayPipeline.build(llm_provider=MockLLMProvider(), config={"max_help_level": 0.5})
+
+
+class TestGatewayPipeline:
+    def test_gateways_share_components(self, pipeline):
+        first = AIGateway(session_repo=Mock(), pipeline=pipeline)
+        second = AIGateway(session_repo=Mock(), pipeline=pipeline)
+
+        assert first.llm is second.llm is pipeline.llm
+        assert first.cognitive_engine is second.cognitive_engine
+        assert first.governance_agent is second.governance_agent
+        assert first.history is second.history
+        assert first._background_tasks is second._background_tasks
+
+    def test_request_state_is_not_shared(self, pipeline):
+        repo_a, repo_b = Mock(), Mock()
+        first = AIGateway(session_repo=repo_a, trace_repo=repo_a, pipeline=pipeline)
+        second = AIGateway(session_repo=repo_b, trace_repo=repo_b, pipeline=pipeline)
+
+        assert first.session_repo is repo_a and second.session_repo is repo_b
+        first._conversation_summaries["s1"] = {"summary": "x"}
+        assert second._conversation_summaries == {}
+
+    def test_config_is_read_only(self, pipeline):
+        assert isinstance(pipeline.config, MappingProxyType)
+        assert pipeline.cognitive_engine.pedagogical_policies["max_help_level"] == 0.5
+        with pytest.raises(TypeError):
+            pipeline.config["max_help_level"] = 1.0
+
+    def test_pipeline_overrides_component_arguments(self, pipeline):
+        gateway = AIGateway(llm_provider=MockLLMProvider(), pipeline=pipeline)
+        assert gateway.llm is pipeline.llm
+
+    def test_without_pipeline_builds_private_components(self):
+        llm = MockLLMProvider()
+        cache = Mock()
+        first = AIGateway(llm_provider=llm, cache=cache)
+        second = AIGateway(llm_provider=llm, cache=cache)
+
+        assert first.llm is second.llm is llm
+        assert first.cache is cache
+        assert first.cognitive_engine is not second.cognitive_engine
+        assert first.pipeline is not second.pipeline
+
+    def test_default_llm_is_mock(self):
+        gateway = AIGateway()
+        assert gateway.llm is not None
+        assert gateway.config == {}
+
+
+class TestBackgroundTaskRegistry:
+    def test_discard_is_idempotent(self):
+        registry = BackgroundTaskRegistry(max_tasks=2)
+        task = object()
+        registry.tasks.add(task)
+
+        registry.discard(task)
+        registry.discard(task)
+        assert len(registry) == 0
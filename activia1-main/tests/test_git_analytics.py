@@ -0,0 +1,129 @@
+"""
+Tests para el motor de git analytics (services/git_analytics.py)
+
+Verifica:
+- Parseo de git log con separadores de control (mensajes y nombres con "|")
+- La primera consulta lee la ventana; las siguientes solo resuelven HEAD
+- Commits nuevos: solo se lee <último>..HEAD
+- Un período más largo o un historial reescrito relee la ventana completa
+- Las métricas y tendencias coinciden con el historial
+"""
+import os
+import shutil
+import subprocess
+from datetime import datetime, timedelta
+
+import pytest
+
+from backend.services.git_analytics import GitAnalyticsEngine, GitCommandError, parse_git_log
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not installed")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "config", "user.email", "ana@example.com")
+    _git(tmp_path, "config", "user.name", "Ana | Grupo 3")
+    return tmp_path
+
+
+def _git(repo, *args, env=None):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env={**os.environ, **(env or {})})
+
+
+def _commit(repo, message, lines=1, days_ago=0):
+    with open(repo / "main.py", "a") as f:
+        f.write("x = 1\n" * lines)
+    when = (datetime.now() - timedelta(days=days_ago)).isoformat()
+    _git(repo, "add", ".")
+    _git(repo, "commit", "-q", "-m", message, env={"GIT_AUTHOR_DATE": when, "GIT_COMMITTER_DATE": when})
+
+
+@pytest.fixture
+def engine():
+    return GitAnalyticsEngine(head_check_seconds=0)
+
+
+class TestParseGitLog:
+
+    def test_parses_numstat_and_binary_files(self):
+        output = (
+            "\x1eabc\x1fAna | Grupo 3\x1fana@example.com\x1f1741000000\x1f2025-03-03 10:00:00 -0300\x1ffeat: a | b\n"
+            "3\t1\tmain.py\n"
+            "-\t-\tlogo.png\n"
+        )
+
+        [commit] = parse_git_log(output)
+
+        assert (commit.sha, commit.author, commit.message) == ("abc", "Ana | Grupo 3", "feat: a | b")
+        assert (commit.insertions, commit.deletions) == (3, 1)
+        assert commit.date.startswith("2025-03-03")
+
+
+@pytest.mark.asyncio
+class TestGitAnalyticsEngine:
+
+    async def test_cached_after_first_load(self, repo, engine):
+        _commit(repo, "feat: primera versión", lines=3)
+        _commit(repo, "fix: corrige", lines=2)
+
+        first = await engine.get_analytics(str(repo), days=30)
+        second = await engine.get_analytics(str(repo), days=30)
+
+        assert first["metrics"] == second["metrics"]
+        assert first["metrics"]["total_commits"] == 2
+        assert first["metrics"]["total_insertions"] == 5
+        assert first["contributors"][0]["name"] == "Ana | Grupo 3"
+        assert first["quality_indicators"]["conventional_commits_ratio"] == 1.0
+        assert engine.stats()["full_loads"] == 1
+        assert engine.stats()["cache_hits"] == 1
+
+    async def test_new_commits_read_incrementally(self, repo, engine):
+        _commit(repo, "feat: uno")
+        await engine.get_analytics(str(repo), days=30)
+
+        _commit(repo, "feat: dos", lines=4)
+        analytics = await engine.get_analytics(str(repo), days=30)
+
+        assert analytics["metrics"]["total_commits"] == 2
+        assert engine.stats()["incremental_loads"] == 1
+        assert engine.stats()["full_loads"] == 1
+
+    async def test_longer_period_reloads_window(self, repo, engine):
+        _commit(repo, "feat: viejo", days_ago=60)
+        _commit(repo, "feat: nuevo")
+
+        assert (await engine.get_analytics(str(repo), days=30))["metrics"]["total_commits"] == 1
+        assert (await engine.get_analytics(str(repo), days=90))["metrics"]["total_commits"] == 2
+        # La ventana de 90 días cubre la de 30: se sirve del cache
+        assert (await engine.get_analytics(str(repo), days=30))["metrics"]["total_commits"] == 1
+        assert engine.stats()["full_loads"] == 2
+
+    async def test_rewritten_history_reloads(self, repo, engine):
+        _commit(repo, "feat: uno")
+        _commit(repo, "feat: dos")
+        await engine.get_analytics(str(repo), days=30)
+
+        _git(repo, "reset", "-q", "--hard", "HEAD~1")
+        _commit(repo, "feat: reescrito")
+        analytics = await engine.get_analytics(str(repo), days=30)
+
+        assert analytics["metrics"]["total_commits"] == 2
+        assert engine.stats()["full_loads"] == 2
+
+    async def test_head_check_interval_skips_git(self, repo):
+        engine = GitAnalyticsEngine(head_check_seconds=60)
+        _commit(repo, "feat: uno")
+        await engine.get_analytics(str(repo), days=30)
+        commands = engine.stats()["git_commands"]
+
+        _commit(repo, "feat: dos")
+        analytics = await engine.get_analytics(str(repo), days=30)
+
+        assert engine.stats()["git_commands"] == commands
+        assert analytics["metrics"]["total_commits"] == 1
+
+    async def test_not_a_repository(self, tmp_path, engine):
+        with pytest.raises(GitCommandError):
+            await engine.get_analytics(str(tmp_path), days=30)
@@ -4,8 +4,13 @@ Tests for Git Integration Agent (N2 Traceability)
 Tests para src/ai_native_mvp/agents/git_integration.py
 
 Verifica captura de commits, análisis de patrones, correlación con trazas N4.
+Captura de sesión en una pasada: un solo Repo, un git log, un bulk insert.
 """
 
+import os
+import shutil
+import subprocess
+
 import pytest
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
@@ -37,6 +42,8 @@ def mock_git_trace_repo():
     """Mock repository para Git traces"""
     repo = Mock()
     repo.create = Mock(return_value=None)
+    repo.bulk_create = Mock(side_effect=len)
+    repo.get_existing_commit_hashes = Mock(return_value=set())
     repo.get_by_session = Mock(return_value=[])
     return repo
 
@@ -503,3 +510,192 @@ class TestGitIntegrationPersistence:
         # Los tests reales de persistencia requieren un repo Git real
         assert agent.git_trace_repo is not None
         assert agent.git_trace_repo == mock_git_trace_repo
+
+
+# ============================================================================
+# Captura de sesión en una pasada
+# ============================================================================
+
+def _git(repo, *args):
+    subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, env={
+        **os.environ, "GIT_AUTHOR_DATE": "2025-03-03T10:00:00", "GIT_COMMITTER_DATE": "2025-03-03T10:00:00",
+    })
+
+
+@pytest.fixture
+def student_repo(tmp_path):
+    """
+    Historia: A (archivo con espacios + binario) -> B (print) -> C en feature (rename)
+    y D en master, luego merge de feature en master.
+    """
+    if shutil.which("git") is None:
+        pytest.skip("git not installed")
+    _git(tmp_path, "init", "-q", "-b", "master")
+    _git(tmp_path, "config", "user.email", "ana@example.com")
+    _git(tmp_path, "config", "user.name", "Ana")
+
+    (tmp_path / "cola circular.py").write_text("class Cola:\n    pass\n# fin\n")
+    (tmp_path / "logo.png").write_bytes(b"\x89PNG\x00\x01")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "feat: cola circular\n\nImplementa enqueue")
+
+    (tmp_path / "cola circular.py").write_text("class Cola:\n    print(self)\n# fin\n")
+    _git(tmp_path, "commit", "-q", "-am", "debug")
+
+    _git(tmp_path, "checkout", "-q", "-b", "feature")
+    _git(tmp_path, "mv", "cola circular.py", "cola.py")
+    _git(tmp_path, "commit", "-q", "-m", "refactor: renombra")
+
+    _git(tmp_path, "checkout", "-q", "master")
+    (tmp_path / "README.md").write_text("TP1\n")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "docs: readme")
+    _git(tmp_path, "merge", "-q", "--no-ff", "-m", "Merge branch 'feature'", "feature")
+    return tmp_path
+
+
+def _files(trace):
+    return {
+        f.file_path: (f.change_type, f.lines_added, f.lines_deleted, f.is_binary)
+        for f in trace.files_changed
+    }
+
+
+@pytest.mark.skipif(not GIT_AVAILABLE, reason="GitPython not available")
+class TestSessionCapture:
+    """Tests para capture_session_commits en una sola pasada"""
+
+    def _capture(self, agent, repo_path):
+        return agent.capture_session_commits(
+            repo_path=str(repo_path),
+            session_id="session_123",
+            student_id="student_001",
+            activity_id="prog2_tp1",
+        )
+
+    def test_single_pass_builds_all_traces(self, git_agent, mock_git_trace_repo, student_repo):
+        """Un Repo, todos los commits, un bulk insert y ningún create por commit"""
+        with patch("backend.agents.git_integration.Repo", wraps=Repo) as repo_cls:
+            traces = self._capture(git_agent, student_repo)
+
+        assert repo_cls.call_count == 1
+        assert [t.commit_message for t in traces] == [
+            "Merge branch 'feature'", "docs: readme", "refactor: renombra",
+            "debug", "feat: cola circular\n\nImplementa enqueue",
+        ]
+        mock_git_trace_repo.bulk_create.assert_called_once_with(traces)
+        mock_git_trace_repo.create.assert_not_called()
+
+    def test_file_changes_and_patterns(self, git_agent, student_repo):
+        """Cambios por archivo, binarios, renames y patrones a partir del mismo diff"""
+        merge, readme, rename, debug, first = self._capture(git_agent, student_repo)
+
+        assert _files(first) == {
+            "cola circular.py": ("added", 3, 0, False),
+            "logo.png": ("added", 0, 0, True),
+        }
+        assert (first.total_lines_added, first.total_lines_deleted) == (3, 0)
+        assert _files(debug) == {"cola circular.py": ("modified", 1, 1, False)}
+        assert CodePattern.DEBUGGING in debug.detected_patterns
+        assert "+    print(self)" in debug.diff
+        assert _files(rename) == {"cola.py": ("renamed", 0, 0, False)}
+
+        # Merge: diff contra el primer padre
+        assert merge.is_merge and merge.event_type == GitEventType.MERGE
+        assert merge.parent_commits[0] == readme.commit_hash
+        assert _files(merge) == {"cola.py": ("renamed", 0, 0, False)}
+
+    def test_branch_names_resolved_once(self, git_agent, student_repo):
+        """Misma rama que `git branch --contains`: la primera por nombre que contiene el commit"""
+        merge, readme, rename, debug, first = self._capture(git_agent, student_repo)
+
+        assert [t.branch_name for t in (merge, readme)] == ["master", "master"]
+        assert [t.branch_name for t in (rename, debug, first)] == ["feature"] * 3
+
+    def test_already_captured_commits_skipped(self, git_agent, mock_git_trace_repo, student_repo):
+        """Re-sincronizar la sesión no reinserta commits ya capturados"""
+        first_hash = self._capture(git_agent, student_repo)[-1].commit_hash
+        mock_git_trace_repo.bulk_create.reset_mock()
+        mock_git_trace_repo.get_existing_commit_hashes.return_value = {first_hash}
+
+        traces = self._capture(git_agent, student_repo)
+
+        assert len(traces) == 4
+        assert first_hash not in [t.commit_hash for t in traces]
+        mock_git_trace_repo.bulk_create.assert_called_once_with(traces)
+
+    def test_capture_commit_uses_same_parser(self, git_agent, mock_git_trace_repo, student_repo):
+        """capture_commit sigue persistiendo un commit individual con create"""
+        debug_hash = self._capture(git_agent, student_repo)[3].commit_hash
+
+        trace = git_agent.capture_commit(
+            repo_path=str(student_repo),
+            commit_hash=debug_hash,
+            session_id="session_123",
+            student_id="student_001",
+            activity_id="prog2_tp1",
+        )
+
+        assert trace.commit_message == "debug"
+        assert trace.branch_name == "feature"
+        assert (trace.total_lines_added, trace.total_lines_deleted) == (1, 1)
+        mock_git_trace_repo.create.assert_called_once()
+
+
+class TestGitTraceRepositoryBulkCreate:
+    """Tests para GitTraceRepository.bulk_create"""
+
+    @pytest.fixture
+    def db(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+
+        from backend.database.models import Base
+
+        engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(bind=engine)()
+        yield session
+        session.close()
+        engine.dispose()
+
+    def _trace(self, commit_hash):
+        return GitTrace(
+            id=str(uuid4()),
+            session_id="session_123",
+            student_id="student_001",
+            activity_id="prog2_tp1",
+            event_type=GitEventType.COMMIT,
+            commit_hash=commit_hash,
+            commit_message="feat: enqueue",
+            author_name="Ana",
+            author_email="ana@example.com",
+            timestamp=datetime(2025, 3, 3, 10, 0, tzinfo=timezone.utc),
+            branch_name="master",
+            parent_commits=[],
+            files_changed=[GitFileChange(file_path="cola.py", change_type="added", lines_added=3)],
+            total_lines_added=3,
+            detected_patterns=[CodePattern.NORMAL],
+        )
+
+    def test_bulk_create_and_existing_hashes(self, db):
+        """Un INSERT multi-fila; los hashes existentes se consultan por sesión"""
+        from backend.database.repositories import GitTraceRepository
+
+        repo = GitTraceRepository(db)
+        traces = [self._trace("a" * 40), self._trace("b" * 40)]
+
+        assert repo.bulk_create(traces) == 2
+        assert repo.bulk_create([]) == 0
+
+        stored = repo.get_by_session("session_123")
+        assert {t.id for t in stored} == {t.id for t in traces}
+        assert stored[0].files_changed[0]["file_path"] == "cola.py"
+        assert stored[0].detected_patterns == ["normal"]
+        assert repo.get_existing_commit_hashes("session_123", ["a" * 40, "c" * 40]) == {"a" * 40}
+        assert repo.get_existing_commit_hashes("otra_sesion", ["a" * 40]) == set()
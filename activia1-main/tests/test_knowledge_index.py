@@ -0,0 +1,282 @@
+"""
+Tests para el índice vectorial en memoria del RAG (fallback sin pgvector)
+
+Verifica:
+- Top-k vectorizado equivalente a la búsqueda exacta documento por documento
+- Filtros como máscaras, umbral de similitud y dimensiones inválidas
+- Tombstones y compactación
+- Grafo HNSW en memoria: recall frente a la búsqueda exacta, filtros
+- SQL de pgvector: umbral dentro del WHERE, ef_search por consulta
+- Integración con KnowledgeRepository sobre SQLite: create, bulk_create,
+  update, soft_delete y sincronización de cambios de otros procesos
+"""
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from backend.database.base import Base
+from backend.database.models.knowledge import KnowledgeDocumentDB
+from backend.database.migrations.add_knowledge_ann_index import ann_index_sql, ivfflat_lists
+from backend.database.repositories.knowledge_hnsw import HNSWGraph
+from backend.database.repositories.knowledge_index import KnowledgeVectorIndex, get_knowledge_index
+from backend.database.repositories.knowledge_repository import KnowledgeRepository
+
+DIM = 16
+
+
+def _unit(vector):
+    vector = np.asarray(vector, dtype=np.float64)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(42)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+# ============================================================================
+# KnowledgeVectorIndex
+# ============================================================================
+
+class TestKnowledgeVectorIndex:
+
+    def test_topk_matches_exact_search(self, rng):
+        index = KnowledgeVectorIndex()
+        vectors = rng.normal(size=(300, DIM))
+        for i, vector in enumerate(vectors):
+            index.upsert(f"doc{i}", vector.tolist(), {"unit": f"u{i % 3}"})
+
+        query = rng.normal(size=DIM)
+        expected = sorted(
+            range(300),
+            key=lambda i: -float(np.dot(vectors[i], query) / (np.linalg.norm(vectors[i]) * np.linalg.norm(query))),
+        )[:5]
+
+        hits = index.search(query.tolist(), limit=5, min_similarity=-1.0)
+        assert [doc_id for doc_id, _ in hits] == [f"doc{i}" for i in expected]
+        assert hits[0][1] >= hits[-1][1]
+
+    def test_filters_and_threshold(self, rng):
+        index = KnowledgeVectorIndex()
+        base = rng.normal(size=DIM)
+        index.upsert("same_unit", base.tolist(), {"unit": "colas", "difficulty": "basico"})
+        index.upsert("other_unit", base.tolist(), {"unit": "pilas", "difficulty": "basico"})
+        index.upsert("orthogonal", (-base).tolist(), {"unit": "colas", "difficulty": "basico"})
+
+        hits = index.search(base.tolist(), {"unit": "colas"}, limit=5, min_similarity=0.5)
+        assert [doc_id for doc_id, _ in hits] == ["same_unit"]
+        assert hits[0][1] == pytest.approx(1.0, abs=1e-5)
+
+        assert index.search(base.tolist(), {"unit": "grafos"}, limit=5, min_similarity=0.0) == []
+        assert len(index.search(base.tolist(), {"difficulty": "basico"}, limit=5, min_similarity=0.5)) == 2
+
+    def test_dimension_mismatch_ignored(self):
+        index = KnowledgeVectorIndex()
+        assert index.upsert("a", [1.0, 0.0, 0.0]) is True
+        assert index.upsert("b", [1.0, 0.0]) is False
+        assert index.search([1.0, 0.0], limit=3) == []
+        assert len(index) == 1
+
+    def test_remove_and_compaction(self, rng):
+        index = KnowledgeVectorIndex()
+        for i in range(600):
+            index.upsert(f"doc{i}", rng.normal(size=DIM).tolist())
+        for i in range(400):
+            assert index.remove(f"doc{i}")
+
+        assert len(index) == 200
+        assert index.stats()["tombstones"] < 400  # compactado
+        hits = index.search(rng.normal(size=DIM).tolist(), limit=300, min_similarity=-1.0)
+        assert len(hits) == 200
+        assert all(int(doc_id[3:]) >= 400 for doc_id, _ in hits)
+
+
+# ============================================================================
+# HNSW
+# ============================================================================
+
+def _normalized(rng, count, dim=DIM):
+    vectors = rng.normal(size=(count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+class TestHNSW:
+
+    def test_graph_recall_against_exact(self, rng):
+        matrix = _normalized(rng, 2000)
+        graph = HNSWGraph(m=8, ef_construction=64, seed=1)
+        for row in range(len(matrix)):
+            graph.add(row, matrix)
+        assert len(graph) == 2000
+
+        recalls = []
+        for query in _normalized(rng, 30):
+            exact = set(np.argsort(-(matrix @ query))[:10].tolist())
+            approx = {node for _, node in graph.search(query, limit=10, ef=64, matrix=matrix)}
+            recalls.append(len(exact & approx) / 10)
+        assert np.mean(recalls) >= 0.9
+
+    def test_graph_respects_allowed_mask(self, rng):
+        matrix = _normalized(rng, 500)
+        graph = HNSWGraph(m=8, seed=1)
+        for row in range(len(matrix)):
+            graph.add(row, matrix)
+        allowed = np.zeros(len(matrix), dtype=bool)
+        allowed[::5] = True
+
+        results = graph.search(matrix[3], limit=5, ef=40, matrix=matrix, allowed=allowed)
+        assert len(results) == 5
+        assert all(node % 5 == 0 for _, node in results)
+
+    def test_index_switches_to_ann(self, rng):
+        index = KnowledgeVectorIndex(ann_min_documents=300)
+        vectors = _normalized(rng, 400)
+        for i, vector in enumerate(vectors):
+            index.upsert(f"doc{i}", vector.tolist(), {"unit": "colas" if i % 2 else "pilas"})
+        assert index.build_ann()
+        assert index.stats()["ann_nodes"] == 400
+
+        # Documentos nuevos y eliminados se reflejan en el grafo
+        index.upsert("nuevo", vectors[0].tolist(), {"unit": "colas"})
+        index.remove("doc0")
+        hits = index.search(vectors[0].tolist(), limit=3, min_similarity=-1.0, ef_search=64)
+        assert hits[0][0] == "nuevo"
+        assert "doc0" not in [doc_id for doc_id, _ in hits]
+
+        # Filtro selectivo (< ann_min_documents candidatos): búsqueda exacta
+        hits = index.search(vectors[1].tolist(), {"unit": "colas"}, limit=3, min_similarity=-1.0)
+        assert hits[0] == ("doc1", pytest.approx(1.0, abs=1e-5))
+
+    def test_compaction_discards_graph(self, rng):
+        index = KnowledgeVectorIndex(ann_min_documents=10 ** 6)
+        for i, vector in enumerate(_normalized(rng, 600)):
+            index.upsert(f"doc{i}", vector.tolist())
+        index.build_ann()
+        for i in range(400):
+            index.remove(f"doc{i}")
+        assert index.stats()["ann_nodes"] is None
+
+
+# ============================================================================
+# pgvector SQL
+# ============================================================================
+
+class TestPgvectorSearch:
+
+    def _postgres_session(self, version="0.8.0"):
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+        db.execute.return_value.scalar.return_value = version
+        db.execute.return_value.fetchall.return_value = []
+        return db
+
+    def test_threshold_and_ef_search_in_sql(self):
+        db = self._postgres_session()
+        repo = KnowledgeRepository(db)
+        repo.search_similar([0.1] * DIM, {"unit": "colas"}, limit=100, min_similarity=0.75, ef_search=40)
+
+        statements = [(str(c.args[0]), c.args[1] if len(c.args) > 1 else None) for c in db.execute.call_args_list]
+        config_sql, config_params = next(s for s in statements if "set_config" in s[0])
+        assert config_params["ef_search"] == "100"  # nunca menor que el LIMIT
+        assert "hnsw.iterative_scan" in config_sql
+
+        search_sql, search_params = statements[-1]
+        assert "CAST(:query_embedding AS vector)" in search_sql
+        assert "<= :max_distance" in search_sql
+        assert search_params["max_distance"] == pytest.approx(0.5)
+        assert search_params["unit"] == "colas"
+
+    def test_iterative_scan_only_on_supported_versions(self):
+        db = self._postgres_session(version="0.7.4")
+        KnowledgeRepository(db).search_similar([0.1] * DIM)
+        config_sql = next(str(c.args[0]) for c in db.execute.call_args_list if "set_config" in str(c.args[0]))
+        assert "iterative_scan" not in config_sql
+
+    def test_ann_index_ddl(self):
+        name, sql = ann_index_sql("hnsw")
+        assert name == "idx_knowledge_embedding_hnsw"
+        assert "USING hnsw (embedding vector_cosine_ops)" in sql
+        assert "CONCURRENTLY" in sql
+
+        _, sql = ann_index_sql("ivfflat", row_count=250_000)
+        assert "lists = 250" in sql
+        assert ivfflat_lists(4_000_000) == 2000
+
+        with pytest.raises(ValueError):
+            ann_index_sql("flat")
+
+
+# ============================================================================
+# KnowledgeRepository integration
+# ============================================================================
+
+class TestKnowledgeRepositoryIndex:
+
+    def test_create_search_update_delete(self, db):
+        repo = KnowledgeRepository(db)
+        colas = repo.create("Una cola es FIFO", "teoria", embedding=_unit([1, 0, 0, 0]), unit="colas")
+        repo.create("Una pila es LIFO", "teoria", embedding=_unit([0, 1, 0, 0]), unit="pilas")
+
+        hits = repo.search_similar(_unit([1, 0.1, 0, 0]), limit=2, min_similarity=0.5)
+        assert [h["id"] for h in hits] == [colas.id]
+        assert hits[0]["content"] == "Una cola es FIFO"
+
+        # Índice cargado: las escrituras siguientes se aplican incrementalmente
+        cola_circular = repo.create(
+            "Cola circular", "ejemplo", embedding=_unit([1, 0.05, 0, 0]), unit="colas"
+        )
+        hits = repo.search_similar(_unit([1, 0, 0, 0]), filters={"content_type": "ejemplo"}, min_similarity=0.5)
+        assert [h["id"] for h in hits] == [cola_circular.id]
+
+        repo.update(colas.id, unit="estructuras")
+        hits = repo.search_similar(_unit([1, 0, 0, 0]), filters={"unit": "estructuras"}, min_similarity=0.5)
+        assert [h["id"] for h in hits] == [colas.id]
+
+        repo.soft_delete(colas.id)
+        hits = repo.search_similar(_unit([1, 0, 0, 0]), limit=5, min_similarity=0.5)
+        assert colas.id not in [h["id"] for h in hits]
+
+    def test_bulk_create_indexed(self, db):
+        repo = KnowledgeRepository(db)
+        repo.search_similar(_unit([1, 0, 0, 0]))  # carga el índice (vacío)
+        inserted = repo.bulk_create([
+            {"content": "BFS", "content_type": "teoria", "embedding": _unit([0, 0, 1, 0]), "unit": "grafos"},
+            {"content": "DFS", "content_type": "teoria", "embedding": _unit([0, 0, 0, 1]), "unit": "grafos"},
+        ])
+        assert inserted == 2
+        hits = repo.search_similar(_unit([0, 0, 1, 0]), filters={"unit": "grafos"}, min_similarity=0.5)
+        assert [h["content"] for h in hits] == ["BFS"]
+
+    def test_sync_picks_up_changes_from_other_processes(self, db):
+        repo = KnowledgeRepository(db)
+        doc = repo.create("Recursión", "teoria", embedding=_unit([1, 1, 0, 0]))
+        repo.search_similar(_unit([1, 1, 0, 0]))
+        index = get_knowledge_index(db)
+        index.sync_interval_seconds = 0
+
+        # Otro worker borra el documento directamente en la BD
+        db.execute(
+            update(KnowledgeDocumentDB)
+            .where(KnowledgeDocumentDB.id == doc.id)
+            .values(deleted_at=KnowledgeDocumentDB.updated_at, updated_at=KnowledgeDocumentDB.updated_at)
+        )
+        db.commit()
+        db.add(KnowledgeDocumentDB(content="Iteración", content_type="teoria", embedding_json=_unit([1, 1, 0.1, 0])))
+        db.commit()
+
+        hits = repo.search_similar(_unit([1, 1, 0, 0]), min_similarity=0.5)
+        assert [h["content"] for h in hits] == ["Iteración"]
+        assert doc.id not in index
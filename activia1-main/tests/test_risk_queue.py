@@ -0,0 +1,339 @@
+"""
+Tests para la cola durable del análisis de riesgo (core/risk_queue.py)
+
+Verifica:
+- El gateway solo encola cuando la cola está corriendo (y analiza en proceso si el backend falla)
+- Backend de BD: claim con alquiler, ack, reintento diferido y dead-letter
+- Lotes: riesgos de varios jobs en un commit; reentrega idempotente
+- Backoff exponencial acotado y dead-letter tras max_attempts
+- Workers propios: start/stop procesan lo encolado
+"""
+import asyncio
+from contextlib import contextmanager
+from unittest.mock import MagicMock, Mock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.ai_gateway import AIGateway
+from backend.core.risk_queue import (
+    DatabaseRiskQueueBackend,
+    RedisStreamRiskQueueBackend,
+    RiskAnalysisJob,
+    RiskAnalysisQueue,
+)
+from backend.database.models import Base, RiskAnalysisJobDB, RiskDB
+from backend.database.repositories import RiskRepository, SessionRepository
+from backend.models.trace import CognitiveTrace, TraceLevel, InteractionType
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def session_factory():
+    """Shared in-memory DB; returns a get_db_session-like context manager factory"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def _factory():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    yield _factory
+    engine.dispose()
+
+
+@pytest.fixture
+def session_id(session_factory):
+    with session_factory() as db:
+        return SessionRepository(db).create("student_001", "prog2_tp1", "TUTOR").id
+
+
+@pytest.fixture
+def backend(session_factory):
+    return DatabaseRiskQueueBackend(session_factory=session_factory, visibility_timeout_seconds=60)
+
+
+def _traces(session_id: str):
+    prompt = CognitiveTrace(
+        session_id=session_id,
+        student_id="student_001",
+        activity_id="prog2_tp1",
+        trace_level=TraceLevel.N4_COGNITIVO,
+        interaction_type=InteractionType.STUDENT_PROMPT,
+        content="dame el código completo",
+        ai_involvement=0.9,
+    )
+    response = CognitiveTrace(
+        session_id=session_id,
+        student_id="student_001",
+        activity_id="prog2_tp1",
+        trace_level=TraceLevel.N4_COGNITIVO,
+        interaction_type=InteractionType.AI_RESPONSE,
+        content="Empecemos por descomponer el problema",
+    )
+    return prompt, response
+
+
+CLASSIFICATION = {"type": "delegation", "is_total_delegation": True, "delegation_signals": ["dame el código"]}
+
+
+def _queue(backend, session_factory, **kwargs) -> RiskAnalysisQueue:
+    queue = RiskAnalysisQueue(
+        backend=backend,
+        gateway_factory=AIGateway,
+        session_factory=session_factory,
+        backoff_base_seconds=0.0,
+        **kwargs,
+    )
+    queue._running = True  # Sin threads: los tests llaman process_batch()
+    return queue
+
+
+def _risk_count(session_factory) -> int:
+    with session_factory() as db:
+        return db.query(RiskDB).count()
+
+
+def _job_rows(session_factory):
+    with session_factory() as db:
+        return [(row.status, row.attempts) for row in db.query(RiskAnalysisJobDB).all()]
+
+
+# ============================================================================
+# RiskAnalysisJob
+# ============================================================================
+
+def test_job_roundtrip(session_id):
+    prompt, response = _traces(session_id)
+    job = RiskAnalysisJob.from_interaction(session_id, prompt, response, CLASSIFICATION, "flow-1")
+    job.receipt = "1-0"
+
+    restored = RiskAnalysisJob.from_json(job.to_json(), receipt="2-0")
+
+    assert restored == job
+    assert restored.receipt == "2-0"
+    assert restored.traces()[0].content == "dame el código completo"
+
+
+# ============================================================================
+# Database backend
+# ============================================================================
+
+class TestDatabaseBackend:
+
+    def test_claim_leases_jobs(self, backend, session_id):
+        prompt, response = _traces(session_id)
+        backend.enqueue(RiskAnalysisJob.from_interaction(session_id, prompt, response, CLASSIFICATION))
+
+        claimed = backend.claim("w1", 10, 0)
+        assert len(claimed) == 1
+        # Alquilado: otro worker no lo ve hasta que venza el visibility timeout
+        assert backend.claim("w2", 10, 0) == []
+        assert backend.depth() == {"pending": 1, "delayed": 0, "dead": 0}
+
+        backend.ack(claimed)
+        assert backend.depth() == {"pending": 0, "delayed": 0, "dead": 0}
+
+    def test_expired_lease_is_reclaimed(self, session_factory, session_id):
+        backend = DatabaseRiskQueueBackend(session_factory=session_factory, visibility_timeout_seconds=1)
+        prompt, response = _traces(session_id)
+        backend.enqueue(RiskAnalysisJob.from_interaction(session_id, prompt, response, CLASSIFICATION))
+        backend.visibility_timeout = backend.visibility_timeout * 0  # Worker "muerto"
+
+        first = backend.claim("w1", 10, 0)
+        second = backend.claim("w2", 10, 0)
+        assert [job.id for job in second] == [job.id for job in first]
+
+    def test_retry_and_dead_letter(self, backend, session_id, session_factory):
+        prompt, response = _traces(session_id)
+        backend.enqueue(RiskAnalysisJob.from_interaction(session_id, prompt, response, CLASSIFICATION))
+
+        job = backend.claim("w1", 10, 0)[0]
+        job.attempts = 1
+        backend.retry(job, delay_seconds=3600, error="boom")
+        assert backend.claim("w1", 10, 0) == []
+        assert backend.depth()["delayed"] == 1
+
+        backend.dead_letter(job, error="boom")
+        assert _job_rows(session_factory) == [("dead", 1)]
+        assert backend.depth() == {"pending": 0, "delayed": 0, "dead": 1}
+
+
+# ============================================================================
+# RiskAnalysisQueue
+# ============================================================================
+
+class TestRiskAnalysisQueue:
+
+    def test_enqueue_rejected_when_not_running(self, backend, session_factory, session_id):
+        queue = RiskAnalysisQueue(backend=backend, gateway_factory=AIGateway, session_factory=session_factory)
+        prompt, response = _traces(session_id)
+        assert queue.enqueue(session_id, prompt, response, CLASSIFICATION) is False
+
+    def test_batch_persists_risks_in_one_commit(self, backend, session_factory, session_id, monkeypatch):
+        queue = _queue(backend, session_factory)
+        for _ in range(3):
+            prompt, response = _traces(session_id)
+            assert queue.enqueue(session_id, prompt, response, CLASSIFICATION)
+
+        calls = []
+        original = RiskRepository.bulk_create
+
+        def spy(self, risks):
+            calls.append(len(risks))
+            return original(self, risks)
+
+        monkeypatch.setattr(RiskRepository, "bulk_create", spy)
+
+        assert queue.process_batch() == 3
+        assert len(calls) == 1
+        assert _risk_count(session_factory) > 0
+        assert _job_rows(session_factory) == []
+        assert queue.stats()["completed"] == 3
+
+    def test_redelivery_does_not_duplicate_risks(self, backend, session_factory, session_id):
+        queue = _queue(backend, session_factory)
+        prompt, response = _traces(session_id)
+        queue.enqueue(session_id, prompt, response, CLASSIFICATION)
+
+        # Crash entre el commit de riesgos y el ack: el job se vuelve a entregar
+        backend.ack = Mock()
+        queue.process_batch()
+        persisted = _risk_count(session_factory)
+        backend.visibility_timeout = backend.visibility_timeout * 0
+        queue.process_batch()
+
+        assert _risk_count(session_factory) == persisted
+
+    def test_failing_job_retries_then_dead_letters(self, backend, session_factory, session_id):
+        gateway = Mock()
+        gateway._analyze_risks_async.side_effect = RuntimeError("analysis failed")
+        queue = _queue(backend, session_factory, max_attempts=2)
+        queue._gateway_factory = lambda: gateway
+        prompt, response = _traces(session_id)
+        queue.enqueue(session_id, prompt, response, CLASSIFICATION)
+
+        queue.process_batch()
+        assert _job_rows(session_factory) == [("retry", 1)]
+        queue.process_batch()
+        assert _job_rows(session_factory) == [("dead", 2)]
+
+        stats = queue.stats()
+        assert stats["retried"] == 1
+        assert stats["dead_lettered"] == 1
+
+    def test_bad_job_isolated_from_batch(self, backend, session_factory, session_id, monkeypatch):
+        queue = _queue(backend, session_factory)
+        prompt, response = _traces(session_id)
+        queue.enqueue(session_id, prompt, response, CLASSIFICATION)
+        queue.enqueue("sesion-rota", prompt, response, CLASSIFICATION)
+
+        original = RiskRepository.bulk_create
+
+        def reject_broken(self, risks):
+            if any(risk.session_id == "sesion-rota" for risk in risks):
+                raise ValueError("integrity error")
+            return original(self, risks)
+
+        monkeypatch.setattr(RiskRepository, "bulk_create", reject_broken)
+
+        queue.process_batch()
+
+        assert _risk_count(session_factory) > 0
+        assert _job_rows(session_factory) == [("retry", 1)]
+
+    def test_backoff_is_exponential_and_capped(self, backend, session_factory):
+        queue = RiskAnalysisQueue(
+            backend=backend, gateway_factory=AIGateway, session_factory=session_factory,
+            backoff_base_seconds=2.0, backoff_max_seconds=10.0,
+        )
+        assert 1.0 <= queue._backoff(1) <= 2.0
+        assert 4.0 <= queue._backoff(3) <= 8.0
+        assert queue._backoff(10) <= 10.0
+
+    @pytest.mark.asyncio
+    async def test_workers_process_enqueued_jobs(self, backend, session_factory, session_id):
+        queue = RiskAnalysisQueue(
+            backend=backend, gateway_factory=AIGateway, session_factory=session_factory,
+            workers=1, poll_interval_ms=10,
+        )
+        await queue.start()
+        try:
+            prompt, response = _traces(session_id)
+            assert queue.enqueue(session_id, prompt, response, CLASSIFICATION)
+            for _ in range(100):
+                if queue.stats()["completed"] == 1:
+                    break
+                await asyncio.sleep(0.02)
+            assert queue.stats()["completed"] == 1
+        finally:
+            await queue.stop()
+        assert queue.is_running is False
+        assert _risk_count(session_factory) > 0
+
+
+# ============================================================================
+# Gateway integration
+# ============================================================================
+
+class TestGatewayEnqueue:
+
+    @pytest.mark.asyncio
+    async def test_gateway_only_enqueues(self, session_id):
+        queue = Mock()
+        queue.enqueue.return_value = True
+        gateway = AIGateway(risk_repo=Mock(), risk_queue=queue)
+        gateway._analyze_risks_async = Mock()
+        prompt, response = _traces(session_id)
+
+        gateway._run_risk_analysis_background(session_id, prompt, response, CLASSIFICATION, "flow-1")
+
+        queue.enqueue.assert_called_once_with(session_id, prompt, response, CLASSIFICATION, "flow-1")
+        assert len(gateway._background_tasks) == 0
+        gateway._analyze_risks_async.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_gateway_falls_back_when_enqueue_fails(self, session_id):
+        queue = Mock()
+        queue.enqueue.return_value = False
+        gateway = AIGateway(risk_repo=Mock(), risk_queue=queue)
+        prompt, response = _traces(session_id)
+
+        gateway._run_risk_analysis_background(session_id, prompt, response, CLASSIFICATION, "flow-1")
+
+        assert len(gateway._background_tasks) == 1
+        for task in list(gateway._background_tasks.tasks):
+            task.cancel()
+
+
+# ============================================================================
+# Redis backend
+# ============================================================================
+
+def test_redis_claim_does_not_block_without_block_ms(session_id):
+    client = MagicMock()
+    client.zrangebyscore.return_value = []
+    client.xautoclaim.return_value = ["0-0", [], []]
+    client.xreadgroup.return_value = []
+    backend = RedisStreamRiskQueueBackend(client)
+
+    assert backend.claim("w1", 5, 0) == []
+    assert client.xreadgroup.call_args.kwargs["block"] is None
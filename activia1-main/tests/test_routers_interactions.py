@@ -640,4 +640,96 @@ class TestInteractionIntegration:
         ]
 
         for field in required_fields:
-            assert field in data, f"Missing field: {field}"
\ No newline at end of file
+            assert field in data, f"Missing field: {field}"
+
+# ============================================================================
+# Streaming Interaction Tests
+# ============================================================================
+
+class TestProcessInteractionStream:
+    """Tests for POST /interactions/stream (Server-Sent Events)"""
+
+    @pytest.fixture
+    def stream_client(self, client, test_db):
+        """Client whose streaming gateway runs on the test database"""
+        from contextlib import contextmanager
+        from backend.api.deps import get_ai_gateway_factory
+
+        async def fake_stream(session_id, prompt, context=None, flow_id=None):
+            yield {"event": "classification", "data": {"blocked": False, "cognitive_state": "exploracion"}}
+            for chunk in ["Una cola ", "es FIFO."]:
+                yield {"event": "token", "data": chunk}
+            yield {"event": "done", "data": {
+                "response": "Una cola es FIFO.",
+                "cognitive_state": "exploracion",
+                "blocked": False,
+            }}
+
+        stream_gateway = Mock()
+        stream_gateway.process_interaction_stream = fake_stream
+
+        @contextmanager
+        def fake_db_session():
+            yield test_db
+
+        app.dependency_overrides[get_ai_gateway_factory] = lambda: (lambda db: stream_gateway)
+        with patch("backend.api.routers.interactions.get_db_session", fake_db_session):
+            yield client
+
+    @staticmethod
+    def _parse_sse(body: str):
+        import json as _json
+        events = []
+        for block in body.strip().split("\n\n"):
+            lines = dict(line.split(": ", 1) for line in block.splitlines())
+            events.append((lines["event"], _json.loads(lines["data"])))
+        return events
+
+    def test_stream_returns_event_stream(self, stream_client, active_session):
+        """Tokens arrive as SSE events followed by the full InteractionResponse"""
+        response = stream_client.post("/api/v1/interactions/stream", json={
+            "session_id": active_session["id"],
+            "prompt": "¿Qué es una cola circular?",
+        })
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = self._parse_sse(response.text)
+        assert [name for name, _ in events] == ["classification", "token", "token", "done"]
+        assert "".join(data["delta"] for name, data in events if name == "token") == "Una cola es FIFO."
+        done = events[-1][1]
+        assert done["session_id"] == active_session["id"]
+        assert done["response"] == "Una cola es FIFO."
+
+    def test_stream_session_not_found(self, stream_client):
+        """Unknown sessions fail before the stream is opened"""
+        response = stream_client.post("/api/v1/interactions/stream", json={
+            "session_id": str(uuid4()),
+            "prompt": "¿Qué es una cola circular?",
+        })
+
+        assert response.status_code == 404
+
+    def test_stream_reports_gateway_errors_as_events(self, stream_client, active_session):
+        """Errors after the stream started are sent as an error event"""
+        from backend.api.deps import get_ai_gateway_factory
+
+        async def failing_stream(**kwargs):
+            raise ValueError("Sesión bloqueada por política")
+            yield  # pragma: no cover
+
+        failing_gateway = Mock()
+        failing_gateway.process_interaction_stream = failing_stream
+        app.dependency_overrides[get_ai_gateway_factory] = lambda: (lambda db: failing_gateway)
+
+        response = stream_client.post("/api/v1/interactions/stream", json={
+            "session_id": active_session["id"],
+            "prompt": "¿Qué es una cola circular?",
+        })
+
+        events = self._parse_sse(response.text)
+        assert events == [("error", {
+            "error_code": "GOVERNANCE_BLOCKED",
+            "message": "Sesión bloqueada por política",
+        })]
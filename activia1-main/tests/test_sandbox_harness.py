@@ -0,0 +1,87 @@
+"""
+Tests para el harness multi-test del sandbox (execute_python_tests / run_python_tests)
+
+Verifica:
+- Todos los tests de una entrega en una sola ejecución, resultados en orden
+- stdin, captura de salida y timeout por test
+- Sufijo por test (tests de expresión)
+- Validación de seguridad única
+- Ejecución en paralelo y vía SandboxPool
+"""
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from backend.utils.sandbox import (
+    SandboxTest,
+    TIMEOUT_ERROR_MESSAGE,
+    execute_python_tests,
+    validate_code_security,
+)
+from backend.utils.sandbox_pool import SandboxPool
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="multi-test harness requires os.fork")
+
+DOUBLE = "n = int(input())\nprint(n * 2)"
+
+
+def test_runs_all_tests_in_order():
+    results = execute_python_tests(DOUBLE, [SandboxTest(input=str(i)) for i in range(5)])
+    assert [result.stdout for result in results] == ["0", "2", "4", "6", "8"]
+    assert all(result.stderr == "" and not result.timed_out for result in results)
+
+
+def test_single_interpreter_launch():
+    with patch("backend.utils.sandbox.subprocess.run", wraps=__import__("subprocess").run) as run:
+        execute_python_tests(DOUBLE, [SandboxTest(input="1"), SandboxTest(input="2"), SandboxTest(input="3")])
+    assert run.call_count == 1
+
+
+def test_per_test_errors_and_timeouts_are_isolated():
+    code = "n = int(input())\nif n == 1:\n    print(1 / 0)\nwhile n == 2:\n    pass\nprint('ok')"
+    results = execute_python_tests(
+        code, [SandboxTest(input="0"), SandboxTest(input="1"), SandboxTest(input="2"), SandboxTest(input="3")],
+        timeout_seconds=1
+    )
+
+    assert results[0].stdout == "ok"
+    assert "ZeroDivisionError" in results[1].stderr
+    assert (results[2].stderr, results[2].execution_time_ms, results[2].timed_out) == (TIMEOUT_ERROR_MESSAGE, 1000, True)
+    assert results[3].stdout == "ok"
+
+
+def test_suffix_runs_after_student_code():
+    results = execute_python_tests(
+        "total = 40 + 2",
+        [SandboxTest(suffix="\nprint(total == 42)"), SandboxTest(suffix="\nprint(total == 0)")]
+    )
+    assert [result.stdout for result in results] == ["True", "False"]
+
+
+def test_validates_code_once():
+    with patch("backend.utils.sandbox.validate_code_security", wraps=validate_code_security) as validate:
+        results = execute_python_tests("import os", [SandboxTest(), SandboxTest()])
+    assert validate.call_count == 1
+    assert all("no permitido" in result.stderr for result in results)
+
+
+def test_parallel_spreads_tests():
+    code = "import time\ntime.sleep(0.5)\nprint(input())"
+    start = time.monotonic()
+    results = execute_python_tests(code, [SandboxTest(input=str(i)) for i in range(4)], parallel=4)
+    assert time.monotonic() - start < 1.5
+    assert [result.stdout for result in results] == ["0", "1", "2", "3"]
+
+
+@pytest.mark.asyncio
+async def test_pool_runs_batch_on_one_worker():
+    pool = SandboxPool(size=1)
+    await pool.start()
+    try:
+        results = await pool.execute_tests(DOUBLE, [SandboxTest(input="4"), SandboxTest(input="5")])
+        assert [result.stdout for result in results] == ["8", "10"]
+        assert pool.get_stats()["jobs"] == 1
+    finally:
+        await pool.stop()
@@ -0,0 +1,123 @@
+"""
+Tests para el pool de workers sandbox (backend/utils/sandbox_pool.py)
+
+Verifica:
+- Mismo contrato que execute_python_code (stdout, stderr, tiempo)
+- Validación de seguridad antes de usar un worker
+- Timeout por wall clock y reciclado del worker tras un límite excedido
+- Reciclado tras max_jobs_per_worker trabajos
+- Aislamiento: un trabajo no ve el estado del anterior
+- run_python_code sin pool (thread) y con pool
+"""
+import asyncio
+import os
+from unittest.mock import patch
+
+import pytest
+import pytest_asyncio
+
+from backend.utils import sandbox_pool as sandbox_pool_module
+from backend.utils.sandbox import run_python_code
+from backend.utils.sandbox_pool import SandboxPool
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="sandbox pool requires os.fork")
+
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = SandboxPool(size=2, max_jobs_per_worker=50)
+    await pool.start()
+    yield pool
+    await pool.stop()
+
+
+async def _settle(pool):
+    """Espera a que terminen los reciclados en curso."""
+    while pool._recycling:
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_runs_code_with_stdin(pool):
+    stdout, stderr, elapsed = await pool.execute("n = int(input())\nprint(n * 2)", "21")
+    assert (stdout, stderr) == ("42", "")
+    assert elapsed >= 0
+
+
+@pytest.mark.asyncio
+async def test_student_error_goes_to_stderr(pool):
+    stdout, stderr, _ = await pool.execute("print(1 / 0)", "")
+    assert stdout == ""
+    assert "ZeroDivisionError" in stderr
+    assert 'File "<sandbox>"' in stderr
+
+
+@pytest.mark.asyncio
+async def test_security_validation_runs_before_pool(pool):
+    stdout, stderr, elapsed = await pool.execute("import os\nprint(os.getcwd())", "")
+    assert (stdout, elapsed) == ("", 0)
+    assert "no permitido" in stderr
+    assert pool.get_stats()["jobs"] == 0
+
+
+@pytest.mark.asyncio
+async def test_timeout_recycles_worker(pool):
+    pids_before = {worker.pid for worker in pool._workers}
+
+    stdout, stderr, elapsed = await pool.execute("while True:\n    pass", "", timeout_seconds=1)
+
+    assert (stdout, stderr, elapsed) == ("", "Error: Tiempo de ejecución excedido", 1000)
+    await _settle(pool)
+    assert pool.get_stats()["recycled"] == 1
+    assert len(pool._workers) == 2
+    assert {worker.pid for worker in pool._workers} != pids_before
+    # El pool sigue operativo
+    assert (await pool.execute("print('ok')", ""))[0] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_recycles_after_max_jobs():
+    pool = SandboxPool(size=1, max_jobs_per_worker=2)
+    await pool.start()
+    try:
+        for _ in range(3):
+            assert (await pool.execute("print('x')", ""))[0] == "x"
+        await _settle(pool)
+        assert pool.get_stats()["recycled"] == 1
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_jobs_do_not_share_state():
+    pool = SandboxPool(size=1)
+    await pool.start()
+    try:
+        await pool.execute("math.pi = 3\nleaked = 1", "")
+        stdout, _, _ = await pool.execute("print(math.pi > 3, 'leaked' in dir())", "")
+        assert stdout == "True False"
+    finally:
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_burst(pool):
+    results = await asyncio.gather(*(
+        pool.execute("print(int(input()) ** 2)", str(i)) for i in range(20)
+    ))
+    assert [stdout for stdout, _, _ in results] == [str(i ** 2) for i in range(20)]
+
+
+@pytest.mark.asyncio
+async def test_run_python_code_without_pool_uses_thread():
+    with patch.object(sandbox_pool_module, "_global_sandbox_pool", None):
+        stdout, stderr, _ = await run_python_code("print(input())", "hola")
+    assert (stdout, stderr) == ("hola", "")
+
+
+@pytest.mark.asyncio
+async def test_run_python_code_uses_running_pool(pool):
+    with patch.object(sandbox_pool_module, "_global_sandbox_pool", pool):
+        stdout, _, _ = await run_python_code("print('pool')", "")
+    assert stdout == "pool"
+    assert pool.get_stats()["jobs"] == 1
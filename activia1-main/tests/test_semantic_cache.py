@@ -0,0 +1,235 @@
+"""
+Tests para el caché semántico de respuestas del tutor
+
+Verifica:
+- Normalización del prompt (tildes, puntuación, mayúsculas)
+- Hit por similitud dentro del bucket, miss bajo el umbral
+- Aislamiento por actividad / tipo de respuesta / nivel de ayuda
+- TTL, límite por bucket y errores del proveedor como miss
+- Invalidación de los buckets de una actividad
+- Integración con AIGateway: solo para tipos de respuesta habilitados
+- Sesiones distintas comparten respuestas generadas sin historial de sesión
+- Las respuestas de fallback (LLM caído) no se guardan en el caché
+"""
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from backend.core.ai_gateway import AIGateway
+from backend.llm.base import LLMMessage, LLMRole
+from backend.core.semantic_cache import (
+    SemanticResponseCache,
+    make_bucket_key,
+    normalize_prompt,
+)
+
+VOCABULARY = ["que", "es", "una", "pila", "cola", "lista", "explicame", "recursion", "como", "funciona"]
+
+
+class BagOfWordsProvider:
+    """Embeddings deterministas: conteo de palabras del vocabulario."""
+
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    async def embed(self, text):
+        self.calls.append(text)
+        if self.fail:
+            raise ConnectionError("ollama down")
+        words = text.split()
+        return [float(words.count(word)) for word in VOCABULARY] + [0.01]
+
+
+BUCKET = make_bucket_key("act-1", "conceptual_explanation", 0.7, "exploracion")
+
+
+def _cache(**kwargs):
+    kwargs.setdefault("embedding_provider", BagOfWordsProvider())
+    kwargs.setdefault("similarity_threshold", 0.9)
+    return SemanticResponseCache(**kwargs)
+
+
+def test_normalize_prompt():
+    assert normalize_prompt("  ¿Qué ES una   Pila?! ") == "que es una pila"
+    assert normalize_prompt("¿Cómo funciona la recursión?") == "como funciona la recursion"
+    assert normalize_prompt("?!") == ""
+
+
+@pytest.mark.asyncio
+async def test_near_duplicate_hit_and_threshold_miss():
+    cache = _cache()
+    await cache.set("¿Qué es una pila?", BUCKET, "Una pila es LIFO...")
+
+    hit = await cache.get("que es una pila", BUCKET)
+    assert hit.response == "Una pila es LIFO..."
+    assert hit.similarity == pytest.approx(1.0)
+
+    assert await cache.get("¿Qué es una cola?", BUCKET) is None
+    stats = cache.get_stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_buckets_are_isolated():
+    cache = _cache()
+    await cache.set("¿Qué es una pila?", BUCKET, "respuesta act-1")
+
+    assert await cache.get("¿Qué es una pila?", make_bucket_key("act-2", "conceptual_explanation", 0.7, "exploracion")) is None
+    assert await cache.get("¿Qué es una pila?", make_bucket_key("act-1", "example_based", 0.7, "exploracion")) is None
+    assert await cache.get("¿Qué es una pila?", make_bucket_key("act-1", "conceptual_explanation", 0.85, "exploracion")) is None
+    # Bucket vacío: no se calcula el embedding
+    assert cache.embedding_provider.calls == ["que es una pila"]
+
+
+@pytest.mark.asyncio
+async def test_invalidate_activity_drops_only_its_buckets():
+    cache = _cache()
+    await cache.set("¿Qué es una pila?", make_bucket_key("act-1", "conceptual_explanation"), "LIFO")
+    await cache.set("¿Qué es una pila?", make_bucket_key("act-1", "guided_hints", 0.3), "Pista")
+    await cache.set("¿Qué es una pila?", make_bucket_key("act-2", "conceptual_explanation"), "LIFO")
+
+    assert cache.invalidate_activity("act-1") == 2
+    assert await cache.get("¿Qué es una pila?", make_bucket_key("act-1", "conceptual_explanation")) is None
+    assert await cache.get("¿Qué es una pila?", make_bucket_key("act-2", "conceptual_explanation")) is not None
+
+
+@pytest.mark.asyncio
+async def test_ttl_and_bucket_limit():
+    cache = _cache(ttl_seconds=60, max_entries_per_bucket=2)
+    await cache.set("que es una pila", BUCKET, "pila")
+    await cache.set("que es una cola", BUCKET, "cola")
+    await cache.set("que es una lista", BUCKET, "lista")
+
+    assert await cache.get("que es una pila", BUCKET) is None
+    assert (await cache.get("que es una lista", BUCKET)).response == "lista"
+    assert cache.get_stats()["entries"] == 2
+
+    # Mismo prompt normalizado: reemplaza la respuesta sin duplicar
+    await cache.set("¿Qué es una lista?", BUCKET, "lista v2")
+    assert (await cache.get("que es una lista", BUCKET)).response == "lista v2"
+    assert cache.get_stats()["entries"] == 2
+
+    cache._buckets[BUCKET].created_at = [0.0, 0.0]
+    assert await cache.get("que es una lista", BUCKET) is None
+    assert cache.get_stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_embedding_errors_are_misses():
+    cache = _cache(embedding_provider=BagOfWordsProvider(fail=True))
+    await cache.set("que es una pila", BUCKET, "pila")   # no lanza
+    assert cache.get_stats()["entries"] == 0
+    assert cache.get_stats()["errors"] == 1
+
+
+def _tutor_gateway(semantic_cache):
+    gateway = AIGateway(llm_provider=Mock(), semantic_cache=semantic_cache)
+    gateway._generate_conceptual_explanation = AsyncMock(return_value="Una pila es LIFO...")
+    gateway._generate_socratic_response = AsyncMock(return_value="¿Qué pensás vos?")
+    return gateway
+
+
+@pytest.mark.asyncio
+async def test_gateway_serves_semantic_hit_across_sessions():
+    gateway = _tutor_gateway(_cache())
+    strategy = {"response_type": "conceptual_explanation", "max_help_level": 0.7}
+
+    first = await gateway._process_tutor_mode(
+        "session-a", "[RAG] ¿Qué es una pila?", strategy, {}, activity_id="act-1",
+        student_prompt="¿Qué es una pila?"
+    )
+    second = await gateway._process_tutor_mode(
+        "session-b", "[RAG] que es una pila", strategy, {}, activity_id="act-1",
+        student_prompt="que es una pila"
+    )
+
+    assert first["metadata"]["from_cache"] is False
+    assert second["response"] == "Una pila es LIFO..."
+    assert second["metadata"]["from_cache"] is True
+    assert second["metadata"]["semantic_similarity"] == pytest.approx(1.0)
+    assert gateway._generate_conceptual_explanation.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_gateway_keeps_ineligible_modes_per_session():
+    cache = _cache()
+    gateway = _tutor_gateway(cache)
+    strategy = {"response_type": "socratic_questioning", "max_help_level": 0.7}
+
+    for session_id in ("session-a", "session-b"):
+        response = await gateway._process_tutor_mode(
+            session_id, "¿Qué es una pila?", strategy, {}, activity_id="act-1",
+            student_prompt="¿Qué es una pila?"
+        )
+        assert response["metadata"]["from_cache"] is False
+
+    assert gateway._generate_socratic_response.await_count == 2
+    assert cache.get_stats()["entries"] == 0
+    assert cache.get_stats()["hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_responses_are_generated_without_session_history():
+    """
+    El bucket no incluye la sesión a propósito: lo compartible se genera sin
+    el historial de ninguna sesión, así session-b no recibe una respuesta
+    adaptada a la conversación de session-a.
+    """
+    gateway = AIGateway(llm_provider=Mock(), trace_repo=Mock(), semantic_cache=_cache())
+    gateway._load_conversation_history_async = AsyncMock(return_value=[
+        LLMMessage(role=LLMRole.USER, content="historial privado de session-a"),
+    ])
+    gateway._decide_model_for_prompt = AsyncMock(return_value="flash")
+    gateway._llm_generate = AsyncMock(return_value=Mock(content="Una pila es LIFO...", usage=None, model="m"))
+    strategy = {"response_type": "conceptual_explanation", "max_help_level": 0.7}
+
+    first = await gateway._process_tutor_mode(
+        "session-a", "¿Qué es una pila?", strategy, {}, activity_id="act-1",
+        student_prompt="¿Qué es una pila?"
+    )
+    second = await gateway._process_tutor_mode(
+        "session-b", "¿Qué es una pila?", strategy, {}, activity_id="act-1",
+        student_prompt="¿Qué es una pila?"
+    )
+
+    assert second["response"] == first["response"] == "Una pila es LIFO..."
+    assert second["metadata"]["from_cache"] is True
+    gateway._load_conversation_history_async.assert_not_awaited()
+    [messages] = gateway._llm_generate.await_args.args
+    assert all("historial privado" not in m.content for m in messages)
+
+    # Un tipo no compartible conserva el historial de su sesión
+    await gateway._process_tutor_mode(
+        "session-a", "¿Qué es una pila?", {"response_type": "socratic_questioning"}, {},
+        activity_id="act-1", student_prompt="¿Qué es una pila?"
+    )
+    gateway._load_conversation_history_async.assert_awaited_once_with("session-a")
+
+
+@pytest.mark.asyncio
+async def test_fallback_replies_are_not_cached():
+    """Si el LLM falla, el fallback no debe servirse a otros estudiantes tras la recuperación."""
+    cache = _cache()
+    gateway = AIGateway(llm_provider=Mock(), semantic_cache=cache)
+    gateway._decide_model_for_prompt = AsyncMock(return_value="flash")
+    gateway._llm_generate = AsyncMock(side_effect=[
+        RuntimeError("circuit breaker open"),
+        Mock(content="Una pila es LIFO...", usage=None, model="m"),
+    ])
+    strategy = {"response_type": "conceptual_explanation", "max_help_level": 0.7}
+
+    during_outage = await gateway._process_tutor_mode(
+        "session-a", "¿Qué es una pila?", strategy, {}, activity_id="act-1",
+        student_prompt="¿Qué es una pila?"
+    )
+    assert during_outage["response"] == gateway._get_fallback_conceptual_explanation("¿Qué es una pila?")
+    assert cache.get_stats()["entries"] == 0
+
+    recovered = await gateway._process_tutor_mode(
+        "session-b", "¿Qué es una pila?", strategy, {}, activity_id="act-1",
+        student_prompt="¿Qué es una pila?"
+    )
+    assert recovered["response"] == "Una pila es LIFO..."
+    assert recovered["metadata"]["from_cache"] is False
+    assert cache.get_stats()["entries"] == 1
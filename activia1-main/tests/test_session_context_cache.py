@@ -0,0 +1,267 @@
+"""
+Tests para el caché de contexto conversacional por sesión
+
+Verifica:
+- Operaciones de lista de RedisCache en modo fallback (memoria) con TTL
+- RPUSHX semantics: append no crea listas parciales
+- SessionContextCache: solo trazas conversacionales, cola acotada, invalidación
+- Tags de sesión / actividad: la invalidación borra solo las listas etiquetadas
+- AIGateway: read-through en miss, sin consulta a BD en hit, append al persistir
+- Modo auto: sin Redis conectado no se usa el fallback en memoria
+- Invalidación al finalizar una sesión (routers/sessions.py) y al modificar
+  una actividad (routers/activities.py)
+"""
+from datetime import datetime
+from unittest.mock import MagicMock, Mock, patch
+
+import pytest
+
+from backend.core.ai_gateway import AIGateway
+from backend.core.redis_cache import RedisCache
+from backend.core import session_context_cache as context_cache_module
+from backend.core.session_context_cache import SessionContextCache
+from backend.llm.base import LLMRole
+from backend.models.trace import CognitiveTrace, TraceLevel, InteractionType
+
+
+@pytest.fixture
+def memory_cache(monkeypatch):
+    """RedisCache en modo fallback (sin REDIS_URL)"""
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    return RedisCache(ttl_seconds=60, prefix="test_ctx:")
+
+
+@pytest.fixture
+def context_cache(memory_cache):
+    return SessionContextCache(cache=memory_cache, max_messages=3, ttl_seconds=60)
+
+
+def _trace(content: str, interaction_type=InteractionType.STUDENT_PROMPT, session_id="s1") -> CognitiveTrace:
+    return CognitiveTrace(
+        session_id=session_id,
+        student_id="student_001",
+        activity_id="prog2_tp1",
+        trace_level=TraceLevel.N4_COGNITIVO,
+        interaction_type=interaction_type,
+        content=content,
+    )
+
+
+# ============================================================================
+# RedisCache list operations (fallback)
+# ============================================================================
+
+class TestRedisCacheListFallback:
+
+    def test_replace_and_get(self, memory_cache):
+        assert memory_cache.list_get("k") is None
+        memory_cache.list_replace("k", ["a", "b"])
+        assert memory_cache.list_get("k") == ["a", "b"]
+
+    def test_append_only_when_exists(self, memory_cache):
+        assert memory_cache.list_append_existing("k", ["x"]) is False
+        assert memory_cache.list_get("k") is None
+
+        memory_cache.list_replace("k", ["a"])
+        assert memory_cache.list_append_existing("k", ["b", "c"], max_length=2) is True
+        assert memory_cache.list_get("k") == ["b", "c"]
+
+    def test_ttl_expiration(self, memory_cache):
+        with patch("backend.core.redis_cache.time.monotonic", return_value=1000.0):
+            memory_cache.list_replace("k", ["a"], ttl=10)
+        with patch("backend.core.redis_cache.time.monotonic", return_value=1011.0):
+            assert memory_cache.list_get("k") is None
+
+    def test_delete_key(self, memory_cache):
+        memory_cache.list_replace("k", ["a"])
+        assert memory_cache.delete_key("k") is True
+        assert memory_cache.list_get("k") is None
+
+    def test_redis_append_uses_rpushx_pipeline(self, memory_cache):
+        pipe = MagicMock()
+        pipe.execute.return_value = [3, True, True]
+        client = MagicMock()
+        client.pipeline.return_value = pipe
+        memory_cache._redis_client = client
+        memory_cache._using_redis = True
+
+        assert memory_cache.list_append_existing("k", ["v"], max_length=20, ttl=30) is True
+        pipe.rpushx.assert_called_once_with("test_ctx:k", "v")
+        pipe.ltrim.assert_called_once_with("test_ctx:k", -20, -1)
+        pipe.expire.assert_called_once_with("test_ctx:k", 30)
+
+    def test_redis_replace_registers_tags_in_pipeline(self, memory_cache):
+        pipe = MagicMock()
+        client = MagicMock()
+        client.pipeline.return_value = pipe
+        memory_cache._redis_client = client
+        memory_cache._using_redis = True
+
+        assert memory_cache.list_replace("k", ["v"], ttl=30, session_id="s1", activity_id="a1") is True
+        pipe.sadd.assert_any_call("test_ctx:tag:session:s1", "test_ctx:k")
+        pipe.sadd.assert_any_call("test_ctx:tag:activity:a1", "test_ctx:k")
+        pipe.expire.assert_any_call("test_ctx:tag:session:s1", 60)
+        pipe.execute.assert_called_once()
+
+
+# ============================================================================
+# SessionContextCache
+# ============================================================================
+
+class TestSessionContextCache:
+
+    def test_store_filters_non_conversational(self, context_cache):
+        context_cache.store_tail("s1", [
+            _trace("¿Qué es una cola?"),
+            _trace("commit", InteractionType.CODE_COMMIT),
+            _trace("Una estructura FIFO", InteractionType.AI_RESPONSE),
+        ])
+        tail = context_cache.get_tail("s1")
+        assert [t.content for t in tail] == ["¿Qué es una cola?", "Una estructura FIFO"]
+        assert isinstance(tail[0].created_at, datetime)
+
+    def test_append_keeps_bounded_tail(self, context_cache):
+        context_cache.store_tail("s1", [_trace("p1"), _trace("r1", InteractionType.AI_RESPONSE)])
+        assert context_cache.append("s1", _trace("p2"))
+        assert context_cache.append("s1", _trace("r2", InteractionType.AI_RESPONSE))
+        assert [t.content for t in context_cache.get_tail("s1")] == ["r1", "p2", "r2"]
+
+    def test_append_without_cached_tail_is_noop(self, context_cache):
+        assert context_cache.append("s1", _trace("p1")) is False
+        assert context_cache.get_tail("s1") is None
+
+    def test_invalidate(self, context_cache):
+        context_cache.store_tail("s1", [_trace("p1")])
+        context_cache.invalidate("s1")
+        assert context_cache.get_tail("s1") is None
+
+    def test_invalidate_activity_only_drops_its_sessions(self, context_cache):
+        context_cache.store_tail("s1", [_trace("p1", session_id="s1")])
+        other = _trace("p2", session_id="s2")
+        other.activity_id = "prog2_tp2"
+        context_cache.store_tail("s2", [other])
+
+        assert context_cache.invalidate_activity("prog2_tp1") == 1
+        assert context_cache.get_tail("s1") is None
+        assert [t.content for t in context_cache.get_tail("s2")] == ["p2"]
+
+    def test_corrupted_entry_is_miss(self, context_cache, memory_cache):
+        memory_cache.list_replace("session:s1", ["{not json"])
+        assert context_cache.get_tail("s1") is None
+        assert memory_cache.list_get("session:s1") is None
+
+
+# ============================================================================
+# AIGateway integration
+# ============================================================================
+
+class TestGatewayContextCache:
+
+    def test_second_load_served_from_cache(self, context_cache):
+        trace_repo = Mock()
+        trace_repo.get_recent_by_session.return_value = [
+            _trace("¿Qué es una cola?"),
+            _trace("Una estructura FIFO", InteractionType.AI_RESPONSE),
+        ]
+        gateway = AIGateway(trace_repo=trace_repo, context_cache=context_cache)
+
+        first = gateway._load_conversation_history("s1")
+        second = gateway._load_conversation_history("s1")
+
+        assert [m.content for m in first] == [m.content for m in second]
+        assert [m.role for m in second] == [LLMRole.USER, LLMRole.ASSISTANT]
+        trace_repo.get_recent_by_session.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_persisted_trace_appended_to_cache(self, context_cache):
+        trace_repo = Mock()
+        trace_repo.get_recent_by_session.return_value = [_trace("p1")]
+        trace_repo.create.side_effect = lambda trace: trace
+        gateway = AIGateway(trace_repo=trace_repo, context_cache=context_cache)
+
+        await gateway._load_conversation_history_async("s1")
+        await gateway._persist_trace(_trace("r1", InteractionType.AI_RESPONSE))
+        history = await gateway._load_conversation_history_async("s1")
+
+        assert [m.content for m in history] == ["p1", "r1"]
+        trace_repo.get_recent_by_session.assert_called_once()
+
+
+@pytest.mark.parametrize("mode, enabled", [("auto", False), ("true", True), ("false", False)])
+def test_singleton_requires_redis_in_auto_mode(monkeypatch, mode, enabled):
+    """En modo auto el fallback por proceso no se usa: con varios workers quedaría desactualizado."""
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    monkeypatch.setattr(context_cache_module, "SESSION_CONTEXT_CACHE_ENABLED", mode)
+    monkeypatch.setattr(context_cache_module, "_session_context_cache", None)
+    monkeypatch.setattr(context_cache_module, "_session_context_cache_resolved", False)
+
+    cache = context_cache_module.get_session_context_cache()
+
+    assert (cache is not None) is enabled
+    if enabled:
+        assert cache.cache.using_redis is False
+
+
+def test_end_session_invalidates_context(monkeypatch):
+    """El endpoint de fin de sesión invalida el contexto cacheado"""
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+    from backend.api.main import app
+    from backend.api.deps import get_current_user, get_db, get_session_repository
+    from backend.api.routers import sessions as sessions_router
+    from backend.database.models import Base
+
+    # Trazas y riesgos de la respuesta se leen de una BD propia, no de la global
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+
+    session_id = "123e4567-e89b-12d3-a456-426614174000"
+    db_session = Mock(
+        id=session_id, student_id="student_001", activity_id="prog2_tp1",
+        mode="TUTOR", status="completed", simulator_type=None,
+        start_time=datetime.now(), end_time=datetime.now(),
+        created_at=datetime.now(), updated_at=datetime.now(),
+    )
+    session_repo = Mock()
+    session_repo.get_by_id.return_value = db_session
+    session_repo.end_session.return_value = db_session
+    invalidated = []
+    monkeypatch.setattr(sessions_router, "invalidate_session_context", invalidated.append)
+
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_session_repository] = lambda: session_repo
+    app.dependency_overrides[get_current_user] = lambda: {"user_id": "student_001", "roles": ["student"]}
+    try:
+        response = TestClient(app).post(f"/api/v1/sessions/{session_id}/end")
+    finally:
+        app.dependency_overrides.clear()
+        db.close()
+        engine.dispose()
+
+    assert response.status_code == 200
+    assert invalidated == [session_id]
+
+
+@pytest.mark.asyncio
+async def test_update_activity_invalidates_caches(monkeypatch):
+    from backend.api.routers import activities as activities_router
+    from backend.api.schemas.activity import ActivityUpdate
+
+    invalidated = []
+    monkeypatch.setattr(activities_router, "invalidate_activity_context", lambda a: invalidated.append(("context", a)))
+    monkeypatch.setattr(activities_router, "invalidate_activity_responses", lambda a: invalidated.append(("semantic", a)))
+    monkeypatch.setattr(activities_router.ActivityResponse, "model_validate", Mock())
+    activity_repo = Mock()
+
+    await activities_router.update_activity(
+        "prog2_tp1", ActivityUpdate(title="Colas circulares"), activity_repo=activity_repo, _current_user={}
+    )
+
+    assert invalidated == [("semantic", "prog2_tp1"), ("context", "prog2_tp1")]
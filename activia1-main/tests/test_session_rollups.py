@@ -0,0 +1,179 @@
+"""
+Tests para los agregados incrementales por sesión (session_rollups)
+
+Verifica:
+- Las escrituras de trazas (create y bulk_create) actualizan el agregado en la misma transacción
+- Las escrituras de riesgos actualizan conteos por tipo y nivel
+- Un insert que falla no deja el agregado incrementado
+- rebuild() produce el mismo agregado que las escrituras incrementales
+- El backfill de la migración recorre todas las sesiones
+"""
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.database.migrations.add_session_rollups import backfill_session_rollups
+from backend.database.models import Base, SessionRollupDB
+from backend.database.repositories import (
+    RiskRepository,
+    SessionRepository,
+    SessionRollupRepository,
+    TraceRepository,
+)
+from backend.models.risk import Risk, RiskDimension, RiskLevel, RiskType
+from backend.models.trace import CognitiveTrace, CognitiveState, InteractionType, TraceLevel
+
+
+@pytest.fixture
+def session_local():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(bind=engine, expire_on_commit=False)
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_local):
+    session = session_local()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def session_id(db):
+    return SessionRepository(db).create("student_001", "prog2_tp1", "TUTOR").id
+
+
+def _trace(session_id, interaction_type=InteractionType.STUDENT_PROMPT, ai=0.5, state=None, metadata=None):
+    return CognitiveTrace(
+        session_id=session_id,
+        student_id="student_001",
+        activity_id="prog2_tp1",
+        trace_level=TraceLevel.N4_COGNITIVO,
+        interaction_type=interaction_type,
+        content="contenido",
+        ai_involvement=ai,
+        cognitive_state=state,
+        trace_metadata=metadata or {},
+    )
+
+
+def _risk(session_id, risk_type=RiskType.COGNITIVE_DELEGATION, level=RiskLevel.HIGH):
+    return Risk(
+        id=str(uuid4()),
+        session_id=session_id,
+        student_id="student_001",
+        activity_id="prog2_tp1",
+        risk_type=risk_type,
+        risk_level=level,
+        dimension=RiskDimension.COGNITIVE,
+        description="Delegación total",
+    )
+
+
+def _rollup(db, session_id) -> SessionRollupDB:
+    db.expire_all()
+    return SessionRollupRepository(db).get_by_session(session_id)
+
+
+class TestTraceWrites:
+
+    def test_create_updates_rollup(self, db, session_id):
+        repo = TraceRepository(db)
+        repo.create(_trace(session_id, ai=0.2, state=CognitiveState.EXPLORACION))
+        repo.create(_trace(
+            session_id, InteractionType.AI_RESPONSE, ai=0.6,
+            state=CognitiveState.EXPLORACION, metadata={"blocked": True},
+        ))
+
+        rollup = _rollup(db, session_id)
+        assert rollup.trace_count == 2
+        assert rollup.interaction_counts == {"student_prompt": 1, "ai_response": 1}
+        assert rollup.cognitive_state_counts == {"exploracion": 2}
+        assert rollup.ai_involvement_avg == pytest.approx(0.4)
+        assert rollup.blocked_count == 1
+        assert rollup.first_trace_at <= rollup.last_trace_at
+
+    def test_bulk_create_updates_rollup_once_per_session(self, db, session_id):
+        other_id = SessionRepository(db).create("student_002", "prog2_tp1", "TUTOR").id
+        start = datetime(2025, 3, 1, 10, 0)
+        traces = [_trace(session_id), _trace(session_id, metadata={"strategy_change": True}), _trace(other_id)]
+        created_at = [start, start + timedelta(minutes=5), start]
+
+        TraceRepository(db).bulk_create(traces, created_at=created_at)
+
+        rollup = _rollup(db, session_id)
+        assert rollup.trace_count == 2
+        assert rollup.strategy_change_count == 1
+        assert rollup.first_trace_at == start
+        assert rollup.last_trace_at == start + timedelta(minutes=5)
+        assert _rollup(db, other_id).trace_count == 1
+
+    def test_failed_insert_leaves_rollup_untouched(self, db, session_id):
+        repo = TraceRepository(db)
+        trace = _trace(session_id)
+        trace.id = "trace-duplicada"
+        repo.create(trace)
+
+        with pytest.raises(Exception):
+            repo.bulk_create([_trace(session_id), trace])  # id duplicado
+
+        assert _rollup(db, session_id).trace_count == 1
+
+
+class TestRiskWrites:
+
+    def test_risk_counts_by_type_and_level(self, db, session_id):
+        repo = RiskRepository(db)
+        repo.create(_risk(session_id))
+        repo.bulk_create([
+            _risk(session_id, level=RiskLevel.CRITICAL),
+            _risk(session_id, RiskType.ACADEMIC_INTEGRITY, RiskLevel.HIGH),
+        ])
+
+        rollup = _rollup(db, session_id)
+        assert rollup.risk_count == 3
+        assert rollup.risk_type_counts == {"cognitive_delegation": 2, "academic_integrity": 1}
+        assert rollup.risk_level_counts == {"high": 2, "critical": 1}
+        assert rollup.trace_count == 0
+
+
+class TestRebuild:
+
+    def test_rebuild_matches_incremental(self, db, session_id):
+        TraceRepository(db).create(_trace(session_id, ai=0.9, state=CognitiveState.IMPLEMENTACION))
+        TraceRepository(db).bulk_create([_trace(session_id, ai=0.1, metadata={"blocked": True})])
+        RiskRepository(db).create(_risk(session_id))
+        incremental = _rollup(db, session_id)
+        expected = {
+            column: getattr(incremental, column)
+            for column in (
+                "trace_count", "interaction_counts", "cognitive_state_counts", "ai_involvement_sum",
+                "ai_involvement_count", "blocked_count", "risk_count", "risk_type_counts", "risk_level_counts",
+            )
+        }
+
+        assert SessionRollupRepository(db).rebuild([session_id]) == 1
+        db.commit()
+
+        rebuilt = _rollup(db, session_id)
+        assert {column: getattr(rebuilt, column) for column in expected} == expected
+
+    def test_backfill_covers_all_sessions(self, session_local, db, session_id):
+        other_id = SessionRepository(db).create("student_002", "prog2_tp1", "TUTOR").id
+        TraceRepository(db).create(_trace(session_id))
+        TraceRepository(db).create(_trace(other_id))
+        db.query(SessionRollupDB).delete()
+        db.commit()
+
+        assert backfill_session_rollups(session_local, batch_size=1) == 2
+        assert _rollup(db, session_id).trace_count == 1
+        assert _rollup(db, other_id).trace_count == 1
@@ -0,0 +1,131 @@
+"""
+Tests para el matcher de señales compilado
+
+Verifica:
+- Todas las categorías detectadas en una sola llamada, con semántica de substring
+- Señales plegadas sin tildes y con variantes voseo/tuteo
+- Señales exactas que exigen la tilde ("qué" no detecta "que")
+- Señales superpuestas y prefijos en la misma posición
+- Recarga del archivo de configuración por mtime
+"""
+import json
+import os
+
+import pytest
+
+from backend.core import signal_matcher as signal_matcher_module
+from backend.core.signal_dictionaries import DEFAULT_SIGNAL_DICTIONARIES
+from backend.core.signal_matcher import SignalMatcher, fold_accents, normalize_text
+
+
+@pytest.fixture
+def matcher():
+    return SignalMatcher({
+        "delegation": ["dame el código completo", "hacelo vos", "decime qué es"],
+        "confusion": {"signals": ["no entiendo"], "exact": ["no sé"]},
+        "question": {"exact": ["qué", "cómo"]},
+        "explanation": {"signals": ["qué significa"], "exact": ["qué es"]},
+        "code": ["{", "}", "def "],
+    })
+
+
+class TestMatching:
+    def test_all_categories_in_one_call(self, matcher):
+        hits = matcher.match("No entiendo, ¿qué es esto? Dame el código completo")
+        assert set(hits) == {"confusion", "question", "explanation", "delegation"}
+        assert hits["delegation"] == {"dame el código completo"}
+
+    def test_substring_semantics(self, matcher):
+        assert "question" in matcher.match("¿porqué falla?")
+        assert matcher.match("") == {}
+        assert matcher.match("nada relevante") == {}
+
+    def test_folded_signals_ignore_accents_and_case(self, matcher):
+        assert "delegation" in matcher.match("DAME EL CODIGO COMPLETO")
+        assert "explanation" in matcher.match("que significa esto")
+
+    def test_voseo_and_tuteo_variants(self, matcher):
+        assert "delegation" in matcher.match("hazlo vos")
+        assert matcher.match("dime qué es una lista")["delegation"] == {"decime qué es"}
+
+    def test_exact_signals_require_accents(self, matcher):
+        assert "question" not in matcher.match("creo que como dije")
+        assert "confusion" not in matcher.match("no se puede dividir")
+        assert "confusion" in matcher.match("no sé cómo seguir")
+        assert "explanation" not in matcher.match("lo que es obvio")
+
+    def test_overlapping_and_prefix_signals(self, matcher):
+        hits = matcher.match("qué es qué significa")
+        assert hits["question"] == {"qué"}
+        assert hits["explanation"] == {"qué es", "qué significa"}
+
+    def test_distinct_signals_are_reported(self, matcher):
+        assert matcher.match("def f(): {}")["code"] == {"{", "}", "def "}
+        assert matcher.match("{ {")["code"] == {"{"}
+
+    def test_normalization_keeps_length(self):
+        text = normalize_text("Explicá ÁRBOLES con ñandú")
+        assert len(fold_accents(text)) == len(text)
+        assert fold_accents(text) == "explica arboles con ñandu"
+
+
+class TestDefaultDictionaries:
+    def test_default_categories_compile(self):
+        matcher = SignalMatcher(DEFAULT_SIGNAL_DICTIONARIES)
+        assert {"delegation", "question", "model_pro", "risk_delegation", "rules_planning"} <= matcher.categories
+
+    def test_risk_delegation_detects_tuteo(self):
+        matcher = SignalMatcher(DEFAULT_SIGNAL_DICTIONARIES)
+        assert "risk_delegation" in matcher.match("hazme el ejercicio")
+        assert "risk_delegation" in matcher.match("Haceme el ejercicio")
+
+    def test_exact_preterite_is_not_infinitive(self):
+        matcher = SignalMatcher(DEFAULT_SIGNAL_DICTIONARIES)
+        assert "justification" not in matcher.match("no sé qué elegir")
+        assert "justification" in matcher.match("elegí una lista porque es ordenada")
+
+
+class TestReload:
+    @pytest.fixture(autouse=True)
+    def reset_singleton(self, monkeypatch):
+        monkeypatch.setattr(signal_matcher_module, "_matcher", None)
+        monkeypatch.setattr(signal_matcher_module, "_matcher_signature", None)
+
+    def test_override_file_replaces_category(self, tmp_path, monkeypatch):
+        path = tmp_path / "signals.json"
+        path.write_text(json.dumps({"delegation": ["resolveme esto"]}), encoding="utf-8")
+        monkeypatch.setattr(signal_matcher_module, "SIGNAL_DICTIONARIES_PATH", str(path))
+
+        matcher = signal_matcher_module.get_signal_matcher()
+        assert "delegation" in matcher.match("resolveme esto ya")
+        assert "delegation" not in matcher.match("dame el código completo")
+        assert "question" in matcher.categories
+
+    def test_changed_file_is_recompiled(self, tmp_path, monkeypatch):
+        path = tmp_path / "signals.json"
+        path.write_text(json.dumps({"custom": ["uno"]}), encoding="utf-8")
+        monkeypatch.setattr(signal_matcher_module, "SIGNAL_DICTIONARIES_PATH", str(path))
+        monkeypatch.setattr(signal_matcher_module, "SIGNAL_DICTIONARIES_RELOAD_SECONDS", 0.01)
+        first = signal_matcher_module.get_signal_matcher()
+
+        path.write_text(json.dumps({"custom": ["dos"]}), encoding="utf-8")
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        monkeypatch.setattr(signal_matcher_module, "_last_check", 0.0)
+
+        second = signal_matcher_module.get_signal_matcher()
+        assert second is not first
+        assert "custom" in second.match("dos")
+
+    def test_invalid_file_keeps_previous_matcher(self, tmp_path, monkeypatch):
+        path = tmp_path / "signals.json"
+        path.write_text(json.dumps({"custom": ["uno"]}), encoding="utf-8")
+        monkeypatch.setattr(signal_matcher_module, "SIGNAL_DICTIONARIES_PATH", str(path))
+        first = signal_matcher_module.get_signal_matcher()
+
+        path.write_text("{ roto", encoding="utf-8")
+        assert signal_matcher_module.reload_signal_matcher() is first
+
+    def test_missing_file_falls_back_to_defaults(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(signal_matcher_module, "SIGNAL_DICTIONARIES_PATH", str(tmp_path / "missing.json"))
+        matcher = signal_matcher_module.get_signal_matcher()
+        assert "delegation" in matcher.match("dame el código completo")
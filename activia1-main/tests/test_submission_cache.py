@@ -0,0 +1,101 @@
+"""
+Tests para la memoización de resultados de entregas
+
+Verifica:
+- Normalización del código (fines de línea, espacios finales) sin mover líneas
+- Clave por versión del ejercicio: editar el JSON invalida
+- Nivel en memoria acotado y promoción desde Redis
+- Errores de Redis degradan a miss
+"""
+import copy
+
+import pytest
+
+from backend.core.submission_cache import (
+    SubmissionCache,
+    exercise_version_hash,
+    normalize_code,
+    submission_key,
+)
+
+EXERCISE = {
+    "id": "U1-VAR-01",
+    "meta": {"title": "Variables"},
+    "hidden_tests": [{"input": "1", "expected": "2"}],
+}
+SANDBOX = {"exit_code": 0, "tests_passed": 1, "tests_total": 1}
+EVALUATION = {"evaluation": {"score": 90}, "gamification": {"xp_earned": 90}}
+
+
+class FakeRedis:
+    """Subconjunto de redis-py (decode_responses=True) usado por SubmissionCache."""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.ttls = {}
+        self.fail = fail
+
+    def get(self, key):
+        if self.fail:
+            raise ConnectionError("redis down")
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        if self.fail:
+            raise ConnectionError("redis down")
+        self.data[key] = value
+        self.ttls[key] = ex
+
+
+@pytest.fixture(autouse=True)
+def no_redis_url(monkeypatch):
+    monkeypatch.delenv("REDIS_URL", raising=False)
+
+
+def test_normalize_code_keeps_line_numbers():
+    assert normalize_code("\nx = 1   \r\nprint(x)\t\n\n\n") == "\nx = 1\nprint(x)"
+    assert submission_key(EXERCISE, "x = 1\n") == submission_key(EXERCISE, "x = 1  \r\n\n")
+    assert submission_key(EXERCISE, "x = 1") != submission_key(EXERCISE, "x = 2")
+
+
+def test_exercise_edit_changes_version():
+    edited = copy.deepcopy(EXERCISE)
+    edited["hidden_tests"][0]["expected"] = "3"
+    assert exercise_version_hash(edited) != exercise_version_hash(EXERCISE)
+
+    cache = SubmissionCache()
+    cache.set(EXERCISE, "x = 1", SANDBOX, EVALUATION)
+    assert cache.get(EXERCISE, "x = 1")["evaluation"] == EVALUATION
+    assert cache.get(edited, "x = 1") is None
+
+
+def test_memory_tier_is_bounded_and_invalidated_per_exercise():
+    cache = SubmissionCache(max_entries=2)
+    for code in ("a = 1", "a = 2", "a = 3"):
+        cache.set(EXERCISE, code, SANDBOX, EVALUATION)
+    assert cache.get(EXERCISE, "a = 1") is None
+    assert cache.get_stats()["memory_entries"] == 2
+
+    assert cache.invalidate_exercise("U1-VAR-01") == 2
+    assert cache.get(EXERCISE, "a = 3") is None
+
+
+def test_redis_tier_shared_and_promoted():
+    redis = FakeRedis()
+    writer = SubmissionCache(redis_client=redis, ttl_seconds=120)
+    writer.set(EXERCISE, "x = 1", SANDBOX, EVALUATION)
+    assert list(redis.ttls.values()) == [120]
+
+    reader = SubmissionCache(redis_client=redis)
+    assert reader.get(EXERCISE, "x = 1") == {"sandbox_result": SANDBOX, "evaluation": EVALUATION}
+    assert reader.get(EXERCISE, "x = 1") is not None
+    stats = reader.get_stats()
+    assert (stats["redis_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_redis_errors_are_misses():
+    cache = SubmissionCache(redis_client=FakeRedis(fail=True))
+    cache.set(EXERCISE, "x = 1", SANDBOX, EVALUATION)  # no lanza
+    cache.clear()
+    assert cache.get(EXERCISE, "x = 1") is None
+    assert cache.get_stats()["misses"] == 1
@@ -0,0 +1,269 @@
+"""
+Tests para el TraceWriter (persistencia write-behind de trazas)
+
+Verifica:
+- Flush en lote (un INSERT multi-fila) por tamaño y por intervalo
+- Read-your-writes: trazas pendientes visibles para el historial del gateway
+- Fallback durable: fila a fila + spool JSONL y replay idempotente
+- Backpressure y flush final en stop()
+"""
+import asyncio
+from contextlib import contextmanager
+from unittest.mock import Mock
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend.core.ai_gateway import AIGateway
+from backend.core.trace_writer import TraceWriter
+from backend.database.models import Base, CognitiveTraceDB
+from backend.database.repositories import SessionRepository, TraceRepository
+from backend.llm.base import LLMRole
+from backend.models.trace import CognitiveTrace, TraceLevel, InteractionType
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def session_factory():
+    """Shared in-memory DB; returns a get_db_session-like context manager factory"""
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+    @contextmanager
+    def _factory():
+        db = SessionLocal()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    yield _factory
+    engine.dispose()
+
+
+@pytest.fixture
+def session_id(session_factory):
+    with session_factory() as db:
+        return SessionRepository(db).create("student_001", "prog2_tp1", "TUTOR").id
+
+
+def _trace(session_id: str, content: str, interaction_type=InteractionType.STUDENT_PROMPT) -> CognitiveTrace:
+    return CognitiveTrace(
+        session_id=session_id,
+        student_id="student_001",
+        activity_id="prog2_tp1",
+        trace_level=TraceLevel.N4_COGNITIVO,
+        interaction_type=interaction_type,
+        content=content,
+    )
+
+
+def _count(session_factory) -> int:
+    with session_factory() as db:
+        return db.query(CognitiveTraceDB).count()
+
+
+# ============================================================================
+# Repository bulk insert
+# ============================================================================
+
+def test_bulk_create_single_commit(session_factory, session_id):
+    """bulk_create inserta todas las filas con un solo commit"""
+    with session_factory() as db:
+        db.commit = Mock(wraps=db.commit)
+        inserted = TraceRepository(db).bulk_create(
+            [_trace(session_id, f"prompt {i}") for i in range(5)]
+        )
+        assert inserted == 5
+        assert db.commit.call_count == 1
+    assert _count(session_factory) == 5
+
+
+# ============================================================================
+# TraceWriter
+# ============================================================================
+
+class TestTraceWriter:
+
+    @pytest.mark.asyncio
+    async def test_enqueue_rejected_when_not_running(self, session_factory, session_id):
+        writer = TraceWriter(session_factory=session_factory, spool_path=None)
+        assert writer.enqueue(_trace(session_id, "hola")) is False
+
+    @pytest.mark.asyncio
+    async def test_flush_on_batch_size(self, session_factory, session_id, tmp_path):
+        writer = TraceWriter(
+            batch_size=3, flush_interval_ms=60_000,
+            session_factory=session_factory, spool_path=str(tmp_path / "spool.jsonl"),
+        )
+        await writer.start()
+        try:
+            for i in range(3):
+                assert writer.enqueue(_trace(session_id, f"prompt {i}"))
+            for _ in range(50):
+                if writer.stats()["flushed"] == 3:
+                    break
+                await asyncio.sleep(0.02)
+            assert writer.stats()["flushed"] == 3
+            assert writer.stats()["batches"] == 1
+            assert _count(session_factory) == 3
+        finally:
+            await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_stop_flushes_pending_in_order(self, session_factory, session_id, tmp_path):
+        writer = TraceWriter(
+            batch_size=100, flush_interval_ms=60_000,
+            session_factory=session_factory, spool_path=str(tmp_path / "spool.jsonl"),
+        )
+        await writer.start()
+        writer.enqueue(_trace(session_id, "primero"))
+        writer.enqueue(_trace(session_id, "segundo", InteractionType.AI_RESPONSE))
+        assert _count(session_factory) == 0
+
+        await writer.stop()
+
+        with session_factory() as db:
+            history = TraceRepository(db).get_by_session(session_id)
+            assert [t.content for t in history] == ["primero", "segundo"]
+        assert writer.is_running is False
+
+    @pytest.mark.asyncio
+    async def test_pending_visible_until_flushed(self, session_factory, session_id, tmp_path):
+        writer = TraceWriter(
+            batch_size=100, flush_interval_ms=60_000,
+            session_factory=session_factory, spool_path=str(tmp_path / "spool.jsonl"),
+        )
+        await writer.start()
+        try:
+            trace = _trace(session_id, "pendiente")
+            writer.enqueue(trace)
+            assert writer.latest_pending(session_id).id == trace.id
+            assert writer.pending_for_session("otra_sesion") == []
+
+            await writer.flush()
+            assert writer.latest_pending(session_id) is None
+        finally:
+            await writer.stop()
+
+    @pytest.mark.asyncio
+    async def test_backpressure_rejects_when_full(self, session_factory, session_id, tmp_path):
+        writer = TraceWriter(
+            batch_size=2, flush_interval_ms=60_000, max_pending=2,
+            session_factory=session_factory, spool_path=str(tmp_path / "spool.jsonl"),
+        )
+        writer._running = True  # Sin loop de flush: el buffer se llena
+        assert writer.enqueue(_trace(session_id, "a"))
+        assert writer.enqueue(_trace(session_id, "b"))
+        assert writer.enqueue(_trace(session_id, "c")) is False
+        assert writer.stats()["rejected"] == 1
+
+    def test_bad_row_isolated_and_spooled(self, session_factory, session_id, tmp_path):
+        """Una fila inválida no bloquea el resto del lote y queda en el spool"""
+        spool = tmp_path / "spool.jsonl"
+        writer = TraceWriter(session_factory=session_factory, spool_path=str(spool))
+        writer._running = True
+
+        good = _trace(session_id, "ok")
+        bad = _trace(session_id, "falla")
+        writer.enqueue(good)
+        writer.enqueue(bad)
+        bad.content = None  # content NOT NULL -> IntegrityError
+
+        assert writer.flush_sync() == 1
+        assert _count(session_factory) == 1
+        assert writer.stats()["spooled"] == 1
+        assert len(spool.read_text(encoding="utf-8").splitlines()) == 1
+
+    def test_spool_when_db_unavailable_and_replay(self, session_factory, session_id, tmp_path):
+        spool = tmp_path / "spool.jsonl"
+
+        @contextmanager
+        def broken_factory():
+            raise RuntimeError("database down")
+            yield  # pragma: no cover
+
+        writer = TraceWriter(session_factory=broken_factory, spool_path=str(spool))
+        writer._running = True
+        writer.enqueue(_trace(session_id, "uno"))
+        writer.enqueue(_trace(session_id, "dos", InteractionType.AI_RESPONSE))
+
+        assert writer.flush_sync() == 0
+        assert writer.stats()["spooled"] == 2
+        assert _count(session_factory) == 0
+        spooled_text = spool.read_text(encoding="utf-8")
+
+        # BD recuperada: el replay persiste el spool y elimina el archivo
+        recovering = TraceWriter(session_factory=session_factory, spool_path=str(spool))
+        assert recovering.replay_spool() == 2
+        assert not spool.exists()
+        with session_factory() as db:
+            history = TraceRepository(db).get_by_session(session_id)
+            assert [t.content for t in history] == ["uno", "dos"]
+
+        # Replay idempotente: trazas ya persistidas no se duplican
+        spool.write_text(spooled_text, encoding="utf-8")
+        assert recovering.replay_spool() == 0
+        assert _count(session_factory) == 2
+
+
+# ============================================================================
+# AIGateway integration
+# ============================================================================
+
+class TestGatewayWriteBehind:
+
+    @pytest.mark.asyncio
+    async def test_persist_trace_enqueues_instead_of_create(self, session_id):
+        writer = Mock()
+        writer.enqueue.return_value = True
+        trace_repo = Mock()
+        gateway = AIGateway(trace_repo=trace_repo, trace_writer=writer)
+
+        await gateway._persist_trace(_trace(session_id, "hola"))
+
+        writer.enqueue.assert_called_once()
+        trace_repo.create.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_persist_trace_falls_back_when_writer_full(self, session_id):
+        writer = Mock()
+        writer.enqueue.return_value = False
+        trace_repo = Mock()
+        gateway = AIGateway(trace_repo=trace_repo, trace_writer=writer)
+
+        await gateway._persist_trace(_trace(session_id, "hola"))
+
+        trace_repo.create.assert_called_once()
+
+    def test_history_includes_pending_traces(self, session_id):
+        persisted = _trace(session_id, "¿Qué es una cola?")
+        persisted.id = "t1"
+        pending = _trace(session_id, "Una estructura FIFO...", InteractionType.AI_RESPONSE)
+        pending.id = "t2"
+
+        trace_repo = Mock()
+        trace_repo.get_recent_by_session.return_value = [persisted]
+        writer = Mock()
+        # El trace t1 puede seguir in-flight mientras ya está en BD: no se duplica
+        writer.pending_for_session.return_value = [persisted, pending]
+        gateway = AIGateway(trace_repo=trace_repo, trace_writer=writer)
+
+        history = gateway._load_conversation_history(session_id)
+
+        assert [m.role for m in history] == [LLMRole.USER, LLMRole.ASSISTANT]
+        assert history[1].content == "Una estructura FIFO..."
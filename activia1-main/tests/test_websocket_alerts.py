@@ -0,0 +1,206 @@
+"""
+Tests para el fan-out de alertas WebSocket entre workers
+
+Verifica:
+- Entrega concurrente: un socket lento no demora a los demás
+- Cola acotada por conexión: el consumidor lento se desconecta (1013)
+- Fan-out por broker: lo publicado en un worker llega a los sockets de otro
+- Sin broker corriendo, entrega solo a las conexiones locales
+"""
+import asyncio
+
+import pytest
+from fastapi.websockets import WebSocketState
+
+from backend.api.routers import websocket_alerts
+from backend.api.routers.websocket_alerts import AlertConnectionManager
+from backend.core.alert_broker import InMemoryAlertBroker, RedisAlertBroker
+from backend.core.constants import WEBSOCKET_CLOSE_CODE_SLOW_CONSUMER
+
+
+class FakeWebSocket:
+    """WebSocket mínimo; con stalled=True send_json nunca termina (cliente que no lee)."""
+
+    def __init__(self, stalled: bool = False):
+        self.client_state = WebSocketState.CONNECTED
+        self.sent = []
+        self.closed_with = None
+        self.stalled = stalled
+
+    async def accept(self):
+        pass
+
+    async def send_json(self, message):
+        if self.stalled:
+            await asyncio.Event().wait()
+        self.sent.append(message)
+
+    async def close(self, code=None, reason=""):
+        self.closed_with = code
+        self.client_state = WebSocketState.DISCONNECTED
+
+
+class FakeRedisHub:
+    """Canal pub/sub en memoria compartido por varios "workers"."""
+
+    def __init__(self):
+        self.subscribers = []
+
+    def client(self):
+        return FakeRedis(self)
+
+
+class FakePubSub:
+    def __init__(self, hub):
+        self.hub = hub
+        self.queue = asyncio.Queue()
+
+    async def subscribe(self, channel):
+        self.hub.subscribers.append(self.queue)
+
+    async def listen(self):
+        while True:
+            yield await self.queue.get()
+
+    async def aclose(self):
+        if self.queue in self.hub.subscribers:
+            self.hub.subscribers.remove(self.queue)
+
+
+class FakeRedis:
+    def __init__(self, hub):
+        self.hub = hub
+
+    async def publish(self, channel, data):
+        for queue in list(self.hub.subscribers):
+            queue.put_nowait({"type": "message", "data": data})
+        return len(self.hub.subscribers)
+
+    def pubsub(self, **kwargs):
+        return FakePubSub(self.hub)
+
+    async def aclose(self):
+        pass
+
+
+async def _drain():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.fixture(autouse=True)
+def no_global_broker(monkeypatch):
+    monkeypatch.setattr(websocket_alerts, "get_alert_broker", lambda: None)
+
+
+class TestLocalDelivery:
+
+    @pytest.mark.asyncio
+    async def test_slow_socket_does_not_block_others(self):
+        manager = AlertConnectionManager(queue_size=10, send_timeout=60)
+        slow = FakeWebSocket(stalled=True)
+        fast = FakeWebSocket()
+        await manager.connect(slow, "t1")
+        await manager.connect(fast, "t2")
+
+        await manager.broadcast_to_all_teachers({"type": "alert", "data": {"alert_id": "a1"}})
+        await _drain()
+
+        assert fast.sent == [{"type": "alert", "data": {"alert_id": "a1"}}]
+        assert manager.get_connected_count() == 2
+
+    @pytest.mark.asyncio
+    async def test_full_queue_drops_slow_consumer(self):
+        manager = AlertConnectionManager(queue_size=2, send_timeout=60)
+        slow = FakeWebSocket(stalled=True)
+        await manager.connect(slow, "t1")
+
+        for i in range(4):
+            manager.deliver_local({"type": "alert", "data": {"n": i}})
+        await _drain()
+
+        assert slow.closed_with == WEBSOCKET_CLOSE_CODE_SLOW_CONSUMER
+        assert manager.get_connected_count() == 0
+        assert manager.stats()["dropped_slow"] == 1
+
+    @pytest.mark.asyncio
+    async def test_send_timeout_drops_connection(self):
+        manager = AlertConnectionManager(queue_size=10, send_timeout=0.01)
+        slow = FakeWebSocket(stalled=True)
+        await manager.connect(slow, "t1")
+
+        manager.deliver_local({"type": "alert"})
+        await asyncio.sleep(0.05)
+
+        assert slow.closed_with == WEBSOCKET_CLOSE_CODE_SLOW_CONSUMER
+        assert not manager.is_teacher_connected("t1")
+
+    @pytest.mark.asyncio
+    async def test_targeted_delivery(self):
+        manager = AlertConnectionManager()
+        first, second = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(first, "t1")
+        await manager.connect(second, "t2")
+
+        await manager.send_to_teacher("t2", {"type": "alert"})
+        await _drain()
+
+        assert first.sent == []
+        assert second.sent == [{"type": "alert"}]
+
+
+class TestBrokerFanOut:
+
+    @pytest.mark.asyncio
+    async def test_in_memory_broker_delivers_locally(self, monkeypatch):
+        manager = AlertConnectionManager()
+        socket = FakeWebSocket()
+        await manager.connect(socket, "t1")
+        broker = InMemoryAlertBroker()
+        await broker.start(manager.deliver_envelope)
+        monkeypatch.setattr(websocket_alerts, "get_alert_broker", lambda: broker)
+
+        await manager.send_to_teacher("t1", {"type": "alert"})
+        await _drain()
+
+        assert socket.sent == [{"type": "alert"}]
+
+    @pytest.mark.asyncio
+    async def test_redis_broker_reaches_other_workers(self):
+        hub = FakeRedisHub()
+        worker_a, worker_b = AlertConnectionManager(), AlertConnectionManager()
+        broker_a = RedisAlertBroker(redis_client=hub.client())
+        broker_b = RedisAlertBroker(redis_client=hub.client())
+        await broker_a.start(worker_a.deliver_envelope)
+        await broker_b.start(worker_b.deliver_envelope)
+        assert await broker_a.wait_subscribed() and await broker_b.wait_subscribed()
+
+        socket_b = FakeWebSocket()
+        await worker_b.connect(socket_b, "t1")
+        try:
+            # Publicado en el worker A; el docente está conectado al B
+            await broker_a.publish({"target": "t1", "message": {"type": "alert", "data": {"alert_id": "a1"}}})
+            await _drain()
+            assert socket_b.sent == [{"type": "alert", "data": {"alert_id": "a1"}}]
+        finally:
+            await broker_a.stop()
+            await broker_b.stop()
+
+    @pytest.mark.asyncio
+    async def test_redis_publish_failure_falls_back_to_local(self):
+        class BrokenRedis(FakeRedis):
+            async def publish(self, channel, data):
+                raise ConnectionError("redis down")
+
+        manager = AlertConnectionManager()
+        socket = FakeWebSocket()
+        await manager.connect(socket, "t1")
+        broker = RedisAlertBroker(redis_client=BrokenRedis(FakeRedisHub()))
+        await broker.start(manager.deliver_envelope)
+        try:
+            await broker.publish({"target": None, "message": {"type": "alert"}})
+            await _drain()
+            assert socket.sent == [{"type": "alert"}]
+            assert broker.stats()["publish_errors"] == 1
+        finally:
+            await broker.stop()